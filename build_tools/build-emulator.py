@@ -64,6 +64,10 @@ def create_build(source_folder, emulator_folder):
         updated_content = file.read().replace('_HOME_PATH = "/sd"', '_HOME_PATH = "sd"')
     with open("build/lib/core/data_handler.py", "w") as file:
         file.write(updated_content)
+    with open("flight/apps/comms/downlink_queue.py", "r") as file:
+        updated_content = file.read().replace('SESSIONS_PATH = "/sd/', 'SESSIONS_PATH = "sd/')
+    with open("build/lib/apps/comms/downlink_queue.py", "w") as file:
+        file.write(updated_content)
 
     # Create main.py file with single import statement "import main_module"
     build_folder = os.path.join(build_folder, "..")
@@ -1,4 +1,5 @@
 import argparse
+import ast
 import filecmp
 import os
 import platform
@@ -23,6 +24,62 @@ if platform.system() == "Windows":
         sys.exit(-1)
 
 
+# DEBUG/INFO log statements removed from flight images with --strip-logs
+STRIPPED_LOG_CALLS = ("logger.debug", "logger.info", "self.log_debug", "self.log_info")
+
+
+def call_name(func):
+    """
+    Returns the dotted name of a called function (`logger.info`, `self.log_info`), or None for other expressions.
+    """
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return f"{func.value.id}.{func.attr}"
+    return None
+
+
+def strip_log_calls(source, calls=STRIPPED_LOG_CALLS):
+    """
+    Replaces the given log statements by `pass` so that neither the call nor its arguments are evaluated on the board.
+    Line numbers are preserved. Statements sharing a line with other code are left untouched.
+    """
+    lines = source.splitlines(keepends=True)
+    stripped = 0
+    for node in ast.walk(ast.parse(source)):
+        if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)):
+            continue
+        if call_name(node.value.func) not in calls:
+            continue
+
+        first, last = node.lineno - 1, node.end_lineno - 1
+        # AST offsets are in UTF-8 bytes
+        before = lines[first].encode()[: node.col_offset].decode()
+        after = lines[last].encode()[node.end_col_offset :].decode().strip()
+        if before.strip() or (after and not after.startswith("#")):
+            continue
+
+        newline = lines[last][len(lines[last].rstrip("\r\n")) :]
+        lines[first] = before + "pass" + newline
+        for i in range(first + 1, last + 1):
+            lines[i] = newline
+        stripped += 1
+    return "".join(lines), stripped
+
+
+def create_event_dictionary(source_folder, output_path):
+    """
+    Writes the event dictionary used to decode the binary event logs on the ground (see ground/event_log.py).
+    It is kept out of the build folder as it is not needed on the board.
+    """
+    if ROOT_PATH not in sys.path:
+        sys.path.insert(0, ROOT_PATH)
+    from ground.event_log import write_dictionary
+
+    count = write_dictionary(output_path, os.path.abspath(source_folder))
+    print(f"Wrote {count} log events to {output_path}")
+
+
 def check_directory_location(source_folder):
     if not os.path.exists(MPY_CROSS_PATH):
         raise FileNotFoundError(f"MPY_CROSS_PATH folder {MPY_CROSS_PATH} not found")
@@ -31,7 +88,7 @@ def check_directory_location(source_folder):
         raise FileNotFoundError(f"Source folder {source_folder} not found")
 
 
-def create_build(source_folder):
+def create_build(source_folder, strip_logs=False):
     build_folder = "build/"
     if os.path.exists(build_folder):
         shutil.rmtree(build_folder)
@@ -68,6 +125,19 @@ def create_build(source_folder):
                     # Extract file name
                     file_name = os.path.basename(file)
 
+                if strip_logs:
+                    with open(file_name, "r", newline="") as f:
+                        source = f.read()
+                    try:
+                        source, stripped = strip_log_calls(source)
+                    except SyntaxError as e:
+                        print(f"Could not strip log calls from {file_name}: {str(e)}")
+                        stripped = 0
+                    if stripped:
+                        with open(file_name, "w", newline="") as f:
+                            f.write(source)
+                        print(f"Stripped {stripped} DEBUG/INFO log calls from {file_name}")
+
                 try:
                     os.system(f"{MPY_CROSS_PATH} {file_name} -O3")
                 except Exception as e:
@@ -134,10 +204,23 @@ if __name__ == "__main__":
         help="Source folder path",
         required=False,
     )
+    parser.add_argument(
+        "--strip-logs",
+        action="store_true",
+        help="Remove DEBUG/INFO log statements from the flight image",
+    )
+    parser.add_argument(
+        "--event_dictionary",
+        type=str,
+        default=os.path.join(ROOT_PATH, "event_dictionary.json"),
+        help="Output path of the binary event log dictionary",
+        required=False,
+    )
     args = parser.parse_args()
 
     source_folder = args.source_folder
 
     check_directory_location(source_folder)
 
-    build_folder = create_build(source_folder)
+    build_folder = create_build(source_folder, strip_logs=args.strip_logs)
+    create_event_dictionary(source_folder, args.event_dictionary)
@@ -0,0 +1,19 @@
+"""
+Emulator benchmarks
+
+======================
+
+Benchmarks run the flight modules of the emulator build on the host and report their results as JSON,
+so that performance regressions show up in review. They are run from the build folder:
+
+    ./run.sh benchmark [name]
+    (or) cd build && python -m lib.hal.benchmarks.<name> [--output results.json]
+
+"""
+
+import sys
+
+if "./lib" not in sys.path:
+    sys.path.insert(0, "./lib")
+
+import hal.cp_mock  # noqa: F401, E402
@@ -0,0 +1,75 @@
+"""
+Shared helpers for the emulator benchmarks: virtual clock, latency statistics and JSON reporting.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+
+class VirtualClock:
+    """
+    Drop-in replacement for the time module of a flight module, advanced by the benchmark instead of the wall clock.
+    This lets hours of flight time be replayed in seconds while keeping timestamps (and file names) realistic.
+    """
+
+    def __init__(self, start: float = 1700000000.0) -> None:
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance_to(self, t: float) -> None:
+        self.now = max(self.now, t)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def percentile(sorted_samples, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, max(0, int(round(q / 100.0 * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[idx]
+
+
+def summarize(samples_ns) -> dict:
+    """Latency statistics in microseconds from a list of durations in nanoseconds."""
+    samples = sorted(samples_ns)
+    n = len(samples)
+    return {
+        "count": n,
+        "mean_us": round(sum(samples) / n / 1000, 3) if n else 0.0,
+        "p50_us": round(percentile(samples, 50) / 1000, 3),
+        "p99_us": round(percentile(samples, 99) / 1000, 3),
+        "max_us": round(samples[-1] / 1000, 3) if n else 0.0,
+    }
+
+
+def make_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("-o", "--output", type=str, default=None, help="Write the JSON results to this file")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator")
+    return parser
+
+
+def emit(benchmark: str, results: dict, output: str = None) -> dict:
+    """Prints the results as JSON (and writes them to output if given)."""
+    report = {
+        "benchmark": benchmark,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    return report
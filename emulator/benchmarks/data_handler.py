@@ -0,0 +1,220 @@
+"""
+DataHandler throughput and latency benchmark
+
+======================
+
+Registers the data processes of the flight tasks with their real formats and parameters and replays them
+against a temporary SD folder, either at flight rates or at stress rates (flight rates x --stress-factor).
+Time is virtual (see common.VirtualClock): an hour of flight is replayed in seconds with realistic file names.
+
+Reported per process:
+- samples/s: log() calls per second of CPU time spent in log()
+- log() latency: p50/p99/max
+- rotation cost: latency of the log() calls that rotated the current file (the closed file is then compressed a
+  few records per log() call, included in the log() latency)
+- check_circular_buffer() cost, called every 5 virtual seconds as done by the OBDH task
+- bytes logged (raw records) and bytes left on the SD folder
+
+The emulator gc.collect() is a 1 ms sleep and is replaced by a no-op so that it does not dominate the timings.
+
+Usage (from the build folder):
+    python -m lib.hal.benchmarks.data_handler [--duration 3600] [--stress-factor 10] [--output results.json]
+
+"""
+
+import heapq
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+
+import core.data_handler as dh
+from core.data_handler import DataHandler as DH
+from hal.benchmarks.common import VirtualClock, emit, make_parser, summarize
+
+# Same formats and registration parameters as the flight tasks, with their nominal task frequencies (Hz)
+IMU_FORMAT = "Lfffffffff"
+CDH_FORMAT = "LbLbbbb"
+EPS_FORMAT = "Lhhb" + "h" * 38
+ADCS_FORMAT = "LB" + 6 * "f" + "B" + 3 * "f" + "B" + 9 * "H" + 6 * "B" + 4 * "f" + "B" + 4 * "f"
+
+PROCESSES = (
+    ("imu", IMU_FORMAT, {"write_interval": 5, "circular_buffer_size": 5, "compress": True}, 10),
+    ("adcs", ADCS_FORMAT, {"write_interval": 5, "compress": True}, 5),
+    ("eps", EPS_FORMAT, {"compress": True}, 1),
+    ("cdh", CDH_FORMAT, {}, 2),
+)
+
+_CLEANUP_PERIOD = 5  # seconds, OBDH clean-up period
+
+_INT_RANGES = {
+    "b": (-(2**7), 2**7 - 1),
+    "B": (0, 2**8 - 1),
+    "h": (-(2**15), 2**15 - 1),
+    "H": (0, 2**16 - 1),
+    "i": (-(2**31), 2**31 - 1),
+    "I": (0, 2**32 - 1),
+    "l": (-(2**31), 2**31 - 1),
+    "L": (0, 2**32 - 1),
+}
+
+
+class _NoCollect:
+    @staticmethod
+    def collect():
+        pass
+
+
+class SampleGenerator:
+    """
+    Slowly varying synthetic samples (random walk per field), the first field being the timestamp.
+    """
+
+    def __init__(self, data_format: str, rng: random.Random) -> None:
+        self.format = data_format
+        self.rng = rng
+        self.values = []
+        for c in data_format:
+            if c in "fd":
+                self.values.append(rng.uniform(-1.0, 1.0))
+            else:
+                lo, hi = _INT_RANGES[c]
+                self.values.append(rng.randint(max(lo, -100), min(hi, 100)))
+
+    def next(self, t: float) -> list:
+        values = self.values
+        values[0] = int(t)
+        for i in range(1, len(values)):
+            c = self.format[i]
+            if c in "fd":
+                values[i] += self.rng.gauss(0.0, 0.01)
+            else:
+                lo, hi = _INT_RANGES[c]
+                values[i] = min(hi, max(lo, values[i] + self.rng.randint(-2, 2)))
+        return values
+
+
+def _dir_size(path: str):
+    size, files = 0, 0
+    for name in os.listdir(path):
+        if name.startswith("."):
+            continue
+        size += os.stat(os.path.join(path, name)).st_size
+        files += 1
+    return size, files
+
+
+def run_scenario(name: str, duration: float, rate_factor: float, seed: int) -> dict:
+    """
+    Replays all processes for duration virtual seconds at rate_factor x their flight rates.
+    """
+    sd_path = tempfile.mkdtemp(prefix=f"bench_dh_{name}_")
+    clock = VirtualClock()
+    saved = (dh._HOME_PATH, dh.time, dh.gc)
+    dh._HOME_PATH, dh.time, dh.gc = sd_path, clock, _NoCollect
+    DH.data_process_registry.clear()
+
+    rng = random.Random(seed)
+    start = clock.now
+    try:
+        stats = {}
+        events = []
+        for tag, data_format, params, rate in PROCESSES:
+            DH.register_data_process(tag, data_format, True, data_limit=100000, **params)
+            stats[tag] = {
+                "generator": SampleGenerator(data_format, rng),
+                "period": 1.0 / (rate * rate_factor),
+                "bytesize": struct.calcsize("<" + data_format),
+                "log": [],
+                "rotation": [],
+                "circular_buffer": [],
+                "records": 0,
+            }
+            heapq.heappush(events, (start, tag))
+        heapq.heappush(events, (start + _CLEANUP_PERIOD, ""))
+        clean_up = []
+
+        wall_start = time.perf_counter()
+        while events:
+            t, tag = heapq.heappop(events)
+            if t - start > duration:
+                break
+            clock.advance_to(t)
+
+            if not tag:  # OBDH clean-up
+                for ptag, dp in DH.data_process_registry.items():
+                    t0 = time.perf_counter_ns()
+                    dp.check_circular_buffer()
+                    stats[ptag]["circular_buffer"].append(time.perf_counter_ns() - t0)
+                t0 = time.perf_counter_ns()
+                DH.clean_up()
+                clean_up.append(time.perf_counter_ns() - t0)
+                heapq.heappush(events, (t + _CLEANUP_PERIOD, ""))
+                continue
+
+            s = stats[tag]
+            data = s["generator"].next(t)
+            dp = DH.data_process_registry[tag]
+            path = dp.current_path if dp.status == dh._OPEN else None
+
+            t0 = time.perf_counter_ns()
+            DH.log_data(tag, data)
+            elapsed = time.perf_counter_ns() - t0
+
+            s["log"].append(elapsed)
+            if path is not None and dp.current_path != path:
+                s["rotation"].append(elapsed)
+            if dp.write_interval_counter == 0:
+                s["records"] += 1
+            heapq.heappush(events, (t + s["period"], tag))
+        wall_time = time.perf_counter() - wall_start
+
+        processes = {}
+        for tag, s in stats.items():
+            DH.data_process_registry[tag].close()
+            on_disk, files = _dir_size(os.path.join(sd_path, tag))
+            total_log_s = sum(s["log"]) / 1e9
+            processes[tag] = {
+                "samples": len(s["log"]),
+                "samples_per_s": round(len(s["log"]) / total_log_s, 1) if total_log_s else 0.0,
+                "log_latency": summarize(s["log"]),
+                "rotation": summarize(s["rotation"]),
+                "check_circular_buffer": summarize(s["circular_buffer"]),
+                "bytes_logged": s["records"] * s["bytesize"],
+                "bytes_on_disk": on_disk,
+                "files": files,
+            }
+
+        return {
+            "virtual_duration_s": duration,
+            "rate_factor": rate_factor,
+            "wall_time_s": round(wall_time, 3),
+            "processes": processes,
+            "clean_up": summarize(clean_up),
+            "samples": sum(p["samples"] for p in processes.values()),
+            "bytes_logged": sum(p["bytes_logged"] for p in processes.values()),
+            "bytes_on_disk": sum(p["bytes_on_disk"] for p in processes.values()),
+        }
+    finally:
+        DH.data_process_registry.clear()
+        dh._HOME_PATH, dh.time, dh.gc = saved
+        shutil.rmtree(sd_path, ignore_errors=True)
+
+
+def main(argv=None) -> dict:
+    parser = make_parser("DataHandler throughput and latency benchmark")
+    parser.add_argument("--duration", type=float, default=3600, help="Virtual duration of each scenario (s)")
+    parser.add_argument("--stress-factor", type=float, default=10, help="Rate multiplier of the stress scenario")
+    args = parser.parse_args(argv)
+
+    results = {
+        "flight": run_scenario("flight", args.duration, 1, args.seed),
+        "stress": run_scenario("stress", args.duration, args.stress_factor, args.seed),
+    }
+    return emit("data_handler", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+End-to-end file downlink benchmark (ground station stand-in)
+
+======================
+
+Replays ground passes in virtual time: the COMMS app of the satellite (SATELLITE_RADIO with its downlink queue,
+burst windows and FEC) against the ground station stand-in (ground/station.py) through the channel model
+(ground/channel.py), for a sweep of channel conditions and request windows. The flight radio is replaced by a
+virtual radio: a transmission takes the time on air of the packet, a GS_ACK is received after the uplink delay.
+The satellite side follows the COMMS task: answer each GS_ACK, return to heartbeats after RX_TIMEOUT without one.
+
+Reported per scenario (loss rate / window / FEC):
+- pass_time_s: virtual time from the first heartbeat to the end of the queue (None if not reached in --max-time)
+- goodput_bps: file bits received per second of pass
+- round_trips, timeouts: GS_ACKs sent by the station, of which repeated after a reply timeout
+- duplicates, crc_errors, fec_corrected_bytes: packets received twice, dropped or corrected by the station
+- channel: packets, bytes and airtime of each direction
+- wall_time_s: host time to replay the pass
+
+The ground station and channel are not part of the emulator build, they are imported from the repository (parent
+of the build folder).
+
+Usage (from the build folder):
+    python -m lib.hal.benchmarks.downlink [--files 4] [--file-size 4800] [--loss 0 0.05 0.2] [--window 1 16]
+                                          [--fec] [--ber 0] [--latency 0.01] [--output results.json]
+
+"""
+
+import asyncio
+import heapq
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import apps.comms.comms as comms
+import apps.comms.downlink as downlink
+import apps.comms.downlink_queue as downlink_queue
+import core.data_handler as dh
+from apps.comms.comms import COMMS_STATE, MSG_ID, SATELLITE_RADIO
+from apps.comms.downlink_queue import DownlinkQueue
+from core.data_handler import DataHandler as DH
+from hal.benchmarks.common import VirtualClock, emit, make_parser
+
+_REPO_PATH = os.path.dirname(os.path.abspath(os.getcwd()))
+if _REPO_PATH not in sys.path:
+    sys.path.append(_REPO_PATH)
+
+from ground.channel import Channel  # noqa: E402
+from ground.station import GroundStation  # noqa: E402
+
+TAG = "bench"
+RX_TIMEOUT = 5.0  # seconds, heartbeat period of the COMMS task
+HEARTBEAT_SIZE = 244
+
+
+class VirtualRadio:
+    """
+    Radio of the satellite in virtual time, connected to the station through the channels.
+    """
+
+    def __init__(self, clock: VirtualClock, station: GroundStation, uplink: Channel, downlink_channel: Channel) -> None:
+        self.clock = clock
+        self.station = station
+        self.uplink = uplink
+        self.downlink = downlink_channel
+        self.xmit_timeout = 2.0
+
+        self.to_ground = []  # (arrival, order, packet, bit errors)
+        self.to_satellite = []  # (arrival, order, packet, bit errors)
+        self.order = 0
+        self._crc_error = 0
+
+    def _push(self, events, arrival, packet, errors):
+        heapq.heappush(events, (arrival, self.order, packet, errors))
+        self.order += 1
+
+    # Satellite side (flight radio interface used by COMMS)
+    def start_send(self, data, **kwargs):
+        self.clock.advance_to(self.clock.now + self.downlink.time_on_air(len(data)))
+        packet, errors = self.downlink.transfer(bytes(data))
+        if packet is not None:
+            self._push(self.to_ground, self.clock.now + self.downlink.latency, packet, errors)
+
+    def tx_done(self):
+        return True
+
+    def end_send(self, *, keep_listening=True):
+        pass
+
+    def RX_available(self):
+        return bool(self.to_satellite) and self.to_satellite[0][0] <= self.clock.now
+
+    def rx_edge(self):
+        return self.RX_available()
+
+    def read_fifo_buffer(self):
+        if not self.RX_available():
+            return None
+        _, _, packet, errors = heapq.heappop(self.to_satellite)
+        self._crc_error = 1 if errors else 0
+        return packet
+
+    def crc_error(self):
+        return self._crc_error
+
+    def rssi(self, raw=True):
+        return -100
+
+    def snr(self):
+        return 10.0
+
+    def listen(self):
+        pass
+
+    def idle(self):
+        pass
+
+    def set_spreading_factor(self, val):
+        pass
+
+    def set_signal_bandwidth(self, val):
+        pass
+
+    def set_coding_rate(self, val):
+        pass
+
+    # Ground side
+    def _next_ground_event(self):
+        t = self.to_ground[0][0] if self.to_ground else None
+        if not self.station.done and self.station.deadline is not None:
+            t = self.station.deadline if t is None else min(t, self.station.deadline)
+        return t
+
+    def wait_for_ack(self, deadline: float) -> bool:
+        """
+        Runs the station until a GS_ACK reaches the satellite or deadline. Returns False on timeout.
+        """
+        while True:
+            t_rx = self.to_satellite[0][0] if self.to_satellite else None
+            t_gs = self._next_ground_event()
+            if t_gs is not None and (t_rx is None or t_gs < t_rx) and t_gs <= deadline:
+                if self.to_ground and self.to_ground[0][0] == t_gs:
+                    _, _, packet, errors = heapq.heappop(self.to_ground)
+                    ack = self.station.receive(packet, t_gs, errors)
+                else:
+                    ack = self.station.poll(t_gs)
+                if ack is not None:
+                    packet, errors = self.uplink.transfer(ack)
+                    if packet is not None:
+                        self._push(self.to_satellite, t_gs + self.uplink.delay(len(ack)), packet, errors)
+                continue
+
+            if t_rx is not None and t_rx <= deadline:
+                self.clock.advance_to(t_rx)
+                return True
+            self.clock.advance_to(deadline)
+            return False
+
+
+class _Satellite:
+    def __init__(self, radio: VirtualRadio) -> None:
+        self.RADIO = radio
+
+
+def _reset_satellite():
+    DownlinkQueue.clear()
+    SATELLITE_RADIO.state = COMMS_STATE.TX_HEARTBEAT
+    SATELLITE_RADIO.set_filepath(None)
+    SATELLITE_RADIO.downlink.close()
+    SATELLITE_RADIO.link.reset()
+    SATELLITE_RADIO.crc_count = 0
+    SATELLITE_RADIO.tx_message_ID = 0x00
+    SATELLITE_RADIO.gs_req_message_ID = 0x00
+    SATELLITE_RADIO.gs_req_seq_count = 0
+    SATELLITE_RADIO.gs_req_window = 1
+    SATELLITE_RADIO.gs_req_bitmap = 1
+
+
+def run_pass(args, loss: float, window: int, fec: bool) -> dict:
+    sd_path = tempfile.mkdtemp(prefix="bench_downlink_")
+    clock = VirtualClock()
+    saved = (dh._HOME_PATH, downlink_queue.time, downlink.time, comms.SATELLITE, SATELLITE_RADIO.sat)
+    dh._HOME_PATH, downlink_queue.time, downlink.time = sd_path, clock, clock
+    DH.data_process_registry.clear()
+
+    channel_args = {"ber": args.ber, "latency": args.latency, "burst_enter": args.burst_enter, "burst_exit": args.burst_exit}
+    uplink = Channel(loss=loss, seed=args.seed, **channel_args)
+    downlink_channel = Channel(loss=loss, seed=args.seed + 1, **channel_args)
+    station = GroundStation(downlink_channel, window=window, fec=fec)
+    radio = VirtualRadio(clock, station, uplink, downlink_channel)
+    comms.SATELLITE = SATELLITE_RADIO.sat = _Satellite(radio)
+
+    try:
+        _reset_satellite()
+        DH.register_data_process(TAG, "B", True, data_limit=args.file_size)
+        process = DH.get_data_process(TAG)
+        rng = random.Random(args.seed)
+        for i in range(args.files):
+            path = dh.join_path(process.dir_path, "%s_%d.bin" % (TAG, int(clock.now) - 3600 * (i + 1)))
+            with open(path, "wb") as f:
+                f.write(bytes(rng.randrange(256) for _ in range(args.file_size)))
+            process.excluded_paths.append(path)
+            DownlinkQueue.add(TAG, path, 3)
+
+        SATELLITE_RADIO.set_tm_frame(bytearray([MSG_ID.SAT_HEARTBEAT]) + bytearray(HEARTBEAT_SIZE - 1))
+        start = clock.now
+        wall_start = time.perf_counter()
+        while not station.done and clock.now - start < args.max_time:
+            if SATELLITE_RADIO.get_state() != COMMS_STATE.RX:
+                asyncio.run(SATELLITE_RADIO.transmit_message())
+                SATELLITE_RADIO.transition_state(False)
+            elif radio.wait_for_ack(clock.now + RX_TIMEOUT):
+                SATELLITE_RADIO.receive_message()
+                SATELLITE_RADIO.transition_state(False)
+            else:
+                SATELLITE_RADIO.transition_state(True)
+        wall_time = time.perf_counter() - wall_start
+
+        report = station.report(clock.now)
+        report["channel"] = {"uplink": uplink.stats, "downlink": downlink_channel.stats}
+        for stats in report["channel"].values():
+            stats["airtime"] = round(stats["airtime"], 3)
+        report["files_left"] = len(DownlinkQueue.items)
+        report["wall_time_s"] = round(wall_time, 3)
+        return report
+    finally:
+        _reset_satellite()
+        DH.data_process_registry.clear()
+        dh._HOME_PATH, downlink_queue.time, downlink.time, comms.SATELLITE, SATELLITE_RADIO.sat = saved
+        shutil.rmtree(sd_path, ignore_errors=True)
+
+
+def main(argv=None) -> dict:
+    parser = make_parser("End-to-end file downlink benchmark (ground station stand-in)")
+    parser.add_argument("--files", type=int, default=4, help="Files queued for the pass")
+    parser.add_argument("--file-size", type=int, default=4800, help="Size of each file in bytes")
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.05, 0.2], help="Packet loss rates of the sweep")
+    parser.add_argument("--window", type=int, nargs="+", default=[1, 16], help="Request windows of the sweep")
+    parser.add_argument("--fec", action="store_true", help="Also run every scenario with FEC file packets")
+    parser.add_argument("--ber", type=float, default=0.0, help="Bit error rate of the channel")
+    parser.add_argument("--burst-enter", type=float, default=0.0, help="Probability of entering a burst per packet")
+    parser.add_argument("--burst-exit", type=float, default=1.0, help="Probability of leaving a burst per packet")
+    parser.add_argument("--latency", type=float, default=0.01, help="Latency in seconds (each way)")
+    parser.add_argument("--max-time", type=float, default=3600, help="Virtual time limit of a pass in seconds")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for loss in args.loss:
+        for window in args.window:
+            for fec in (False, True) if args.fec else (False,):
+                name = "loss=%s/window=%s%s" % (loss, window, "/fec" if fec else "")
+                results[name] = run_pass(args, loss, window, fec)
+    return emit("downlink", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
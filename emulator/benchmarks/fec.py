@@ -0,0 +1,124 @@
+"""
+File packet forward error correction benchmark (loss sweep)
+
+======================
+
+Sends full file packets over a binary symmetric channel for a range of bit error rates (BER), with and without the
+Reed-Solomon parity of SAT_FILE_PKT_FEC (apps/comms/fec.py), and decodes them with the ground decoder (ground/fec.py).
+
+Reported per BER:
+- plain_delivery: fraction of plain packets (header + 240 bytes) received without any error (the radio CRC drops
+  the others, which then have to be requested again)
+- fec_delivery: fraction of FEC packets decoded to the original packet (up to FEC_NSYM / 2 corrupted bytes)
+- fec_undetected: fraction of FEC packets decoded to a wrong packet (miscorrection, more than FEC_NSYM / 2 errors)
+- plain/fec_transmissions_per_packet: expected number of transmissions per delivered packet (1 / delivery)
+- plain/fec_goodput: file bytes delivered per byte sent over the air
+Also reported: encode latency of the satellite (per packet, host CPU) and decode latency of the ground.
+
+The ground decoder is not part of the emulator build, it is imported from the repository (parent of the build folder).
+
+Usage (from the build folder):
+    python -m lib.hal.benchmarks.fec [--packets 500] [--ber 1e-4 1e-3] [--output results.json]
+
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from apps.comms.fec import FEC_NSYM, RSEncoder
+from hal.benchmarks.common import emit, make_parser, summarize
+
+_REPO_PATH = os.path.dirname(os.path.abspath(os.getcwd()))
+if _REPO_PATH not in sys.path:
+    sys.path.append(_REPO_PATH)
+
+from ground.fec import decode_packet  # noqa: E402
+
+HEADER_SIZE = 4
+FILE_PKTSIZE = 240  # apps/comms/comms.py (not imported, it pulls the hardware configuration)
+DEFAULT_BER = (1e-5, 1e-4, 3e-4, 1e-3, 2e-3, 4e-3)
+
+
+def _corrupt(codeword: bytes, ber: float, rng: np.random.Generator) -> bytearray:
+    # Binary symmetric channel: each bit flipped independently with probability ber
+    bits = np.unpackbits(np.frombuffer(codeword, dtype=np.uint8))
+    bits ^= (rng.random(bits.size) < ber).astype(np.uint8)
+    return bytearray(np.packbits(bits).tobytes())
+
+
+def run_ber(ber: float, packets: list, codewords: list, rng: np.random.Generator) -> dict:
+    plain_ok = 0
+    fec_ok = 0
+    fec_wrong = 0
+    decode_samples = []
+
+    for packet, codeword in zip(packets, codewords):
+        if _corrupt(packet, ber, rng) == packet:
+            plain_ok += 1
+
+        received = _corrupt(codeword, ber, rng)
+        t0 = time.perf_counter_ns()
+        try:
+            decoded, _ = decode_packet(received)
+        except ValueError:
+            decoded = None
+        decode_samples.append(time.perf_counter_ns() - t0)
+
+        if decoded == packet:
+            fec_ok += 1
+        elif decoded is not None:
+            fec_wrong += 1
+
+    n = len(packets)
+    plain_delivery = plain_ok / n
+    fec_delivery = fec_ok / n
+    return {
+        "plain_delivery": round(plain_delivery, 4),
+        "fec_delivery": round(fec_delivery, 4),
+        "fec_undetected": round(fec_wrong / n, 4),
+        "plain_transmissions_per_packet": round(1 / plain_delivery, 3) if plain_ok else None,
+        "fec_transmissions_per_packet": round(1 / fec_delivery, 3) if fec_ok else None,
+        "plain_goodput": round(FILE_PKTSIZE * plain_delivery / (HEADER_SIZE + FILE_PKTSIZE), 4),
+        "fec_goodput": round(FILE_PKTSIZE * fec_delivery / (HEADER_SIZE + FILE_PKTSIZE + FEC_NSYM), 4),
+        "decode_latency": summarize(decode_samples),
+    }
+
+
+def main(argv=None) -> dict:
+    parser = make_parser("File packet forward error correction benchmark (loss sweep)")
+    parser.add_argument("--packets", type=int, default=500, help="Packets sent per bit error rate")
+    parser.add_argument("--ber", type=float, nargs="+", default=list(DEFAULT_BER), help="Bit error rates of the sweep")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    encoder = RSEncoder(FEC_NSYM)
+    parity = bytearray(FEC_NSYM)
+
+    packets = []
+    codewords = []
+    encode_samples = []
+    for seq in range(args.packets):
+        header = bytes([0x21]) + (seq & 0xFFFF).to_bytes(2, "big") + bytes([FILE_PKTSIZE])
+        packet = bytearray(header + bytes(rng.randrange(256) for _ in range(FILE_PKTSIZE)))
+        t0 = time.perf_counter_ns()
+        encoder.encode_into(packet, parity)
+        encode_samples.append(time.perf_counter_ns() - t0)
+        packets.append(packet)
+        codewords.append(packet + parity)
+
+    channel = np.random.default_rng(args.seed)
+    results = {
+        "packet_size": HEADER_SIZE + FILE_PKTSIZE,
+        "fec_packet_size": HEADER_SIZE + FILE_PKTSIZE + FEC_NSYM,
+        "nsym": FEC_NSYM,
+        "encode_latency": summarize(encode_samples),
+        "sweep": {str(ber): run_ber(ber, packets, codewords, channel) for ber in args.ber},
+    }
+    return emit("fec", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Fixed point codec benchmark
+
+======================
+
+Compares the scalar fixed point helpers of apps/telemetry/helpers.py (one value and one bytearray at a time) with
+their batch versions (whole array into a caller-supplied buffer, column decode into a float array).
+
+Reported per codec (hp, lp) and array size:
+- encode/decode latency of a whole array: scalar loop vs batch (p50/p99/max), and the p50 speedup
+- bit_exact: the batch encoder wrote the same bytes and the batch decoder returned the same values as the scalar helpers
+
+Usage (from the build folder):
+    python -m lib.hal.benchmarks.fixed_point [--sizes 16 256 4096] [--repeat 200] [--output results.json]
+
+"""
+
+import random
+import time
+
+import numpy as np
+from apps.telemetry.helpers import (
+    convert_fixed_point_array_to_float_hp,
+    convert_fixed_point_array_to_float_lp,
+    convert_fixed_point_to_float_hp,
+    convert_fixed_point_to_float_lp,
+    convert_float_array_to_fixed_point_hp,
+    convert_float_array_to_fixed_point_lp,
+    convert_float_to_fixed_point_hp,
+    convert_float_to_fixed_point_lp,
+)
+from hal.benchmarks.common import emit, make_parser, summarize
+
+# name -> (scalar encode, scalar decode, batch encode, batch decode, value range)
+CODECS = {
+    "hp": (
+        convert_float_to_fixed_point_hp,
+        convert_fixed_point_to_float_hp,
+        convert_float_array_to_fixed_point_hp,
+        convert_fixed_point_array_to_float_hp,
+        127.0,
+    ),
+    "lp": (
+        convert_float_to_fixed_point_lp,
+        convert_fixed_point_to_float_lp,
+        convert_float_array_to_fixed_point_lp,
+        convert_fixed_point_array_to_float_lp,
+        32767.0,
+    ),
+}
+
+
+def _time(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+def run_codec(name: str, size: int, repeat: int, seed: int) -> dict:
+    encode, decode, encode_array, decode_array, limit = CODECS[name]
+    rng = random.Random(seed)
+    values = [rng.uniform(-limit, limit) for _ in range(size)]
+    array = np.array(values)
+
+    scalar_buffer = bytearray(4 * size)
+    batch_buffer = bytearray(4 * size)
+
+    def scalar_encode():
+        for i, val in enumerate(values):
+            scalar_buffer[4 * i : 4 * i + 4] = encode(val)
+
+    def batch_encode():
+        encode_array(array, batch_buffer)
+
+    def scalar_decode():
+        return [decode(scalar_buffer[4 * i : 4 * i + 4]) for i in range(size)]
+
+    def batch_decode():
+        return decode_array(batch_buffer, size)
+
+    encode_scalar = summarize(_time(scalar_encode, repeat))
+    encode_batch = summarize(_time(batch_encode, repeat))
+    decode_scalar = summarize(_time(scalar_decode, repeat))
+    decode_batch = summarize(_time(batch_decode, repeat))
+
+    bit_exact = scalar_buffer == batch_buffer and scalar_decode() == batch_decode().tolist()
+
+    return {
+        "size": size,
+        "bit_exact": bit_exact,
+        "encode_scalar": encode_scalar,
+        "encode_batch": encode_batch,
+        "encode_speedup": round(encode_scalar["p50_us"] / max(encode_batch["p50_us"], 1e-3), 2),
+        "decode_scalar": decode_scalar,
+        "decode_batch": decode_batch,
+        "decode_speedup": round(decode_scalar["p50_us"] / max(decode_batch["p50_us"], 1e-3), 2),
+    }
+
+
+def main(argv=None) -> dict:
+    parser = make_parser("Fixed point codec benchmark (scalar vs batch)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 256, 4096], help="Array sizes")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed calls per size")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in CODECS:
+        results[name] = [run_codec(name, size, args.repeat, args.seed) for size in args.sizes]
+    return emit("fixed_point", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Telemetry packing benchmark and allocation profiler
+
+======================
+
+Fills the DataHandler with realistic CDH/EPS/ADCS/GPS/thermal/storage records (flight formats, slowly varying values)
+and times TelemetryPacker.pack_tm_frame() for each frame type, in two modes:
+- updated: every data process logged new data before each frame (all sections re-encoded, worst case)
+- unchanged: no new data between frames (sections skipped, heartbeats between two samples)
+
+Reported per frame type and mode:
+- pack_tm_frame() latency (p50/p99/max), timed without tracemalloc
+- peak_bytes_per_frame: peak heap above the baseline while packing one frame (transient allocations, tracemalloc)
+- retained_bytes_per_frame / retained_objects_per_frame: net heap growth (bytes and memory blocks) of the packing
+  code per frame over all iterations. It stays close to 0 as the encoded values are replaced in place, a value that
+  grows with --iterations means the packer keeps allocating between frames (heap fragmentation on board)
+- golden: the packed frame is byte-exact with a field by field reference packing done with the scalar helpers
+  (the frame digest is reported as well to compare runs)
+
+The emulator gc.collect() is a 1 ms sleep and is replaced by a no-op so that it does not dominate the timings.
+
+Usage (from the build folder):
+    python -m lib.hal.benchmarks.telemetry [--iterations 2000] [--output results.json]
+
+"""
+
+import hashlib
+import random
+import struct
+import time
+import tracemalloc
+
+import apps.telemetry.packing as packing
+import core.data_handler as dh
+from apps.telemetry.frames import TM_FRAME_ID, TM_FRAMES
+from apps.telemetry.helpers import (
+    convert_float_to_fixed_point_hp,
+    convert_float_to_fixed_point_lp,
+    pack_signed_long_int,
+    pack_signed_short_int,
+    pack_unsigned_long_int,
+    pack_unsigned_short_int,
+)
+from apps.telemetry.schema import FP_HP, FP_LP, S16, S32, U8, U16, U32
+from core.data_handler import DataHandler as DH
+from hal.benchmarks.common import emit, make_parser, summarize
+from hal.benchmarks.data_handler import ADCS_FORMAT, CDH_FORMAT, EPS_FORMAT, SampleGenerator, _NoCollect
+
+# Data processes of the flight tasks packed into the telemetry frames (non-persistent, packing only reads the latest data)
+PROCESSES = (
+    ("cdh", CDH_FORMAT),
+    ("eps", EPS_FORMAT),
+    ("adcs", ADCS_FORMAT),
+    ("gps", "LBBBHIiiiiHHHHHiiiiii"),
+    ("thermal", "LHHH"),
+    ("storage", "LL" + "HL" * 8),
+)
+
+# Frames packed from the latest data (the history frame pages records out of the SD card instead)
+FRAMES = (TM_FRAME_ID.FULL, TM_FRAME_ID.COMPACT, TM_FRAME_ID.ADCS, TM_FRAME_ID.STORAGE)
+
+_SIZES = {U8: 1, U16: 2, S16: 2, U32: 4, S32: 4, FP_HP: 4, FP_LP: 4}
+
+
+def reference_frame(frame_id: int, seq_count: int) -> bytearray:
+    """
+    Packs the frame field by field with the scalar helpers of helpers.py, from the latest data of the DataHandler.
+    """
+    schema, size = TM_FRAMES[frame_id]
+    frame = bytearray(size)
+    frame[0] = frame_id
+    struct.pack_into(">H", frame, 1, seq_count)
+    frame[3] = schema.length
+    for name, tag, idx, enc, offset in schema.fields:
+        values = DH.get_latest_data(tag)
+        if enc == U8:
+            encoded = bytearray([values[idx] & 0xFF])
+        elif enc == U16:
+            encoded = pack_unsigned_short_int(values, idx)
+        elif enc == S16:
+            encoded = pack_signed_short_int(values, idx)
+        elif enc == U32:
+            encoded = pack_unsigned_long_int(values, idx)
+        elif enc == S32:
+            encoded = pack_signed_long_int(values, idx)
+        elif enc == FP_HP:
+            encoded = convert_float_to_fixed_point_hp(values[idx])
+        else:
+            encoded = convert_float_to_fixed_point_lp(values[idx])
+        frame[offset : offset + _SIZES[enc]] = encoded
+    return frame
+
+
+def _log_all(generators, t: float) -> None:
+    for tag, generator in generators:
+        DH.log_data(tag, generator.next(t))
+
+
+def run_frame(frame_id: int, updated: bool, iterations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    generators = [(tag, SampleGenerator(data_format, rng)) for tag, data_format in PROCESSES]
+    packer = packing.TelemetryPacker
+    packer._FRAMES = packing._allocate_frames()
+    _log_all(generators, 0)
+    packer.pack_tm_frame(frame_id)  # first frame encodes every section
+
+    # Latency, without tracemalloc overhead
+    samples = []
+    for i in range(iterations):
+        if updated:
+            _log_all(generators, i + 1)
+        t0 = time.perf_counter_ns()
+        packer.pack_tm_frame(frame_id)
+        samples.append(time.perf_counter_ns() - t0)
+
+    # Allocations
+    tracemalloc.start()
+    peaks = []
+    before = tracemalloc.take_snapshot()
+    for i in range(iterations):
+        if updated:
+            _log_all(generators, iterations + i + 1)
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        packer.pack_tm_frame(frame_id)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Only the growth attributed to the packing code counts (not the data generators)
+    filters = [tracemalloc.Filter(True, "*apps/telemetry/*")]
+    growth = after.filter_traces(filters).compare_to(before.filter_traces(filters), "filename")
+    retained_bytes = sum(stat.size_diff for stat in growth)
+    retained_blocks = sum(stat.count_diff for stat in growth)
+
+    frame = packer.FRAME()
+    golden = frame == reference_frame(frame_id, packer.SEQ_COUNT())
+
+    return {
+        "frame_size": len(frame),
+        "iterations": iterations,
+        "pack_latency": summarize(samples),
+        "peak_bytes_per_frame": max(peaks),
+        "retained_bytes_per_frame": round(retained_bytes / iterations, 3),
+        "retained_objects_per_frame": round(retained_blocks / iterations, 3),
+        "golden": golden,
+        "digest": hashlib.sha256(frame).hexdigest()[:16],
+    }
+
+
+def main(argv=None) -> dict:
+    parser = make_parser("Telemetry packing benchmark and allocation profiler")
+    parser.add_argument("--iterations", type=int, default=2000, help="Frames packed per frame type and mode")
+    args = parser.parse_args(argv)
+
+    saved = (dh.gc, dict(DH.data_process_registry), packing.TelemetryPacker._FRAMES)
+    dh.gc = _NoCollect
+    DH.data_process_registry.clear()
+    try:
+        for tag, data_format in PROCESSES:
+            DH.register_data_process(tag, data_format, False)
+
+        results = {}
+        for frame_id in FRAMES:
+            name = [key for key, val in vars(TM_FRAME_ID).items() if val == frame_id][0].lower()
+            results[name] = {
+                "updated": run_frame(frame_id, True, args.iterations, args.seed),
+                "unchanged": run_frame(frame_id, False, args.iterations, args.seed),
+            }
+        results["golden"] = all(mode["golden"] for frame in results.values() for mode in frame.values())
+        return emit("telemetry", results, args.output)
+    finally:
+        dh.gc, registry, packing.TelemetryPacker._FRAMES = saved
+        DH.data_process_registry.clear()
+        DH.data_process_registry.update(registry)
+
+
+if __name__ == "__main__":
+    main()
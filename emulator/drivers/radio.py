@@ -3,6 +3,13 @@ import random
 import socket
 import time
 
+from apps.comms.link import time_on_air
+
+# Ground station stand-in (ground/station.py), one UDP datagram per radio packet (RadioHead header included)
+GS_ADDRESS = ("127.0.0.1", 5500)
+SAT_ADDRESS = ("127.0.0.1", 5501)
+RH_HEADER_SIZE = 4
+
 
 class RadioDebug:
     def __init__(self, radio):
@@ -33,6 +40,11 @@ class Radio:
         self.node = 0
         self.listening = False
 
+        # Modulation (configuration of the radio at boot)
+        self.spreading_factor = 7
+        self.signal_bandwidth = 125000
+        self.coding_rate = 5
+
         self._rx_queue = queue.Queue()
         self._rx_time_bias = 0.5
         self._rx_time_dev = 0.3
@@ -40,16 +52,54 @@ class Radio:
         self._tx_queue = queue.Queue()
         self._tx_time_bias = 0.5
         self._tx_time_dev = 0.3
+        self.xmit_timeout = 2.0
+
+        # Transmission in progress (start_send), delivered by end_send once the time on air has elapsed
+        self._tx_packet = None
+        self._tx_destination = 0x00
+        self._tx_done_time = 0.0
 
         self._last_rssi = -147.0
+        self._last_snr = 10.0
         self._frequency_error = 123.45
 
+        # Persistent socket to the ground station, received packets are moved to the RX queue when polled
+        self._socket = None
+        if use_socket:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.bind(SAT_ADDRESS)
+            self._socket.setblocking(False)
+
         self.test = RadioDebug(self)
 
+    def _poll_socket(self):
+        if self._socket is None:
+            return
+        while True:
+            try:
+                datagram = self._socket.recv(256)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(e)
+                return
+            if len(datagram) > RH_HEADER_SIZE:
+                self._rx_queue.put(datagram[RH_HEADER_SIZE:])
+
     def RX_available(self):
+        self._poll_socket()
+        return not self._rx_queue.empty()
+
+    def rx_irq_available(self):
+        return True
+
+    def rx_edge(self):
+        # DIO0 edge capture: a packet is waiting in the queue
+        self._poll_socket()
         return not self._rx_queue.empty()
 
     def read_fifo_buffer(self):
+        self._poll_socket()
         if self._rx_queue.empty():
             return None
         return self._rx_queue.get()
@@ -67,34 +117,70 @@ class Radio:
     def rssi(self, raw=True):
         return self._last_rssi
 
+    def snr(self):
+        return self._last_snr
+
     def frequency_error(self):
         return self._frequency_error
 
     def sleep(self):
         self.listening = False
 
+    def idle(self):
+        self.listening = False
+
+    def set_spreading_factor(self, val):
+        self.spreading_factor = val
+
+    def set_signal_bandwidth(self, val):
+        self.signal_bandwidth = val
+
+    def set_coding_rate(self, val):
+        self.coding_rate = val
+
     def send(self, packet, destination=0x00, keep_listening=True):
-        if self.use_socket:
+        # Blocking send, tasks use start_send/tx_done/end_send instead
+        self.start_send(packet, destination=destination)
+        while not self.tx_done():
+            time.sleep(max(0.0, self._tx_done_time - time.monotonic()))
+        return self.end_send(keep_listening=keep_listening)
+
+    def start_send(self, packet, destination=0x00):
+        # Simulated time on air, the packet is delivered by end_send
+        self._tx_packet = bytes(packet)
+        self._tx_destination = destination
+        if self._socket is not None:
+            # Time on air of the current modulation, as seen by the ground station
+            tx_time = time_on_air(len(packet) + RH_HEADER_SIZE, self.spreading_factor, self.signal_bandwidth, self.coding_rate)
+        else:
             tx_time = self._tx_time_bias + (random.random() - 0.5) * self._tx_time_dev
-            time.sleep(tx_time)
+        self._tx_done_time = time.monotonic() + tx_time
+        return True
+
+    def tx_done(self):
+        return self._tx_packet is None or time.monotonic() >= self._tx_done_time
+
+    def end_send(self, keep_listening=True):
+        packet = self._tx_packet
+        self._tx_packet = None
+        if packet is None:
+            return False
+
+        if self.use_socket:
             payload = bytearray(len(packet) + 4)
-            payload[0] = destination
+            payload[0] = self._tx_destination
             payload[1] = 0xFF
             payload[2] = 0x00
             payload[3] = 0x00
             payload[4:] = packet
             self.test.last_tx_packet = payload
             try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.connect((socket.gethostname(), 5500))
-                    s.sendall(payload)
-                    return True
-            except Exception as e:
+                self._socket.sendto(payload, GS_ADDRESS)
+                return True
+            except OSError as e:
                 print(e)
                 return False
         else:
-            tx_time = self._tx_time_bias + (random.random() - 0.5) * self._tx_time_dev
-            time.sleep(tx_time)
             self.test.last_tx_packet = packet
         return True
 
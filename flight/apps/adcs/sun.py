@@ -60,7 +60,7 @@ def read_light_sensors():
         try:
             lux_readings.append(_read_light_sensor(face))
         except Exception as e:
-            logger.warning(f"Error reading {face}: {e}")
+            logger.warning("Error reading %s: %s", face, e)
             lux_readings.append(ERROR_LUX)
 
     # Placeholder for the z+ face pyramid reading
@@ -20,6 +20,8 @@ Author: Ibrahima S. Sow
 
 """
 
+from apps.comms.downlink_queue import DownlinkQueue
+from apps.telemetry import TelemetryPacker
 from core import logger
 
 
@@ -31,50 +33,65 @@ def SWITCH_TO_SAFE_MODE():
 
 def SWITCH_TO_AUTONOMOUS_MODE(target_state):
     """Switches the satellite back to autonomous mode."""
-    logger.info(f"Executing SWITCH_TO_AUTONOMOUS_MODE with target_state: {target_state}")
+    logger.info("Executing SWITCH_TO_AUTONOMOUS_MODE with target_state: %s", target_state)
     pass
 
 
 def ENABLE_DEVICE(device_id):
     """Enables the specified device and updates the configuration file."""
-    logger.info(f"Executing ENABLE_DEVICE with device_id: {device_id}")
+    logger.info("Executing ENABLE_DEVICE with device_id: %s", device_id)
     pass
 
 
 def DISABLE_DEVICE(device_id):
     """Disables the specified device and updates the configuration file."""
-    logger.info(f"Executing DISABLE_DEVICE with device_id: {device_id}")
+    logger.info("Executing DISABLE_DEVICE with device_id: %s", device_id)
     pass
 
 
 def ENABLE_TASK(task_id, state_flags):
     """Enables a task in a specific state or set of states."""
-    logger.info(f"Executing ENABLE_TASK with task_id: {task_id} and state_flags: {state_flags}")
+    logger.info("Executing ENABLE_TASK with task_id: %s and state_flags: %s", task_id, state_flags)
     pass
 
 
 def DISABLE_TASK(task_id, state_flags):
     """Disables a task in a specific state or set of states."""
-    logger.info(f"Executing DISABLE_TASK with task_id: {task_id} and state_flags: {state_flags}")
+    logger.info("Executing DISABLE_TASK with task_id: %s and state_flags: %s", task_id, state_flags)
     pass
 
 
 def REQUEST_TELEMETRY(tm_type):
-    """Requests telemetry data from the satellite."""
-    logger.info(f"Executing REQUEST_TELEMETRY with tm_type: {tm_type}")
-    pass
+    """Requests telemetry data from the satellite, tm_type being the frame ID sent with the next heartbeat."""
+    logger.info("Executing REQUEST_TELEMETRY with tm_type: %s", tm_type)
+    if not TelemetryPacker.request_frame(tm_type):
+        raise ValueError("Unknown telemetry frame type")
 
 
-def REQUEST_FILE(file_tag, time_window=None):
-    """Requests a specific file from the satellite."""
-    logger.info(f"Executing REQUEST_FILE with file_tag: {file_tag} and time_window: {time_window}")
-    pass
+def REQUEST_HISTORY(first_seq):
+    """Requests the housekeeping history from record first_seq, paged out with the next heartbeats until caught up."""
+    logger.info("Executing REQUEST_HISTORY with first_seq: %s", first_seq)
+    TelemetryPacker.request_history(first_seq)
+
+
+def REQUEST_FILE(file_tag, start=0, end=0):
+    """
+    Requests the files of a data process overlapping the time window [start, end], or its latest file if end is 0.
+    The files are queued for downlink ahead of the routine files.
+    """
+    logger.info("Executing REQUEST_FILE with file_tag: %s and time window: %s - %s", file_tag, start, end)
+    if end == 0:
+        if DownlinkQueue.add_latest(file_tag) is None:
+            raise ValueError("No file available")
+    elif DownlinkQueue.add_extract(file_tag, start, end) == 0:
+        raise ValueError("No file in the time window")
 
 
 def REQUEST_IMAGE():
-    """Requests an image from the satellite storage."""
+    """Requests the latest image from the satellite storage, queued for downlink ahead of the routine files."""
     logger.info("Executing REQUEST_IMAGE")
-    pass
+    if DownlinkQueue.add_latest("img") is None:
+        raise ValueError("No image available")
 
 
 def REQUEST_STORAGE_STATUS():
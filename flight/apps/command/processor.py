@@ -12,14 +12,26 @@ Each command is defined as follow:
 - ID: A unique identifier for the command
 - Name: A string representation of the command for debugging
 - Description: A brief description of the command
-- Arguments: A list of parameters that the command accepts
+- Arguments: The packed argument schema of the command (struct format, big-endian)
 - Precondition: A list of conditions that must be met before executing the command
 
+Commands are uplinked in batches: a single frame carries several command records, each made of the command ID followed
+by its arguments packed with the schema of the command, so that the record size is known from the ID alone:
+    [cmd_id (1 byte), args (schema size)] [cmd_id, args] ...
+The records are decoded straight into the CommandQueue (see unpack_commands). Fixed-size strings ("8s") are NUL padded
+and decoded to str.
+
+The commands are compiled once at import into a dispatch table indexed by command ID (precondition, struct, argument
+types, function): processing a command is a table lookup, and its arguments are checked against the argument types
+of its schema.
+
 See documentation for a full description of each commands.
 
 Author: Ibrahima S. Sow
 """
 
+import struct
+
 from apps.command.commands import (
     DISABLE_DEVICE,
     DISABLE_TASK,
@@ -27,6 +39,7 @@ from apps.command.commands import (
     ENABLE_DEVICE,
     ENABLE_TASK,
     REQUEST_FILE,
+    REQUEST_HISTORY,
     REQUEST_IMAGE,
     REQUEST_STORAGE_STATUS,
     REQUEST_TELEMETRY,
@@ -34,88 +47,95 @@ from apps.command.commands import (
     SWITCH_TO_AUTONOMOUS_MODE,
     SWITCH_TO_SAFE_MODE,
 )
+from apps.command.fifo import CommandQueue
 from core import logger
 
 # See commands.py for function definitions (command functions and eventual preconditions)
 # A command is defined as a tuple with the following elements:
 # - ID: A unique identifier for the command
 # - Precondition: A function that checks if the command can be executed
-# - Arguments: A list of parameters that the command accepts
+# - Arguments: The struct format of the arguments (without byte order), "" for none
 # - Execute: The function that executes the command
 
 COMMANDS = [
     (
         0x01,
         lambda: True,
-        [],
+        "",
         SWITCH_TO_SAFE_MODE,
     ),
     (
         0x02,
-        lambda: True,  # TODO: Validate the target state
-        ["target_state"],
+        lambda target_state: True,  # TODO: Validate the target state
+        "B",
         SWITCH_TO_AUTONOMOUS_MODE,
     ),
     (
         0x03,
         lambda device_id: True,  # TODO: Check if the device is ON
-        ["device_id"],
+        "B",
         ENABLE_DEVICE,
     ),
     (
         0x04,
         lambda device_id: True,  # TODO: Check if the device is OFF
-        ["device_id"],
+        "B",
         DISABLE_DEVICE,
     ),
     (
         0x05,
-        lambda task_id: True,  # TODO: Ensure the task ID exists
-        ["task_id", "state_flags"],
+        lambda task_id, state_flags: True,  # TODO: Ensure the task ID exists
+        "BB",
         ENABLE_TASK,
     ),
     (
         0x06,
-        lambda task_id: True,  # TODO: Ensure the task ID exists
-        ["task_id", "state_flags"],
+        lambda task_id, state_flags: True,  # TODO: Ensure the task ID exists
+        "BB",
         DISABLE_TASK,
     ),
     (
         0x07,
-        lambda: True,
-        ["tm_type"],
+        lambda tm_type: True,
+        "B",
         REQUEST_TELEMETRY,
     ),
     (
         0x08,
-        lambda file_tag: True,  # TODO: Validate if the file exists
-        ["file_tag", "time_window"],
+        lambda file_tag, start, end: True,  # TODO: Validate if the file exists
+        "8sLL",
         REQUEST_FILE,
     ),
     (
         0x09,
         lambda: True,  # TODO: Check for image availability
-        [],
+        "",
         REQUEST_IMAGE,
     ),
     (
         0x0A,
         lambda: True,
-        [],
+        "",
         REQUEST_STORAGE_STATUS,
     ),
     (
         0x0B,
         lambda: True,  # TODO: Check for power and readiness
-        [],
+        "",
         SCHEDULE_OD_EXPERIMENT,
     ),
     (
         0x0C,
         lambda: True,
-        [],
+        "",
         DOWNLINK_MISSION_DATA,
     ),
+    (
+        0x0D,
+        lambda first_seq: True,
+        "L",
+        REQUEST_HISTORY,
+    ),
 ]
 
 
@@ -125,36 +145,110 @@ class CommandProcessingStatus:
     PRECONDITION_FAILED = 0x02
     ARGUMENT_COUNT_MISMATCH = 0x03
     COMMAND_EXECUTION_FAILED = 0x04  # Maybe write error stack to a file/log ?
+    ARGUMENT_TYPE_MISMATCH = 0x05
+
+
+def _arg_types(schema):
+    # Python type of each argument unpacked with the schema ("8s" is a single str, "2B" two ints)
+    types = []
+    count = 0
+    for c in schema:
+        if "0" <= c <= "9":
+            count = count * 10 + int(c)
+            continue
+        if c == "s":
+            types.append(str)
+        elif c != "x":
+            types.extend([float if c in "fd" else int] * (count or 1))
+        count = 0
+    return tuple(types)
+
+
+def compile_commands(commands):
+    """
+    Builds the dispatch table of the commands, indexed by command ID.
+    Each entry is (precondition, struct format, packed size, argument types, execute), None for unknown IDs.
+    """
+    table = [None] * (max(command[0] for command in commands) + 1)
+    for cmd_id, precondition, schema, execute in commands:
+        fmt = ">" + schema
+        table[cmd_id] = (precondition, fmt, struct.calcsize(fmt), _arg_types(schema), execute)
+    return table
+
+
+DISPATCH_TABLE = compile_commands(COMMANDS)
+
+
+def _lookup(cmd_id):
+    if 0 <= cmd_id < len(DISPATCH_TABLE):
+        return DISPATCH_TABLE[cmd_id]
+    return None
 
 
 def process_command(cmd_id, *args):
     """Processes a command by ID and arguments, with lightweight validation and execution."""
-    for command in COMMANDS:
-        if command[0] == cmd_id:
-            precondition, arg_list, execute = command[1:]
-
-            # Verify precondition
-            if not precondition():
-                logger.error("Cmd: Precondition failed")
-                return CommandProcessingStatus.PRECONDITION_FAILED
-
-            # Verify the argument count
-            if len(args) != len(arg_list):
-                print(arg_list)
-                logger.error(f"Cmd: Argument count mismatch for command ID {cmd_id}")
-                return CommandProcessingStatus.ARGUMENT_COUNT_MISMATCH
-
-            # Execute the command function with arguments
-            try:
-                execute(*args)
-                return CommandProcessingStatus.COMMAND_EXECUTION_SUCCESS
-            except Exception as e:
-                logger.error(f"Cmd: Command execution failed: {e}")
-                # Optionally log stack trace to a file for deeper diagnostics
-                return CommandProcessingStatus.COMMAND_EXECUTION_FAILED
-
-    logger.warning("Cmd: Unknown command ID")
-    return CommandProcessingStatus.UNKNOWN_COMMAND_ID
+    command = _lookup(cmd_id)
+    if command is None:
+        logger.warning("Cmd: Unknown command ID")
+        return CommandProcessingStatus.UNKNOWN_COMMAND_ID
+    precondition, _, _, arg_types, execute = command
+
+    # Verify the arguments against the schema
+    if len(args) != len(arg_types):
+        logger.error("Cmd: Argument count mismatch for command ID %s", cmd_id)
+        return CommandProcessingStatus.ARGUMENT_COUNT_MISMATCH
+    for arg, arg_type in zip(args, arg_types):
+        if not isinstance(arg, arg_type):
+            logger.error("Cmd: Argument type mismatch for command ID %s", cmd_id)
+            return CommandProcessingStatus.ARGUMENT_TYPE_MISMATCH
+
+    # Verify precondition
+    if not precondition(*args):
+        logger.error("Cmd: Precondition failed")
+        return CommandProcessingStatus.PRECONDITION_FAILED
+
+    # Execute the command function with arguments
+    try:
+        execute(*args)
+        return CommandProcessingStatus.COMMAND_EXECUTION_SUCCESS
+    except Exception as e:
+        logger.error("Cmd: Command execution failed: %s", e)
+        # Optionally log stack trace to a file for deeper diagnostics
+        return CommandProcessingStatus.COMMAND_EXECUTION_FAILED
+
+
+def unpack_commands(frame, offset=0, end=None):
+    """
+    Decodes the command records of an uplink frame from offset to end into the CommandQueue.
+    Decoding stops at an unknown command ID or a truncated record (the size of the next records is unknown), or when
+    the queue is full.
+
+    Returns:
+        int: The number of commands queued.
+    """
+    if end is None:
+        end = len(frame)
+    count = 0
+    while offset < end:
+        cmd_id = frame[offset]
+        command = _lookup(cmd_id)
+        if command is None:
+            logger.warning("Cmd: Unknown command ID %s in uplink frame", cmd_id)
+            break
+        fmt, size = command[1], command[2]
+        if offset + 1 + size > end:
+            logger.warning("Cmd: Truncated arguments for command ID %s", cmd_id)
+            break
+
+        args = struct.unpack_from(fmt, frame, offset + 1)
+        if str in command[3]:
+            args = tuple(arg.rstrip(b"\x00").decode() if isinstance(arg, bytes) else arg for arg in args)
+        if CommandQueue.push_command(cmd_id, args) != CommandQueue.OK:
+            logger.warning("Cmd: Command queue full")
+            break
+        offset += 1 + size
+        count += 1
+    return count
 
 
 def handle_command_execution_status(status):
@@ -6,14 +6,62 @@ and acknowledgement RX.
 Authors: Akshat Sahay, Ibrahima S. Sow
 
 By default, the RF module is in RX mode, and returns to it after TX.
+Transmissions do not block the scheduler: the FIFO is loaded and TX started, then the COMMS task awaits TX done
+(polled every TX_POLL_INTERVAL seconds on the scheduler clock, up to the radio xmit_timeout) while the other tasks run.
+In RX, the COMMS task awaits the DIO0 RxDone edge (counted by the radio without SPI, polled every RX_POLL_INTERVAL
+seconds by the scheduler) and only reads the radio over SPI once a packet is waiting.
+
+File packets can be requested one at a time (one GS_ACK per packet) or by window (burst mode).
+A GS_ACK requesting SAT_FILE_PKT may carry a window after the requested sequence count:
+    [8]     : window size W, 1 to MAX_WINDOW packets starting at the requested sequence count
+    [9:...] : optional bitmap of the packets to send, (W + 7) // 8 bytes, bit i % 8 (LSB first) of byte i // 8
+              standing for packet seq + i. Without bitmap, the W packets not received by the ground yet are requested.
+The satellite then sends the requested packets back to back before listening again, so that a single RX/TX
+turnaround is paid per window instead of per packet. Missing packets are requested again with a bitmap.
+Each file packet is assembled in place in a pre-allocated TX frame (header packed with struct.pack_into, data copied
+from the read-ahead block of the downlink session, parity encoded after it) and handed to the radio as a memoryview,
+which the radio writes to its FIFO without copy: no packet-sized allocation during a file downlink.
+
+Requesting SAT_FILE_PKT_FEC instead of SAT_FILE_PKT (same GS_ACK layout) appends FEC_NSYM Reed-Solomon parity bytes
+computed over the header and data of each packet (see fec.py): the ground corrects up to FEC_NSYM / 2 corrupted bytes
+per packet instead of requesting it again.
+
+File metadata: [file ID, size (4 bytes), packet count (2 bytes), first packet the ground still needs (2 bytes)].
+The file is the best item of the downlink queue (see downlink_queue.py). A GS_ACK requesting SAT_FILE_PKT or
+SAT_FILE_METADATA acknowledges the packets of the current file before its sequence count, as well as the packets of
+its window left out of its bitmap: requesting the metadata of the next file with the packet count of the current one
+completes it, otherwise it stays queued and resumes later. The received packets of each file are saved to the SD card
+with the downlink queue, a transfer interrupted by a reset resumes without sending them again.
+
+Requesting SAT_LINK_CONFIG starts the link adaptation handshake (see link.py): the satellite answers with the fastest
+modulation profile supported by the SNR of the last GS_ACKs, and switches to it when the next GS_ACK acknowledges it.
+
+Commands are uplinked in a GS_CMD frame: a GS_ACK without window (same acknowledgement and request in bytes 4 to 7)
+followed by a batch of command records (see command/processor.py), so that several commands cost a single RX/TX
+turnaround and the requested message is sent as usual. A frame repeated by the ground after a lost answer (same
+sequence count and command records as the frame received just before) is not queued twice; a pass timeout forgets
+the last frame, so a ground restarting its frame count at each pass is never dropped.
 """
 
 import os
-
+import struct
+from binascii import crc32
+
+from apps.command.processor import unpack_commands
+from apps.comms.downlink import DownlinkSession
+from apps.comms.downlink_queue import DownlinkQueue
+from apps.comms.fec import FEC_NSYM, RSEncoder
+from apps.comms.link import LinkAdaptation
 from core import logger
+from core.scheduler import wait_for
 from hal.configuration import SATELLITE
 
 FILE_PKTSIZE = 240
+FILE_HEADER_FORMAT = ">BHB"  # message ID, sequence count, packet size
+FILE_HEADER_SIZE = 4
+MAX_WINDOW = 32  # maximum number of file packets sent per GS_ACK (burst mode)
+TX_POLL_INTERVAL = 0.01  # seconds between two TX done checks
+RX_POLL_INTERVAL = 0.01  # seconds between two DIO0 edge checks
 
 
 class COMMS_STATE:
@@ -24,16 +72,22 @@ class COMMS_STATE:
     TX_METADATA = 0x02
     TX_FILEPKT = 0x03
 
+    TX_LINK_CONFIG = 0x04
+
 
 class MSG_ID:
     SAT_HEARTBEAT = 0x01
 
     GS_ACK = 0x08
     SAT_ACK = 0x09
+    GS_CMD = 0x0A
 
     SAT_FILE_METADATA = 0x10
 
     SAT_FILE_PKT = 0x20
+    SAT_FILE_PKT_FEC = 0x21
+
+    SAT_LINK_CONFIG = 0x30
 
 
 class SATELLITE_RADIO:
@@ -51,11 +105,19 @@ class SATELLITE_RADIO:
     file_ID = 0x00
     file_size = 0
     file_message_count = 0
+    file_first_seq = 0
 
-    # Data for file downlinking
-    file_obj = []
+    # Data for file downlinking, the file stays open for the whole transfer (see downlink.py)
+    downlink = DownlinkSession(FILE_PKTSIZE)
     file_array = []
 
+    # Reed-Solomon encoder for FEC file packets
+    fec = RSEncoder(FEC_NSYM)
+
+    # Pre-allocated TX frame of the file packets (header, data and FEC parity), sent as a memoryview
+    tx_frame = bytearray(FILE_HEADER_SIZE + FILE_PKTSIZE + FEC_NSYM)
+    tx_view = memoryview(tx_frame)
+
     # Last TX'd message ID
     tx_message_ID = 0x00
     tx_message = []
@@ -65,11 +127,21 @@ class SATELLITE_RADIO:
     rx_message_sequence_count = 0
     rx_message_size = 0
     rx_message_rssi = 0
+    rx_message_snr = 0
+
+    # Modulation profile of the link, adapted during a ground pass
+    link = LinkAdaptation()
 
     # Payload for GS ACKs, used for comms state and error checking
     gs_rx_message_ID = 0x0
     gs_req_message_ID = 0x0
     gs_req_seq_count = 0
+    # Requested window of file packets (burst mode): number of packets and bitmap of the packets to send
+    gs_req_window = 1
+    gs_req_bitmap = 1
+
+    # Sequence count and CRC32 of the command records of the GS_CMD frame received just before (None otherwise)
+    gs_cmd_frame = None
 
     # CRC error count
     crc_count = 0
@@ -99,20 +171,31 @@ class SATELLITE_RADIO:
             if timeout:
                 # Lost contact with GS, return to default state
                 cls.state = COMMS_STATE.TX_HEARTBEAT
+                cls.downlink.close()
+                if cls.link.reset():
+                    # The ground returns to the default profile as well
+                    cls.set_link_profile()
+                # End of the pass, the next command frame is new whatever its sequence count
+                cls.gs_cmd_frame = None
 
             # Transitions based on GS ACKs
             elif cls.gs_req_message_ID == MSG_ID.SAT_HEARTBEAT:
-                # Send latest TM frame
+                # Send latest TM frame, any file transfer is complete
                 cls.state = COMMS_STATE.TX_HEARTBEAT
+                cls.downlink.close()
 
             elif cls.gs_req_message_ID == MSG_ID.SAT_FILE_METADATA:
                 # Send file metadata
                 cls.state = COMMS_STATE.TX_METADATA
 
-            elif cls.gs_req_message_ID == MSG_ID.SAT_FILE_PKT:
-                # Send file packet with specified sequence count
+            elif cls.gs_req_message_ID == MSG_ID.SAT_FILE_PKT or cls.gs_req_message_ID == MSG_ID.SAT_FILE_PKT_FEC:
+                # Send file packet with specified sequence count (with FEC parity if requested)
                 cls.state = COMMS_STATE.TX_FILEPKT
 
+            elif cls.gs_req_message_ID == MSG_ID.SAT_LINK_CONFIG:
+                # Send the proposed modulation profile
+                cls.state = COMMS_STATE.TX_LINK_CONFIG
+
             else:
                 # Unknown message ID, return to default state
                 cls.state = COMMS_STATE.TX_HEARTBEAT
@@ -139,6 +222,8 @@ class SATELLITE_RADIO:
     @classmethod
     def set_filepath(cls, filepath):
         # Set internal TM frame definition
+        if filepath != cls.filepath:
+            cls.downlink.close()
         cls.filepath = filepath
 
     """
@@ -148,6 +233,11 @@ class SATELLITE_RADIO:
 
     @classmethod
     def file_get_metadata(cls):
+        # Progress of the current file, then best item of the downlink queue
+        cls.acknowledge_file()
+        item = DownlinkQueue.next()
+        cls.set_filepath(item.path if item is not None else None)
+
         if not (cls.filepath):
             # No file at filepath
             logger.warning("[COMMS ERROR] Undefined TX filepath")
@@ -155,11 +245,13 @@ class SATELLITE_RADIO:
             cls.file_ID = 0x00
             cls.file_size = 0
             cls.file_message_count = 0
+            cls.file_first_seq = 0
 
         else:
             # Valid filepath from DH, set size and message count
             file_stat = os.stat(cls.filepath)
-            cls.file_ID = 0x01
+            cls.file_ID = item.item_id
+            cls.file_first_seq = item.acked
             cls.file_size = int(file_stat[6])
             cls.file_message_count = int(cls.file_size / FILE_PKTSIZE)
 
@@ -167,40 +259,64 @@ class SATELLITE_RADIO:
             if (cls.file_size % FILE_PKTSIZE) > 0:
                 cls.file_message_count += 1
 
-            # cls.file_obj = open(cls.filepath, "rb")
+    """
+        Name: acknowledge_file
+        Description: Record the packets of the current file received by the ground (before the requested sequence count)
+    """
+
+    @classmethod
+    def acknowledge_file(cls):
+        item = DownlinkQueue.current
+        if item is not None and item.path == cls.filepath:
+            if DownlinkQueue.acknowledge(item, cls.gs_req_seq_count, cls.gs_req_window, cls.gs_req_bitmap):
+                logger.info("File %s downlinked", item.path)
+
+    """
+        Name: file_missing_bitmap
+        Description: Bitmap of the packets of a window of the current file not received by the ground yet
+    """
+
+    @classmethod
+    def file_missing_bitmap(cls, seq, window):
+        item = DownlinkQueue.current
+        if item is None or item.path != cls.filepath:
+            return (1 << window) - 1
+        return DownlinkQueue.missing(item, seq, window)
 
     """
         Name: file_get_packet
-        Description: Packetize TX file and store in file array for TX
+        Description: Get the TX file packet with the given sequence count from the downlink session (file_array)
     """
 
     @classmethod
     def file_get_packet(cls, sq_cnt):
-        if cls.filepath is not None:
-            cls.file_obj = open(cls.filepath, "rb")
-
-        else:
+        if not cls.filepath or not cls.downlink.open(cls.filepath):
             logger.warning("[COMMS ERROR] Undefined TX filepath")
             cls.file_array = bytes([0x00, 0x00, 0x00, 0x00])
 
             return 0x00
 
-        # Seek to the correct sq_cnt
-        if sq_cnt != cls.file_message_count - 1:
-            cls.file_obj.seek(sq_cnt * FILE_PKTSIZE)
-            cls.file_array = cls.file_obj.read(FILE_PKTSIZE)
-            cls.file_obj.close()
+        # Packet served from the read-ahead block of the session (memoryview)
+        packet = cls.downlink.get_packet(sq_cnt)
+        if packet is None:
+            logger.warning("[COMMS ERROR] File packet %s out of range", sq_cnt)
+            cls.file_array = bytes([0x00, 0x00, 0x00, 0x00])
 
-            return FILE_PKTSIZE
+            return 0x00
 
-        else:
-            last_pkt_size = cls.file_size - (cls.file_message_count - 1) * FILE_PKTSIZE
+        cls.file_array = packet
+        return len(packet)
 
-            cls.file_obj.seek(sq_cnt * FILE_PKTSIZE)
-            cls.file_array = cls.file_obj.read(last_pkt_size)
-            cls.file_obj.close()
+    """
+        Name: check_downlink_timeout
+        Description: Close the downlink session if the ground stopped requesting packets
+    """
 
-            return last_pkt_size
+    @classmethod
+    def check_downlink_timeout(cls):
+        if cls.downlink.expired():
+            logger.info("File downlink session timed out")
+            cls.downlink.close()
 
     """
         Name: file_pack_metadata
@@ -213,7 +329,12 @@ class SATELLITE_RADIO:
         cls.file_get_metadata()
 
         # Return file metadata payload message
-        return cls.file_ID.to_bytes(1, "big") + cls.file_size.to_bytes(4, "big") + cls.file_message_count.to_bytes(2, "big")
+        return (
+            cls.file_ID.to_bytes(1, "big")
+            + cls.file_size.to_bytes(4, "big")
+            + cls.file_message_count.to_bytes(2, "big")
+            + cls.file_first_seq.to_bytes(2, "big")
+        )
 
     """
         Name: listen
@@ -231,7 +352,21 @@ class SATELLITE_RADIO:
 
     @classmethod
     def data_available(cls):
-        return SATELLITE.RADIO.RX_available()
+        # IRQ flags only read over SPI once DIO0 signalled a packet
+        return cls.sat.RADIO.rx_edge() and cls.sat.RADIO.RX_available()
+
+    """
+        Name: wait_for_packet
+        Description: Yield to the scheduler until a packet is received or timeout seconds have elapsed
+    """
+
+    @classmethod
+    async def wait_for_packet(cls, timeout):
+        if not cls.sat.RADIO.rx_irq_available():
+            # No DIO0 edge capture, single check of the IRQ flags over SPI
+            return cls.data_available()
+
+        return await wait_for(cls.data_available, timeout, RX_POLL_INTERVAL)
 
     """
         Name: receive_message
@@ -254,28 +389,54 @@ class SATELLITE_RADIO:
         # Check CRC error on received packet
         crc_check = SATELLITE.RADIO.crc_error()
 
-        # Increment internal CRC count
+        # Increment internal CRC count, the link can't sustain the current profile
         if crc_check > 0:
             cls.crc_count += 1
+            cls.link.on_crc_error()
 
         # Get RX message RSSI
         cls.rx_message_rssi = SATELLITE.RADIO.rssi(raw=True)
+        cls.rx_message_snr = SATELLITE.RADIO.snr()
 
         # Unpack RX message header
         cls.rx_message_ID = int.from_bytes(packet[0:1], "big")
         cls.rx_message_sequence_count = int.from_bytes(packet[1:3], "big")
         cls.rx_message_size = int.from_bytes(packet[3:4], "big")
 
-        if cls.rx_message_ID == MSG_ID.GS_ACK:
+        if cls.rx_message_ID != MSG_ID.GS_CMD:
+            # Only the command frame received just before can be repeated
+            cls.gs_cmd_frame = None
+
+        if cls.rx_message_ID == MSG_ID.GS_ACK or cls.rx_message_ID == MSG_ID.GS_CMD:
             # GS acknowledged and sent command
             cls.gs_rx_message_ID = int.from_bytes(packet[4:5], "big")
             cls.gs_req_message_ID = int.from_bytes(packet[5:6], "big")
             cls.gs_req_seq_count = int.from_bytes(packet[6:8], "big")
 
+            if cls.rx_message_ID == MSG_ID.GS_CMD:
+                # Batch of commands after the request, queued whatever the last TX'd message
+                cls.gs_req_window = 1
+                cls.gs_req_bitmap = 1
+                if cls.crc_count == 0:
+                    cls.queue_commands(packet)
+                else:
+                    cls.gs_cmd_frame = None
+
+            # Optional window of file packets (burst mode)
+            elif len(packet) > 8:
+                cls.gs_req_window = min(max(packet[8], 1), MAX_WINDOW)
+                if len(packet) > 9:
+                    cls.gs_req_bitmap = int.from_bytes(packet[9 : 9 + (cls.gs_req_window + 7) // 8], "little")
+                else:
+                    cls.gs_req_bitmap = cls.file_missing_bitmap(cls.gs_req_seq_count, cls.gs_req_window)
+            else:
+                cls.gs_req_window = 1
+                cls.gs_req_bitmap = 1
+
             # Verify GS RX message ID with previously transmitted message ID
             if cls.tx_message_ID != cls.gs_rx_message_ID:
                 # RX ID mismatch, reset GS RQ'd ID
-                logger.warning(f"[COMMS ERROR] GS received {cls.gs_rx_message_ID}")
+                logger.warning("[COMMS ERROR] GS received %s", cls.gs_rx_message_ID)
                 cls.gs_req_message_ID = 0x00
 
                 return cls.gs_req_message_ID
@@ -288,12 +449,37 @@ class SATELLITE_RADIO:
 
                 return cls.gs_req_message_ID
 
+            # Valid GS_ACK, SNR of the current profile
+            cls.link.record(cls.rx_message_snr)
+
+            if cls.tx_message_ID == MSG_ID.SAT_LINK_CONFIG and cls.link.commit():
+                # Handshake confirmed, switch before answering (the ground switched after sending this GS_ACK)
+                cls.set_link_profile()
+
         else:
             # Unknown message ID, reset GS RQ' ID
             cls.gs_req_message_ID = 0x00
 
         return cls.gs_req_message_ID
 
+    """
+        Name: queue_commands
+        Description: Queue the command records of a GS_CMD frame, once per frame
+    """
+
+    @classmethod
+    def queue_commands(cls, packet):
+        end = min(len(packet), 4 + cls.rx_message_size)
+        frame = (cls.rx_message_sequence_count, crc32(packet[8:end]))
+        if frame == cls.gs_cmd_frame:
+            # Frame repeated by the GS, already queued
+            return 0
+
+        cls.gs_cmd_frame = frame
+        count = unpack_commands(packet, 8, end)
+        logger.info("[COMMS] %s commands queued", count)
+        return count
+
     """
         Name: transmit_file_metadata
         Description: Generate TX message for file metadata
@@ -307,7 +493,7 @@ class SATELLITE_RADIO:
                 (MSG_ID.SAT_FILE_METADATA),
                 0x0,
                 0x0,
-                0x7,
+                0x9,
             ]
         )
 
@@ -316,24 +502,112 @@ class SATELLITE_RADIO:
         # Pack entire message
         cls.tx_message = tx_header + tx_payload
 
+    """
+        Name: transmit_link_config
+        Description: Generate TX message for the proposed modulation profile (link adaptation handshake)
+    """
+
+    @classmethod
+    def transmit_link_config(cls):
+        profile = cls.link.propose()
+        sf, bw, cr = cls.link.settings(profile)
+        worst_snr = cls.link.worst_snr()
+        worst_snr = cls.rx_message_snr if worst_snr is None else worst_snr
+
+        tx_header = bytes([MSG_ID.SAT_LINK_CONFIG, 0x0, 0x0, 0x6])
+        tx_payload = bytes([profile, sf, cr]) + (bw // 1000).to_bytes(2, "big") + bytes([int(worst_snr) & 0xFF])
+        cls.tx_message = tx_header + tx_payload
+
+    """
+        Name: set_link_profile
+        Description: Configure the radio with the current modulation profile of the link
+    """
+
+    @classmethod
+    def set_link_profile(cls):
+        sf, bw, cr = cls.link.settings()
+        radio = cls.sat.RADIO
+
+        radio.idle()
+        radio.set_spreading_factor(sf)
+        radio.set_signal_bandwidth(bw)
+        radio.set_coding_rate(cr)
+        radio.listen()
+        logger.info("Link profile %s: SF%s, BW %s Hz, CR 4/%s", cls.link.current, sf, bw, cr)
+
     """
         Name: transmit_file_packet
         Description: Generate TX message for file packet
     """
 
     @classmethod
-    def transmit_file_packet(cls):
+    def transmit_file_packet(cls, sq_cnt=None):
+        if sq_cnt is None:
+            sq_cnt = cls.gs_req_seq_count
+
         # Get bytes from file (stored in file_array)
-        pkt_size = cls.file_get_packet(cls.gs_req_seq_count)
+        pkt_size = cls.file_get_packet(sq_cnt)
 
-        tx_header = (
-            (MSG_ID.SAT_FILE_PKT).to_bytes(1, "big")
-            + (cls.gs_req_seq_count).to_bytes(2, "big")
-            + (pkt_size).to_bytes(1, "big")
-        )
+        fec = cls.gs_req_message_ID == MSG_ID.SAT_FILE_PKT_FEC
+        msg_id = MSG_ID.SAT_FILE_PKT_FEC if fec else MSG_ID.SAT_FILE_PKT
 
-        # Pack entire message
-        cls.tx_message = tx_header + cls.file_array
+        # Pack entire message in place in the TX frame (no allocation per packet)
+        struct.pack_into(FILE_HEADER_FORMAT, cls.tx_frame, 0, msg_id, sq_cnt, pkt_size)
+        length = FILE_HEADER_SIZE + len(cls.file_array)
+        cls.tx_frame[FILE_HEADER_SIZE:length] = cls.file_array
+
+        if fec:
+            # Reed-Solomon parity over the header and data
+            length = cls.fec.encode_into(cls.tx_view[:length], cls.tx_frame, length)
+
+        cls.tx_message = cls.tx_view[:length]
+
+    """
+        Name: transmit_file_window
+        Description: Send the requested window of file packets back to back, the last one is left in tx_message
+    """
+
+    @classmethod
+    async def transmit_file_window(cls):
+        cls.acknowledge_file()
+
+        count = 0
+        for i in range(cls.gs_req_window):
+            if not (cls.gs_req_bitmap >> i) & 1:
+                continue
+            sq_cnt = cls.gs_req_seq_count + i
+            if count > 0:
+                if sq_cnt >= cls.downlink.packet_count:
+                    # Window past the end of the file
+                    break
+                # Send the previous packet of the burst
+                await cls.send(cls.tx_message)
+            cls.transmit_file_packet(sq_cnt)
+            count += 1
+
+        if count == 0:
+            # Empty bitmap, send the requested packet
+            cls.transmit_file_packet()
+            count = 1
+
+        return count
+
+    """
+        Name: send
+        Description: Transmit a message via the LoRa module, yielding to the scheduler until TX done
+    """
+
+    @classmethod
+    async def send(cls, message):
+        radio = cls.sat.RADIO
+        radio.start_send(message)
+
+        done = await wait_for(radio.tx_done, radio.xmit_timeout, TX_POLL_INTERVAL)
+        radio.end_send()
+        if not done:
+            logger.warning("[COMMS ERROR] TX timed out")
+
+        return done
 
     """
         Name: transmit_message
@@ -341,7 +615,7 @@ class SATELLITE_RADIO:
     """
 
     @classmethod
-    def transmit_message(cls):
+    async def transmit_message(cls):
         # Check comms state and TX message accordingly
         if cls.state == COMMS_STATE.TX_HEARTBEAT:
             # Transmit SAT heartbeat
@@ -352,18 +626,22 @@ class SATELLITE_RADIO:
             cls.transmit_file_metadata()
 
         elif cls.state == COMMS_STATE.TX_FILEPKT:
-            # Transmit file packets with requested sequence count
-            cls.transmit_file_packet()
+            # Transmit file packets of the requested window (single packet if no window)
+            await cls.transmit_file_window()
+
+        elif cls.state == COMMS_STATE.TX_LINK_CONFIG:
+            # Transmit proposed modulation profile
+            cls.transmit_link_config()
 
         else:
             # Unknown state, just send
-            logger.warning(f"[COMMS ERROR] SAT received {cls.gs_rq_message_ID}")
+            logger.warning("[COMMS ERROR] SAT received %s", cls.gs_rq_message_ID)
             cls.tx_message = cls.tm_frame
 
         # Send a message to GS
-        cls.sat.RADIO.send(cls.tx_message)
+        await cls.send(cls.tx_message)
         cls.crc_count = 0
 
         # Return TX message header
-        cls.tx_message_ID = int.from_bytes(cls.tx_message[0:1], "big")
+        cls.tx_message_ID = cls.tx_message[0]
         return cls.tx_message_ID
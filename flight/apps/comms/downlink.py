@@ -0,0 +1,125 @@
+"""
+File downlink session
+
+======================
+
+Keeps the file being downlinked open for the whole transfer instead of opening, seeking and closing it for every
+requested packet. Packets are read ahead in blocks of block_packets packets into a pre-allocated buffer and served as
+memoryview slices of that buffer, so consecutive packet requests within a block cost no SD card access at all.
+
+The session is closed when the transfer is complete (the ground moves on), when the ground pass times out or when
+it has been idle for more than timeout seconds.
+
+"""
+
+import os
+import time
+
+from core import logger
+
+
+class DownlinkSession:
+    """
+    Read-ahead packet cache over the file being downlinked.
+
+    Args:
+        packet_size (int): The size of a file packet in bytes.
+        block_packets (int): The number of packets read from the file at once.
+        timeout (float): Idle time in seconds after which the session can be closed (see expired()).
+    """
+
+    def __init__(self, packet_size, block_packets=8, timeout=60):
+        self.packet_size = packet_size
+        self.block_packets = block_packets
+        self.timeout = timeout
+
+        # Pre-allocated read-ahead block
+        self.buffer = bytearray(packet_size * block_packets)
+        self.view = memoryview(self.buffer)
+
+        self.file = None
+        self.path = None
+        self.file_size = 0
+        self.packet_count = 0
+
+        # Packets currently in the buffer: [block_start, block_start + block_count), block_bytes valid bytes
+        self.block_start = 0
+        self.block_count = 0
+        self.block_bytes = 0
+
+        self.last_activity = 0
+        self.block_reads = 0  # number of SD card reads of the session
+
+    def open(self, path):
+        """
+        Opens the file to downlink, no-op if it is already the file of the session.
+
+        Returns:
+            bool: False if the file can't be opened.
+        """
+        if self.file is not None and path == self.path:
+            return True
+        self.close()
+
+        try:
+            self.file = open(path, "rb")
+            self.file_size = os.stat(path)[6]
+        except OSError as e:
+            logger.warning("[COMMS ERROR] Can't open %s: %s", path, e)
+            self.close()
+            return False
+
+        self.path = path
+        self.packet_count = (self.file_size + self.packet_size - 1) // self.packet_size
+        self.block_count = 0
+        self.block_bytes = 0
+        self.block_reads = 0
+        self.last_activity = time.monotonic()
+        return True
+
+    def is_open(self):
+        return self.file is not None
+
+    def get_packet(self, seq):
+        """
+        Returns the packet with sequence number seq as a memoryview of the read-ahead buffer
+        (valid until the next call), or None if seq is outside the file.
+        The last packet of the file is shorter than packet_size if the file size is not a multiple of it.
+        """
+        if self.file is None or seq < 0 or seq >= self.packet_count:
+            return None
+        self.last_activity = time.monotonic()
+
+        if not self.block_start <= seq < self.block_start + self.block_count:
+            self._read_block(seq)
+
+        start = (seq - self.block_start) * self.packet_size
+        return self.view[start : min(start + self.packet_size, self.block_bytes)]
+
+    def _read_block(self, seq):
+        # Single seek and read of up to block_packets packets, starting at packet seq
+        self.file.seek(seq * self.packet_size)
+        read = self.file.readinto(self.buffer) or 0
+        self.block_start = seq
+        self.block_bytes = read
+        self.block_count = (read + self.packet_size - 1) // self.packet_size
+        self.block_reads += 1
+
+    def expired(self):
+        """
+        Returns whether the session is open and has been idle for more than timeout seconds.
+        """
+        return self.file is not None and time.monotonic() - self.last_activity > self.timeout
+
+    def close(self):
+        """
+        Closes the file of the session (transfer complete or timed out).
+        """
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.path = None
+        self.file_size = 0
+        self.packet_count = 0
+        self.block_count = 0
+        self.block_bytes = 0
@@ -0,0 +1,542 @@
+"""
+Downlink priority queue
+
+======================
+
+Candidate items for the file downlink (closed telemetry files of the data processes, event/command logs, images and
+time-window extracts requested by the ground), served to COMMS best score first when the ground requests the
+metadata of the next file:
+
+    score = PRIORITY_WEIGHT * priority + AGE_WEIGHT * min(age in hours, AGE_LIMIT) - SIZE_WEIGHT * remaining kB
+
+so that the most valuable bytes go first on a short pass, old data is not starved and partially sent items, with
+fewer bytes left, are finished first. Scores depend on the time and are evaluated at selection, over at most
+MAX_ITEMS items.
+
+Each item keeps its progress: a bitmap of the packets received by the ground (acknowledged by the GS_ACKs, see
+comms.py) and the first packet the ground still needs. An item partially sent when the pass ends stays in the queue
+and resumes from there at the next pass, the packets already received are not sent again. Completed items are
+notified to the DataHandler (notify_TM_path), which deletes the file.
+
+The transfer sessions are saved to the SD card (SESSIONS_PATH, at most every SAVE_INTERVAL seconds while they change)
+and loaded at boot, so that a reset doesn't restart the transfers. Binary format, little endian:
+    header : packet size (2 bytes), next file ID (1 byte), item count (1 byte)
+    item   : file ID (1), priority (1), creation time (4), size (4), CRC32 (4), tag length (1), path length (1),
+             tag, path, received bitmap ((packet count + 7) // 8 bytes, bit seq % 8 of byte seq // 8)
+An item is only restored if its file still has the saved size and CRC32. The CRC32 of a queued file is computed
+incrementally, CRC_STEP bytes per refresh() (heartbeat), and completed when its session is first saved. The restored files are excluded again from
+the deletions of their data process (excluded_paths is not persisted by the DataHandler). The sessions file and the
+saved files themselves are kept when the SD card is wiped at boot (see kept_files()).
+
+"""
+
+import os
+import struct
+import time
+from binascii import crc32
+
+from core import logger
+from core.data_handler import DataHandler as DH
+from core.data_handler import join_path
+
+# Files of the data processes refreshed into the queue, with their priority (command logs and housekeeping first).
+# The telemetry history ring is not a file source, its records are paged out in the telemetry frames.
+SOURCE_PRIORITIES = (
+    ("cmd_logs", 3),
+    ("cdh", 3),
+    ("eps", 3),
+    ("adcs", 3),
+    ("gps", 3),
+    ("evt", 2),
+    ("imu", 2),
+    ("img", 1),
+)
+REQUEST_PRIORITY = 4  # files requested by the ground (REQUEST_FILE, REQUEST_IMAGE)
+
+MAX_ITEMS = 32
+PRIORITY_WEIGHT = 100
+AGE_WEIGHT = 1  # per hour
+AGE_LIMIT = 48  # hours
+SIZE_WEIGHT = 0.5  # per kB left to send
+
+SESSIONS_PATH = "/sd/.downlink_sessions"
+SAVE_INTERVAL = 10  # seconds
+CRC_STEP = 4096  # bytes of the queued files added to their CRC32 per refresh
+_HEADER_FORMAT = "<HBB"
+_ITEM_FORMAT = "<BBIIIBB"
+_CRC_BUFFER = bytearray(256)
+
+
+def file_crc(path):
+    """
+    Returns the CRC32 of a file, read in chunks of a pre-allocated buffer.
+    """
+    crc = 0
+    view = memoryview(_CRC_BUFFER)
+    with open(path, "rb") as f:
+        while True:
+            read = f.readinto(_CRC_BUFFER)
+            if not read:
+                break
+            crc = crc32(view[:read], crc)
+    return crc
+
+
+def file_time(path):
+    """
+    Returns the creation time encoded in a data process file name (<tag>_<time>.<ext>, or <tag>_<time>_<n>.<ext> for
+    the files created in the same second), or None.
+    """
+    name = path[path.rfind("/") + 1 :]
+    fields = name[: name.rfind(".")].split("_")
+    try:
+        if len(fields) > 2 and fields[-2].isdigit():
+            return int(fields[-2])
+        return int(fields[-1])
+    except ValueError:
+        return None
+
+
+class DownlinkItem:
+    """
+    File queued for downlink.
+
+    Args:
+        item_id (int): The file ID sent in the file metadata.
+        tag (str): The data process of the file.
+        path (str): The path of the file.
+        priority (int): The priority of the item.
+        created (int): The creation time of the file.
+        size (int): The size of the file in bytes.
+        crc (int): The CRC32 of the file, None to compute it with update_crc().
+        packet_count (int): The number of packets of the file.
+    """
+
+    __slots__ = (
+        "item_id",
+        "tag",
+        "path",
+        "priority",
+        "created",
+        "size",
+        "crc",
+        "crc_offset",
+        "packet_count",
+        "received",
+        "acked",
+    )
+
+    def __init__(self, item_id, tag, path, priority, created, size, crc, packet_count):
+        self.item_id = item_id
+        self.tag = tag
+        self.path = path
+        self.priority = priority
+        self.created = created
+        self.size = size
+        self.crc = crc or 0
+        self.crc_offset = 0 if crc is None else size  # bytes of the file in the CRC32 so far
+        self.packet_count = packet_count
+        self.received = bytearray((packet_count + 7) // 8)  # packets received by the ground
+        self.acked = 0  # first packet still needed by the ground
+
+    def update_crc(self, max_bytes=None):
+        """
+        Adds up to max_bytes (the rest of the file if None) of the file to its CRC32, in chunks of a pre-allocated
+        buffer. A file that can't be read or is shorter than its size is given up, its session won't be restored.
+
+        Returns:
+            int: The number of bytes read.
+        """
+        remaining = self.size - self.crc_offset
+        if max_bytes is not None:
+            remaining = min(remaining, max_bytes)
+        if remaining <= 0:
+            return 0
+
+        count = 0
+        view = memoryview(_CRC_BUFFER)
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.crc_offset)
+                while count < remaining:
+                    read = f.readinto(view[: min(len(_CRC_BUFFER), remaining - count)])
+                    if not read:
+                        self.crc_offset = self.size
+                        break
+                    self.crc = crc32(view[:read], self.crc)
+                    self.crc_offset += read
+                    count += read
+        except OSError as e:
+            logger.warning("Can't read %s: %s", self.path, e)
+            self.crc_offset = self.size
+        return count
+
+    def is_received(self, seq):
+        return 0 <= seq < self.packet_count and (self.received[seq >> 3] >> (seq & 7)) & 1
+
+    def mark_received(self, seq):
+        """
+        Returns True if the packet wasn't marked as received yet.
+        """
+        if seq >= self.packet_count or self.is_received(seq):
+            return False
+        self.received[seq >> 3] |= 1 << (seq & 7)
+        return True
+
+    def received_count(self):
+        count = 0
+        for byte in self.received:
+            while byte:
+                byte &= byte - 1
+                count += 1
+        return count
+
+    def score(self, now, packet_size):
+        age = min(max(now - self.created, 0) / 3600, AGE_LIMIT)
+        remaining = max(self.size - self.received_count() * packet_size, 0)
+        return PRIORITY_WEIGHT * self.priority + AGE_WEIGHT * age - SIZE_WEIGHT * remaining / 1000
+
+
+class DownlinkQueue:
+    items = []
+    current = None  # item being downlinked
+    packet_size = 240
+    _next_id = 1
+
+    # Sessions changed since the last save
+    dirty = False
+    last_save = 0
+
+    @classmethod
+    def add(cls, tag, path, priority, created=None):
+        """
+        Queues a file excluded from deletion by its data process (request_TM_path).
+
+        Returns:
+            DownlinkItem: The queued item, or None if the queue is full or the file can't be read.
+        """
+        for item in cls.items:
+            if item.path == path:
+                item.priority = max(item.priority, priority)
+                return item
+
+        if len(cls.items) >= MAX_ITEMS:
+            logger.warning("Downlink queue full, %s not queued", path)
+            return None
+
+        try:
+            size = os.stat(path)[6]
+        except OSError as e:
+            logger.warning("Can't queue %s: %s", path, e)
+            return None
+
+        if created is None:
+            created = file_time(path)
+        if created is None:
+            created = int(time.time())
+
+        item = DownlinkItem(cls._next_id, tag, path, priority, created, size, None, cls._packet_count(size))
+        cls._next_id = cls._next_id % 255 + 1  # 1 byte file ID, 0 is no file
+        cls.items.append(item)
+        cls.dirty = True
+        return item
+
+    @classmethod
+    def _packet_count(cls, size):
+        return (size + cls.packet_size - 1) // cls.packet_size
+
+    @classmethod
+    def refresh(cls):
+        """
+        Queues the oldest closed file of each source data process that has no file queued yet, once compressed if the
+        process compresses its files (a file still waiting for its compression is queued at a later heartbeat).
+        Then adds CRC_STEP bytes of the queued files to their CRC32.
+        """
+        # Processes registered after the sessions were loaded
+        for item in cls.items:
+            cls._exclude(item)
+
+        for tag, priority in SOURCE_PRIORITIES:
+            if not DH.data_process_exists(tag) or cls.has_tag(tag):
+                continue
+            process = DH.get_data_process(tag)
+            files = process.get_sorted_file_list()
+            # Configuration file, current file and at least one closed file
+            if len(files) <= 2 or process.compression_pending(join_path(process.dir_path, files[1])):
+                continue
+            path = DH.request_TM_path(tag)
+            if path:
+                cls.add(tag, path, priority)
+
+        budget = CRC_STEP
+        for item in cls.items:
+            if budget <= 0:
+                break
+            budget -= item.update_crc(budget)
+
+    @classmethod
+    def add_latest(cls, tag, priority=REQUEST_PRIORITY):
+        """
+        Queues the latest file of a data process (ground request).
+
+        Returns:
+            DownlinkItem: The queued item, or None if the process has no file available.
+        """
+        path = DH.request_TM_path(tag, latest=True)
+        if not path:
+            return None
+        return cls.add(tag, path, priority)
+
+    @classmethod
+    def add_extract(cls, tag, start, end, priority=REQUEST_PRIORITY):
+        """
+        Queues the closed files of a data process overlapping the time window [start, end] (ground request).
+
+        Returns:
+            int: The number of files queued.
+        """
+        process = DH.get_data_process(tag)
+        files = [name for name in process.get_sorted_file_list() if not name.startswith(".")]  # no configuration file
+        times = [file_time(name) for name in files]
+
+        count = 0
+        for i, name in enumerate(files):
+            if times[i] is None:
+                continue
+            # A file covers the time from its creation to the creation of the next one
+            file_end = times[i + 1] if i + 1 < len(times) and times[i + 1] is not None else int(time.time())
+            path = join_path(process.dir_path, name)
+            if times[i] > end or file_end < start or path == process.current_path:
+                continue
+
+            if path not in process.excluded_paths:
+                if process.compression_pending(path):
+                    path = process.finish_compression(path)
+                process.excluded_paths.append(path)
+            if cls.add(tag, path, priority, times[i]) is not None:
+                count += 1
+        return count
+
+    @classmethod
+    def has_tag(cls, tag):
+        for item in cls.items:
+            if item.tag == tag:
+                return True
+        return False
+
+    @classmethod
+    def next(cls, now=None):
+        """
+        Selects the item with the best score as the current item.
+
+        Returns:
+            DownlinkItem: The current item, or None if the queue is empty.
+        """
+        if now is None:
+            now = time.time()
+        best = None
+        best_score = 0
+        for item in cls.items:
+            score = item.score(now, cls.packet_size)
+            if best is None or score > best_score:
+                best = item
+                best_score = score
+        cls.current = best
+        return best
+
+    @classmethod
+    def acknowledge(cls, item, seq, window=1, bitmap=1):
+        """
+        Records the packets of the item received by the ground, from a GS_ACK requesting packet seq: the packets
+        before seq, and the packets of the requested window (seq to seq + window - 1) not requested in its bitmap.
+
+        Returns:
+            bool: True if the item is complete (all its packets received).
+        """
+        changed = False
+        for i in range(item.acked, seq):
+            changed |= item.mark_received(i)
+        for i in range(window):
+            if not (bitmap >> i) & 1:
+                changed |= item.mark_received(seq + i)
+
+        while item.is_received(item.acked):
+            item.acked += 1
+        if changed:
+            cls.dirty = True
+
+        if item.acked >= item.packet_count:
+            cls.complete(item)
+            return True
+        return False
+
+    @classmethod
+    def missing(cls, item, seq, window):
+        """
+        Returns the bitmap (bit i for packet seq + i) of the packets of the window not received by the ground yet.
+        """
+        bitmap = 0
+        for i in range(window):
+            if not item.is_received(seq + i):
+                bitmap |= 1 << i
+        return bitmap
+
+    @classmethod
+    def complete(cls, item):
+        """
+        Removes a fully downlinked item, its file is released to the DataHandler for deletion.
+        """
+        if item in cls.items:
+            cls.items.remove(item)
+        if cls.current is item:
+            cls.current = None
+        cls.dirty = True
+        DH.notify_TM_path(item.tag, item.path)
+
+    @classmethod
+    def clear(cls):
+        cls.items.clear()
+        cls.current = None
+        cls.dirty = False
+
+    @classmethod
+    def _exclude(cls, item):
+        # Protect the file of a restored item from the deletions of its data process
+        if DH.data_process_exists(item.tag):
+            excluded_paths = DH.get_data_process(item.tag).excluded_paths
+            if item.path not in excluded_paths:
+                excluded_paths.append(item.path)
+
+    @classmethod
+    def save(cls, force=False):
+        """
+        Saves the transfer sessions to SESSIONS_PATH if they changed, at most every SAVE_INTERVAL seconds unless forced.
+
+        Returns:
+            bool: True if the sessions were saved.
+        """
+        now = time.monotonic()
+        if not cls.dirty or (not force and now - cls.last_save < SAVE_INTERVAL):
+            return False
+
+        tmp_path = SESSIONS_PATH + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(struct.pack(_HEADER_FORMAT, cls.packet_size, cls._next_id, len(cls.items)))
+                for item in cls.items:
+                    item.update_crc()  # rest of the CRC32 not computed at the heartbeats
+                    tag = item.tag.encode()
+                    path = item.path.encode()
+                    f.write(
+                        struct.pack(
+                            _ITEM_FORMAT, item.item_id, item.priority, item.created, item.size, item.crc, len(tag), len(path)
+                        )
+                    )
+                    f.write(tag)
+                    f.write(path)
+                    f.write(item.received)
+            os.rename(tmp_path, SESSIONS_PATH)
+        except OSError as e:
+            logger.error("Can't save the downlink sessions: %s", e)
+            cls.last_save = now  # retried after SAVE_INTERVAL
+            return False
+
+        cls.dirty = False
+        cls.last_save = now
+        return True
+
+    @staticmethod
+    def _read_sessions():
+        """
+        Reads the transfer sessions saved in SESSIONS_PATH, up to the first corrupted item.
+
+        Returns:
+            tuple: The packet size, the next file ID and the saved items, as tuples
+                (item_id, priority, created, size, crc, tag, path, received bitmap). None if nothing was saved.
+        """
+        try:
+            with open(SESSIONS_PATH, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        header_size = struct.calcsize(_HEADER_FORMAT)
+        item_size = struct.calcsize(_ITEM_FORMAT)
+        if len(data) < header_size:
+            logger.error("Corrupted downlink sessions")
+            return None
+
+        packet_size, next_id, count = struct.unpack_from(_HEADER_FORMAT, data, 0)
+        saved = []
+        offset = header_size
+        for _ in range(count):
+            if offset + item_size > len(data):
+                logger.error("Corrupted downlink sessions")
+                break
+            item_id, priority, created, size, crc, tag_len, path_len = struct.unpack_from(_ITEM_FORMAT, data, offset)
+            offset += item_size
+            # Bitmap saved with the packet size of the saving software
+            bitmap_size = (size + packet_size - 1) // packet_size if packet_size > 0 else 0
+            bitmap_size = (bitmap_size + 7) // 8
+            end = offset + tag_len + path_len + bitmap_size
+            if end > len(data):
+                logger.error("Corrupted downlink sessions")
+                break
+            tag = data[offset : offset + tag_len].decode()
+            path = data[offset + tag_len : offset + tag_len + path_len].decode()
+            saved.append((item_id, priority, created, size, crc, tag, path, data[end - bitmap_size : end]))
+            offset = end
+        return packet_size, next_id, saved
+
+    @classmethod
+    def kept_files(cls):
+        """
+        Returns the full paths of the files to keep when the SD card is wiped at boot (see
+        DataHandler.delete_all_files): the sessions file and the files of the saved transfer sessions.
+        """
+        kept = [SESSIONS_PATH]
+        sessions = cls._read_sessions()
+        if sessions is not None:
+            for item in sessions[2]:
+                if item[6] not in kept:
+                    kept.append(item[6])
+        return kept
+
+    @classmethod
+    def load(cls):
+        """
+        Restores the transfer sessions saved in SESSIONS_PATH (at boot), dropping the items whose file changed.
+
+        Returns:
+            int: The number of items restored.
+        """
+        sessions = cls._read_sessions()
+        if sessions is None:
+            return 0
+
+        packet_size, next_id, saved = sessions
+        if next_id > 0:
+            cls._next_id = next_id
+
+        for item_id, priority, created, size, crc, tag, path, received in saved:
+            if len(cls.items) >= MAX_ITEMS or cls._file_changed(path, size, crc):
+                logger.info("Downlink session of %s dropped", path)
+                continue
+
+            item = DownlinkItem(item_id, tag, path, priority, created, size, crc, cls._packet_count(size))
+            if packet_size == cls.packet_size:
+                item.received[:] = received
+                while item.is_received(item.acked):
+                    item.acked += 1
+            cls.items.append(item)
+            cls._exclude(item)
+
+        logger.info("%s downlink sessions restored", len(cls.items))
+        return len(cls.items)
+
+    @staticmethod
+    def _file_changed(path, size, crc):
+        try:
+            return os.stat(path)[6] != size or file_crc(path) != crc
+        except OSError:
+            return True
@@ -0,0 +1,112 @@
+"""
+Forward error correction for file packets
+
+======================
+
+Systematic Reed-Solomon code over GF(256) (primitive polynomial 0x11D, generator 2, first consecutive root 1),
+one codeword per file packet: the packet header and data are sent unchanged, followed by FEC_NSYM parity bytes.
+The ground corrects up to FEC_NSYM / 2 corrupted bytes per packet (see ground/fec.py) instead of requesting the
+packet again after a CRC failure.
+
+With FEC_NSYM = 8, a full packet (4-byte header + 240 bytes of data) plus its parity is 252 bytes, the maximum
+payload of the radio, so FEC packets have the same sequence numbers and data size as plain file packets.
+
+The GF tables and the generator polynomial are computed once at import into pre-allocated bytearrays and the
+encoder writes the parity into a caller-supplied buffer: encoding a packet does not allocate.
+
+"""
+
+from micropython import const
+
+FEC_NSYM = const(8)  # parity bytes per packet
+
+_PRIM = const(0x11D)
+
+# GF(256) exponential (doubled to avoid a modulo in the multiplications) and logarithm tables
+GF_EXP = bytearray(512)
+GF_LOG = bytearray(256)
+
+
+def _init_tables():
+    x = 1
+    for i in range(255):
+        GF_EXP[i] = x
+        GF_LOG[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= _PRIM
+    for i in range(255, 512):
+        GF_EXP[i] = GF_EXP[i - 255]
+
+
+_init_tables()
+
+
+def gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return GF_EXP[GF_LOG[a] + GF_LOG[b]]
+
+
+def generator_poly(nsym):
+    """
+    Returns the coefficients (highest degree first) of the generator polynomial (x - 2^0)...(x - 2^(nsym - 1)).
+    """
+    gen = bytearray([1])
+    for i in range(nsym):
+        root = GF_EXP[i]
+        out = bytearray(len(gen) + 1)
+        for j in range(len(gen)):
+            out[j] ^= gen[j]
+            out[j + 1] ^= gf_mul(gen[j], root)
+        gen = out
+    return gen
+
+
+class RSEncoder:
+    """
+    Systematic Reed-Solomon encoder (LFSR division by the generator polynomial).
+
+    Args:
+        nsym (int): The number of parity bytes per codeword (corrects nsym / 2 byte errors).
+    """
+
+    __slots__ = ("nsym", "gen_log", "parity")
+
+    def __init__(self, nsym=FEC_NSYM):
+        self.nsym = nsym
+        # Logarithms of the generator coefficients (the leading 1 excluded), all non-zero
+        self.gen_log = bytearray([GF_LOG[c] for c in generator_poly(nsym)[1:]])
+        self.parity = bytearray(nsym)
+
+    def encode_into(self, data, out, offset=0):
+        """
+        Computes the parity of data (header and payload of the packet, up to 255 - nsym bytes) into out[offset:].
+
+        Returns:
+            int: The offset after the parity bytes.
+        """
+        nsym = self.nsym
+        last = nsym - 1
+        parity = self.parity
+        gen_log = self.gen_log
+        exp = GF_EXP
+        log = GF_LOG
+
+        for j in range(nsym):
+            parity[j] = 0
+
+        for byte in data:
+            feedback = byte ^ parity[0]
+            if feedback:
+                lf = log[feedback]
+                for j in range(last):
+                    parity[j] = parity[j + 1] ^ exp[lf + gen_log[j]]
+                parity[last] = exp[lf + gen_log[last]]
+            else:
+                for j in range(last):
+                    parity[j] = parity[j + 1]
+                parity[last] = 0
+
+        out[offset : offset + nsym] = parity
+        return offset + nsym
@@ -0,0 +1,163 @@
+"""
+LoRa link adaptation
+
+======================
+
+Selects the fastest modulation profile (spreading factor, bandwidth, coding rate) supported by the link during a
+ground pass, from the SNR of the GS_ACKs received by the satellite (the link is assumed reciprocal).
+
+Handshake (see comms.py):
+    1. The ground requests SAT_LINK_CONFIG in a GS_ACK.
+    2. The satellite answers, still with the current profile, with the profile it proposes:
+       [profile, SF, CR, BW (kHz, 2 bytes), worst SNR of the window (dB, signed)].
+    3. The next GS_ACK received by the satellite acknowledging SAT_LINK_CONFIG confirms the proposal: the satellite
+       switches to the proposed profile before answering, the ground switches right after sending that GS_ACK.
+Both sides return to the default profile when the pass times out (no valid GS_ACK), so that a lost handshake can't
+desynchronize the link for more than a pass timeout.
+
+A CRC error on a received packet caps the profiles proposed for the rest of the pass below the current one, the
+next handshake then falls back to a slower profile.
+
+time_on_air() gives the airtime of a packet with a profile (Semtech AN1200.13), used by the emulator radio and the
+ground station stand-in (ground/station.py).
+
+"""
+
+from micropython import const
+
+# Modulation profiles from the most robust to the fastest:
+# (spreading factor, bandwidth (Hz), coding rate denominator, demodulation SNR floor (dB), noise offset of the bandwidth (dB))
+PROFILES = (
+    (10, 125000, 8, -15.0, 0.0),  # 0.6 kbps
+    (9, 125000, 5, -12.5, 0.0),  # 1.8 kbps
+    (8, 125000, 5, -10.0, 0.0),  # 3.1 kbps
+    (7, 125000, 5, -7.5, 0.0),  # 5.5 kbps, configuration of the radio at boot
+    (7, 250000, 5, -7.5, 3.0),  # 10.9 kbps
+    (7, 500000, 5, -7.5, 6.0),  # 21.9 kbps
+)
+
+DEFAULT_PROFILE = const(3)  # profile of the radio at boot, used at the start of each pass
+SNR_MARGIN = 5.0  # dB above the demodulation floor (fading, pointing)
+SNR_WINDOW = const(8)  # number of GS_ACKs the worst SNR is taken over
+PREAMBLE_LENGTH = const(8)  # symbols, preamble of the radio
+
+
+def time_on_air(length, sf, bw, cr, preamble=PREAMBLE_LENGTH):
+    """
+    Returns the time on air in seconds of a LoRa packet of length bytes (RadioHead header included), with explicit
+    header and payload CRC, for a spreading factor, bandwidth (Hz) and coding rate denominator (5 to 8).
+    """
+    symbol = (1 << sf) / bw
+    # Low data rate optimization above 16 ms per symbol
+    de = 1 if symbol > 0.016 else 0
+    bits = 8 * length - 4 * sf + 28 + 16
+    symbols = 8 + max(-(-bits // (4 * (sf - 2 * de))) * cr, 0)
+    return (preamble + 4.25 + symbols) * symbol
+
+
+class LinkAdaptation:
+    """
+    Modulation profile selection from the SNR of the received GS_ACKs.
+
+    Args:
+        default (int): The profile of the radio at the start of a pass.
+        margin (float): The SNR margin in dB above the demodulation floor of a profile.
+        window (int): The number of SNR samples the worst SNR is taken over.
+    """
+
+    def __init__(self, default=DEFAULT_PROFILE, margin=SNR_MARGIN, window=SNR_WINDOW):
+        self.default = default
+        self.margin = margin
+
+        self.current = default
+        self.proposed = None
+        self.ceiling = len(PROFILES) - 1  # fastest profile that can be proposed (lowered by CRC errors)
+
+        # SNR of the last GS_ACKs, measured with the current profile (pre-allocated ring)
+        self.snr = [0.0] * window
+        self.snr_count = 0
+        self.snr_head = 0
+
+    def record(self, snr):
+        """
+        Records the SNR (dB) of a valid GS_ACK received with the current profile.
+        """
+        self.snr[self.snr_head] = snr
+        self.snr_head = (self.snr_head + 1) % len(self.snr)
+        if self.snr_count < len(self.snr):
+            self.snr_count += 1
+
+    def worst_snr(self):
+        """
+        Returns the worst SNR of the window, or None if no GS_ACK was received with the current profile.
+        """
+        if self.snr_count == 0:
+            return None
+        return min(self.snr[: self.snr_count])
+
+    def on_crc_error(self):
+        """
+        Caps the next proposals below the current profile for the rest of the pass.
+        """
+        self.ceiling = max(0, min(self.ceiling, self.current - 1))
+
+    def propose(self):
+        """
+        Returns (and keeps until commit()) the fastest profile whose SNR floor, plus the margin, is below the worst
+        SNR of the window translated to its bandwidth. The current profile is kept without SNR samples.
+        """
+        worst = self.worst_snr()
+        if worst is None:
+            self.proposed = min(self.current, self.ceiling)
+            return self.proposed
+
+        offset = PROFILES[self.current][4]
+        self.proposed = 0
+        for index in range(self.ceiling, -1, -1):
+            _, _, _, floor, bw_offset = PROFILES[index]
+            if worst + offset - bw_offset >= floor + self.margin:
+                self.proposed = index
+                break
+        return self.proposed
+
+    def commit(self):
+        """
+        Switches to the proposed profile (handshake confirmed by the ground).
+
+        Returns:
+            bool: True if the profile changed.
+        """
+        if self.proposed is None:
+            return False
+        changed = self.proposed != self.current
+        self.current = self.proposed
+        self.proposed = None
+        if changed:
+            # SNR measured with the previous bandwidth
+            self.snr_count = 0
+            self.snr_head = 0
+        return changed
+
+    def reset(self):
+        """
+        Returns to the default profile (end of the pass).
+
+        Returns:
+            bool: True if the profile changed.
+        """
+        changed = self.current != self.default
+        self.current = self.default
+        self.proposed = None
+        self.ceiling = len(PROFILES) - 1
+        self.snr_count = 0
+        self.snr_head = 0
+        return changed
+
+    def settings(self, index=None):
+        """
+        Returns the (spreading factor, bandwidth, coding rate) of a profile (the current one by default).
+        """
+        if index is None:
+            index = self.current
+        sf, bw, cr, _, _ = PROFILES[index]
+        return sf, bw, cr
@@ -142,5 +142,26 @@ class THERMAL_IDX:
     BATTERY_PACK_TEMPERATURE = const(3)
 
 
+class STORAGE_IDX:
+    TIME_STORAGE = const(0)
+    TOTAL_SIZE = const(1)
+    CDH_NUM_FILES = const(2)
+    CDH_DIR_SIZE = const(3)
+    EPS_NUM_FILES = const(4)
+    EPS_DIR_SIZE = const(5)
+    ADCS_NUM_FILES = const(6)
+    ADCS_DIR_SIZE = const(7)
+    IMU_NUM_FILES = const(8)
+    IMU_DIR_SIZE = const(9)
+    GPS_NUM_FILES = const(10)
+    GPS_DIR_SIZE = const(11)
+    THERMAL_NUM_FILES = const(12)
+    THERMAL_DIR_SIZE = const(13)
+    IMG_NUM_FILES = const(14)
+    IMG_DIR_SIZE = const(15)
+    EVT_NUM_FILES = const(16)
+    EVT_DIR_SIZE = const(17)
+
+
 class PAYLOAD_IDX:
     pass
@@ -0,0 +1,320 @@
+"""
+
+Telemetry frame layouts
+
+Each layout lists the (name, tag, idx, encoding, offset) fields of a frame, see schema.py.
+Offsets are absolute within the LoRa payload, bytes 0-3 being the frame header (MESSAGE_ID, SEQ_COUNT, PACKET_LENGTH).
+The MESSAGE_ID of a telemetry frame is its frame ID (see TM_FRAME_ID).
+
+Frame types:
+    FULL    : Full housekeeping frame (CDH, EPS, ADCS, GPS, thermal), 250 bytes.
+    COMPACT : Beacon with the essential health fields, sent in LOW_POWER and SAFE to reduce the time-on-air.
+    ADCS    : Detailed attitude frame with the ADCS estimates and the GPS ECEF state.
+    STORAGE : Number of files and directory size of each data process (see the OBDH task).
+    HISTORY : Page of consecutive housekeeping history records (catch-up of the trends between passes).
+
+The housekeeping history records (TM_HISTORY_RECORD_FIELDS, offsets relative to the record) are sampled by the
+OBDH task and stored encoded in a ring on the SD card (see HistoryProcess in core/data_handler.py).
+A history frame carries the sequence number of its first record, the number of records and the total number of
+records logged, followed by up to TM_HISTORY_RECORDS_PER_FRAME records copied from the ring.
+
+"""
+
+from apps.telemetry.constants import ADCS_IDX, CDH_IDX, EPS_IDX, GPS_IDX, STORAGE_IDX, THERMAL_IDX
+from apps.telemetry.schema import FP_HP, S16, S32, U8, U16, U32, FrameSchema
+from core.states import STATES
+from micropython import const
+
+TM_HEADER_SIZE = const(4)
+
+# Data process of the housekeeping history ring (registered by the OBDH task)
+TM_HISTORY_TAG = "history"
+
+
+class TM_FRAME_ID:
+    FULL = const(0x01)
+    COMPACT = const(0x02)
+    ADCS = const(0x03)
+    STORAGE = const(0x04)
+    HISTORY = const(0x05)
+
+
+TM_FRAME_FIELDS = [
+    ############ CDH fields ############
+    ("TIME", "cdh", CDH_IDX.TIME, U32, 4),
+    ("SC_STATE", "cdh", CDH_IDX.SC_STATE, U8, 8),
+    ("SD_USAGE", "cdh", CDH_IDX.SD_USAGE, U32, 9),
+    ("CURRENT_RAM_USAGE", "cdh", CDH_IDX.CURRENT_RAM_USAGE, U8, 13),
+    ("REBOOT_COUNT", "cdh", CDH_IDX.REBOOT_COUNT, U8, 14),
+    ("WATCHDOG_TIMER", "cdh", CDH_IDX.WATCHDOG_TIMER, U8, 15),
+    ("HAL_BITFLAGS", "cdh", CDH_IDX.HAL_BITFLAGS, U8, 16),
+    ############ EPS fields ############
+    ("MAINBOARD_VOLTAGE", "eps", EPS_IDX.MAINBOARD_VOLTAGE, S16, 17),
+    ("MAINBOARD_CURRENT", "eps", EPS_IDX.MAINBOARD_CURRENT, S16, 19),
+    ("BATTERY_PACK_REPORTED_SOC", "eps", EPS_IDX.BATTERY_PACK_REPORTED_SOC, U8, 21),
+    ("BATTERY_PACK_REPORTED_CAPACITY", "eps", EPS_IDX.BATTERY_PACK_REPORTED_CAPACITY, S16, 22),
+    ("BATTERY_PACK_CURRENT", "eps", EPS_IDX.BATTERY_PACK_CURRENT, S16, 24),
+    ("BATTERY_PACK_VOLTAGE", "eps", EPS_IDX.BATTERY_PACK_VOLTAGE, S16, 26),
+    ("BATTERY_PACK_MIDPOINT_VOLTAGE", "eps", EPS_IDX.BATTERY_PACK_MIDPOINT_VOLTAGE, S16, 28),
+    ("BATTERY_CYCLES", "eps", EPS_IDX.BATTERY_CYCLES, S16, 30),
+    ("BATTERY_PACK_TTE", "eps", EPS_IDX.BATTERY_PACK_TTE, S16, 32),
+    ("BATTERY_PACK_TTF", "eps", EPS_IDX.BATTERY_PACK_TTF, S16, 34),
+    ("BATTERY_TIME_SINCE_POWER_UP", "eps", EPS_IDX.BATTERY_TIME_SINCE_POWER_UP, S16, 36),
+    ("XP_COIL_VOLTAGE", "eps", EPS_IDX.XP_COIL_VOLTAGE, S16, 38),
+    ("XP_COIL_CURRENT", "eps", EPS_IDX.XP_COIL_CURRENT, S16, 40),
+    ("XM_COIL_VOLTAGE", "eps", EPS_IDX.XM_COIL_VOLTAGE, S16, 42),
+    ("XM_COIL_CURRENT", "eps", EPS_IDX.XM_COIL_CURRENT, S16, 44),
+    ("YP_COIL_VOLTAGE", "eps", EPS_IDX.YP_COIL_VOLTAGE, S16, 46),
+    ("YP_COIL_CURRENT", "eps", EPS_IDX.YP_COIL_CURRENT, S16, 48),
+    ("YM_COIL_VOLTAGE", "eps", EPS_IDX.YM_COIL_VOLTAGE, S16, 50),
+    ("YM_COIL_CURRENT", "eps", EPS_IDX.YM_COIL_CURRENT, S16, 52),
+    ("ZP_COIL_VOLTAGE", "eps", EPS_IDX.ZP_COIL_VOLTAGE, S16, 54),
+    ("ZP_COIL_CURRENT", "eps", EPS_IDX.ZP_COIL_CURRENT, S16, 56),
+    ("ZM_COIL_VOLTAGE", "eps", EPS_IDX.ZM_COIL_VOLTAGE, S16, 58),
+    ("ZM_COIL_CURRENT", "eps", EPS_IDX.ZM_COIL_CURRENT, S16, 60),
+    ("JETSON_INPUT_VOLTAGE", "eps", EPS_IDX.JETSON_INPUT_VOLTAGE, S16, 62),
+    ("JETSON_INPUT_CURRENT", "eps", EPS_IDX.JETSON_INPUT_CURRENT, S16, 64),
+    ("RF_LDO_OUTPUT_VOLTAGE", "eps", EPS_IDX.RF_LDO_OUTPUT_VOLTAGE, S16, 66),
+    ("RF_LDO_OUTPUT_CURRENT", "eps", EPS_IDX.RF_LDO_OUTPUT_CURRENT, S16, 68),
+    ("GPS_VOLTAGE", "eps", EPS_IDX.GPS_VOLTAGE, S16, 70),
+    ("GPS_CURRENT", "eps", EPS_IDX.GPS_CURRENT, S16, 72),
+    ("XP_SOLAR_CHARGE_VOLTAGE", "eps", EPS_IDX.XP_SOLAR_CHARGE_VOLTAGE, S16, 74),
+    ("XP_SOLAR_CHARGE_CURRENT", "eps", EPS_IDX.XP_SOLAR_CHARGE_CURRENT, S16, 76),
+    ("XM_SOLAR_CHARGE_VOLTAGE", "eps", EPS_IDX.XM_SOLAR_CHARGE_VOLTAGE, S16, 78),
+    ("XM_SOLAR_CHARGE_CURRENT", "eps", EPS_IDX.XM_SOLAR_CHARGE_CURRENT, S16, 80),
+    ("YP_SOLAR_CHARGE_VOLTAGE", "eps", EPS_IDX.YP_SOLAR_CHARGE_VOLTAGE, S16, 82),
+    ("YP_SOLAR_CHARGE_CURRENT", "eps", EPS_IDX.YP_SOLAR_CHARGE_CURRENT, S16, 84),
+    ("YM_SOLAR_CHARGE_VOLTAGE", "eps", EPS_IDX.YM_SOLAR_CHARGE_VOLTAGE, S16, 86),
+    ("YM_SOLAR_CHARGE_CURRENT", "eps", EPS_IDX.YM_SOLAR_CHARGE_CURRENT, S16, 88),
+    ("ZP_SOLAR_CHARGE_VOLTAGE", "eps", EPS_IDX.ZP_SOLAR_CHARGE_VOLTAGE, S16, 90),
+    ("ZP_SOLAR_CHARGE_CURRENT", "eps", EPS_IDX.ZP_SOLAR_CHARGE_CURRENT, S16, 92),
+    ("ZM_SOLAR_CHARGE_VOLTAGE", "eps", EPS_IDX.ZM_SOLAR_CHARGE_VOLTAGE, S16, 94),
+    ("ZM_SOLAR_CHARGE_CURRENT", "eps", EPS_IDX.ZM_SOLAR_CHARGE_CURRENT, S16, 96),
+    ############ ADCS fields ############
+    ("ADCS_STATE", "adcs", ADCS_IDX.ADCS_STATE, U8, 98),
+    ("GYRO_X", "adcs", ADCS_IDX.GYRO_X, FP_HP, 99),
+    ("GYRO_Y", "adcs", ADCS_IDX.GYRO_Y, FP_HP, 103),
+    ("GYRO_Z", "adcs", ADCS_IDX.GYRO_Z, FP_HP, 107),
+    ("MAG_X", "adcs", ADCS_IDX.MAG_X, FP_HP, 111),
+    ("MAG_Y", "adcs", ADCS_IDX.MAG_Y, FP_HP, 115),
+    ("MAG_Z", "adcs", ADCS_IDX.MAG_Z, FP_HP, 119),
+    ("SUN_STATUS", "adcs", ADCS_IDX.SUN_STATUS, U8, 123),
+    ("SUN_VEC_X", "adcs", ADCS_IDX.SUN_VEC_X, FP_HP, 124),
+    ("SUN_VEC_Y", "adcs", ADCS_IDX.SUN_VEC_Y, FP_HP, 128),
+    ("SUN_VEC_Z", "adcs", ADCS_IDX.SUN_VEC_Z, FP_HP, 132),
+    ("ECLIPSE", "adcs", ADCS_IDX.ECLIPSE, U8, 136),
+    ("LIGHT_SENSOR_XP", "adcs", ADCS_IDX.LIGHT_SENSOR_XP, U16, 137),
+    ("LIGHT_SENSOR_XM", "adcs", ADCS_IDX.LIGHT_SENSOR_XM, U16, 139),
+    ("LIGHT_SENSOR_YP", "adcs", ADCS_IDX.LIGHT_SENSOR_YP, U16, 141),
+    ("LIGHT_SENSOR_YM", "adcs", ADCS_IDX.LIGHT_SENSOR_YM, U16, 143),
+    ("LIGHT_SENSOR_ZP1", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP1, U16, 145),
+    ("LIGHT_SENSOR_ZP2", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP2, U16, 147),
+    ("LIGHT_SENSOR_ZP3", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP3, U16, 149),
+    ("LIGHT_SENSOR_ZP4", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP4, U16, 151),
+    ("LIGHT_SENSOR_ZM", "adcs", ADCS_IDX.LIGHT_SENSOR_ZM, U16, 153),
+    ("XP_COIL_STATUS", "adcs", ADCS_IDX.XP_COIL_STATUS, U8, 155),
+    ("XM_COIL_STATUS", "adcs", ADCS_IDX.XM_COIL_STATUS, U8, 156),
+    ("YP_COIL_STATUS", "adcs", ADCS_IDX.YP_COIL_STATUS, U8, 157),
+    ("YM_COIL_STATUS", "adcs", ADCS_IDX.YM_COIL_STATUS, U8, 158),
+    ("ZP_COIL_STATUS", "adcs", ADCS_IDX.ZP_COIL_STATUS, U8, 159),
+    ("ZM_COIL_STATUS", "adcs", ADCS_IDX.ZM_COIL_STATUS, U8, 160),
+    ("COARSE_ATTITUDE_QW", "adcs", ADCS_IDX.COARSE_ATTITUDE_QW, FP_HP, 161),
+    ("COARSE_ATTITUDE_QX", "adcs", ADCS_IDX.COARSE_ATTITUDE_QX, FP_HP, 165),
+    ("COARSE_ATTITUDE_QY", "adcs", ADCS_IDX.COARSE_ATTITUDE_QY, FP_HP, 169),
+    ("COARSE_ATTITUDE_QZ", "adcs", ADCS_IDX.COARSE_ATTITUDE_QZ, FP_HP, 173),
+    ("STAR_TRACKER_STATUS", "adcs", ADCS_IDX.STAR_TRACKER_STATUS, U8, 177),
+    ("STAR_TRACKER_ATTITUDE_QW", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QW, FP_HP, 178),
+    ("STAR_TRACKER_ATTITUDE_QX", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QX, FP_HP, 182),
+    ("STAR_TRACKER_ATTITUDE_QY", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QY, FP_HP, 186),
+    ("STAR_TRACKER_ATTITUDE_QZ", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QZ, FP_HP, 190),
+    ############ GPS fields ############
+    ("GPS_MESSAGE_ID", "gps", GPS_IDX.GPS_MESSAGE_ID, U8, 194),
+    ("GPS_FIX_MODE", "gps", GPS_IDX.GPS_FIX_MODE, U8, 195),
+    ("GPS_NUMBER_OF_SV", "gps", GPS_IDX.GPS_NUMBER_OF_SV, U8, 196),
+    ("GPS_GNSS_WEEK", "gps", GPS_IDX.GPS_GNSS_WEEK, U16, 197),
+    ("GPS_GNSS_TOW", "gps", GPS_IDX.GPS_GNSS_TOW, U32, 199),
+    ("GPS_LATITUDE", "gps", GPS_IDX.GPS_LATITUDE, S32, 203),
+    ("GPS_LONGITUDE", "gps", GPS_IDX.GPS_LONGITUDE, S32, 207),
+    ("GPS_ELLIPSOID_ALT", "gps", GPS_IDX.GPS_ELLIPSOID_ALT, S32, 211),
+    ("GPS_MEAN_SEA_LVL_ALT", "gps", GPS_IDX.GPS_MEAN_SEA_LVL_ALT, S32, 215),
+    ("GPS_ECEF_X", "gps", GPS_IDX.GPS_ECEF_X, S32, 219),
+    ("GPS_ECEF_Y", "gps", GPS_IDX.GPS_ECEF_Y, S32, 223),
+    ("GPS_ECEF_Z", "gps", GPS_IDX.GPS_ECEF_Z, S32, 227),
+    ("GPS_ECEF_VX", "gps", GPS_IDX.GPS_ECEF_VX, S32, 231),
+    ("GPS_ECEF_VY", "gps", GPS_IDX.GPS_ECEF_VY, S32, 235),
+    ("GPS_ECEF_VZ", "gps", GPS_IDX.GPS_ECEF_VZ, S32, 239),
+    ############ Thermal fields ############
+    ("IMU_TEMPERATURE", "thermal", THERMAL_IDX.IMU_TEMPERATURE, U16, 243),
+    ("CPU_TEMPERATURE", "thermal", THERMAL_IDX.CPU_TEMPERATURE, U16, 245),
+    ("BATTERY_PACK_TEMPERATURE", "thermal", THERMAL_IDX.BATTERY_PACK_TEMPERATURE, U16, 247),
+    ############ Payload fields ############
+    # TODO
+]
+
+TM_FRAME_SCHEMA = FrameSchema(TM_FRAME_FIELDS, start=TM_HEADER_SIZE, length=245)
+
+
+TM_COMPACT_FIELDS = [
+    ############ CDH fields ############
+    ("TIME", "cdh", CDH_IDX.TIME, U32, 4),
+    ("SC_STATE", "cdh", CDH_IDX.SC_STATE, U8, 8),
+    ("REBOOT_COUNT", "cdh", CDH_IDX.REBOOT_COUNT, U8, 9),
+    ("HAL_BITFLAGS", "cdh", CDH_IDX.HAL_BITFLAGS, U8, 10),
+    ############ EPS fields ############
+    ("MAINBOARD_VOLTAGE", "eps", EPS_IDX.MAINBOARD_VOLTAGE, S16, 11),
+    ("MAINBOARD_CURRENT", "eps", EPS_IDX.MAINBOARD_CURRENT, S16, 13),
+    ("BATTERY_PACK_REPORTED_SOC", "eps", EPS_IDX.BATTERY_PACK_REPORTED_SOC, U8, 15),
+    ("BATTERY_PACK_CURRENT", "eps", EPS_IDX.BATTERY_PACK_CURRENT, S16, 16),
+    ("BATTERY_PACK_VOLTAGE", "eps", EPS_IDX.BATTERY_PACK_VOLTAGE, S16, 18),
+    ############ ADCS fields ############
+    ("ADCS_STATE", "adcs", ADCS_IDX.ADCS_STATE, U8, 20),
+    ("GYRO_X", "adcs", ADCS_IDX.GYRO_X, FP_HP, 21),
+    ("GYRO_Y", "adcs", ADCS_IDX.GYRO_Y, FP_HP, 25),
+    ("GYRO_Z", "adcs", ADCS_IDX.GYRO_Z, FP_HP, 29),
+    ("SUN_STATUS", "adcs", ADCS_IDX.SUN_STATUS, U8, 33),
+    ("ECLIPSE", "adcs", ADCS_IDX.ECLIPSE, U8, 34),
+    ############ GPS fields ############
+    ("GPS_FIX_MODE", "gps", GPS_IDX.GPS_FIX_MODE, U8, 35),
+    ("GPS_NUMBER_OF_SV", "gps", GPS_IDX.GPS_NUMBER_OF_SV, U8, 36),
+    ############ Thermal fields ############
+    ("CPU_TEMPERATURE", "thermal", THERMAL_IDX.CPU_TEMPERATURE, U16, 37),
+    ("BATTERY_PACK_TEMPERATURE", "thermal", THERMAL_IDX.BATTERY_PACK_TEMPERATURE, U16, 39),
+]
+
+TM_COMPACT_SCHEMA = FrameSchema(TM_COMPACT_FIELDS, start=TM_HEADER_SIZE)
+
+
+TM_ADCS_FIELDS = [
+    ("TIME", "cdh", CDH_IDX.TIME, U32, 4),
+    ("SC_STATE", "cdh", CDH_IDX.SC_STATE, U8, 8),
+    ############ ADCS fields ############
+    ("TIME_ADCS", "adcs", ADCS_IDX.TIME_ADCS, U32, 9),
+    ("ADCS_STATE", "adcs", ADCS_IDX.ADCS_STATE, U8, 13),
+    ("GYRO_X", "adcs", ADCS_IDX.GYRO_X, FP_HP, 14),
+    ("GYRO_Y", "adcs", ADCS_IDX.GYRO_Y, FP_HP, 18),
+    ("GYRO_Z", "adcs", ADCS_IDX.GYRO_Z, FP_HP, 22),
+    ("MAG_X", "adcs", ADCS_IDX.MAG_X, FP_HP, 26),
+    ("MAG_Y", "adcs", ADCS_IDX.MAG_Y, FP_HP, 30),
+    ("MAG_Z", "adcs", ADCS_IDX.MAG_Z, FP_HP, 34),
+    ("SUN_STATUS", "adcs", ADCS_IDX.SUN_STATUS, U8, 38),
+    ("SUN_VEC_X", "adcs", ADCS_IDX.SUN_VEC_X, FP_HP, 39),
+    ("SUN_VEC_Y", "adcs", ADCS_IDX.SUN_VEC_Y, FP_HP, 43),
+    ("SUN_VEC_Z", "adcs", ADCS_IDX.SUN_VEC_Z, FP_HP, 47),
+    ("ECLIPSE", "adcs", ADCS_IDX.ECLIPSE, U8, 51),
+    ("LIGHT_SENSOR_XP", "adcs", ADCS_IDX.LIGHT_SENSOR_XP, U16, 52),
+    ("LIGHT_SENSOR_XM", "adcs", ADCS_IDX.LIGHT_SENSOR_XM, U16, 54),
+    ("LIGHT_SENSOR_YP", "adcs", ADCS_IDX.LIGHT_SENSOR_YP, U16, 56),
+    ("LIGHT_SENSOR_YM", "adcs", ADCS_IDX.LIGHT_SENSOR_YM, U16, 58),
+    ("LIGHT_SENSOR_ZP1", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP1, U16, 60),
+    ("LIGHT_SENSOR_ZP2", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP2, U16, 62),
+    ("LIGHT_SENSOR_ZP3", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP3, U16, 64),
+    ("LIGHT_SENSOR_ZP4", "adcs", ADCS_IDX.LIGHT_SENSOR_ZP4, U16, 66),
+    ("LIGHT_SENSOR_ZM", "adcs", ADCS_IDX.LIGHT_SENSOR_ZM, U16, 68),
+    ("XP_COIL_STATUS", "adcs", ADCS_IDX.XP_COIL_STATUS, U8, 70),
+    ("XM_COIL_STATUS", "adcs", ADCS_IDX.XM_COIL_STATUS, U8, 71),
+    ("YP_COIL_STATUS", "adcs", ADCS_IDX.YP_COIL_STATUS, U8, 72),
+    ("YM_COIL_STATUS", "adcs", ADCS_IDX.YM_COIL_STATUS, U8, 73),
+    ("ZP_COIL_STATUS", "adcs", ADCS_IDX.ZP_COIL_STATUS, U8, 74),
+    ("ZM_COIL_STATUS", "adcs", ADCS_IDX.ZM_COIL_STATUS, U8, 75),
+    ("COARSE_ATTITUDE_QW", "adcs", ADCS_IDX.COARSE_ATTITUDE_QW, FP_HP, 76),
+    ("COARSE_ATTITUDE_QX", "adcs", ADCS_IDX.COARSE_ATTITUDE_QX, FP_HP, 80),
+    ("COARSE_ATTITUDE_QY", "adcs", ADCS_IDX.COARSE_ATTITUDE_QY, FP_HP, 84),
+    ("COARSE_ATTITUDE_QZ", "adcs", ADCS_IDX.COARSE_ATTITUDE_QZ, FP_HP, 88),
+    ("STAR_TRACKER_STATUS", "adcs", ADCS_IDX.STAR_TRACKER_STATUS, U8, 92),
+    ("STAR_TRACKER_ATTITUDE_QW", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QW, FP_HP, 93),
+    ("STAR_TRACKER_ATTITUDE_QX", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QX, FP_HP, 97),
+    ("STAR_TRACKER_ATTITUDE_QY", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QY, FP_HP, 101),
+    ("STAR_TRACKER_ATTITUDE_QZ", "adcs", ADCS_IDX.STAR_TRACKER_ATTITUDE_QZ, FP_HP, 105),
+    ############ GPS fields ############
+    ("TIME_GPS", "gps", GPS_IDX.TIME_GPS, U32, 109),
+    ("GPS_FIX_MODE", "gps", GPS_IDX.GPS_FIX_MODE, U8, 113),
+    ("GPS_ECEF_X", "gps", GPS_IDX.GPS_ECEF_X, S32, 114),
+    ("GPS_ECEF_Y", "gps", GPS_IDX.GPS_ECEF_Y, S32, 118),
+    ("GPS_ECEF_Z", "gps", GPS_IDX.GPS_ECEF_Z, S32, 122),
+    ("GPS_ECEF_VX", "gps", GPS_IDX.GPS_ECEF_VX, S32, 126),
+    ("GPS_ECEF_VY", "gps", GPS_IDX.GPS_ECEF_VY, S32, 130),
+    ("GPS_ECEF_VZ", "gps", GPS_IDX.GPS_ECEF_VZ, S32, 134),
+]
+
+TM_ADCS_SCHEMA = FrameSchema(TM_ADCS_FIELDS, start=TM_HEADER_SIZE)
+
+
+TM_STORAGE_FIELDS = [
+    ("TIME", "cdh", CDH_IDX.TIME, U32, 4),
+    ("SC_STATE", "cdh", CDH_IDX.SC_STATE, U8, 8),
+    ("SD_USAGE", "cdh", CDH_IDX.SD_USAGE, U32, 9),
+    ############ Storage fields ############
+    ("TIME_STORAGE", "storage", STORAGE_IDX.TIME_STORAGE, U32, 13),
+    ("TOTAL_SIZE", "storage", STORAGE_IDX.TOTAL_SIZE, U32, 17),
+    ("CDH_NUM_FILES", "storage", STORAGE_IDX.CDH_NUM_FILES, U16, 21),
+    ("CDH_DIR_SIZE", "storage", STORAGE_IDX.CDH_DIR_SIZE, U32, 23),
+    ("EPS_NUM_FILES", "storage", STORAGE_IDX.EPS_NUM_FILES, U16, 27),
+    ("EPS_DIR_SIZE", "storage", STORAGE_IDX.EPS_DIR_SIZE, U32, 29),
+    ("ADCS_NUM_FILES", "storage", STORAGE_IDX.ADCS_NUM_FILES, U16, 33),
+    ("ADCS_DIR_SIZE", "storage", STORAGE_IDX.ADCS_DIR_SIZE, U32, 35),
+    ("IMU_NUM_FILES", "storage", STORAGE_IDX.IMU_NUM_FILES, U16, 39),
+    ("IMU_DIR_SIZE", "storage", STORAGE_IDX.IMU_DIR_SIZE, U32, 41),
+    ("GPS_NUM_FILES", "storage", STORAGE_IDX.GPS_NUM_FILES, U16, 45),
+    ("GPS_DIR_SIZE", "storage", STORAGE_IDX.GPS_DIR_SIZE, U32, 47),
+    ("THERMAL_NUM_FILES", "storage", STORAGE_IDX.THERMAL_NUM_FILES, U16, 51),
+    ("THERMAL_DIR_SIZE", "storage", STORAGE_IDX.THERMAL_DIR_SIZE, U32, 53),
+    ("IMG_NUM_FILES", "storage", STORAGE_IDX.IMG_NUM_FILES, U16, 57),
+    ("IMG_DIR_SIZE", "storage", STORAGE_IDX.IMG_DIR_SIZE, U32, 59),
+    ("EVT_NUM_FILES", "storage", STORAGE_IDX.EVT_NUM_FILES, U16, 63),
+    ("EVT_DIR_SIZE", "storage", STORAGE_IDX.EVT_DIR_SIZE, U32, 65),
+]
+
+TM_STORAGE_SCHEMA = FrameSchema(TM_STORAGE_FIELDS, start=TM_HEADER_SIZE)
+
+
+TM_HISTORY_RECORD_FIELDS = [
+    ("TIME", "cdh", CDH_IDX.TIME, U32, 0),
+    ("SC_STATE", "cdh", CDH_IDX.SC_STATE, U8, 4),
+    ("BATTERY_PACK_REPORTED_SOC", "eps", EPS_IDX.BATTERY_PACK_REPORTED_SOC, U8, 5),
+    ("BATTERY_PACK_VOLTAGE", "eps", EPS_IDX.BATTERY_PACK_VOLTAGE, S16, 6),
+    ("BATTERY_PACK_CURRENT", "eps", EPS_IDX.BATTERY_PACK_CURRENT, S16, 8),
+    ("MAINBOARD_VOLTAGE", "eps", EPS_IDX.MAINBOARD_VOLTAGE, S16, 10),
+    ("ADCS_STATE", "adcs", ADCS_IDX.ADCS_STATE, U8, 12),
+    ("GYRO_X", "adcs", ADCS_IDX.GYRO_X, FP_HP, 13),
+    ("GYRO_Y", "adcs", ADCS_IDX.GYRO_Y, FP_HP, 17),
+    ("GYRO_Z", "adcs", ADCS_IDX.GYRO_Z, FP_HP, 21),
+    ("CPU_TEMPERATURE", "thermal", THERMAL_IDX.CPU_TEMPERATURE, U16, 25),
+    ("BATTERY_PACK_TEMPERATURE", "thermal", THERMAL_IDX.BATTERY_PACK_TEMPERATURE, U16, 27),
+]
+
+TM_HISTORY_RECORD_SCHEMA = FrameSchema(TM_HISTORY_RECORD_FIELDS, start=0)
+TM_HISTORY_RECORD_SIZE = TM_HISTORY_RECORD_SCHEMA.length
+
+# Page header, the values come from the history ring (see TelemetryPacker.pack_tm_frame)
+TM_HISTORY_FIELDS = [
+    ("FIRST_SEQ", "history", 0, U32, 4),
+    ("RECORD_COUNT", "history", 1, U8, 8),
+    ("TOTAL_RECORDS", "history", 2, U32, 9),
+]
+
+TM_HISTORY_SCHEMA = FrameSchema(TM_HISTORY_FIELDS, start=TM_HEADER_SIZE)
+TM_HISTORY_RECORDS_OFFSET = TM_HEADER_SIZE + TM_HISTORY_SCHEMA.length
+TM_HISTORY_RECORDS_PER_FRAME = (250 - TM_HISTORY_RECORDS_OFFSET) // TM_HISTORY_RECORD_SIZE
+
+
+# Frame ID -> (schema, frame size in bytes)
+# The full frame keeps its historical 250-byte size, the others are sized to their fields
+TM_FRAMES = {
+    TM_FRAME_ID.FULL: (TM_FRAME_SCHEMA, 250),
+    TM_FRAME_ID.COMPACT: (TM_COMPACT_SCHEMA, TM_HEADER_SIZE + TM_COMPACT_SCHEMA.length),
+    TM_FRAME_ID.ADCS: (TM_ADCS_SCHEMA, TM_HEADER_SIZE + TM_ADCS_SCHEMA.length),
+    TM_FRAME_ID.STORAGE: (TM_STORAGE_SCHEMA, TM_HEADER_SIZE + TM_STORAGE_SCHEMA.length),
+    TM_FRAME_ID.HISTORY: (
+        TM_HISTORY_SCHEMA,
+        TM_HISTORY_RECORDS_OFFSET + TM_HISTORY_RECORDS_PER_FRAME * TM_HISTORY_RECORD_SIZE,
+    ),
+}
+
+# Heartbeat frame sent by default in each state
+TM_FRAME_BY_STATE = {
+    STATES.STARTUP: TM_FRAME_ID.COMPACT,
+    STATES.NOMINAL: TM_FRAME_ID.FULL,
+    STATES.DOWNLINK: TM_FRAME_ID.FULL,
+    STATES.LOW_POWER: TM_FRAME_ID.COMPACT,
+    STATES.SAFE: TM_FRAME_ID.COMPACT,
+}
@@ -2,8 +2,17 @@
 
 Helper functions for converting to fixed point format and back.
 
+The *_array functions are batch versions of the scalar conversions: they encode a whole ulab (onboard) or NumPy
+(ground) array into a caller-supplied buffer, and decode a column of packed values back into a float array,
+with the same bytes and values as the scalar helpers.
+
 """
 
+from ulab import numpy as np
+
+# ulab names its float dtype np.float, NumPy np.float64
+_FLOAT = np.float if hasattr(np, "float") else np.float64
+
 
 def convert_float_to_fixed_point_lp(val):
     """
@@ -192,3 +201,106 @@ def unpack_signed_short_int(byte_list):
     """
     val = (byte_list[0] << 8) | byte_list[1]
     return val if val < 0x8000 else val - 0x10000
+
+
+def _encode_fixed_point_array(values, buffer, offset, scale):
+    """
+    Writes values as 4-byte big-endian fixed point words into buffer from offset, scale being 2^(fractional bits).
+    Same steps as the scalar helpers, on whole arrays: sign flag, integer part, truncated fractional part.
+    """
+    vals = np.array(values, dtype=_FLOAT)
+    count = len(vals)
+    neg = vals < 0
+    vals = abs(vals)
+    val_int = np.floor(vals)
+    val_dec = np.floor((vals - val_int) * scale)
+
+    if scale == 16777216:  # 1 integer byte (7 bits), 3 decimal bytes
+        byte0 = val_int - np.floor(val_int / 128) * 128
+        byte1 = np.floor(val_dec / 65536)
+        byte2 = np.floor(val_dec / 256) - byte1 * 256
+    else:  # 2 integer bytes (15 bits), 2 decimal bytes
+        val_int = val_int - np.floor(val_int / 32768) * 32768
+        byte0 = np.floor(val_int / 256)
+        byte1 = val_int - byte0 * 256
+        byte2 = np.floor(val_dec / 256)
+    byte3 = val_dec - np.floor(val_dec / 256) * 256
+    byte0 = byte0 + neg * 128.0
+
+    out = np.frombuffer(buffer, dtype=np.uint8, count=4 * count, offset=offset)
+    out[0::4] = np.array(byte0, dtype=np.uint8)
+    out[1::4] = np.array(byte1, dtype=np.uint8)
+    out[2::4] = np.array(byte2, dtype=np.uint8)
+    out[3::4] = np.array(byte3, dtype=np.uint8)
+    return offset + 4 * count
+
+
+def _decode_fixed_point_array(buffer, count, offset, stride, scale):
+    """
+    Reads count 4-byte big-endian fixed point words from buffer, starting at offset and stride bytes apart.
+    """
+    if count == 0:
+        return np.zeros(0, dtype=_FLOAT)
+    raw = np.frombuffer(buffer, dtype=np.uint8, count=stride * (count - 1) + 4, offset=offset)
+    byte0 = np.array(raw[0::stride], dtype=_FLOAT)
+    byte1 = np.array(raw[1::stride], dtype=_FLOAT)
+    byte2 = np.array(raw[2::stride], dtype=_FLOAT)
+    byte3 = np.array(raw[3::stride], dtype=_FLOAT)
+
+    neg = byte0 >= 128
+    byte0 = byte0 - neg * 128.0
+    if scale == 16777216:
+        vals = byte0 + (byte1 * 65536 + byte2 * 256 + byte3) / scale
+    else:
+        vals = (byte0 * 256 + byte1) + (byte2 * 256 + byte3) / scale
+    return vals * (1.0 - neg * 2.0)
+
+
+def convert_float_array_to_fixed_point_hp(values, buffer, offset=0):
+    """
+    Batch version of convert_float_to_fixed_point_hp.
+
+    :param values: Array (or list) of values to convert to fixed point
+    :param buffer: Writable buffer receiving 4 bytes per value
+    :param offset: Offset of the first value in buffer
+    :return: offset past the last written byte
+    """
+    return _encode_fixed_point_array(values, buffer, offset, 16777216)
+
+
+def convert_float_array_to_fixed_point_lp(values, buffer, offset=0):
+    """
+    Batch version of convert_float_to_fixed_point_lp.
+
+    :param values: Array (or list) of values to convert to fixed point
+    :param buffer: Writable buffer receiving 4 bytes per value
+    :param offset: Offset of the first value in buffer
+    :return: offset past the last written byte
+    """
+    return _encode_fixed_point_array(values, buffer, offset, 65536)
+
+
+def convert_fixed_point_array_to_float_hp(buffer, count, offset=0, stride=4):
+    """
+    Batch version of convert_fixed_point_to_float_hp.
+
+    :param buffer: Buffer of packed values
+    :param count: Number of values to decode
+    :param offset: Offset of the first value in buffer
+    :param stride: Bytes between two consecutive values (4 when packed back to back, the frame size for a column of frames)
+    :return: float array of the values
+    """
+    return _decode_fixed_point_array(buffer, count, offset, stride, 16777216)
+
+
+def convert_fixed_point_array_to_float_lp(buffer, count, offset=0, stride=4):
+    """
+    Batch version of convert_fixed_point_to_float_lp.
+
+    :param buffer: Buffer of packed values
+    :param count: Number of values to decode
+    :param offset: Offset of the first value in buffer
+    :param stride: Bytes between two consecutive values (4 when packed back to back, the frame size for a column of frames)
+    :return: float array of the values
+    """
+    return _decode_fixed_point_array(buffer, count, offset, stride, 65536)
@@ -6,7 +6,11 @@ Each fixed-length LoRa Payload is structured as follows
 MESSAGE_ID : 1 byte
 SEQ_COUNT  : 2 byte
 PACKET_LENGTH: 1 byte
-PACKET_DATA  : 252 bytes (for now)
+PACKET_DATA  : depends on the frame type (see frames.py)
+
+The MESSAGE_ID is the ID of the frame type. Each frame type has its own pre-allocated buffer.
+The heartbeat frame is selected from the satellite state, or requested by the ground (REQUEST_TELEMETRY).
+After a history request (REQUEST_HISTORY), the heartbeats page out the housekeeping history until caught up.
 
 For struct module format strings:
     "b": 1,  # byte
@@ -23,20 +27,31 @@ For struct module format strings:
     "d": 8,  # double
 
 """
-import gc
-
-from apps.telemetry.constants import ADCS_IDX, CDH_IDX, EPS_IDX, GPS_IDX, THERMAL_IDX
-from apps.telemetry.helpers import (
-    convert_float_to_fixed_point_hp,
-    pack_signed_long_int,
-    pack_signed_short_int,
-    pack_unsigned_long_int,
-    pack_unsigned_short_int,
-    unpack_unsigned_short_int,
+import struct
+
+from apps.telemetry.frames import (
+    TM_FRAME_BY_STATE,
+    TM_FRAME_ID,
+    TM_FRAMES,
+    TM_HISTORY_RECORD_SCHEMA,
+    TM_HISTORY_RECORD_SIZE,
+    TM_HISTORY_RECORDS_OFFSET,
+    TM_HISTORY_RECORDS_PER_FRAME,
+    TM_HISTORY_TAG,
 )
 from core import DataHandler as DH
 from core import logger
-from micropython import const
+
+
+def _allocate_frames():
+    frames = {}
+    for frame_id, (schema, size) in TM_FRAMES.items():
+        frame = bytearray(size)  # pre-allocated buffer for packing
+        frame[0] = frame_id & 0xFF  # message ID
+        struct.pack_into(">H", frame, 1, 0)  # sequence count
+        frame[3] = schema.length & 0xFF  # packet length
+        frames[frame_id] = (schema, frame, {})
+    return frames
 
 
 # No instantiation, the class acts as a namespace for the shared state
@@ -44,307 +59,150 @@ from micropython import const
 class TelemetryPacker:
     """
     Packs telemetry data for transmission
+
+    The frame layouts are declared in frames.py and compiled into a single struct format each (see schema.py).
     """
 
     _TM_AVAILABLE = False
 
-    _TM_FRAME_SIZE = const(250)  # size of the telemetry frame
+    # Frame ID -> (schema, pre-allocated buffer, last update sequence number packed for each section)
+    _FRAMES = _allocate_frames()
 
-    _FRAME = bytearray(_TM_FRAME_SIZE)  # pre-allocated buffer for packing
-    _FRAME[0] = const(0x01) & 0xFF  # message ID
-    _FRAME[1:3] = pack_unsigned_short_int([const(0x00)], 0)  # sequence count
-    _FRAME[3] = const(245) & 0xFF  # packet length
+    _FRAME_ID = TM_FRAME_ID.FULL  # last packed frame
+    _REQUESTED_ID = None  # frame requested by the ground for the next heartbeat
+
+    # Housekeeping history record (pre-allocated) and last update sequence number encoded for each section
+    _HISTORY_RECORD = bytearray(TM_HISTORY_RECORD_SIZE)
+    _HISTORY_PACKED_SEQ = {}
+    _HISTORY_CURSOR = None  # next history record to page out, None if no catch-up is in progress
 
     @classmethod
     def FRAME(cls):
-        return cls._FRAME
+        return cls._FRAMES[cls._FRAME_ID][1]
+
+    @classmethod
+    def FRAME_ID(cls):
+        return cls._FRAME_ID
 
     @classmethod
     def FRAME_SIZE(cls):
-        return cls._TM_FRAME_SIZE
+        return len(cls._FRAMES[cls._FRAME_ID][1])
 
     @classmethod
     def SEQ_COUNT(cls):
-        return unpack_unsigned_short_int(cls._FRAME[1:3])
+        return struct.unpack_from(">H", cls.FRAME(), 1)[0]
 
     @classmethod
     def PACKET_LENGTH(cls):
-        return cls._FRAME[3]
+        return cls.FRAME()[3]
 
     @classmethod
     def TM_AVAILABLE(cls):
         return cls._TM_AVAILABLE
 
     @classmethod
-    def pack_tm_frame(cls):
+    def frame_exists(cls, frame_id):
+        return frame_id in cls._FRAMES
 
-        if not cls._TM_AVAILABLE:
-            cls._TM_AVAILABLE = True
+    @classmethod
+    def request_frame(cls, frame_id):
+        """
+        Requests the frame type to send with the next heartbeat (ground command).
+
+        Returns:
+            bool: False if the frame type does not exist.
+        """
+        if frame_id not in cls._FRAMES:
+            logger.warning("Unknown telemetry frame type %s", frame_id)
+            return False
+        cls._REQUESTED_ID = frame_id
+        return True
 
-        ############ CDH fields ############
-        if DH.data_process_exists("cdh"):
+    @classmethod
+    def request_history(cls, first_seq):
+        """
+        Starts the catch-up of the housekeeping history from record first_seq (ground command).
+        The next heartbeats carry consecutive history frames until the latest record has been sent.
+        """
+        cls._HISTORY_CURSOR = first_seq
 
-            cdh_data = DH.get_latest_data("cdh")
+    @classmethod
+    def next_frame_id(cls, state):
+        """
+        Returns the frame type of the next heartbeat: the one requested by the ground if any (once),
+        a history frame during a catch-up, the default of the given satellite state otherwise.
+        """
+        if cls._REQUESTED_ID is not None:
+            frame_id = cls._REQUESTED_ID
+            cls._REQUESTED_ID = None
+            return frame_id
+        if cls._HISTORY_CURSOR is not None:
+            return TM_FRAME_ID.HISTORY
+        return TM_FRAME_BY_STATE.get(state, TM_FRAME_ID.FULL)
 
-            # Time
-            cls._FRAME[4:8] = pack_unsigned_long_int(cdh_data, CDH_IDX.TIME)
+    @classmethod
+    def _update_sections(cls, schema, packed_seq):
+        # Only re-encode the sections whose data process logged new data since the schema was last packed
+        # Fields of a missing data process keep their last packed values
+        for tag in schema.tags:
+            seq = DH.get_update_seq(tag)
+            if seq < 0:
+                logger.warning("No %s data available", tag)
+            elif seq != packed_seq.get(tag, 0) and DH.data_available(tag):
+                schema.update(tag, DH.get_latest_data(tag))
+                packed_seq[tag] = seq
 
-            # SC State
-            cls._FRAME[8] = cdh_data[CDH_IDX.SC_STATE] & 0xFF
-            # SD Usage
-            cls._FRAME[9:13] = pack_unsigned_long_int(cdh_data, CDH_IDX.SD_USAGE)
-            # Current RAM Usage
-            cls._FRAME[13] = cdh_data[CDH_IDX.CURRENT_RAM_USAGE] & 0xFF
-            # Reboot count
-            cls._FRAME[14] = cdh_data[CDH_IDX.REBOOT_COUNT] & 0xFF
-            # Watchdog Timer
-            cls._FRAME[15] = cdh_data[CDH_IDX.WATCHDOG_TIMER] & 0xFF
-            # HAL Bitflags
-            cls._FRAME[16] = cdh_data[CDH_IDX.HAL_BITFLAGS] & 0xFF
+    @classmethod
+    def pack_history_record(cls):
+        """
+        Encodes a housekeeping history record from the latest data.
 
+        Returns:
+            bytearray: The pre-allocated record, to be logged to the history process.
+        """
+        cls._update_sections(TM_HISTORY_RECORD_SCHEMA, cls._HISTORY_PACKED_SEQ)
+        TM_HISTORY_RECORD_SCHEMA.pack_into(cls._HISTORY_RECORD)
+        return cls._HISTORY_RECORD
+
+    @classmethod
+    def _pack_history_frame(cls, schema, frame):
+        # Records are read from the ring straight into the frame, they are stored already encoded
+        first, count, total = 0, 0, 0
+        if DH.data_process_exists(TM_HISTORY_TAG):
+            history = DH.get_data_process(TM_HISTORY_TAG)
+            oldest, total = history.get_record_range()
+            first = cls._HISTORY_CURSOR
+            if first is None:
+                # Single page requested with REQUEST_TELEMETRY, latest records
+                first = max(oldest, total - TM_HISTORY_RECORDS_PER_FRAME)
+            first, count = history.read_records(first, frame, TM_HISTORY_RECORDS_OFFSET, TM_HISTORY_RECORDS_PER_FRAME)
         else:
-            logger.warning("No CDH data available")
-
-        ############ EPS fields ############
-
-        if DH.data_process_exists("eps"):
-            eps_data = DH.get_latest_data("eps")
-
-            # Mainboard voltage
-            cls._FRAME[17:19] = pack_signed_short_int(eps_data, EPS_IDX.MAINBOARD_VOLTAGE)
-            # Mainboard current
-            cls._FRAME[19:21] = pack_signed_short_int(eps_data, EPS_IDX.MAINBOARD_CURRENT)
-            # Battery pack SOC
-            cls._FRAME[21] = eps_data[EPS_IDX.BATTERY_PACK_REPORTED_SOC] & 0xFF
-            # Battery pack capacity
-            cls._FRAME[22:24] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_PACK_REPORTED_CAPACITY)
-            # Battery pack current
-            cls._FRAME[24:26] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_PACK_CURRENT)
-            # Battery pack voltage
-            cls._FRAME[26:28] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_PACK_VOLTAGE)
-            # Battery pack midpoint voltage
-            cls._FRAME[28:30] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_PACK_MIDPOINT_VOLTAGE)
-            # Battery cycles
-            cls._FRAME[30:32] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_CYCLES)
-            # Battery pack TTE
-            cls._FRAME[32:34] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_PACK_TTE)
-            # Battery pack TTF
-            cls._FRAME[34:36] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_PACK_TTF)
-            # Battery time since power up
-            cls._FRAME[36:38] = pack_signed_short_int(eps_data, EPS_IDX.BATTERY_TIME_SINCE_POWER_UP)
-
-            # XP coil voltage
-            cls._FRAME[38:40] = pack_signed_short_int(eps_data, EPS_IDX.XP_COIL_VOLTAGE)
-            # XP coil current
-            cls._FRAME[40:42] = pack_signed_short_int(eps_data, EPS_IDX.XP_COIL_CURRENT)
-            # XM coil voltage
-            cls._FRAME[42:44] = pack_signed_short_int(eps_data, EPS_IDX.XM_COIL_VOLTAGE)
-            # XM coil current
-            cls._FRAME[44:46] = pack_signed_short_int(eps_data, EPS_IDX.XM_COIL_CURRENT)
-            # YP coil voltage
-            cls._FRAME[46:48] = pack_signed_short_int(eps_data, EPS_IDX.YP_COIL_VOLTAGE)
-            # YP coil current
-            cls._FRAME[48:50] = pack_signed_short_int(eps_data, EPS_IDX.YP_COIL_CURRENT)
-            # YM coil voltage
-            cls._FRAME[50:52] = pack_signed_short_int(eps_data, EPS_IDX.YM_COIL_VOLTAGE)
-            # YM coil current
-            cls._FRAME[52:54] = pack_signed_short_int(eps_data, EPS_IDX.YM_COIL_CURRENT)
-            # ZP coil voltage
-            cls._FRAME[54:56] = pack_signed_short_int(eps_data, EPS_IDX.ZP_COIL_VOLTAGE)
-            # ZP coil current
-            cls._FRAME[56:58] = pack_signed_short_int(eps_data, EPS_IDX.ZP_COIL_CURRENT)
-            # ZM coil voltage
-            cls._FRAME[58:60] = pack_signed_short_int(eps_data, EPS_IDX.ZM_COIL_VOLTAGE)
-            # ZM coil current
-            cls._FRAME[60:62] = pack_signed_short_int(eps_data, EPS_IDX.ZM_COIL_CURRENT)
-
-            # Jetson input voltage
-            cls._FRAME[62:64] = pack_signed_short_int(eps_data, EPS_IDX.JETSON_INPUT_VOLTAGE)
-            # Jetson input current
-            cls._FRAME[64:66] = pack_signed_short_int(eps_data, EPS_IDX.JETSON_INPUT_CURRENT)
-
-            # RF LDO output voltage
-            cls._FRAME[66:68] = pack_signed_short_int(eps_data, EPS_IDX.RF_LDO_OUTPUT_VOLTAGE)
-            # RF LDO output current
-            cls._FRAME[68:70] = pack_signed_short_int(eps_data, EPS_IDX.RF_LDO_OUTPUT_CURRENT)
-
-            # GPS voltage
-            cls._FRAME[70:72] = pack_signed_short_int(eps_data, EPS_IDX.GPS_VOLTAGE)
-            # GPS current
-            cls._FRAME[72:74] = pack_signed_short_int(eps_data, EPS_IDX.GPS_CURRENT)
-
-            # XP solar charge voltage
-            cls._FRAME[74:76] = pack_signed_short_int(eps_data, EPS_IDX.XP_SOLAR_CHARGE_VOLTAGE)
-            # XP solar charge current
-            cls._FRAME[76:78] = pack_signed_short_int(eps_data, EPS_IDX.XP_SOLAR_CHARGE_CURRENT)
-            # XM solar charge voltage
-            cls._FRAME[78:80] = pack_signed_short_int(eps_data, EPS_IDX.XM_SOLAR_CHARGE_VOLTAGE)
-            # XM solar charge current
-            cls._FRAME[80:82] = pack_signed_short_int(eps_data, EPS_IDX.XM_SOLAR_CHARGE_CURRENT)
-            # YP solar charge voltage
-            cls._FRAME[82:84] = pack_signed_short_int(eps_data, EPS_IDX.YP_SOLAR_CHARGE_VOLTAGE)
-            # YP solar charge current
-            cls._FRAME[84:86] = pack_signed_short_int(eps_data, EPS_IDX.YP_SOLAR_CHARGE_CURRENT)
-            # YM solar charge voltage
-            cls._FRAME[86:88] = pack_signed_short_int(eps_data, EPS_IDX.YM_SOLAR_CHARGE_VOLTAGE)
-            # YM solar charge current
-            cls._FRAME[88:90] = pack_signed_short_int(eps_data, EPS_IDX.YM_SOLAR_CHARGE_CURRENT)
-            # ZP solar charge voltage
-            cls._FRAME[90:92] = pack_signed_short_int(eps_data, EPS_IDX.ZP_SOLAR_CHARGE_VOLTAGE)
-            # ZP solar charge current
-            cls._FRAME[92:94] = pack_signed_short_int(eps_data, EPS_IDX.ZP_SOLAR_CHARGE_CURRENT)
-            # ZM solar charge voltage
-            cls._FRAME[94:96] = pack_signed_short_int(eps_data, EPS_IDX.ZM_SOLAR_CHARGE_VOLTAGE)
-            # ZM solar charge current
-            cls._FRAME[96:98] = pack_signed_short_int(eps_data, EPS_IDX.ZM_SOLAR_CHARGE_CURRENT)
-        else:
-            logger.warning("No EPS data available")
-
-        ############ ADCS fields ############
-        if DH.data_process_exists("adcs"):
-
-            adcs_data = DH.get_latest_data("adcs")
-
-            # ADCS state
-            cls._FRAME[98] = adcs_data[ADCS_IDX.ADCS_STATE] & 0xFF
-
-            # Gyro X
-            cls._FRAME[99:103] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.GYRO_X])
-            # Gyro Y
-            cls._FRAME[103:107] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.GYRO_Y])
-            # Gyro Z
-            cls._FRAME[107:111] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.GYRO_Z])
-
-            # Magnetometer X
-            cls._FRAME[111:115] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.MAG_X])
-            # Magnetometer Y
-            cls._FRAME[115:119] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.MAG_Y])
-            # Magnetometer Z
-            cls._FRAME[119:123] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.MAG_Z])
-
-            # Sun status
-            cls._FRAME[123] = adcs_data[ADCS_IDX.SUN_STATUS] & 0xFF
-            # Sun vector X
-            cls._FRAME[124:128] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.SUN_VEC_X])
-            # Sun vector Y
-            cls._FRAME[128:132] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.SUN_VEC_Y])
-            # Sun vector Z
-            cls._FRAME[132:136] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.SUN_VEC_Z])
-            # Eclipse bool
-            cls._FRAME[136] = adcs_data[ADCS_IDX.ECLIPSE] & 0xFF
-            # Light sensor X+
-            cls._FRAME[137:139] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_XP)
-            # Light sensor X-
-            cls._FRAME[139:141] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_XM)
-            # Light sensor Y+
-            cls._FRAME[141:143] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_YP)
-            # Light sensor Y-
-            cls._FRAME[143:145] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_YM)
-            # Light sensor Z+ 1
-            cls._FRAME[145:147] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_ZP1)
-            # Light sensor Z+ 2
-            cls._FRAME[147:149] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_ZP2)
-            # Light sensor Z+ 3
-            cls._FRAME[149:151] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_ZP3)
-            # Light sensor Z+ 4
-            cls._FRAME[151:153] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_ZP4)
-            # Light sensor Z-
-            cls._FRAME[153:155] = pack_unsigned_short_int(adcs_data, ADCS_IDX.LIGHT_SENSOR_ZM)
-
-            # XP coil status
-            cls._FRAME[155] = adcs_data[ADCS_IDX.XP_COIL_STATUS] & 0xFF
-            # XM coil status
-            cls._FRAME[156] = adcs_data[ADCS_IDX.XM_COIL_STATUS] & 0xFF
-            # YP coil status
-            cls._FRAME[157] = adcs_data[ADCS_IDX.YP_COIL_STATUS] & 0xFF
-            # YM coil status
-            cls._FRAME[158] = adcs_data[ADCS_IDX.YM_COIL_STATUS] & 0xFF
-            # ZP coil status
-            cls._FRAME[159] = adcs_data[ADCS_IDX.ZP_COIL_STATUS] & 0xFF
-            # ZM coil status
-            cls._FRAME[160] = adcs_data[ADCS_IDX.ZM_COIL_STATUS] & 0xFF
-
-            # Coarse attitude QW
-            cls._FRAME[161:165] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.COARSE_ATTITUDE_QW])
-            # Coarse attitude QX
-            cls._FRAME[165:169] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.COARSE_ATTITUDE_QX])
-            # Coarse attitude QY
-            cls._FRAME[169:173] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.COARSE_ATTITUDE_QY])
-            # Coarse attitude QZ
-            cls._FRAME[173:177] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.COARSE_ATTITUDE_QZ])
-
-            # Star tracker status
-            cls._FRAME[177] = adcs_data[ADCS_IDX.STAR_TRACKER_STATUS] & 0xFF
-
-            # Star tracker attitude QW
-            cls._FRAME[178:182] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.STAR_TRACKER_ATTITUDE_QW])
-            # Star tracker attitude QX
-            cls._FRAME[182:186] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.STAR_TRACKER_ATTITUDE_QX])
-            # Star tracker attitude QY
-            cls._FRAME[186:190] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.STAR_TRACKER_ATTITUDE_QY])
-            # Star tracker attitude QZ
-            cls._FRAME[190:194] = convert_float_to_fixed_point_hp(adcs_data[ADCS_IDX.STAR_TRACKER_ATTITUDE_QZ])
-        else:
-            logger.warning("No ADCS data available")
-
-        ############ GPS fields ############
-        if DH.data_process_exists("gps"):
-
-            gps_data = DH.get_latest_data("gps")
-
-            # message ID
-            cls._FRAME[194] = gps_data[GPS_IDX.GPS_MESSAGE_ID] & 0xFF
-            # fix mode
-            cls._FRAME[195] = gps_data[GPS_IDX.GPS_FIX_MODE] & 0xFF
-            # number of SV
-            cls._FRAME[196] = gps_data[GPS_IDX.GPS_NUMBER_OF_SV] & 0xFF
-            # GNSS week
-            cls._FRAME[197:199] = pack_unsigned_short_int(gps_data, GPS_IDX.GPS_GNSS_WEEK)
-            # GNSS TOW
-            cls._FRAME[199:203] = pack_unsigned_long_int(gps_data, GPS_IDX.GPS_GNSS_TOW)
-            # latitude
-            cls._FRAME[203:207] = pack_signed_long_int(gps_data, GPS_IDX.GPS_LATITUDE)
-            # longitude
-            cls._FRAME[207:211] = pack_signed_long_int(gps_data, GPS_IDX.GPS_LONGITUDE)
-            # ellipsoid altitude
-            cls._FRAME[211:215] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ELLIPSOID_ALT)
-            # mean sea level altitude
-            cls._FRAME[215:219] = pack_signed_long_int(gps_data, GPS_IDX.GPS_MEAN_SEA_LVL_ALT)
-
-            # ECEF X
-            cls._FRAME[219:223] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ECEF_X)
-            # ECEF Y
-            cls._FRAME[223:227] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ECEF_Y)
-            # ECEF Z
-            cls._FRAME[227:231] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ECEF_Z)
-            # ECEF VX
-            cls._FRAME[231:235] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ECEF_VX)
-            # ECEF VY
-            cls._FRAME[235:239] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ECEF_VY)
-            # ECEF VZ
-            cls._FRAME[239:243] = pack_signed_long_int(gps_data, GPS_IDX.GPS_ECEF_VZ)
-        else:
-            logger.warning("No GPS data available")
+            logger.warning("No %s data available", TM_HISTORY_TAG)
 
-        ############ Thermal fields ############
+        if cls._HISTORY_CURSOR is not None:
+            cls._HISTORY_CURSOR = first + count if first + count < total else None
 
-        if DH.data_process_exists("thermal"):
-            thermal_data = DH.get_latest_data("thermal")
+        schema.update(TM_HISTORY_TAG, (first, count, total))
+        frame[3] = (schema.length + count * TM_HISTORY_RECORD_SIZE) & 0xFF  # packet length
 
-            # IMU temperature
-            cls._FRAME[243:245] = pack_unsigned_short_int(thermal_data, THERMAL_IDX.IMU_TEMPERATURE)
-            # CPU temperature
-            cls._FRAME[245:247] = pack_unsigned_short_int(thermal_data, THERMAL_IDX.CPU_TEMPERATURE)
-            # Battery temperature
-            cls._FRAME[247:249] = pack_unsigned_short_int(thermal_data, THERMAL_IDX.BATTERY_PACK_TEMPERATURE)
+    @classmethod
+    def pack_tm_frame(cls, frame_id=TM_FRAME_ID.FULL):
 
-        else:
-            logger.warning("No Thermal data available")
+        if frame_id not in cls._FRAMES:
+            logger.warning("Unknown telemetry frame type %s", frame_id)
+            return False
+
+        if not cls._TM_AVAILABLE:
+            cls._TM_AVAILABLE = True
+
+        schema, frame, packed_seq = cls._FRAMES[frame_id]
 
-        cls._FRAME[:] = bytearray(cls._FRAME[:])
-        gc.collect()
+        if frame_id == TM_FRAME_ID.HISTORY:
+            cls._pack_history_frame(schema, frame)
+        else:
+            cls._update_sections(schema, packed_seq)
 
-        ############ Payload fields ############
-        # TODO
+        schema.pack_into(frame)
+        cls._FRAME_ID = frame_id
 
         return True
@@ -0,0 +1,144 @@
+"""
+Telemetry Frame Schema
+
+======================
+
+A telemetry frame layout is declared once as a list of fields:
+    (name, tag, idx, encoding, offset)
+where tag is the name of the source data process, idx the index of the value in its latest data (see constants.py),
+encoding one of the encodings below and offset the absolute byte offset of the field in the frame.
+
+FrameSchema compiles the layout into a single big-endian struct format string so that packing a frame is one
+struct.pack_into call on the pre-allocated frame buffer (no intermediate bytearrays). The same schema generates the
+decoder used on the ground.
+
+Encodings (big-endian on the wire):
+    U8    : 1 byte, unsigned
+    U16   : 2 bytes, unsigned
+    S16   : 2 bytes, signed (two's complement)
+    U32   : 4 bytes, unsigned
+    S32   : 4 bytes, signed (two's complement)
+    FP_HP : 4 bytes, high-precision fixed point (sign bit, 7 integer bits, 24 fractional bits), see helpers.py
+    FP_LP : 4 bytes, low-precision fixed point (sign bit, 15 integer bits, 16 fractional bits), see helpers.py
+
+Values are masked to the width of their encoding so that the wire bytes are identical to the helpers in helpers.py.
+
+"""
+
+import struct
+
+from micropython import const
+
+U8 = const(0)
+U16 = const(1)
+S16 = const(2)
+U32 = const(3)
+S32 = const(4)
+FP_HP = const(5)
+FP_LP = const(6)
+
+# Struct format written on the wire (raw bit pattern) and read back on the ground (value)
+_PACK_FORMATS = ("B", "H", "H", "I", "I", "I", "I")
+_UNPACK_FORMATS = ("B", "H", "h", "I", "i", "I", "I")
+_MASKS = (0xFF, 0xFFFF, 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFF, 0, 0)
+
+
+class FrameSchema:
+    """
+    Compiled layout of a telemetry frame.
+
+    Args:
+        fields (list): The (name, tag, idx, encoding, offset) tuples of the frame.
+        start (int): Offset of the first byte covered by the schema (after the frame header).
+        length (int): Number of bytes covered by the schema. Defaults to the end of the last field.
+    """
+
+    def __init__(self, fields, start, length=None):
+        self.start = start
+        self.fields = sorted(fields, key=lambda field: field[4])
+
+        pack_fmt = ">"
+        unpack_fmt = ">"
+        # tag -> list of (slot, idx, encoding) used to refresh the values of a data process
+        self.sections = {}
+        # Data process tags in frame order
+        self.tags = []
+        position = start
+        for slot, (name, tag, idx, enc, offset) in enumerate(self.fields):
+            if offset < position:
+                raise ValueError(f"Field {name} at offset {offset} overlaps the previous field")
+            if offset > position:
+                pack_fmt += f"{offset - position}x"
+                unpack_fmt += f"{offset - position}x"
+            pack_fmt += _PACK_FORMATS[enc]
+            unpack_fmt += _UNPACK_FORMATS[enc]
+            position = offset + struct.calcsize(_PACK_FORMATS[enc])
+            if tag not in self.sections:
+                self.sections[tag] = []
+                self.tags.append(tag)
+            self.sections[tag].append((slot, idx, enc))
+
+        if length is None:
+            length = position - start
+        elif position > start + length:
+            raise ValueError(f"Fields end at offset {position}, past the schema length {length}")
+        elif position < start + length:
+            pack_fmt += f"{start + length - position}x"
+            unpack_fmt += f"{start + length - position}x"
+
+        self.length = length
+        self.pack_fmt = pack_fmt
+        self.unpack_fmt = unpack_fmt
+        # Encoded values, kept between frames so that missing data processes retain their last values
+        self.values = [0] * len(self.fields)
+
+    def update(self, tag, data):
+        """
+        Encodes the values of the data process tag from its latest data.
+
+        Args:
+            tag (str): The data process tag.
+            data (list): The latest data of the data process.
+        """
+        values = self.values
+        for slot, idx, enc in self.sections[tag]:
+            val = data[idx]
+            if enc == FP_HP or enc == FP_LP:
+                neg = val < 0
+                if neg:
+                    val = -val
+                val_int = int(val)
+                if enc == FP_HP:
+                    word = ((val_int & 0x7F) << 24) | (int((val - val_int) * 16777216) & 0xFFFFFF)
+                else:
+                    word = ((val_int & 0x7FFF) << 16) | (int((val - val_int) * 65536) & 0xFFFF)
+                values[slot] = (word | 0x80000000) if neg else word
+            else:
+                values[slot] = val & _MASKS[enc]
+
+    def pack_into(self, buffer):
+        """Writes the encoded values into buffer in a single struct call."""
+        struct.pack_into(self.pack_fmt, buffer, self.start, *self.values)
+
+    def decode(self, buffer):
+        """
+        Decodes a frame packed with this schema (ground side).
+
+        Returns:
+            dict: {tag: {name: value}} with fixed point fields converted back to floats.
+        """
+        raw = struct.unpack_from(self.unpack_fmt, buffer, self.start)
+        decoded = {}
+        for (name, tag, _, enc, _), val in zip(self.fields, raw):
+            if enc == FP_HP or enc == FP_LP:
+                neg = val >> 31
+                if enc == FP_HP:
+                    val = ((val >> 24) & 0x7F) + (val & 0xFFFFFF) / 16777216
+                else:
+                    val = ((val >> 16) & 0x7FFF) + (val & 0xFFFF) / 65536
+                if neg:
+                    val = -val
+            if tag not in decoded:
+                decoded[tag] = {}
+            decoded[tag][name] = val
+        return decoded
@@ -0,0 +1,351 @@
+"""
+Time-Series Compression Module
+
+======================
+
+This module provides the compression stage for the fixed-format binary files produced by the data processes
+(see core/data_handler.py) before they are downlinked. It is lossless unless a float precision is requested.
+
+Consecutive records of a data process differ by small amounts, so each field column is encoded against the same
+field of the previous record:
+- Integer fields are delta-encoded (modulo their width) and zig-zag mapped to an unsigned value.
+- Floating point fields are XOR-ed with the previous bit pattern (identical bits cancel out), or, if the process
+  declares a float precision, quantised to fixed point with that many fractional bits and delta-encoded like the
+  integer fields.
+The result is written as a LEB128 varint, so an unchanged field costs a single byte.
+
+The XOR of two noisy sensor readings keeps its low mantissa bits set, so lossless float columns barely compress
+(about 1.2x on IMU-like records). Quantised columns are lossy, each value being rounded to a multiple of
+2^-FLOAT_BITS, but their deltas only take the bits of the sensor noise: about 3.15x on the same records with 10
+fractional bits (see tests/test_compression.py). In quantised columns, the zig-zag delta is offset by one and 0
+escapes a non-finite value (NaN, infinity), followed by its raw bit pattern; the next delta is taken against the
+last finite value.
+
+Container layout (little-endian):
+    MAGIC        : 4 bytes ("ACMP")
+    VERSION      : 1 byte
+    FORMAT_LEN   : 1 byte
+    FORMAT       : FORMAT_LEN bytes (struct format of a record, without the endianness character)
+    FLOAT_BITS   : 1 byte (fractional bits of the quantised float fields, 0xFF for lossless)
+    RECORD_COUNT : 4 bytes
+    TAIL_LEN     : 2 bytes (trailing bytes that do not form a full record, stored raw)
+    RECORDS      : varint stream, RECORD_COUNT x number of fields
+    TAIL         : TAIL_LEN bytes
+
+Without float precision, the decoder reproduces the exact original bytes. It runs both onboard and on the ground
+(CPython). Onboard, a file is compressed a few records at a time (StreamCompressor) so that the encoding never
+blocks a task for the whole file.
+
+Author: Ibrahima Sory Sow
+
+"""
+
+import struct
+
+from micropython import const
+
+try:
+    from typing import Tuple
+except ImportError:
+    pass
+
+MAGIC = b"ACMP"
+_VERSION = const(1)
+_LOSSLESS = const(0xFF)  # FLOAT_BITS of the lossless containers
+_HEADER_FORMAT = "<IH"  # record count, tail length
+_CHUNK_SIZE = const(512)  # output buffer size before flushing to the file
+
+# Raw bit pattern of each field as an unsigned integer of the same width
+_UNSIGNED = {
+    "b": "B",
+    "B": "B",
+    "h": "H",
+    "H": "H",
+    "i": "I",
+    "I": "I",
+    "l": "L",
+    "L": "L",
+    "q": "Q",
+    "Q": "Q",
+    "f": "I",
+    "d": "Q",
+}
+_FLOATS = "fd"
+_INF = float("inf")
+
+
+def _compile(data_format: str):
+    """
+    Returns the unsigned record format, the record format with unsigned integers and floats (quantised containers),
+    the bit width of each field and whether each field is a float.
+    """
+    if data_format and data_format[0] in "<>!=@":
+        data_format = data_format[1:]
+    raw_format = "<"
+    value_format = "<"
+    widths = []
+    is_float = []
+    for c in data_format:
+        if c not in _UNSIGNED:
+            raise ValueError(f"Invalid format character '{c}'")
+        raw_format += _UNSIGNED[c]
+        value_format += c if c in _FLOATS else _UNSIGNED[c]
+        widths.append(struct.calcsize(_UNSIGNED[c]) * 8)
+        is_float.append(c in _FLOATS)
+    return data_format, raw_format, value_format, widths, is_float
+
+
+def _float_bits(val: float, width: int) -> int:
+    # Bit pattern of a float of the given width
+    if width == 32:
+        return struct.unpack("<I", struct.pack("<f", val))[0]
+    return struct.unpack("<Q", struct.pack("<d", val))[0]
+
+
+def _bits_float(bits: int, width: int) -> float:
+    if width == 32:
+        return struct.unpack("<f", struct.pack("<I", bits))[0]
+    return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+
+def _write_varint(buf: bytearray, pos: int, val: int) -> int:
+    """Writes val as a LEB128 varint into buf at pos and returns the new position."""
+    while val > 0x7F:
+        buf[pos] = (val & 0x7F) | 0x80
+        val >>= 7
+        pos += 1
+    buf[pos] = val
+    return pos + 1
+
+
+def _read_varint(stream, pos: int) -> Tuple[int, int]:
+    """Reads a LEB128 varint from stream at pos and returns its value and the new position."""
+    val = 0
+    shift = 0
+    while True:
+        byte = stream[pos]
+        pos += 1
+        val |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return val, pos
+
+
+class StreamCompressor:
+    """
+    Compresses the records of a src file object into a dst file object, a given number of records per step().
+
+    Args:
+        src: Readable binary file object positioned at the first record.
+        dst: Writable binary file object.
+        data_format (str): The struct format of a record (e.g. "<Lfff").
+        size (int): The number of bytes to read from src.
+        float_bits (int, optional): Fractional bits kept for the float fields (0 to 64), None to keep them exact.
+    """
+
+    __slots__ = (
+        "src",
+        "dst",
+        "raw_format",
+        "widths",
+        "is_float",
+        "quantised",
+        "scale",
+        "record_size",
+        "remaining",
+        "tail_len",
+        "prev",
+        "buf",
+        "written",
+    )
+
+    def __init__(self, src, dst, data_format: str, size: int, float_bits: int = None) -> None:
+        data_format, raw_format, value_format, widths, is_float = _compile(data_format)
+        self.quantised = float_bits is not None
+        self.scale = 1
+        if self.quantised:
+            if not 0 <= float_bits <= 64:
+                raise ValueError("Float precision must be between 0 and 64 bits")
+            raw_format = value_format
+            self.scale = 1 << float_bits
+        self.src = src
+        self.dst = dst
+        self.raw_format = raw_format
+        self.widths = widths
+        self.is_float = is_float
+        self.record_size = struct.calcsize(raw_format)
+        self.remaining = size // self.record_size
+        self.tail_len = size % self.record_size
+
+        fmt_bytes = data_format.encode()
+        dst.write(MAGIC)
+        dst.write(bytes([_VERSION, len(fmt_bytes)]))
+        dst.write(fmt_bytes)
+        dst.write(bytes([float_bits if self.quantised else _LOSSLESS]))
+        dst.write(struct.pack(_HEADER_FORMAT, self.remaining, self.tail_len))
+        self.written = len(MAGIC) + 3 + len(fmt_bytes) + struct.calcsize(_HEADER_FORMAT)
+
+        self.prev = [0] * len(widths)
+        # A 64-bit field takes at most 10 varint bytes, 11 for an escaped non-finite float
+        self.buf = bytearray(_CHUNK_SIZE + 11 * len(widths))
+
+    def step(self, max_records: int = None) -> bool:
+        """
+        Compresses up to max_records records (all the remaining records if None).
+
+        Returns:
+            bool: True once the whole input has been written to dst.
+        """
+        count = self.remaining if max_records is None else min(max_records, self.remaining)
+        src = self.src
+        buf = self.buf
+        prev = self.prev
+        widths = self.widths
+        is_float = self.is_float
+        quantised = self.quantised
+        scale = self.scale
+        n_fields = len(widths)
+        pos = 0
+
+        for _ in range(count):
+            record = struct.unpack(self.raw_format, src.read(self.record_size))
+            for i in range(n_fields):
+                val = record[i]
+                if is_float[i] and quantised:
+                    if val != val or val == _INF or val == -_INF:
+                        buf[pos] = 0  # escape, prev is kept
+                        pos = _write_varint(buf, pos + 1, _float_bits(val, widths[i]))
+                        continue
+                    val = int(round(val * scale))
+                    delta = val - prev[i]
+                    out = (delta << 1 if delta >= 0 else ((-delta) << 1) - 1) + 1
+                elif is_float[i]:
+                    out = val ^ prev[i]
+                else:
+                    width = widths[i]
+                    delta = (val - prev[i]) & ((1 << width) - 1)
+                    if delta >> (width - 1):  # negative delta
+                        out = ((((1 << width) - delta)) << 1) - 1
+                    else:
+                        out = delta << 1
+                prev[i] = val
+                pos = _write_varint(buf, pos, out)
+
+            if pos >= _CHUNK_SIZE:
+                self.dst.write(buf[:pos])
+                self.written += pos
+                pos = 0
+
+        if pos:
+            self.dst.write(buf[:pos])
+            self.written += pos
+        self.remaining -= count
+
+        if self.remaining:
+            return False
+        if self.tail_len:
+            self.dst.write(src.read(self.tail_len))
+            self.written += self.tail_len
+            self.tail_len = 0
+        return True
+
+
+def compress(src, dst, data_format: str, size: int, float_bits: int = None) -> int:
+    """
+    Compresses size bytes of fixed-format records read from the src file object into the dst file object.
+
+    Args:
+        src: Readable binary file object positioned at the first record.
+        dst: Writable binary file object.
+        data_format (str): The struct format of a record (e.g. "<Lfff").
+        size (int): The number of bytes to read from src.
+        float_bits (int, optional): Fractional bits kept for the float fields (0 to 64), None to keep them exact.
+
+    Returns:
+        int: The number of bytes written to dst.
+    """
+    compressor = StreamCompressor(src, dst, data_format, size, float_bits)
+    compressor.step()
+    return compressor.written
+
+
+def decompress(src, dst) -> str:
+    """
+    Decompresses a container read from the src file object and writes the original records to dst.
+
+    Args:
+        src: Readable binary file object positioned at the start of the container.
+        dst: Writable binary file object.
+
+    Returns:
+        str: The struct format of the records (without the endianness character).
+    """
+    if src.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a compressed data process file")
+    version, fmt_len = src.read(2)
+    if version != _VERSION:
+        raise ValueError(f"Unsupported container version {version}")
+    data_format = src.read(fmt_len).decode()
+    float_bits = src.read(1)[0]
+    n_records, tail_len = struct.unpack(_HEADER_FORMAT, src.read(struct.calcsize(_HEADER_FORMAT)))
+    _, raw_format, value_format, widths, is_float = _compile(data_format)
+    n_fields = len(widths)
+    quantised = float_bits != _LOSSLESS
+    if quantised:
+        raw_format = value_format
+        scale = 1 << float_bits
+
+    prev = [0] * n_fields
+    record = [0] * n_fields
+    stream = src.read()
+    pos = 0
+
+    for _ in range(n_records):
+        for i in range(n_fields):
+            val, pos = _read_varint(stream, pos)
+            if is_float[i] and quantised:
+                if not val:  # escaped non-finite value
+                    val, pos = _read_varint(stream, pos)
+                    record[i] = _bits_float(val, widths[i])
+                    continue
+                val -= 1
+                prev[i] += -((val + 1) >> 1) if val & 1 else val >> 1
+                record[i] = prev[i] / scale
+                continue
+            if is_float[i]:
+                record[i] = val ^ prev[i]
+            else:
+                delta = -((val + 1) >> 1) if val & 1 else val >> 1
+                record[i] = (prev[i] + delta) & ((1 << widths[i]) - 1)
+            prev[i] = record[i]
+        dst.write(struct.pack(raw_format, *record))
+
+    if tail_len:
+        dst.write(stream[pos : pos + tail_len])
+
+    return data_format
+
+
+def compress_file(src_path: str, dst_path: str, data_format: str, size: int, float_bits: int = None) -> int:
+    """
+    Compresses the data process file at src_path into dst_path (float fields quantised to float_bits if given).
+
+    Returns:
+        int: The size of the compressed file in bytes.
+    """
+    with open(src_path, "rb") as src:
+        with open(dst_path, "wb") as dst:
+            return compress(src, dst, data_format, size, float_bits)
+
+
+def decompress_file(src_path: str, dst_path: str) -> Tuple[str, int]:
+    """
+    Decompresses the container at src_path into dst_path (host-side or onboard).
+
+    Returns:
+        Tuple[str, int]: The struct format of the records and the number of bytes written.
+    """
+    with open(src_path, "rb") as src:
+        with open(dst_path, "wb") as dst:
+            data_format = decompress(src, dst)
+            return data_format, dst.tell()
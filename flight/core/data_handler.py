@@ -36,6 +36,7 @@ import re
 import struct
 import time
 
+from core.compression import StreamCompressor
 from core.logging import logger
 from micropython import const
 
@@ -48,10 +49,19 @@ _HOME_PATH = "/sd"  # Default path for the SD card
 _CLOSED = const(20)
 _OPEN = const(21)
 _IMG_SIZE_LIMIT = const(100000)
+_EVT_SIZE_LIMIT = const(20000)
+_EVT_FLUSH_BYTES = const(512)  # pending bytes of the event log before a flush
+_HIST_HEADER_SIZE = const(4)
+_CMP_STEP_RECORDS = const(64)  # records compressed per log() call
 
 
 _PROCESS_CONFIG_FILENAME = ".data_process_configuration.json"
 _IMG_TAG_NAME = "img"
+_EVT_TAG_NAME = "evt"
+_HIST_TAG_NAME = "history"
+_BIN_EXT = ".bin"
+_CMP_EXT = ".cmp"  # compressed files (see core/compression.py)
+_RAW_EXT = ".raw"  # original of a lossy compressed file, kept onboard
 
 
 class DataProcess:
@@ -65,6 +75,9 @@ class DataProcess:
         data_limit (int): The maximum number of data in bytes allowed in the file (default is 100kb).
                         This attribute will automatically get updated based on the line bytesize.
         new_config_file (bool): Whether to create a new configuration file (default is False).
+        compress (bool): Whether closed files are compressed before transmission (default is False).
+        float_precision (int): Fractional bits kept for the float fields of compressed files (None: lossless).
+                        Lossy opt-in, the original file is then kept onboard as <name>.raw.
         write_interval (int): The interval of logs at which the data should be written to the file (default is 1).
         write_interval_counter (int): The counter for the write interval.
         status (str): The status of the file ("CLOSED" or "OPEN").
@@ -72,6 +85,10 @@ class DataProcess:
         dir_path (str): The directory path for the file.
         current_path (str): The current filename.
         bytesize (int): The size of each new data line to be written to the file.
+        update_seq (int): Number of data points logged since boot, lets consumers detect new data.
+        compress_queue (list): Closed files waiting for compression.
+        compressor (StreamCompressor): The compression in progress, None if there is none.
+        compress_path (str): The path of the file being compressed.
     """
 
     # For optimization purposes  (avoid creating a __dict__ and instantiate static memnory space for attributes)
@@ -94,6 +111,12 @@ class DataProcess:
         "last_data",
         "delete_paths",
         "excluded_paths",
+        "compress",
+        "float_precision",
+        "update_seq",
+        "compress_queue",
+        "compressor",
+        "compress_path",
     )
 
     _FORMAT = {
@@ -120,6 +143,8 @@ class DataProcess:
         write_interval: int = 1,
         circular_buffer_size: int = 10,
         new_config_file: bool = False,
+        compress: bool = False,
+        float_precision: int = None,
     ) -> None:
         """
         Initializes a DataProcess object.
@@ -133,6 +158,10 @@ class DataProcess:
             circular_buffer_size (int, optional): The size of the circular buffer for the files in
                                         the directory (default is 10).
             new_config_file (bool, optional): Whether to create a new configuration file (default is False).
+            compress (bool, optional): Whether closed files are compressed before transmission (default is False).
+            float_precision (int, optional): Fractional bits kept for the float fields of compressed files, the
+                                        floats being quantised to fixed point (default is None, lossless).
+                                        The original of a lossy compressed file is kept onboard.
         """
 
         self.tag_name = tag_name
@@ -141,6 +170,11 @@ class DataProcess:
         self.write_interval = int(write_interval)
         self.write_interval_counter = self.write_interval - 1  # To write the first data point
         self.circular_buffer_size = circular_buffer_size
+        self.compress = compress
+        self.float_precision = float_precision
+        self.compress_queue = []
+        self.compressor = None
+        self.compress_path = None
 
         # TODO Check formating e.g. 'iff', 'iif', 'fff', 'iii', etc. ~ done within compute_bytesize()
         self.data_format = "<" + data_format
@@ -149,6 +183,7 @@ class DataProcess:
         self.bytesize = self.compute_bytesize(self.data_format)
 
         self.last_data = None
+        self.update_seq = 0
 
         if self.persistent:
 
@@ -172,6 +207,8 @@ class DataProcess:
                     "data_format": self.data_format[1:],  # remove the < character
                     "data_limit": data_limit,
                     "write_interval": write_interval,
+                    "compress": compress,
+                    "float_precision": float_precision,
                 }
                 with open(config_file_path, "w") as config_file:
                     json.dump(config_data, config_file)
@@ -183,9 +220,9 @@ class DataProcess:
         if not path_exist(self.dir_path):
             try:
                 os.mkdir(self.dir_path)
-                logger.info(f"Folder {self.dir_path} created successfully.")
+                logger.info("Folder %s created successfully.", self.dir_path)
             except OSError as e:
-                logger.critical(f"Error creating folder: {e}")
+                logger.critical("Error creating folder: %s", e)
         else:
             logger.info("Folder already exists.")
 
@@ -217,8 +254,10 @@ class DataProcess:
         Returns:
             None
         """
-        self.resolve_current_file()
+        if self.persistent:
+            self.resolve_current_file()
         self.last_data = data
+        self.update_seq += 1
         self.write_interval_counter += 1
 
         if self.persistent and self.write_interval_counter >= self.write_interval:
@@ -227,6 +266,9 @@ class DataProcess:
             self.file.flush()  # Flush immediately
             self.write_interval_counter = 0
 
+        if self.compressor is not None or self.compress_queue:
+            self.compress_step(_CMP_STEP_RECORDS)
+
         gc.collect()
 
     def get_latest_data(self) -> Optional[List]:
@@ -251,6 +293,13 @@ class DataProcess:
         """
         self.last_data = None
 
+    def get_update_seq(self) -> int:
+        """
+        Returns the number of data points logged since boot (0 if nothing has been logged yet).
+        Consumers compare it with the last value they processed to skip unchanged data.
+        """
+        return self.update_seq
+
     def data_available(self) -> bool:
         """
         Returns whether data is available in the internal buffer (latest).
@@ -270,18 +319,36 @@ class DataProcess:
             current_file_size = self.get_current_file_size()
             if current_file_size >= self.size_limit:
                 self.close()
+                if self.compress and self.current_path not in self.compress_queue:
+                    self.compress_queue.append(self.current_path)
                 self.current_path = self.create_new_path()
                 self.open()
 
     def create_new_path(self) -> str:
         """
-        Create a new filename for the current file process.
+        Create a new filename for the current file process, <tag>_<time>.bin.
+        A file created in the same second (rotations faster than a second) is suffixed with _<n>, so that a closed file
+        is never reopened as the current file.
 
         Returns:
             str: The new filename.
         """
         # Keeping the tag name in the filename for identification in debugging
-        return join_path(self.dir_path, self.tag_name) + "_" + str(int(time.time())) + ".bin"
+        stem = join_path(self.dir_path, self.tag_name) + "_" + str(int(time.time()))
+        path = stem + _BIN_EXT
+        n = 0
+        while self.path_taken(path):
+            n += 1
+            path = stem + "_" + str(n) + _BIN_EXT
+        return path
+
+    def path_taken(self, path: str) -> bool:
+        """
+        Returns whether a file path of the process is in use: existing, or its compressed version existing or pending.
+        """
+        if path_exist(path):
+            return True
+        return self.compress and (self.compression_pending(path) or path_exist(path[: -len(_BIN_EXT)] + _CMP_EXT))
 
     def open(self) -> None:
         """
@@ -329,12 +396,128 @@ class DataProcess:
             if tm_path == self.current_path:
                 self.close()
                 self.resolve_current_file()
+            elif self.compression_pending(tm_path):
+                tm_path = self.finish_compression(tm_path)
 
             self.excluded_paths.append(tm_path)
             return tm_path
         else:
             return None
 
+    def compression_pending(self, path: str) -> bool:
+        """
+        Returns whether a closed file of the process waits for its compression or is being compressed.
+        """
+        return self.compress and (path == self.compress_path or path in self.compress_queue)
+
+    def finish_compression(self, path: str) -> str:
+        """
+        Completes right away the compression of a file waiting for it (requested by the ground), after the compression
+        in progress if it is another file.
+
+        Returns:
+            str: The path of the compressed file, or the original path if the compression failed.
+        """
+        if path in self.compress_queue:
+            self.compress_queue.remove(path)
+            self.compress_queue.insert(0, path)
+        while self.compression_pending(path):
+            self.compress_step(None)
+        if path_exist(path):
+            return path
+        return path[: -len(_BIN_EXT)] + _CMP_EXT
+
+    def compress_step(self, max_records: Optional[int]) -> None:
+        """
+        Compresses up to max_records records (None: the whole file) of the files closed by the rotation (see
+        core/compression.py). log() compresses _CMP_STEP_RECORDS records per call, so that a file is compressed over
+        several calls instead of blocking the task for the whole file.
+
+        The compressed file replaces the original once complete. With a float precision (lossy), the original is kept
+        as <name>.raw until the compressed file is deleted. A file requested for transmission or flagged for deletion
+        before its compression is complete stays uncompressed.
+        """
+        if self.compressor is None:
+            if not self.start_compression():
+                return
+        elif self.compress_path in self.excluded_paths or self.compress_path in self.delete_paths:
+            self.abort_compression()
+            return
+
+        try:
+            done = self.compressor.step(max_records)
+        except OSError as e:
+            logger.error("Error compressing %s: %s", self.compress_path, e)
+            self.abort_compression()
+            return
+        if not done:
+            return
+
+        path = self.compress_path
+        self.close_compression()
+        if path == self.current_path:
+            # Never removes the file being written, its compressed version is outdated
+            os.remove(path[: -len(_BIN_EXT)] + _CMP_EXT)
+            return
+        try:
+            if self.float_precision is None:
+                os.remove(path)
+            else:
+                os.rename(path, path[: -len(_BIN_EXT)] + _RAW_EXT)
+        except OSError as e:
+            logger.error("Error replacing %s: %s", path, e)
+            cmp_path = path[: -len(_BIN_EXT)] + _CMP_EXT
+            if path_exist(path) and path_exist(cmp_path):
+                os.remove(cmp_path)
+
+    def start_compression(self) -> bool:
+        """
+        Starts the compression of the next queued file still available.
+
+        Returns:
+            bool: True if a compression was started.
+        """
+        while self.compress_queue:
+            path = self.compress_queue.pop(0)
+            if path in self.excluded_paths or path in self.delete_paths or path == self.current_path:
+                continue
+            if not path_exist(path):
+                continue
+            self.compress_path = path
+            src = dst = None
+            try:
+                src = open(path, "rb")
+                dst = open(path[: -len(_BIN_EXT)] + _CMP_EXT, "wb")
+                self.compressor = StreamCompressor(src, dst, self.data_format, os.stat(path)[6], self.float_precision)
+                return True
+            except OSError as e:
+                logger.error("Error compressing %s: %s", path, e)
+                if src is not None:
+                    src.close()
+                if dst is not None:
+                    dst.close()
+                    os.remove(path[: -len(_BIN_EXT)] + _CMP_EXT)
+                self.compress_path = None
+        return False
+
+    def close_compression(self) -> None:
+        """
+        Closes the files of the compression in progress.
+        """
+        self.compressor.src.close()
+        self.compressor.dst.close()
+        self.compressor = None
+        self.compress_path = None
+
+    def abort_compression(self) -> None:
+        """
+        Stops the compression in progress, the original file is left untouched and the partial output deleted.
+        """
+        cmp_path = self.compress_path[: -len(_BIN_EXT)] + _CMP_EXT
+        self.close_compression()
+        if path_exist(cmp_path):
+            os.remove(cmp_path)
+
     def notify_TM_path(self, path: str) -> None:
         """
         Acknowledge the transmission of the file.
@@ -351,13 +534,21 @@ class DataProcess:
         """
         Clean up the files that have been marked for deletion.
         """
+        if not self.persistent:
+            return
         for d_path in self.delete_paths[:]:  # IMPORTANT: Iterate over a COPY of the list
             # shouldn't iterate over the same list we're removing from
+            if self.compress and d_path == self.compress_path:
+                self.abort_compression()
             if path_exist(d_path):
                 os.remove(d_path)
+                if self.compress and d_path.endswith(_CMP_EXT):
+                    raw_path = d_path[: -len(_CMP_EXT)] + _RAW_EXT
+                    if path_exist(raw_path):
+                        os.remove(raw_path)
             else:
                 # TODO - log error, use exception handling instead
-                logger.critical(f"File {d_path} does not exist.")
+                logger.critical("File %s does not exist.", d_path)
             self.delete_paths.remove(d_path)
 
     def check_circular_buffer(self) -> None:
@@ -377,6 +568,8 @@ class DataProcess:
         Returns:
             None
         """
+        if not self.persistent:
+            return
         files = self.get_sorted_file_list()[1:]  # Ignore process configuration file
         # Actual overflow of the buffer
         diff = len(files) - (self.circular_buffer_size + len(self.excluded_paths) + len(self.delete_paths) - 1)
@@ -395,26 +588,41 @@ class DataProcess:
     def get_sorted_file_list(self) -> List[str]:
         """
         Returns a list of all files in the directory.
+        The partial output of the compression in progress and the kept originals of lossy compressed files are not
+        listed, they are never transmitted.
 
         Returns:
             A list of filenames.
         """
-        return sorted(os.listdir(self.dir_path))
+        files = sorted(os.listdir(self.dir_path))
+        if not self.compress:
+            return files
+        partial = self.compress_path[: -len(_BIN_EXT)] + _CMP_EXT if self.compressor is not None else None
+        return [name for name in files if not name.endswith(_RAW_EXT) and join_path(self.dir_path, name) != partial]
 
     def get_storage_info(self) -> Tuple[int, int]:
         """
         Returns storage information for the current file process which includes:
-        - Number of files in the directory
+        - Number of files in the directory (excluding the process configuration file)
         - Total directory size in bytes
-        - TODO
 
         Returns:
             A tuple containing the number of files and the total directory size.
         """
-        files = os.listdir(self.dir_path)
-        # TODO - implement the rest of the function
-        total_size = len(files) * self.size_limit + self.get_current_file_size()
-        return len(files), total_size
+        if not self.persistent:
+            return 0, 0
+        num_files = 0
+        total_size = 0
+        for file in os.listdir(self.dir_path):
+            if file == _PROCESS_CONFIG_FILENAME:
+                continue
+            try:
+                total_size += os.stat(join_path(self.dir_path, file))[6]
+                num_files += 1
+            except OSError:
+                # File deleted in between
+                pass
+        return num_files, total_size
 
     def get_current_file_size(self) -> Optional[int]:
         """
@@ -429,11 +637,11 @@ class DataProcess:
                 filesize = file_stats[6]  # size of the file in bytes
                 return filesize
             except OSError as e:
-                logger.error(f"Error getting file size: {e}")
+                logger.error("Error getting file size: %s", e)
                 return None
         else:
             # TODO handle case where file does not exist
-            logger.warning(f"File {self.current_path} does not exist.")
+            logger.warning("File %s does not exist.", self.current_path)
             return None
 
     # DEBUG ONLY
@@ -461,7 +669,7 @@ class DataProcess:
                     content.append(struct.unpack(self.data_format, cr))
                 return content
         else:
-            logger.warning(f"Can't read {self.current_path}: File is not closed!")
+            logger.warning("Can't read %s: File is not closed!", self.current_path)
 
 
 class ImageProcess(DataProcess):
@@ -469,6 +677,10 @@ class ImageProcess(DataProcess):
 
         self.tag_name = tag_name
         self.file = None
+        self.persistent = True
+        self.compress = False
+        self.last_data = None
+        self.update_seq = 0
 
         self.status = _CLOSED
 
@@ -499,6 +711,7 @@ class ImageProcess(DataProcess):
         """
         self.resolve_current_file()
         self.last_data = data
+        self.update_seq += 1
 
         self.file.write(data)
         self.file.flush()
@@ -547,6 +760,215 @@ class ImageProcess(DataProcess):
         self.resolve_current_file()
 
 
+class EventLogProcess(DataProcess):
+    """
+    Rotating files of binary log records (see BinaryLogHandler in core/logging.py).
+    The files can be downlinked as any other data process file.
+
+    As in the RotatingFileHandler, the size of the current file is tracked in RAM (read once when it is opened), so
+    logging a record costs no file system access until the pending bytes reach _EVT_FLUSH_BYTES. The handler flushes
+    the records of level ERROR and above right away (see flush()).
+    """
+
+    __slots__ = ("file_size", "pending_bytes")
+
+    def __init__(self, tag_name: str, circular_buffer_size: int = 10):
+
+        self.tag_name = tag_name
+        self.file = None
+        self.persistent = True
+        self.compress = False
+        self.last_data = None
+        self.update_seq = 0
+
+        self.status = _CLOSED
+
+        self.dir_path = join_path(_HOME_PATH, self.tag_name)
+        self.create_folder()
+
+        self.size_limit = _EVT_SIZE_LIMIT
+        self.circular_buffer_size = circular_buffer_size
+        self.file_size = 0
+        self.pending_bytes = 0
+
+        self.current_path = self.create_new_path()
+        self.delete_paths = []  # Paths that are flagged for deletion
+        self.excluded_paths = []  # Paths that are currently being transmitted
+
+        config_file_path = join_path(self.dir_path, _PROCESS_CONFIG_FILENAME)
+        if not path_exist(config_file_path):
+            config_data = {_EVT_TAG_NAME: True}
+            with open(config_file_path, "w") as config_file:
+                json.dump(config_data, config_file)
+
+    def log(self, data: bytearray) -> None:
+        """
+        Appends the given binary record(s) to the current file.
+
+        Args:
+            data (bytearray): The packed record(s).
+
+        Returns:
+            None
+        """
+        if self.status == _OPEN and self.file_size >= self.size_limit:
+            self.close()
+        if self.status == _CLOSED:
+            self.current_path = self.create_new_path()
+            self.open()
+            self.file_size = self.get_current_file_size() or 0  # appending to a file of the same second
+        self.update_seq += 1
+        self.file.write(data)
+        self.file_size += len(data)
+        self.pending_bytes += len(data)
+        if self.pending_bytes >= _EVT_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the pending records to the SD card.
+        """
+        if self.status == _OPEN:
+            self.file.flush()
+        self.pending_bytes = 0
+
+    def close(self) -> None:
+        """
+        Close the file (pending records included).
+        """
+        self.pending_bytes = 0
+        super().close()
+
+
+class HistoryProcess(DataProcess):
+    """
+    Fixed-size ring of fixed-size binary records in a single file, for the housekeeping history.
+
+    The file holds a 4-byte header (big-endian number of records written since the ring creation) followed by
+    capacity record slots. Record n is stored in slot n % capacity, so the ring never grows nor rotates and the
+    records [max(0, total - capacity), total) are always available for downlink (see read_records()).
+    The records are stored as they are downlinked (already encoded), paging them out is a plain file read.
+    """
+
+    __slots__ = ("record_size", "capacity", "total")
+
+    def __init__(self, tag_name: str, record_size: int, capacity: int):
+
+        self.tag_name = tag_name
+        self.file = None
+        self.persistent = True
+        self.compress = False
+        self.last_data = None
+        self.update_seq = 0
+        self.circular_buffer_size = 1
+
+        self.record_size = record_size
+        self.capacity = capacity
+        self.bytesize = record_size
+        self.size_limit = _HIST_HEADER_SIZE + capacity * record_size
+
+        self.status = _CLOSED
+
+        self.dir_path = join_path(_HOME_PATH, self.tag_name)
+        self.create_folder()
+
+        self.current_path = join_path(self.dir_path, self.tag_name) + _BIN_EXT
+        self.delete_paths = []  # Paths that are flagged for deletion
+        self.excluded_paths = []  # Paths that are currently being transmitted
+
+        config_data = {_HIST_TAG_NAME: True, "record_size": record_size, "capacity": capacity}
+        config_file_path = join_path(self.dir_path, _PROCESS_CONFIG_FILENAME)
+        reset = True
+        if path_exist(config_file_path):
+            with open(config_file_path, "r") as config_file:
+                reset = json.load(config_file) != config_data
+        if reset:
+            with open(config_file_path, "w") as config_file:
+                json.dump(config_data, config_file)
+
+        self.total = 0
+        if not reset and path_exist(self.current_path):
+            self.file = open(self.current_path, "r+b")
+            header = self.file.read(_HIST_HEADER_SIZE)
+            if len(header) == _HIST_HEADER_SIZE:
+                self.total = struct.unpack(">I", header)[0]
+        else:
+            # New ring (or layout change), the previous records can't be read back
+            self.file = open(self.current_path, "w+b")
+            self.file.write(struct.pack(">I", 0))
+            self.file.flush()
+        self.status = _OPEN
+
+    def log(self, data: bytearray) -> None:
+        """
+        Writes the given record into the next slot of the ring, overwriting the oldest record once full.
+
+        Args:
+            data (bytearray): The encoded record, record_size bytes.
+
+        Returns:
+            None
+        """
+        self.file.seek(_HIST_HEADER_SIZE + (self.total % self.capacity) * self.record_size)
+        self.file.write(data)
+        self.total += 1
+        # Header written after the record: a reset in between loses the record, never corrupts the ring
+        self.file.seek(0)
+        self.file.write(struct.pack(">I", self.total))
+        self.file.flush()
+        self.last_data = data
+        self.update_seq += 1
+
+    def get_record_range(self) -> Tuple[int, int]:
+        """
+        Returns the sequence numbers of the records available in the ring: [oldest, total).
+        """
+        return max(0, self.total - self.capacity), self.total
+
+    def read_records(self, first: int, buffer: bytearray, offset: int, max_count: int) -> Tuple[int, int]:
+        """
+        Reads consecutive records, starting from sequence number first, directly into buffer.
+        A first record already overwritten is moved up to the oldest record available.
+
+        Args:
+            first (int): The sequence number of the first record to read.
+            buffer (bytearray): The destination buffer (e.g. a telemetry frame).
+            offset (int): The offset of the first record in buffer.
+            max_count (int): The maximum number of records to read.
+
+        Returns:
+            A tuple containing the sequence number of the first record read and the number of records read.
+        """
+        oldest, total = self.get_record_range()
+        if first < oldest:
+            first = oldest
+        count = min(max_count, total - first)
+        if count <= 0:
+            return first, 0
+
+        view = memoryview(buffer)
+        slot = first % self.capacity
+        head = min(count, self.capacity - slot)  # records before the end of the ring
+        self.file.seek(_HIST_HEADER_SIZE + slot * self.record_size)
+        self.file.readinto(view[offset : offset + head * self.record_size])
+        if head < count:
+            self.file.seek(_HIST_HEADER_SIZE)
+            self.file.readinto(view[offset + head * self.record_size : offset + count * self.record_size])
+        return first, count
+
+    def request_TM_path(self, latest: bool = False) -> Optional[str]:
+        """
+        The ring is never downlinked as a file, its records are paged out with read_records().
+        """
+        return None
+
+    def check_circular_buffer(self) -> None:
+        """
+        Nothing to do, the ring has a fixed size.
+        """
+        return
+
+
 class DataHandler:
     """
     Managing class for all data processes and the SD card.
@@ -595,9 +1017,17 @@ class DataHandler:
                         data_format: str = config_data.get(_IMG_TAG_NAME)
                         cls.register_image_process()
                         continue
+                    if _EVT_TAG_NAME in config_data:
+                        cls.register_event_log_process(dir_name)
+                        continue
+                    if _HIST_TAG_NAME in config_data:
+                        cls.register_history_process(dir_name, config_data["record_size"], config_data["capacity"])
+                        continue
                     data_format: str = config_data.get("data_format")
                     data_limit: int = config_data.get("data_limit")
                     write_interval: int = config_data.get("write_interval")
+                    compress: bool = config_data.get("compress", False)
+                    float_precision: int = config_data.get("float_precision")
                     if data_format and data_limit:
                         cls.register_data_process(
                             tag_name=dir_name,
@@ -605,6 +1035,8 @@ class DataHandler:
                             persistent=True,
                             data_limit=data_limit,
                             write_interval=write_interval,
+                            compress=compress,
+                            float_precision=float_precision,
                         )
 
         cls._SD_SCANNED = True
@@ -618,6 +1050,8 @@ class DataHandler:
         data_limit: int = 100000,
         write_interval: int = 1,
         circular_buffer_size: int = 10,
+        compress: bool = False,
+        float_precision: int = None,
     ) -> None:
         """
         Register a data process with the given parameters.
@@ -629,6 +1063,9 @@ class DataHandler:
         - data_limit (int, optional): The maximum number of data lines to store. Defaults to 100000 bytes.
         - write_interval (int, optional): The interval of logs at which the data should be written to the file. Defaults to 1.
         - circular_buffer_size (int, optional): The size of the circular buffer for the files in the directory. Defaults to 10.
+        - compress (bool, optional): Whether closed files are compressed before transmission. Defaults to False.
+        - float_precision (int, optional): Fractional bits kept for the float fields of compressed files (lossy opt-in,
+          the original file is kept onboard). Defaults to None (lossless).
 
         Raises:
         - ValueError: If data_limit is not a positive integer.
@@ -644,6 +1081,8 @@ class DataHandler:
                 data_limit=data_limit,
                 write_interval=write_interval,
                 circular_buffer_size=circular_buffer_size,
+                compress=compress,
+                float_precision=float_precision,
             )
         else:
             raise ValueError("Data limit must be a positive integer.")
@@ -658,6 +1097,38 @@ class DataHandler:
         """
         cls.data_process_registry[_IMG_TAG_NAME] = ImageProcess(_IMG_TAG_NAME)
 
+    @classmethod
+    def register_event_log_process(cls, tag_name: str = _EVT_TAG_NAME) -> EventLogProcess:
+        """
+        Register a binary event log process, if not already registered.
+
+        Parameters:
+        - tag_name (str, optional): The tag name of the process. Defaults to the event log of the logger.
+
+        Returns:
+        - EventLogProcess: The registered process, e.g. to be given to the BinaryLogHandler.
+        """
+        if tag_name not in cls.data_process_registry:
+            cls.data_process_registry[tag_name] = EventLogProcess(tag_name)
+        return cls.data_process_registry[tag_name]
+
+    @classmethod
+    def register_history_process(cls, tag_name: str, record_size: int, capacity: int) -> HistoryProcess:
+        """
+        Register a history ring of fixed-size records, if not already registered.
+
+        Parameters:
+        - tag_name (str): The tag name of the process.
+        - record_size (int): The size of a record in bytes.
+        - capacity (int): The number of records kept in the ring.
+
+        Returns:
+        - HistoryProcess: The registered process.
+        """
+        if tag_name not in cls.data_process_registry:
+            cls.data_process_registry[tag_name] = HistoryProcess(tag_name, record_size, capacity)
+        return cls.data_process_registry[tag_name]
+
     @classmethod
     def log_data(cls, tag_name: str, data: List) -> None:
         """
@@ -679,7 +1150,7 @@ class DataHandler:
             else:
                 raise KeyError("Data process not registered!")
         except KeyError as e:
-            logger.critical(f"Error: {e}")
+            logger.critical("Error: %s", e)
 
     @classmethod
     def log_image(cls, data: List[bytes]) -> None:
@@ -698,7 +1169,7 @@ class DataHandler:
             else:
                 raise KeyError("Data process not registered!")
         except KeyError as e:
-            logger.critical(f"Error: {e}")
+            logger.critical("Error: %s", e)
 
     @classmethod
     def image_completed(cls) -> bool:
@@ -714,7 +1185,7 @@ class DataHandler:
             else:
                 raise KeyError("Image data process not registered!")
         except KeyError as e:
-            logger.critical(f"Error: {e}")
+            logger.critical("Error: %s", e)
 
     @classmethod
     def get_latest_data(cls, tag_name: str):
@@ -748,6 +1219,22 @@ class DataHandler:
         else:
             return False
 
+    @classmethod
+    def get_update_seq(cls, tag_name: str) -> int:
+        """
+        Returns the update sequence number of the specified data process (see DataProcess.get_update_seq).
+
+        Parameters:
+        - tag_name (str): The name of the data process.
+
+        Returns:
+        - int: The number of data points logged since boot, or -1 if the data process does not exist.
+        """
+        if tag_name in cls.data_process_registry:
+            return cls.data_process_registry[tag_name].update_seq
+        else:
+            return -1
+
     @classmethod
     def data_available(cls, tag_name: str) -> bool:
         """
@@ -826,9 +1313,9 @@ class DataHandler:
         return list(cls.data_process_registry.values())
 
     @classmethod
-    def get_storage_info(cls, tag_name: str) -> None:
+    def get_storage_info(cls, tag_name: str) -> Optional[Tuple[int, int]]:
         """
-        Prints the storage information for the specified data process.
+        Returns the storage information for the specified data process.
 
         Parameters:
             tag_name (str): The name of the data process.
@@ -837,18 +1324,18 @@ class DataHandler:
             KeyError: If the provided tag name is not registered in the data process registry.
 
         Returns:
-            None
+            The number of files and the total directory size in bytes, or None if the data process does not exist.
 
         Example:
             DataHandler.get_storage_info('tag_name')
         """
         try:
             if tag_name in cls.data_process_registry:
-                cls.data_process_registry[tag_name].get_storage_info()
+                return cls.data_process_registry[tag_name].get_storage_info()
             else:
                 raise KeyError("File process not registered.")
         except KeyError as e:
-            logger.warning(f"Error: {e}")
+            logger.warning("Error: %s", e)
 
     @classmethod
     def data_process_exists(cls, tag_name: str) -> bool:
@@ -879,7 +1366,7 @@ class DataHandler:
             else:
                 raise KeyError("Data  process not registered!")
         except KeyError as e:
-            logger.critical(f"Error: {e}")
+            logger.critical("Error: %s", e)
 
     @classmethod
     def request_TM_path_image(cls, latest=False):
@@ -897,7 +1384,7 @@ class DataHandler:
             else:
                 raise KeyError("Image process not registered!")
         except KeyError as e:
-            logger.critical(f"Error: {e}")
+            logger.critical("Error: %s", e)
 
     @classmethod
     def notify_TM_path(cls, tag_name, path):
@@ -911,7 +1398,7 @@ class DataHandler:
             else:
                 raise KeyError("Data process not registered!")
         except KeyError as e:
-            logger.critical(f"Error: {e}")
+            logger.critical("Error: %s", e)
 
     @classmethod
     def clean_up(cls):
@@ -931,20 +1418,41 @@ class DataHandler:
             cls.data_process_registry[tag_name].check_circular_buffer()
 
     @classmethod
-    def delete_all_files(cls, path=None):
+    def delete_all_files(cls, path=None, exclude=()):
+        """
+        Deletes the files and directories under path (the SD card by default), except the excluded entries.
+
+        Args:
+            path (str, optional): The directory to empty.
+            exclude (iterable, optional): The entries to keep, either names of entries of path (e.g. a data process
+                                          folder) or full paths of files in any subdirectory.
+
+        Returns:
+            bool: True if everything under path was deleted.
+        """
         if path is None:
             path = _HOME_PATH
+        emptied = True
         try:
             for file_name in os.listdir(path):
                 file_path = join_path(path, file_name)
+                if file_name in exclude or file_path in exclude:
+                    emptied = False
+                    continue
                 if os.stat(file_path)[0] & 0x8000:  # Check if file is a regular file
                     os.remove(file_path)
                 elif os.stat(file_path)[0] & 0x4000:  # Check if file is a directory
-                    cls.delete_all_files(file_path)  # Recursively delete files in subdirectories
-                    os.rmdir(file_path)  # Delete the empty directory
-            logger.info("All files and directories deleted successfully!")
+                    # Recursively delete files in subdirectories, full paths excluded at any depth
+                    if cls.delete_all_files(file_path, [p for p in exclude if p.startswith(file_path + "/")]):
+                        os.rmdir(file_path)  # Delete the empty directory
+                    else:
+                        emptied = False
+            if path == _HOME_PATH:
+                logger.info("All files and directories deleted successfully!")
         except Exception as e:
-            logger.warning(f"Error deleting files and directories: {e}")
+            logger.warning("Error deleting files and directories: %s", e)
+            emptied = False
+        return emptied
 
     @classmethod
     def get_current_file_size(cls, tag_name):
@@ -954,7 +1462,7 @@ class DataHandler:
             else:
                 raise KeyError("File process not registered!")
         except KeyError as e:
-            logger.warning(f"Error: {e}")
+            logger.warning("Error: %s", e)
 
     @classmethod
     def compute_total_size_files(cls, root_path: str = None) -> int:
@@ -1031,7 +1539,7 @@ class DataHandler:
         if tag_name in cls.data_process_registry:
             return True
         else:
-            logger.critical("Data process '{}' not registered!".format(tag_name))
+            logger.critical("Data process '%s' not registered!", tag_name)
             return False
 
 
@@ -1049,7 +1557,7 @@ def path_exist(path: str) -> bool:
         os.stat(try_path)
         return True
     except OSError as e:
-        logger.info(f"{e} - {try_path} doesn't exist")
+        logger.info("%s - %s doesn't exist", e, try_path)
         return False
 
 
@@ -48,6 +48,7 @@ Attributes
 # pylint: disable=invalid-name,undefined-variable
 
 import os
+import struct
 import sys
 import time
 from collections import namedtuple
@@ -116,9 +117,12 @@ be retrieved from it:
 - ``name`` - The name of the logger
 - ``levelno`` - The log level number
 - ``levelname`` - The log level name
-- ``msg`` - The log message
+- ``msg`` - The log message, with embedded formatting directives
 - ``created`` - When the log record was created
 - ``args`` - The additional positional arguments provided
+
+The message is kept unformatted in the record and only formatted by the handlers
+(see `getMessage`), so that records filtered out by their level never allocate a string.
 """
 
 
@@ -126,6 +130,121 @@ def _logRecordFactory(name, level, msg, args):
     return LogRecord(name, level, _level_for(level), msg, time.monotonic(), args)
 
 
+def getMessage(record: LogRecord) -> str:
+    """Return the message of the record, merging ``msg % args`` if arguments were provided.
+
+    :param record: The record (message object) to be logged
+    """
+    if record.args:
+        return record.msg % record.args
+    return record.msg
+
+
+class Filter:
+    """
+    Base class of the logger and handler filters (see `Logger.addFilter` and `Handler.addFilter`).
+
+    Unlike CPython, ``filter`` returns the record to log, which may be a replacement record,
+    or None to drop it.
+    """
+
+    def filter(self, record: LogRecord) -> Optional[LogRecord]:
+        """Return the record to log, or None to drop it.
+
+        :param record: The record (message object) to be logged
+        """
+        return record
+
+
+# Prefix of the records following suppressed repeats, with the number of suppressed records
+REPEATED_PREFIX = "[repeated %s times] "
+
+# Prefix of the task messages (see TemplateTask), followed by the task ID and name
+TASK_LOG_PREFIX = "[%s][%s] "
+
+
+class RateLimitFilter(Filter):
+    """
+    Rate limits identical messages with a token bucket per message, keyed on the template and its
+    arguments so that the records are not formatted here.
+
+    Each message can be logged ``burst`` times in a row, then ``rate`` times per second.
+    Records over the limit are dropped and counted; the next record of the same message that goes
+    through is prefixed with the number of suppressed repeats (see `REPEATED_PREFIX`).
+    Records of the same template with different values are different messages, they are never
+    collapsed. Errors are never limited by default.
+
+    Meant for the text handlers (see `Handler.addFilter`), which format the records anyway: the
+    binary event log and the crash log keep every record.
+
+    :param float rate: Sustained number of records per second for a message
+    :param int burst: Number of records of a message that can be logged in a row
+    :param int maxKeys: Maximum number of messages tracked; beyond it, new messages are not limited
+    :param int exemptLevel: Records of this level or above are never limited
+    """
+
+    def __init__(self, rate: float = 0.1, burst: int = 3, maxKeys: int = 32, exemptLevel: int = ERROR) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.maxKeys = maxKeys
+        self.exemptLevel = exemptLevel
+        self._buckets = {}  # message -> [tokens, last update, suppressed records]
+
+    def filter(self, record: LogRecord) -> Optional[LogRecord]:
+        """Drop the record if its message is over the limit.
+
+        :param record: The record (message object) to be logged
+        """
+        if record.levelno >= self.exemptLevel:
+            return record
+
+        key = (record.msg, record.args)
+        try:
+            bucket = self._buckets.get(key)
+        except TypeError:  # unhashable argument (list, dict)
+            key = getMessage(record)
+            bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.maxKeys:
+                self._evict(record.created)
+                if len(self._buckets) >= self.maxKeys:
+                    return record
+            self._buckets[key] = [self.burst - 1, record.created, 0]
+            return record
+
+        tokens = min(self.burst, bucket[0] + (record.created - bucket[1]) * self.rate)
+        bucket[1] = record.created
+        if tokens < 1:
+            bucket[0] = tokens
+            bucket[2] += 1
+            return None
+
+        bucket[0] = tokens - 1
+        suppressed = bucket[2]
+        if not suppressed:
+            return record
+
+        bucket[2] = 0
+        msg = str(record.msg)
+        if not record.args and "%" in msg:
+            msg = msg.replace("%", "%%")  # literal message
+        return LogRecord(
+            record.name,
+            record.levelno,
+            record.levelname,
+            REPEATED_PREFIX + msg,
+            record.created,
+            (suppressed,) + tuple(record.args),
+        )
+
+    def _evict(self, now: float) -> None:
+        """Forget the messages whose bucket is full again and has nothing suppressed."""
+        for key in list(self._buckets):
+            tokens, last, suppressed = self._buckets[key]
+            if not suppressed and tokens + (now - last) * self.rate >= self.burst:
+                del self._buckets[key]
+
+
 class Formatter:
     """
     Responsible for converting a LogRecord to an output string to be
@@ -163,13 +282,13 @@ class Formatter:
         Format the given LogRecord into an output string
         """
         if self.fmt is None:
-            return record.msg
+            return getMessage(record)
 
         vals = {
             "name": record.name,
             "levelno": record.levelno,
             "levelname": record.levelname,
-            "message": record.msg,
+            "message": getMessage(record),
             "created": record.created,
             "args": record.args,
         }
@@ -197,10 +316,14 @@ class Formatter:
 class Handler:
     """Base logging message handler."""
 
+    # Whether the records reach the handler through the logger filters (see `Logger.handle`)
+    loggerFilters = True
+
     def __init__(self, level: int = NOTSET) -> None:
         """Create Handler instance"""
         self.level = level
         self.formatter = None
+        self.filters = []
 
     def setLevel(self, level: int) -> None:
         """
@@ -208,6 +331,31 @@ class Handler:
         """
         self.level = level
 
+    def addFilter(self, fltr: Filter) -> None:
+        """Adds a filter to this handler, applied in order to the records after the logger filters.
+
+        :param Filter fltr: The filter to add
+        """
+        self.filters.append(fltr)
+
+    def removeFilter(self, fltr: Filter) -> None:
+        """Remove filter from this handler.
+
+        :param Filter fltr: The filter to remove
+        """
+        self.filters.remove(fltr)
+
+    def filter(self, record: LogRecord) -> Optional[LogRecord]:
+        """Return the record to emit after the filters of this handler, or None to drop it.
+
+        :param record: The record (message object) to be logged
+        """
+        for fltr in self.filters:
+            record = fltr.filter(record)
+            if record is None:
+                return None
+        return record
+
     # pylint: disable=no-self-use
     def format(self, record: LogRecord) -> str:
         """Generate a timestamped message.
@@ -216,7 +364,7 @@ class Handler:
         """
         if self.formatter:
             return self.formatter.format(record)
-        return f"{record.created:<0.3f}: {record.levelname} - {record.msg}"
+        return f"{record.created:<0.3f}: {record.levelname} - {getMessage(record)}"
 
     def emit(self, record: LogRecord) -> None:
         """Send a message where it should go.
@@ -325,32 +473,54 @@ class RotatingFileHandler(FileHandler):
     If either maxBytes or backupCount is not set, or set to zero, the log rotation is disabled.
     This will result in a single log file with a name `filename` that will grow without bound.
 
+    The size of the log file is read once when it is opened and then tracked in RAM, so rotation
+    decisions cost no file system access (non-ASCII characters are counted as one byte). Records are
+    buffered by the stream and flushed once flushBytes characters are pending, flushInterval seconds
+    have passed since the last flush, or a record of level flushLevel or above is emitted.
+    CRITICAL records are always flushed immediately.
+
     :param str filename: The filename of the log file
     :param str mode: Whether to write ('w') or append ('a'); default is to append
     :param int maxBytes: The max allowable size of the log file in bytes.
     :param int backupCount: The number of old log files to keep.
+    :param int flushBytes: Flush once this many bytes are pending; 0 disables the threshold.
+    :param float flushInterval: Flush if this many seconds have passed since the last flush; 0 disables the threshold.
+    :param int flushLevel: Flush immediately records of this level or above (capped to CRITICAL).
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         filename: str,
         mode: str = "a",
         maxBytes: int = 0,
         backupCount: int = 0,
+        flushBytes: int = 512,
+        flushInterval: float = 5,
+        flushLevel: int = ERROR,
     ) -> None:
         if maxBytes < 0:
             raise ValueError("maxBytes must be a positive number")
         if backupCount < 0:
             raise ValueError("backupCount must be a positive number")
+        if flushBytes < 0 or flushInterval < 0:
+            raise ValueError("flushBytes and flushInterval must be positive numbers")
 
         self._LogFileName = filename
         self._WriteMode = mode
         self._maxBytes = maxBytes
         self._backupCount = backupCount
+        self._flushBytes = flushBytes
+        self._flushInterval = flushInterval
+        self._flushLevel = min(flushLevel, CRITICAL)
 
         # Open the file and save the handle to self.stream
         super().__init__(self._LogFileName, mode=self._WriteMode)
 
+        # Seed the size tracking once
+        self._LogFileSize = self.GetLogSize() or 0
+        self._pendingBytes = 0
+        self._lastFlush = time.monotonic()
+
     def doRollover(self) -> None:
         """Roll over the log files. This should not need to be called directly"""
         # At this point, we have already determined that we need to roll the log files.
@@ -380,6 +550,8 @@ class RotatingFileHandler(FileHandler):
         # Reopen the file.
         # pylint: disable=consider-using-with
         self.stream = open(self._LogFileName, mode=self._WriteMode)
+        self._LogFileSize = 0
+        self._pendingBytes = 0
 
     def GetLogSize(self) -> int:
         """Check the size of the log file."""
@@ -394,15 +566,264 @@ class RotatingFileHandler(FileHandler):
                 raise e
         return LogFileSize
 
+    def flush(self) -> None:
+        """Flush the pending records to the file."""
+        self.stream.flush()
+        self._pendingBytes = 0
+        self._lastFlush = time.monotonic()
+
     def emit(self, record: LogRecord) -> None:
         """Generate the message and write it to the file.
 
         :param record: The record (message object) to be logged
         """
-        if (self.GetLogSize() >= self._maxBytes) and (self._maxBytes > 0) and (self._backupCount > 0):
+        if (self._LogFileSize >= self._maxBytes) and (self._maxBytes > 0) and (self._backupCount > 0):
             self.doRollover()
-        self.stream.write(self.format(record))
-        self.stream.flush()
+        text = self.format(record)
+        self.stream.write(text)
+        self._LogFileSize += len(text)
+        self._pendingBytes += len(text)
+
+        if (
+            record.levelno >= self._flushLevel
+            or (self._flushBytes and self._pendingBytes >= self._flushBytes)
+            or (self._flushInterval and time.monotonic() - self._lastFlush >= self._flushInterval)
+        ):
+            self.flush()
+
+
+# Binary event log record (little-endian):
+#     LEN (B, bytes following this field) | TIME (I) | LEVEL (B) | EVENT_ID (I) | NARGS (B) | ARGS
+# Each argument is a type tag followed by its payload. Records are decoded on the ground (ground/event_log.py).
+EVT_HEADER_FORMAT = "<BIBIB"
+EVT_HEADER_SIZE = const(11)
+EVT_MAX_RECORD_SIZE = const(256)
+
+ARG_NONE = const(0x6E)  # 'n'
+ARG_BOOL = const(0x3F)  # '?', 1 byte
+ARG_INT = const(0x69)  # 'i', int32
+ARG_LONG = const(0x71)  # 'q', int64
+ARG_FLOAT = const(0x66)  # 'f', float32
+ARG_STR = const(0x73)  # 's', length (B) + UTF-8 bytes, truncated to fit
+ARG_BYTES = const(0x79)  # 'y', length (B) + bytes, truncated to fit
+ARG_LIST = const(0x6C)  # 'l', count (B) + tagged items
+
+_EVT_MAX_CACHED_IDS = const(128)
+_event_ids = {}
+
+
+def event_id(fmt: str) -> int:
+    """Stable 32-bit identifier of a message template (FNV-1a of its UTF-8 bytes).
+
+    The same function generates the event dictionary at build time, so IDs never need to be stored on board.
+
+    :param str fmt: The message template
+    """
+    eid = _event_ids.get(fmt)
+    if eid is None:
+        eid = 0x811C9DC5
+        for b in str(fmt).encode():
+            eid = ((eid ^ b) * 0x01000193) & 0xFFFFFFFF
+        if len(_event_ids) < _EVT_MAX_CACHED_IDS:
+            _event_ids[fmt] = eid
+    return eid
+
+
+def _pack_arg(buf: bytearray, pos: int, arg) -> int:
+    """Pack a tagged argument at pos and return the new position, or -1 if it does not fit."""
+    size = len(buf)
+    if arg is None:
+        if pos + 1 > size:
+            return -1
+        buf[pos] = ARG_NONE
+        return pos + 1
+    if isinstance(arg, bool):
+        if pos + 2 > size:
+            return -1
+        buf[pos] = ARG_BOOL
+        buf[pos + 1] = 1 if arg else 0
+        return pos + 2
+    if isinstance(arg, int) and -0x80000000 <= arg <= 0x7FFFFFFF:
+        if pos + 5 > size:
+            return -1
+        buf[pos] = ARG_INT
+        struct.pack_into("<i", buf, pos + 1, arg)
+        return pos + 5
+    if isinstance(arg, int) and -0x8000000000000000 <= arg <= 0x7FFFFFFFFFFFFFFF:
+        if pos + 9 > size:
+            return -1
+        buf[pos] = ARG_LONG
+        struct.pack_into("<q", buf, pos + 1, arg)
+        return pos + 9
+    if isinstance(arg, float):
+        if pos + 5 > size:
+            return -1
+        buf[pos] = ARG_FLOAT
+        struct.pack_into("<f", buf, pos + 1, arg)
+        return pos + 5
+    if isinstance(arg, (list, tuple)):
+        if pos + 2 > size:
+            return -1
+        buf[pos] = ARG_LIST
+        count_pos = pos + 1
+        pos += 2
+        count = 0
+        for item in arg:
+            new_pos = _pack_arg(buf, pos, item) if count < 255 else -1
+            if new_pos < 0:
+                break  # truncated list
+            pos = new_pos
+            count += 1
+        buf[count_pos] = count
+        return pos
+
+    if isinstance(arg, (bytes, bytearray)):
+        tag = ARG_BYTES
+        data = arg
+    else:
+        tag = ARG_STR
+        data = (arg if isinstance(arg, str) else str(arg)).encode()
+    length = min(len(data), size - pos - 2, 255)
+    if length < 0:
+        return -1
+    buf[pos] = tag
+    buf[pos + 1] = length
+    buf[pos + 2 : pos + 2 + length] = data[:length]
+    return pos + 2 + length
+
+
+def pack_event(buf: bytearray, timestamp: int, level: int, msg: str, args: tuple) -> int:
+    """Pack a binary event log record into buf (at most EVT_MAX_RECORD_SIZE bytes).
+
+    Arguments that do not fit are dropped, strings and lists are truncated.
+
+    :param bytearray buf: The destination buffer
+    :param int timestamp: The record time in seconds
+    :param int level: The log level number
+    :param str msg: The message template
+    :param tuple args: The arguments of the template
+    :return: The size of the record in bytes
+    """
+    pos = EVT_HEADER_SIZE
+    nargs = 0
+    for arg in args:
+        new_pos = _pack_arg(buf, pos, arg)
+        if new_pos < 0:
+            break
+        pos = new_pos
+        nargs += 1
+    struct.pack_into(EVT_HEADER_FORMAT, buf, 0, pos - 1, timestamp & 0xFFFFFFFF, level, event_id(msg), nargs)
+    return pos
+
+
+class BinaryLogHandler(Handler):
+    """Write records as compact binary events (see `pack_event`) instead of formatted text.
+
+    Nothing is formatted on board: the message template is replaced by its event ID and the arguments
+    are packed as is. The records are decoded on the ground with the event dictionary generated at
+    build time (ground/event_log.py). The process buffers the records, they are flushed right away
+    from flushLevel.
+
+    :param process: Destination of the records, any object with ``log(data)`` and ``flush()`` methods
+        (typically the event log process of the DataHandler)
+    :param int level: The lowest level to write, default is ``NOTSET``
+    :param int flushLevel: Flush immediately records of this level or above, default is ``ERROR``
+    """
+
+    def __init__(self, process, level: int = NOTSET, flushLevel: int = ERROR) -> None:
+        super().__init__(level)
+        self.process = process
+        self._flushLevel = flushLevel
+        self._buffer = bytearray(EVT_MAX_RECORD_SIZE)
+        self._view = memoryview(self._buffer)
+        self._emitting = False
+
+    def emit(self, record: LogRecord) -> None:
+        """Pack the record and hand it over to the process.
+
+        :param record: The record (message object) to be logged
+        """
+        if self._emitting:  # the process itself may log through the same logger
+            return
+        self._emitting = True
+        try:
+            size = pack_event(self._buffer, int(time.time()), record.levelno, record.msg, record.args)
+            self.process.log(self._view[:size])
+            if record.levelno >= self._flushLevel:
+                self.process.flush()
+        finally:
+            self._emitting = False
+
+    def flush(self) -> None:
+        """Write the pending records of the process."""
+        self.process.flush()
+
+
+class RingBufferHandler(Handler):
+    """Keep the most recent records in a fixed-size RAM ring, as binary events (see `pack_event`).
+
+    Emitting a record costs no I/O and no allocation beyond packing. The oldest records are
+    overwritten once the ring is full. The content is meant to be dumped to the SD card after a
+    crash (see `dump`), giving the context that led to it without writing every record.
+
+    The ring gets the records before the logger filters, so that it keeps the repeated records that
+    led to an anomaly.
+
+    :param int capacity: Size of the ring in bytes (at least EVT_MAX_RECORD_SIZE)
+    :param int level: The lowest level to keep, default is ``NOTSET``
+    """
+
+    loggerFilters = False
+
+    def __init__(self, capacity: int = 4096, level: int = NOTSET) -> None:
+        if capacity < EVT_MAX_RECORD_SIZE:
+            raise ValueError("capacity must be at least EVT_MAX_RECORD_SIZE")
+        super().__init__(level)
+        self._ring = bytearray(capacity)
+        self._ring_view = memoryview(self._ring)
+        self._record = bytearray(EVT_MAX_RECORD_SIZE)
+        self._record_view = memoryview(self._record)
+        self._head = 0  # next write position
+        self._tail = 0  # position of the oldest record
+        self._used = 0
+        self.records = 0  # number of records currently in the ring
+
+    def emit(self, record: LogRecord) -> None:
+        """Pack the record into the ring, dropping the oldest records if needed.
+
+        :param record: The record (message object) to be logged
+        """
+        size = pack_event(self._record, int(time.time()), record.levelno, record.msg, record.args)
+        capacity = len(self._ring)
+
+        while self._used + size > capacity:
+            oldest = self._ring[self._tail] + 1  # LEN field + record
+            self._tail = (self._tail + oldest) % capacity
+            self._used -= oldest
+            self.records -= 1
+
+        first = min(size, capacity - self._head)
+        self._ring_view[self._head : self._head + first] = self._record_view[:first]
+        if first < size:  # wrap around
+            self._ring_view[: size - first] = self._record_view[first:size]
+
+        self._head = (self._head + size) % capacity
+        self._used += size
+        self.records += 1
+
+    def dump(self) -> bytearray:
+        """Return the records of the ring in chronological order (same format as the binary event log)."""
+        end = self._tail + self._used
+        if end <= len(self._ring):
+            return self._ring[self._tail : end]
+        return self._ring[self._tail :] + self._ring[: end - len(self._ring)]
+
+    def clear(self) -> None:
+        """Drop all the records of the ring."""
+        self._head = 0
+        self._tail = 0
+        self._used = 0
+        self.records = 0
 
 
 class NullHandler(Handler):
@@ -456,6 +877,7 @@ class Logger:
         """The name of the logger, this should be unique for proper
         functionality of `getLogger()`"""
         self._handlers = []
+        self._filters = []
         self.emittedNoHandlerWarning = False
 
     def setLevel(self, log_level: int) -> None:
@@ -474,6 +896,15 @@ class Logger:
 
         return self._level
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Whether a message of the given level would be processed by this logger.
+
+        Use it to guard expensive argument computations at the call site.
+
+        :param int level: the level to check
+        """
+        return self._level <= level
+
     def addHandler(self, hdlr: Handler) -> None:
         """Adds the handler to this logger.
 
@@ -488,16 +919,32 @@ class Logger:
         """
         self._handlers.remove(hdlr)
 
+    def addFilter(self, fltr: Filter) -> None:
+        """Adds a filter to this logger, applied in order to the records before the handlers.
+
+        :param Filter fltr: The filter to add
+        """
+        self._filters.append(fltr)
+
+    def removeFilter(self, fltr: Filter) -> None:
+        """Remove filter from this logger.
+
+        :param Filter fltr: The filter to remove
+        """
+        self._filters.remove(fltr)
+
     def hasHandlers(self) -> bool:
         """Whether any handlers have been set for this logger"""
         return len(self._handlers) > 0
 
     def _log(self, level: int, msg: str, *args) -> None:
-        record = _logRecordFactory(self.name, level, (msg % args) if args else msg, args)
+        # Formatting is deferred to the handlers
+        record = _logRecordFactory(self.name, level, msg, args)
         self.handle(record)
 
     def handle(self, record: LogRecord) -> None:
-        """Pass the record to all handlers registered with this logger.
+        """Pass the record to all handlers registered with this logger, through the logger filters
+        except for the handlers that bypass them (``loggerFilters`` False, e.g. the crash log).
 
         :param LogRecord record: log record
         """
@@ -508,13 +955,23 @@ class Logger:
 
         emitted = False
         if record.levelno >= self._level:
+            logged = record
+            for fltr in self._filters:
+                logged = fltr.filter(logged)
+                if logged is None:
+                    break
+
             for handler in self._handlers:
-                if record.levelno >= handler.level:
-                    handler.emit(record)
+                handled = logged if handler.loggerFilters else record
+                if handled is not None and handled.levelno >= handler.level:
                     emitted = True
+                    if handler.filters:
+                        handled = handler.filter(handled)
+                    if handled is not None:
+                        handler.emit(handled)
 
-            if not emitted and _default_handler and record.levelno >= _default_handler.level:
-                _default_handler.emit(record)
+            if not emitted and logged is not None and _default_handler and logged.levelno >= _default_handler.level:
+                _default_handler.emit(logged)
 
     def log(self, level: int, msg: str, *args) -> None:
         """Log a message.
@@ -605,18 +1062,21 @@ class Logger:
             # some of the returned strings from format_exception already have newlines in them,
             # so we can't add the indent in the above line - needs to be done separately
             lines = lines.replace("\n", "\n  ")
-            self._log(ERROR, lines)
+            self._log(ERROR, "%s", lines)
 
 
 logger = getLogger("core_logger")
 
 
-def setup_logger(level="NOTSET", handler=None):
+def setup_logger(level="NOTSET", handler=None, crash_log=None):
     """
     Setup the logger with the specified level and handler.
 
     :param level: The logging level (NOTSET, DEBUG, INFO, WARNING, ERROR, CRITICAL).
     :param handler: A logging handler, e.g., StreamHandler or FileHandler.
+    :param crash_log: An optional RingBufferHandler keeping the recent records down to its own level.
+        If its level is lower, the logger level is lowered to it while the handler stays at ``level``
+        (the handler is pinned to ``level`` either way, so that the crash log level can be lowered later).
     """
     set_level = 0
     for i, _level in enumerate(LEVELS):
@@ -631,7 +1091,16 @@ def setup_logger(level="NOTSET", handler=None):
     if handler is None:
         handler = StreamHandler()
 
+    # Collapse the identical lines of the text output (e.g. missing data warnings of the periodic tasks)
+    handler.addFilter(RateLimitFilter())
+
+    if crash_log is not None:
+        logger.addHandler(crash_log)
+        handler.setLevel(set_level)
+        if crash_log.level < set_level:
+            logger.setLevel(crash_log.level)
+
     formatter = Formatter(fmt="[{asctime}][{levelname}] {message}", datefmt="%Y-%m-%d %H:%M:%S", style="{")
     handler.setFormatter(formatter)
     logger.addHandler(handler)
-    logger.info(f"Logger set to level {level}")
+    logger.info("Logger set to level %s", level)
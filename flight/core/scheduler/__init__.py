@@ -20,4 +20,5 @@ run_later = get_loop().run_later
 schedule = get_loop().schedule
 schedule_later = get_loop().schedule_later
 sleep = get_loop().sleep
+wait_for = get_loop().wait_for
 run = get_loop().run
@@ -204,6 +204,28 @@ class Scheduler:
         """
         await self._sleep_until_nanos(_get_future_nanos(seconds))
 
+    async def wait_for(self, condition, timeout, poll_interval=0):
+        """
+        From within a coroutine, polls condition() until it is true or until timeout seconds have elapsed on the
+        scheduler clock, yielding to the other tasks between two polls (for poll_interval seconds, or a single
+        event loop step if 0). Used instead of busy-waiting on hardware status flags.
+        NOTE: Always`await`this!
+
+        Returns True if the condition was met, False on timeout.
+        """
+        if condition():
+            return True
+
+        deadline = _get_future_nanos(timeout)
+        while not condition():
+            if _monotonic_ns() >= deadline:
+                return False
+            if poll_interval > 0:
+                await self._sleep_until_nanos(_get_future_nanos(poll_interval))
+            else:
+                await _yield_once()
+        return True
+
     def run_later(self, seconds_to_delay, awaitable_task, priority):
         """
         Add a concurrent task, delayed by some seconds.
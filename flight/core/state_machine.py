@@ -72,13 +72,13 @@ class StateManager:
         """
 
         if new_state_id not in self.__states:
-            logger.critical(f"State {new_state_id} is not in the list of states")
+            logger.critical("State %s is not in the list of states", new_state_id)
             raise ValueError(f"State {new_state_id} is not in the list of states")
 
         if self.__initialized:
             # prevent illegal transitions
             if not (new_state_id in self.__config[self.__current_state]["MovesTo"]):
-                logger.critical(f"No transition from {self.__current_state} to {new_state_id}")
+                logger.critical("No transition from %s to %s", self.__current_state, new_state_id)
                 raise ValueError(f"No transition from {self.__current_state} to {new_state_id}")
         else:
             self.__initialized = True
@@ -88,7 +88,7 @@ class StateManager:
         self.stop_all_tasks()
         self.schedule_new_state_tasks(new_state_id)
 
-        logger.info(f"Switched to state {new_state_id}")
+        logger.info("Switched to state %s", new_state_id)
 
     def stop_all_tasks(self):
         for name, task in self.__scheduled_tasks.items():
@@ -128,5 +128,5 @@ class StateManager:
     def change_task_frequency(self, task_id, freq_hz):
         """Changes the frequency of a task"""
         self.__scheduled_tasks[task_id].change_rate(freq_hz)
-        logger.info(f"Task {task_id} frequency changed to {freq_hz}")
+        logger.info("Task %s frequency changed to %s", task_id, freq_hz)
         # TODO - change the persistent sm_configuration
@@ -1,6 +1,24 @@
 import gc
 
 from core import logger
+from core.logging import CRITICAL, DEBUG, ERROR, INFO, TASK_LOG_PREFIX, WARNING
+from micropython import const
+
+# The task messages are prefixed with TASK_LOG_PREFIX, the task ID and name (kept in the template for the event IDs)
+
+# Prefixed templates of the task messages with arguments, built once per template (messages without arguments are
+# often built at the call site and are not cached)
+_MAX_CACHED_TEMPLATES = const(128)
+_templates = {}
+
+
+def _task_template(msg):
+    template = _templates.get(msg)
+    if template is None:
+        template = TASK_LOG_PREFIX + msg
+        if len(_templates) < _MAX_CACHED_TEMPLATES:
+            _templates[msg] = template
+    return template
 
 
 class TemplateTask:
@@ -17,14 +35,14 @@ class TemplateTask:
         self.name = "TASK"
         self.frequency = None
 
-    def debug(self, msg):
+    def debug(self, msg, *args):
         """
         Print a debug message formatted with the task name, filename, and line number
 
         :param msg: Debug message to print
-        :param level: > 1 will print as a sub-level
+        :param args: arguments to ``msg % args``; can be empty
         """
-        logger.info(f"[{self.ID}][{self.name}] {msg}")
+        self._log(INFO, msg, args)
 
     def set_frequency(self, frequency):
         """
@@ -52,44 +70,62 @@ class TemplateTask:
             await self.main_task()
             gc.collect()
         except Exception as e:
-            self.debug(f"{e}")
+            self.debug("%s", e)
 
-    def log_debug(self, msg):
+    def log_debug(self, msg, *args):
         """
         Log a debug message with the task name
 
-        :param msg: Message to log
+        :param msg: Message to log, with embedded formatting directives
+        :param args: arguments to ``msg % args``; can be empty
         """
-        logger.debug(f"[{self.ID}][{self.name}] {msg}")
+        self._log(DEBUG, msg, args)
 
-    def log_info(self, msg):
+    def log_info(self, msg, *args):
         """
         Log a message with the task name
 
-        :param msg: Message to log
+        :param msg: Message to log, with embedded formatting directives
+        :param args: arguments to ``msg % args``; can be empty
         """
-        logger.info(f"[{self.ID}][{self.name}] {msg}")
+        self._log(INFO, msg, args)
 
-    def log_warning(self, msg):
+    def log_warning(self, msg, *args):
         """
         Log a warning message with the task name
 
-        :param msg: Message to log
+        :param msg: Message to log, with embedded formatting directives
+        :param args: arguments to ``msg % args``; can be empty
         """
-        logger.warning(f"[{self.ID}][{self.name}] {msg}")
+        self._log(WARNING, msg, args)
 
-    def log_error(self, msg):
+    def log_error(self, msg, *args):
         """
         Log an error message with the task name
 
-        :param msg: Message to log
+        :param msg: Message to log, with embedded formatting directives
+        :param args: arguments to ``msg % args``; can be empty
         """
-        logger.error(f"[{self.ID}][{self.name}] {msg}")
+        self._log(ERROR, msg, args)
 
-    def log_critical(self, msg):
+    def log_critical(self, msg, *args):
         """
         Log a critical message with the task name
 
-        :param msg: Message to log
+        :param msg: Message to log, with embedded formatting directives
+        :param args: arguments to ``msg % args``; can be empty
+        """
+        self._log(CRITICAL, msg, args)
+
+    def _log(self, level, msg, args):
+        """
+        Prefix the message template with the task ID and name. Nothing is built if the level is disabled, and the
+        prefixed template of a message is only built once.
         """
-        logger.critical(f"[{self.ID}][{self.name}] {msg}")
+        if not logger.isEnabledFor(level):
+            return
+        if args:
+            logger.log(level, _task_template(msg), self.ID, self.name, *args)
+        else:
+            # Literal message
+            logger.log(level, TASK_LOG_PREFIX + msg.replace("%", "%%"), self.ID, self.name)
@@ -110,7 +110,7 @@ class CubeSat:
         """STATE_FLAGS: Returns the state flags object
         :return: object or None
         """
-        return self._state_flags
+        return self.__state_flags
 
     # ######################### INTERFACES #########################
 
@@ -143,6 +143,7 @@ class RFM9x(Driver):
 
     # Global buffer for SPI commands
     _BUFFER = bytearray(4)
+    _TX_HEADER = bytearray(4)  # RadioHead header of the TX packet
     DEBUG_HEADER = False
     valid_ids = (58, 59, 60, 255)
 
@@ -239,9 +240,15 @@ class RFM9x(Driver):
         self.high_power = high_power
         self.max_output = max_output
 
-        self.dio0 = DigitalInOut(dio0)
-        self.dio0.switch_to_input()
+        # DIO0 rises on RxDone in RX mode (and TxDone in TX mode). Its rising edges are counted in hardware when countio
+        # is available, so that a received packet is detected without any SPI transaction (see rx_edge)
         self.dio0 = False
+        try:
+            from countio import Counter, Edge
+
+            self._dio0_edges = Counter(dio0, edge=Edge.RISE)
+        except (ImportError, ValueError, RuntimeError):
+            self._dio0_edges = None
 
         self.packet_in_rx_buffer = False
 
@@ -588,6 +595,13 @@ class RFM9x(Driver):
             self.max_power = 0b111  # Allow max power output.
             self.output_power = (val + 1) & 0x0F
 
+    def snr(self):
+        """SNR of the last received packet in dB"""
+        snr = self._read_u8(_RH_RF95_REG_19_PKT_SNR_VALUE)
+        if snr > 127:
+            snr -= 256
+        return snr / 4
+
     # ADDED FOR PYCUBED
     def packet_status(self):
         return (self.rssi, self._read_u8(_RH_RF95_REG_19_PKT_SNR_VALUE) / 4)
@@ -717,6 +731,21 @@ class RFM9x(Driver):
         else:
             return (self._read_u8(_RH_RF95_REG_12_IRQ_FLAGS) & 0x40) >> 6
 
+    def rx_irq_available(self):
+        """Whether received packets are signalled by DIO0 edges (rx_edge) instead of the IRQ flags over SPI"""
+        return self._dio0_edges is not None
+
+    def rx_edge(self):
+        """Returns whether DIO0 rose since the last call (packet received), without any SPI transaction.
+        Always True without DIO0 edge capture, RX_available() must then be polled.
+        """
+        if self._dio0_edges is None:
+            return True
+        if self._dio0_edges.count > 0:
+            self._dio0_edges.reset()
+            return True
+        return False
+
     def crc_error(self):
         """crc status"""
         return (self._read_u8(_RH_RF95_REG_12_IRQ_FLAGS) & 0x20) >> 5
@@ -790,7 +819,37 @@ class RFM9x(Driver):
         identifier=None,
         flags=None,
     ):
-        """Send a string of data using the transmitter.
+        """Send a string of data using the transmitter and wait for the end of the transmission.
+        WARNING: This function is blocking for the whole time on air of the packet, use start_send(),
+        tx_done() and end_send() from a task instead (see apps/comms/comms.py).
+
+        Returns: True if success or False if the send timed out.
+        """
+        self.start_send(data, destination=destination, node=node, identifier=identifier, flags=flags)
+
+        # Wait for tx done interrupt with explicit polling
+        start = monotonic()
+        timed_out = False
+        while not timed_out and not self.tx_done():
+            if (monotonic() - start) >= self.xmit_timeout:
+                timed_out = True
+
+        self.end_send(keep_listening=keep_listening)
+
+        return not timed_out
+
+    def start_send(
+        self,
+        data,
+        *,
+        destination=None,
+        node=None,
+        identifier=None,
+        flags=None,
+    ):
+        """Load a string of data in the FIFO and start the transmission, without waiting for it to complete.
+        The end of the transmission is signalled by tx_done(), after which end_send() must be called.
+        Buffers (bytes, bytearray, memoryview) are written to the FIFO as is, without copy.
         You can only send 252 bytes at a time
         (limited by chip's FIFO size and appended headers).
         This appends a 4 byte header to be compatible with the RadioHead library.
@@ -798,10 +857,6 @@ class RFM9x(Driver):
         (destination,node,identifier,flags)
         It may be temporarily overidden via the kwargs - destination,node,identifier,flags.
         Values passed via kwargs do not alter the attribute settings.
-        The keep_listening argument should be set to True if you want to start listening
-        automatically after the packet is sent. The default setting is False.
-
-        Returns: True if success or False if the send timed out.
         """
         # Disable pylint warning to not use length as a check for zero.
         # This is a puzzling warning as the below code is clearly the most
@@ -821,11 +876,8 @@ class RFM9x(Driver):
         # Fill the FIFO with a packet to send.
         self._write_u8(_RH_RF95_REG_0D_FIFO_ADDR_PTR, 0x00)  # FIFO starts at 0.
 
-        # Combine header and data to form payload
-        if data == b"!":
-            payload = bytearray(5)
-        else:
-            payload = self.buffview[:length]
+        # Header written in the pre-allocated header buffer, data written from the buffer of the caller
+        payload = self._TX_HEADER
 
         if destination is None:  # use attribute
             payload[0] = self.destination
@@ -845,30 +897,22 @@ class RFM9x(Driver):
             payload[3] = flags
         if self.DEBUG_HEADER:
             print("[header] - {}".format([hex(i) for i in payload]))
-        # payload = payload + data
-        try:
-            if isinstance(data, (bytes, bytearray, memoryview)):
-                payload[4:] = data[:]
-            else:
-                payload[4:] = data.encode()
-        except Exception as e:
-            print("payload encoding error:", e)
-            payload = bytearray(payload[:4]) + data
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = data.encode()
 
-        # Write payload.
+        # Write header then payload, the FIFO address pointer increments across the two writes.
         self._write_from(_RH_RF95_REG_00_FIFO, payload)
+        self._write_from(_RH_RF95_REG_00_FIFO, data)
         # Write payload and header length.
         self._write_u8(_RH_RF95_REG_22_PAYLOAD_LENGTH, length)
         # Turn on transmit mode to send out the packet.
         self.transmit()
-        # Wait for tx done interrupt with explicit polling (not ideal but
-        # best that can be done right now without interrupts).
-        start = monotonic()
-        timed_out = False
-        while not timed_out and not self.tx_done():  # TODO remove while loop
-            if (monotonic() - start) >= self.xmit_timeout:
-                timed_out = True
 
+    def end_send(self, *, keep_listening=True):
+        """Return to RX (or idle) mode after a transmission started with start_send(), completed or timed out.
+        The keep_listening argument should be set to True if you want to start listening
+        automatically after the packet is sent.
+        """
         if hasattr(self, "txrx"):  # RX
             self.txrx[0].value = False
             self.txrx[1].value = True
@@ -883,7 +927,9 @@ class RFM9x(Driver):
         # Clear interrupt.
         self._write_u8(_RH_RF95_REG_12_IRQ_FLAGS, 0xFF)
 
-        return not timed_out
+        # The TxDone edge on DIO0 is not a received packet
+        if self._dio0_edges is not None:
+            self._dio0_edges.reset()
 
     # pylint: disable=too-many-branches
     # Prefer using data_available and read_fifo_buffer for non-blocking operation
@@ -9,6 +9,7 @@ Author: Harry Rosmann
 
 """
 
+import microcontroller
 from hal.drivers.bitflags import bitFlag, multiBitFlag
 from micropython import const
 
@@ -17,7 +18,7 @@ class StateFlags:
     """StateFlags: Class for managing flags and counters in the NVM."""
 
     def __init__(self):
-        pass
+        self.micro = microcontroller  # NVM access for the flag descriptors
 
     # TODO: Update to reflect desired design
 
@@ -28,6 +29,7 @@ class StateFlags:
     TOUTS = const(9)
     GSRSP = const(10)
     ICHRG = const(11)
+    CRASHCNT = const(12)
     FLAG = const(16)
 
     # General NVM counters
@@ -36,6 +38,7 @@ class StateFlags:
     c_state_err = multiBitFlag(register=STATECNT, lowest_bit=0, num_bits=8)
     c_gs_resp = multiBitFlag(register=GSRSP, lowest_bit=0, num_bits=8)
     c_ichrg = multiBitFlag(register=ICHRG, lowest_bit=0, num_bits=8)
+    c_crash = multiBitFlag(register=CRASHCNT, lowest_bit=0, num_bits=8)  # unhandled exceptions in main
 
     # Define NVM flags
     f_lowbatt = bitFlag(register=FLAG, bit=0)
@@ -44,3 +47,5 @@ class StateFlags:
     f_lowbtout = bitFlag(register=FLAG, bit=3)
     f_gpsfix = bitFlag(register=FLAG, bit=4)
     f_shtdwn = bitFlag(register=FLAG, bit=5)
+    f_crashlog = bitFlag(register=FLAG, bit=6)  # crash log dumped to the SD card, not yet reported
+    f_debuglog = bitFlag(register=FLAG, bit=7)  # crash log keeps the DEBUG records
@@ -1,58 +1,112 @@
-import gc
-import sys
-import time
-
-from core import logger, setup_logger, state_manager
-from hal.configuration import SATELLITE
-
-
-# Memory stats
-def print_memory_stats(call_gc=True):
-    if call_gc:
-        gc.collect()
-    print(f"Memory stats after gc: {call_gc}")
-    print(f"Total memory: {str(gc.mem_alloc() + gc.mem_free())} bytes")
-    print(f"Memory free: {str(gc.mem_free())} bytes")
-    print(f"Memory free: {int((gc.mem_alloc() / (gc.mem_alloc() + gc.mem_free())) * 100)}%")
-
-
-for path in ["/hal", "/apps", "/core"]:
-    if path not in sys.path:
-        sys.path.append(path)
-
-setup_logger(level="INFO")
-
-print_memory_stats(call_gc=True)
-
-print("Booting ARGUS-1...")
-boot_errors = SATELLITE.boot_sequence()
-print("ARGUS-1 booted.")
-print(f"Boot Errors: {boot_errors}")
-
-
-print("Waiting 1 sec...")
-time.sleep(1)
-
-
-"""print("Running system diagnostics...")
-errors = SATELLITE.run_system_diagnostics()
-print("System diagnostics complete")
-print("Errors:", errors)
-"""
-
-print_memory_stats(call_gc=False)
-print_memory_stats(call_gc=True)
-
-try:
-    # Run forever
-
-    from core import DataHandler as DH
-
-    DH.delete_all_files()
-
-    logger.info("Starting state manager")
-    state_manager.start()
-
-except Exception as e:
-    logger.critical("ERROR:", e)
-    # TODO Log the error
+import gc
+import sys
+import time
+
+from apps.comms.downlink_queue import DownlinkQueue
+from apps.telemetry.frames import TM_HISTORY_TAG
+from core import logger, setup_logger, state_manager
+from core.logging import DEBUG, INFO, BinaryLogHandler, RingBufferHandler
+from hal.configuration import SATELLITE
+
+CRASH_LOG_TAG = "crash"
+EVENT_LOG_TAG = "evt"
+
+
+# Memory stats
+def print_memory_stats(call_gc=True):
+    if call_gc:
+        gc.collect()
+    print(f"Memory stats after gc: {call_gc}")
+    print(f"Total memory: {str(gc.mem_alloc() + gc.mem_free())} bytes")
+    print(f"Memory free: {str(gc.mem_free())} bytes")
+    print(f"Memory free: {int((gc.mem_alloc() / (gc.mem_alloc() + gc.mem_free())) * 100)}%")
+
+
+# Post-mortem logs
+def enable_debug_capture():
+    """Keep the DEBUG records in the crash log if requested in the NVM (every DEBUG call site then packs a record)."""
+    flags = SATELLITE.STATE_FLAGS
+    if flags is not None and flags.f_debuglog:
+        crash_log.setLevel(DEBUG)
+        logger.setLevel(DEBUG)
+        logger.info("DEBUG records kept in the crash log")
+
+
+def report_previous_crash():
+    """Report the crash of a previous run recorded in the NVM, if any."""
+    flags = SATELLITE.STATE_FLAGS
+    if flags is not None and flags.f_crashlog:
+        logger.warning("Unhandled exception(s) in previous run: %s, crash log in /%s", flags.c_crash, CRASH_LOG_TAG)
+        flags.f_crashlog = False
+
+
+def dump_crash_log():
+    """Write the recent records kept in RAM to the SD card and record the crash in the NVM."""
+    dumped = False
+    try:
+        from core import DataHandler as DH
+
+        process = DH.register_event_log_process(CRASH_LOG_TAG)
+        process.log(crash_log.dump())
+        process.close()
+        dumped = True
+    except Exception as e:
+        print(f"Crash log dump failed: {e}")
+
+    flags = SATELLITE.STATE_FLAGS
+    if flags is not None:
+        flags.c_crash = flags.c_crash + 1
+        flags.f_crashlog = dumped
+
+
+for path in ["/hal", "/apps", "/core"]:
+    if path not in sys.path:
+        sys.path.append(path)
+
+# Recent records are kept in RAM and only written to the SD card after a crash. DEBUG records are only kept if the
+# f_debuglog NVM flag is set (see enable_debug_capture), disabled DEBUG calls cost nothing otherwise.
+crash_log = RingBufferHandler(capacity=4096, level=INFO)
+setup_logger(level="INFO", crash_log=crash_log)
+
+print_memory_stats(call_gc=True)
+
+print("Booting ARGUS-1...")
+boot_errors = SATELLITE.boot_sequence()
+print("ARGUS-1 booted.")
+print(f"Boot Errors: {boot_errors}")
+enable_debug_capture()
+
+
+print("Waiting 1 sec...")
+time.sleep(1)
+
+
+"""print("Running system diagnostics...")
+errors = SATELLITE.run_system_diagnostics()
+print("System diagnostics complete")
+print("Errors:", errors)
+"""
+
+print_memory_stats(call_gc=False)
+print_memory_stats(call_gc=True)
+
+try:
+    # Run forever
+
+    from core import DataHandler as DH
+
+    # The crash log, the event log, the housekeeping history and the files of the interrupted downlinks survive the
+    # resets
+    DH.delete_all_files(exclude=[CRASH_LOG_TAG, EVENT_LOG_TAG, TM_HISTORY_TAG] + DownlinkQueue.kept_files())
+    report_previous_crash()
+
+    # Binary event log on the SD card (decoded on the ground, see ground/event_log.py)
+    logger.addHandler(BinaryLogHandler(DH.register_event_log_process(EVENT_LOG_TAG), INFO))
+
+    logger.info("Starting state manager")
+    state_manager.start()
+
+except Exception as e:
+    logger.critical("ERROR: %s", e)
+    dump_crash_log()
+    # TODO Log the error
@@ -96,7 +96,7 @@ class Task(TemplateTask):
 
             if not DH.data_process_exists("adcs"):
                 data_format = "LB" + 6 * "f" + "B" + 3 * "f" + "B" + 9 * "H" + 6 * "B" + 4 * "f" + "B" + 4 * "f"
-                DH.register_data_process("adcs", data_format, True, data_limit=100000, write_interval=5)
+                DH.register_data_process("adcs", data_format, True, data_limit=100000, write_interval=5, compress=True)
 
             self.time = int(time.time())
             self.log_data[ADCS_IDX.TIME_ADCS] = self.time
@@ -209,8 +209,8 @@ class Task(TemplateTask):
 
             # Data logging
             DH.log_data("adcs", self.log_data)
-            self.log_info(f"Sun: {self.log_data[8:13]}")
-            self.log_info(f"Coarse attitude: {self.log_data[28:32]}")
+            self.log_info("Sun: %s", self.log_data[8:13])
+            self.log_info("Coarse attitude: %s", self.log_data[28:32])
 
 
 def is_nan(x):
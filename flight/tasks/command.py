@@ -80,7 +80,7 @@ class Task(TemplateTask):
 
                 if queue_error_code == CommandQueue.OK:
 
-                    self.log_info(f"Processing command: {cmd_id} with args: {cmd_args}")
+                    self.log_info("Processing command: %s with args: %s", cmd_id, cmd_args)
                     status = process_command(cmd_id, *cmd_args)
 
                     handle_command_execution_status(status)
@@ -110,7 +110,7 @@ class Task(TemplateTask):
         self.log_print_counter += 1
         if self.log_print_counter % self.frequency == 0:
             self.log_print_counter = 0
-            self.log_info(f"Time: {int(time.time())}")
-            self.log_info(f"Time since boot: {int(time.time()) - SATELLITE.BOOTTIME}")
-            self.log_info(f"GLOBAL STATE: {STR_STATES[SM.current_state]}.")
-            self.log_info(f"RAM USAGE: {self.log_data[CDH_IDX.CURRENT_RAM_USAGE]}%")
+            self.log_info("Time: %s", int(time.time()))
+            self.log_info("Time since boot: %s", int(time.time()) - SATELLITE.BOOTTIME)
+            self.log_info("GLOBAL STATE: %s.", STR_STATES[SM.current_state])
+            self.log_info("RAM USAGE: %s%%", self.log_data[CDH_IDX.CURRENT_RAM_USAGE])
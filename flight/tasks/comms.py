@@ -1,5 +1,6 @@
 # Communication task which uses the radio to transmit and receive messages.
 from apps.comms.comms import COMMS_STATE, SATELLITE_RADIO
+from apps.comms.downlink_queue import DownlinkQueue
 from apps.telemetry import TelemetryPacker
 from core import TemplateTask
 from core import state_manager as SM
@@ -13,6 +14,9 @@ class Task(TemplateTask):
 
     # Setup for heartbeat frequency
     frequency_set = False
+
+    # Transfer sessions restored from the SD card
+    sessions_loaded = False
     TX_heartbeat_frequency = 0.2  # 5 seconds
 
     def __init__(self, id):
@@ -46,51 +50,60 @@ class Task(TemplateTask):
             self.TX_COUNTER = self.TX_COUNT_THRESHOLD - 1
             self.frequency_set = True
 
-            self.log_info(f"Heartbeat frequency threshold set to {self.TX_COUNT_THRESHOLD}")
+            self.log_info("Heartbeat frequency threshold set to %s", self.TX_COUNT_THRESHOLD)
 
-        if SM.current_state == STATES.NOMINAL:
-            if not DH.data_process_exists("img"):
-                # TODO: Move image process to another task
-                DH.register_data_process("img", "b", True)
+        if not self.sessions_loaded and DH.SD_scanned:
+            # Resume the file transfers interrupted by a reset
+            DownlinkQueue.load()
+            self.sessions_loaded = True
 
-                # Set filepath for comms TX file
-                filepath = DH.request_TM_path_image()
-                SATELLITE_RADIO.set_filepath(filepath)
-                self.log_info(f"Initializing TX file filepath: {filepath}")
+        if SM.current_state == STATES.NOMINAL and not DH.data_process_exists("img"):
+            # TODO: Move image process to another task
+            DH.register_data_process("img", "b", True)
 
+        # Heartbeats are sent in every state the task is scheduled in, the frame type depends on the state
+        if SM.current_state != STATES.STARTUP:
             # Increment counter
             self.TX_COUNTER += 1
 
+            # Release the file of an abandoned downlink
+            SATELLITE_RADIO.check_downlink_timeout()
+
             # Print current comms state
             self.comms_state = SATELLITE_RADIO.get_state()
-            self.log_info(f"Comms state is {self.comms_state}")
+            self.log_info("Comms state is %s", self.comms_state)
 
             if self.comms_state != COMMS_STATE.RX:
                 # Current state is TX state, transmit message
 
                 if self.TX_COUNTER >= self.TX_COUNT_THRESHOLD or self.ground_pass:
-                    # Pack telemetry
-                    self.packed = TelemetryPacker.pack_tm_frame()
-                    if self.packed:
-                        self.log_info("Telemetry packed")
-                    # Set current TM frame
-                    if TelemetryPacker.TM_AVAILABLE and self.comms_state == COMMS_STATE.TX_HEARTBEAT:
-                        SATELLITE_RADIO.set_tm_frame(TelemetryPacker.FRAME())
+                    if self.comms_state == COMMS_STATE.TX_HEARTBEAT:
+                        if not self.ground_pass:
+                            # Queue the files closed since the last heartbeat for the next pass
+                            DownlinkQueue.refresh()
+
+                        # Pack telemetry, the ground request (if any) is only consumed by a heartbeat
+                        frame_id = TelemetryPacker.next_frame_id(SM.current_state)
+                        self.packed = TelemetryPacker.pack_tm_frame(frame_id)
+                        if self.packed:
+                            self.log_info("Telemetry frame %s packed", frame_id)
+                            # Set current TM frame
+                            SATELLITE_RADIO.set_tm_frame(TelemetryPacker.FRAME())
 
                     # Transmit a message from the satellite
-                    self.tx_msg_id = SATELLITE_RADIO.transmit_message()
+                    self.tx_msg_id = await SATELLITE_RADIO.transmit_message()
                     self.TX_COUNTER = 0
                     self.RX_COUNTER = 0
 
                     # State transition to RX state
                     SATELLITE_RADIO.transition_state(False)
 
-                    self.log_info(f"Sent message with ID: {self.tx_msg_id}")
+                    self.log_info("Sent message with ID: %s", self.tx_msg_id)
 
             else:
-                # Current state is RX, receive message
+                # Current state is RX, wait up to one task period for a packet (DIO0) and receive it
 
-                if SATELLITE_RADIO.data_available():
+                if await SATELLITE_RADIO.wait_for_packet(1 / self.frequency):
                     # Read packet present in the RX buffer
                     self.rq_msg_id = SATELLITE_RADIO.receive_message()
                     SATELLITE_RADIO.transition_state(False)
@@ -98,20 +111,26 @@ class Task(TemplateTask):
                     # Check the response from the GS
                     if self.rq_msg_id != 0x00:
                         # GS requested valid message ID
-                        self.log_info(f"GS requested message ID: {self.rq_msg_id}")
+                        self.log_info("GS requested message ID: %s", self.rq_msg_id)
                         self.ground_pass = True
                         self.RX_COUNTER = 0
 
                     else:
                         # GS requested invalid message ID
-                        self.log_warning(f"GS requested invalid message ID: {self.rq_msg_id}")
+                        self.log_warning("GS requested invalid message ID: %s", self.rq_msg_id)
 
                 else:
                     # No packet received from GS yet
                     self.RX_COUNTER += 1
-                    self.log_info(f"Nothing in RX buffer, {self.RX_COUNTER}")
+                    self.log_info("Nothing in RX buffer, %s", self.RX_COUNTER)
 
                     if self.RX_COUNTER >= self.TX_COUNT_THRESHOLD:
                         # GS response timeout
                         self.ground_pass = False
                         SATELLITE_RADIO.transition_state(True)
+
+                        # Progress of the pass
+                        DownlinkQueue.save(force=True)
+
+            # Progress of the file transfers (rate limited)
+            DownlinkQueue.save()
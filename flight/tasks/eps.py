@@ -79,7 +79,7 @@ class Task(TemplateTask):
 
             if not DH.data_process_exists("eps"):
                 data_format = "Lhhb" + "h" * 38  # - use mV for voltage and mA for current (h = short integer 2 bytes)
-                DH.register_data_process("eps", data_format, True, data_limit=100000)
+                DH.register_data_process("eps", data_format, True, data_limit=100000, compress=True)
 
             # Get power system readings
 
@@ -94,8 +94,9 @@ class Task(TemplateTask):
 
             DH.log_data("eps", self.log_data)
             self.log_info(
-                f"Board Voltage: {self.log_data[EPS_IDX.MAINBOARD_VOLTAGE]} mV, "
-                + f"Board Current: {self.log_data[EPS_IDX.MAINBOARD_CURRENT]} mA, "
-                + f"Jetson Voltage: {self.log_data[EPS_IDX.JETSON_INPUT_VOLTAGE]} mV, "
-                + f"Jetson Current: {self.log_data[EPS_IDX.JETSON_INPUT_CURRENT]} mA"
+                "Board Voltage: %s mV, Board Current: %s mA, Jetson Voltage: %s mV, Jetson Current: %s mA",
+                self.log_data[EPS_IDX.MAINBOARD_VOLTAGE],
+                self.log_data[EPS_IDX.MAINBOARD_CURRENT],
+                self.log_data[EPS_IDX.JETSON_INPUT_VOLTAGE],
+                self.log_data[EPS_IDX.JETSON_INPUT_CURRENT],
             )
@@ -81,5 +81,5 @@ class Task(TemplateTask):
                     self.log_data[GPS_IDX.GPS_ECEF_VZ] = SATELLITE.GPS.parsed_nav_data["ecef_vz"]
 
                     DH.log_data("gps", self.log_data)
-            # self.log_info(f"{dict(zip(self.data_keys[-6:], self.log_data[-6:]))}")
-            self.log_info(f"GPS ECEF: {self.log_data[GPS_IDX.GPS_ECEF_X:]}")
+            # self.log_info("%s", dict(zip(self.data_keys[-6:], self.log_data[-6:])))
+            self.log_info("GPS ECEF: %s", self.log_data[GPS_IDX.GPS_ECEF_X :])
@@ -38,7 +38,7 @@ class Task(TemplateTask):
 
             if not DH.data_process_exists("imu"):
                 DH.register_data_process(
-                    "imu", "Lfffffffff", True, data_limit=100000, write_interval=5, circular_buffer_size=5
+                    "imu", "Lfffffffff", True, data_limit=100000, write_interval=5, circular_buffer_size=5, compress=True
                 )
 
             accel = SATELLITE.IMU.accel()
@@ -61,7 +61,7 @@ class Task(TemplateTask):
 
             self.log_print_counter += 1
             if self.log_print_counter % 10 == 0:
-                # self.log_info(f"{dict(zip(self.data_keys, self.log_data))}")
+                # self.log_info("%s", dict(zip(self.data_keys, self.log_data)))
                 self.log_print_counter = 0
-                self.log_info(f"gyro: {self.log_data[IMU_IDX.GYROSCOPE_X:IMU_IDX.GYROSCOPE_Z + 1]}")
-                self.log_info(f"mag: {self.log_data[IMU_IDX.MAGNETOMETER_X:IMU_IDX.MAGNETOMETER_Z + 1]}")
+                self.log_info("gyro: %s", self.log_data[IMU_IDX.GYROSCOPE_X : IMU_IDX.GYROSCOPE_Z + 1])
+                self.log_info("mag: %s", self.log_data[IMU_IDX.MAGNETOMETER_X : IMU_IDX.MAGNETOMETER_Z + 1])
@@ -1,21 +1,39 @@
 # Onboard Data Handling (OBDH) Task
 
+import time
+
+from apps.telemetry import TelemetryPacker
+from apps.telemetry.constants import STORAGE_IDX
+from apps.telemetry.frames import TM_HISTORY_RECORD_SIZE, TM_HISTORY_TAG
 from core import DataHandler as DH
 from core import TemplateTask
 from core import state_manager as SM
 from core.states import STATES
 
+# Data processes reported in the storage status, in STORAGE_IDX order
+STORAGE_TAGS = ("cdh", "eps", "adcs", "imu", "gps", "thermal", "img", "evt")
+
 
 class Task(TemplateTask):
 
     frequency_set = False
     cleanup_frequency = 0.2  # 5 seconds
 
+    # Housekeeping history: one record every history_interval seconds, the ring keeps history_capacity records
+    # The storage status (a listdir and a stat per data process) is refreshed at the same period
+    history_interval = 60
+    history_capacity = 2880  # 48 hours, ~84 kB
+
+    # data_keys = ["TIME_STORAGE", "TOTAL_SIZE", then NUM_FILES and DIR_SIZE for each of STORAGE_TAGS]
+    log_data = [0] * (2 + 2 * len(STORAGE_TAGS))  # pre-allocation
+
     def __init__(self, id):
         super().__init__(id)
         self.name = "OBDH"
         self.CLEANUP_COUNT_THRESHOLD = 0
         self.CLEANUP_COUNTER = 0
+        self.process_count = 0
+        self.last_history_time = 0
 
     async def main_task(self):
 
@@ -41,8 +59,46 @@ class Task(TemplateTask):
                 DH.clean_up()  # Clean up path that have been marked for deletion
                 self.CLEANUP_COUNTER = 0
 
+            if time.time() - self.last_history_time >= self.history_interval:
+                self.log_storage_status()
+                self.log_history()
+
             if SM.current_state == STATES.NOMINAL:
                 pass
 
-            self.log_info(f"Data processes: {DH.get_all_data_processes_name()}")
-            # self.log_info(f"Stored files: {DH.SD_usage()} bytes.")
+            # Only log the data processes when new ones are registered
+            if len(DH.data_process_registry) != self.process_count:
+                self.process_count = len(DH.data_process_registry)
+                self.log_info("Data processes: %s", DH.get_all_data_processes_name())
+            # self.log_info("Stored files: %s bytes.", DH.SD_usage())
+
+    def log_storage_status(self):
+        """
+        Logs the number of files and directory size of each data process to the non-persistent storage process
+        (downlinked with the storage telemetry frame).
+        """
+        if not DH.data_process_exists("storage"):
+            DH.register_data_process("storage", "LL" + "HL" * len(STORAGE_TAGS), False)
+
+        total_size = 0
+        for i, tag in enumerate(STORAGE_TAGS):
+            storage_info = DH.get_storage_info(tag) if DH.data_process_exists(tag) else None
+            num_files, dir_size = storage_info if storage_info else (0, 0)
+            self.log_data[STORAGE_IDX.CDH_NUM_FILES + 2 * i] = num_files
+            self.log_data[STORAGE_IDX.CDH_DIR_SIZE + 2 * i] = dir_size
+            total_size += dir_size
+
+        self.log_data[STORAGE_IDX.TIME_STORAGE] = int(time.time())
+        self.log_data[STORAGE_IDX.TOTAL_SIZE] = total_size
+        DH.log_data("storage", self.log_data)
+
+    def log_history(self):
+        """
+        Logs a downsampled housekeeping record (from the latest data of the subsystems) to the history ring,
+        paged out to the ground with the history telemetry frames.
+        """
+        if not DH.data_process_exists(TM_HISTORY_TAG):
+            DH.register_history_process(TM_HISTORY_TAG, TM_HISTORY_RECORD_SIZE, self.history_capacity)
+
+        self.last_history_time = time.time()
+        DH.log_data(TM_HISTORY_TAG, TelemetryPacker.pack_history_record())
@@ -0,0 +1,25 @@
+"""
+Ground tools
+
+======================
+
+Host-side (CPython) tools for the data produced by the flight software: decoders for the files and
+records downlinked from the satellite. They reuse the flight modules directly, so this package puts
+the flight folder and the CircuitPython mocks of the emulator on the path.
+
+"""
+
+import os
+import sys
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLIGHT_PATH = os.path.join(ROOT_PATH, "flight")
+
+for _path in (FLIGHT_PATH, os.path.join(ROOT_PATH, "emulator", "cp")):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+if "micropython" not in sys.modules:
+    sys.modules["micropython"] = __import__("micropython_mock")
+if "ulab" not in sys.modules:
+    sys.modules["ulab"] = __import__("ulab_mock")
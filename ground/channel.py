@@ -0,0 +1,129 @@
+"""
+Radio channel model
+
+======================
+
+Host-side model of the LoRa link between the satellite and the ground station, used by the ground station stand-in
+(ground/station.py) and the end-to-end downlink benchmark of the emulator:
+- packet erasure with probability loss (missed preamble, collision)
+- bit errors with a two-state Gilbert-Elliott model: bit error rate ber in the good state, burst_ber in the bad state,
+  the state changing before each packet with probability burst_enter (good to bad) and burst_exit (bad to good)
+- propagation and processing latency, plus the time on air of the packet for the modulation profile (sf, bw, cr)
+
+A packet received with bit errors fails the radio CRC: it is dropped, unless the receiver corrects it (FEC packets).
+
+"""
+
+import math
+import random
+
+import ground  # noqa: F401  (flight modules on the path)
+
+from apps.comms.link import time_on_air  # isort: skip
+
+RH_HEADER_SIZE = 4  # RadioHead header added by the radio
+
+
+class Channel:
+    """
+    Lossy, bursty and delayed LoRa channel (one direction or both).
+
+    Args:
+        loss (float): The probability that a packet is not received at all.
+        ber (float): The bit error rate of the good state.
+        burst_enter (float): The probability of entering the bad state before a packet.
+        burst_exit (float): The probability of leaving the bad state before a packet.
+        burst_ber (float): The bit error rate of the bad state.
+        latency (float): The latency in seconds added to the time on air.
+        sf (int): The spreading factor.
+        bw (int): The bandwidth in Hz.
+        cr (int): The coding rate denominator (5 to 8).
+        seed (int): The seed of the random generator.
+    """
+
+    def __init__(
+        self,
+        loss: float = 0.0,
+        ber: float = 0.0,
+        burst_enter: float = 0.0,
+        burst_exit: float = 1.0,
+        burst_ber: float = 1e-2,
+        latency: float = 0.0,
+        sf: int = 7,
+        bw: int = 125000,
+        cr: int = 5,
+        seed: int = 0,
+    ) -> None:
+        self.loss = loss
+        self.ber = ber
+        self.burst_enter = burst_enter
+        self.burst_exit = burst_exit
+        self.burst_ber = burst_ber
+        self.latency = latency
+        self.set_profile(sf, bw, cr)
+        self.rng = random.Random(seed)
+
+        self.bad = False
+        self.stats = {"packets": 0, "lost": 0, "corrupted": 0, "bit_errors": 0, "bytes": 0, "airtime": 0.0}
+
+    def set_profile(self, sf: int, bw: int, cr: int) -> None:
+        self.sf = sf
+        self.bw = bw
+        self.cr = cr
+
+    def time_on_air(self, length: int) -> float:
+        """Returns the time on air in seconds of a packet of length bytes (RadioHead header excluded)."""
+        return time_on_air(length + RH_HEADER_SIZE, self.sf, self.bw, self.cr)
+
+    def delay(self, length: int) -> float:
+        """Returns the time in seconds between the start of the transmission of a packet and its reception."""
+        return self.latency + self.time_on_air(length)
+
+    def transfer(self, packet):
+        """
+        Sends a packet over the channel.
+
+        Returns:
+            tuple: (received packet as a bytearray or None if lost, number of bit errors)
+        """
+        stats = self.stats
+        stats["packets"] += 1
+        stats["bytes"] += len(packet)
+        stats["airtime"] += self.time_on_air(len(packet))
+
+        if self.bad:
+            self.bad = self.rng.random() >= self.burst_exit
+        else:
+            self.bad = self.rng.random() < self.burst_enter
+
+        if self.rng.random() < self.loss:
+            stats["lost"] += 1
+            return None, 0
+
+        received = bytearray(packet)
+        errors = self._flip_bits(received, self.burst_ber if self.bad else self.ber)
+        if errors:
+            stats["corrupted"] += 1
+            stats["bit_errors"] += errors
+        return received, errors
+
+    def _flip_bits(self, data: bytearray, ber: float) -> int:
+        # Independent bit errors: geometric gaps between two errors instead of one draw per bit
+        if ber <= 0.0:
+            return 0
+        nbits = 8 * len(data)
+        if ber >= 1.0:
+            positions = range(nbits)
+        else:
+            positions = []
+            log_q = math.log(1.0 - ber)
+            position = -1
+            while True:
+                position += 1 + int(math.log(1.0 - self.rng.random()) / log_q)
+                if position >= nbits:
+                    break
+                positions.append(position)
+
+        for position in positions:
+            data[position >> 3] ^= 0x80 >> (position & 7)
+        return len(positions)
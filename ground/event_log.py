@@ -0,0 +1,250 @@
+"""
+Binary event log tools
+
+======================
+
+Host-side counterpart of the BinaryLogHandler (see flight/core/logging.py):
+- generates the event dictionary (event ID -> message template) from the flight sources at build time
+- decodes the binary event log files downlinked from the satellite back into text logs
+
+Usage:
+    python -m ground.event_log dictionary [-s flight] [-o event_dictionary.json]
+    python -m ground.event_log decode <files> [-d event_dictionary.json]
+
+"""
+
+import argparse
+import ast
+import json
+import os
+import struct
+import sys
+
+from ground import FLIGHT_PATH
+
+from core.logging import (  # isort: skip
+    ARG_BOOL,
+    ARG_BYTES,
+    ARG_FLOAT,
+    ARG_INT,
+    ARG_LIST,
+    ARG_LONG,
+    ARG_NONE,
+    ARG_STR,
+    CRITICAL,
+    DEBUG,
+    ERROR,
+    EVT_HEADER_FORMAT,
+    EVT_HEADER_SIZE,
+    INFO,
+    REPEATED_PREFIX,
+    WARNING,
+    _level_for,
+    event_id,
+)
+from core.template_task import TASK_LOG_PREFIX  # isort: skip
+
+_LEVEL_METHODS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "critical": CRITICAL}
+_LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR, "CRITICAL": CRITICAL}
+
+
+def _call_template(node: ast.Call):
+    """
+    Returns (template, level, has_args) of a logging call with a literal message template, or None.
+    """
+    func = node.func
+    if not isinstance(func, ast.Attribute):
+        return None
+    name = func.attr
+    args = node.args
+    on_self = isinstance(func.value, ast.Name) and func.value.id == "self"
+
+    # Task methods first: self.debug is TemplateTask.debug, not the logger method of the same name
+    if on_self and name == "debug":  # self.debug("...", *args), INFO level with the task prefix
+        level, msg_idx, task = INFO, 0, True
+    elif name.startswith("log_") and name[4:] in _LEVEL_METHODS:  # self.log_info("...", *args)
+        level, msg_idx, task = _LEVEL_METHODS[name[4:]], 0, True
+    elif name in _LEVEL_METHODS:  # logger.info("...", *args)
+        level, msg_idx, task = _LEVEL_METHODS[name], 0, False
+    elif name == "log" or name == "_log":
+        # logger.log(LEVEL, "...")
+        if len(args) >= 2 and isinstance(args[0], ast.Name) and args[0].id in _LEVEL_NAMES:
+            level, msg_idx, task = _LEVEL_NAMES[args[0].id], 1, False
+        else:
+            return None
+    else:
+        return None
+
+    if len(args) <= msg_idx or not (isinstance(args[msg_idx], ast.Constant) and isinstance(args[msg_idx].value, str)):
+        return None
+    template = args[msg_idx].value
+    has_args = len(args) > msg_idx + 1
+    if task:
+        # Same rule as TemplateTask._log
+        if not has_args and "%" in template:
+            template = template.replace("%", "%%")
+        template = TASK_LOG_PREFIX + template
+        has_args = True
+    return template, level, has_args
+
+
+def _add_event(events: dict, template: str, level: int, location: str) -> None:
+    key = f"0x{event_id(template):08x}"
+    if key in events:
+        if events[key]["fmt"] != template:
+            raise ValueError(f"Event ID collision {key}: {events[key]['fmt']!r} / {template!r}")
+        events[key]["locations"].append(location)
+    else:
+        events[key] = {"fmt": template, "level": _level_for(level), "locations": [location]}
+
+
+def generate_dictionary(source_folder: str = FLIGHT_PATH) -> dict:
+    """
+    Scans the flight sources for logging calls and maps their event IDs to the message templates.
+
+    Returns:
+        dict: {"events": {"0x<id>": {"fmt": template, "level": level name, "locations": [...]}}}
+    """
+    events = {}
+    for root, _, files in os.walk(source_folder):
+        for file in sorted(files):
+            if not file.endswith(".py"):
+                continue
+            path = os.path.join(root, file)
+            with open(path, "r", encoding="utf-8") as f:
+                try:
+                    tree = ast.parse(f.read())
+                except SyntaxError:
+                    continue
+            for node in ast.walk(tree):
+                if not isinstance(node, ast.Call):
+                    continue
+                found = _call_template(node)
+                if found is None:
+                    continue
+                template, level, has_args = found
+                location = f"{os.path.relpath(path, source_folder)}:{node.lineno}"
+                _add_event(events, template, level, location)
+                # Variant emitted after suppressed repeats (see RateLimitFilter)
+                if not has_args and "%" in template:
+                    template = template.replace("%", "%%")
+                _add_event(events, REPEATED_PREFIX + template, level, location)
+    return {"version": 1, "events": events}
+
+
+def write_dictionary(output_path: str, source_folder: str = FLIGHT_PATH) -> int:
+    """
+    Generates the event dictionary and writes it as JSON.
+
+    Returns:
+        int: The number of events in the dictionary.
+    """
+    dictionary = generate_dictionary(source_folder)
+    with open(output_path, "w") as f:
+        json.dump(dictionary, f, indent=2, sort_keys=True)
+    return len(dictionary["events"])
+
+
+def _unpack_arg(data, pos: int):
+    tag = data[pos]
+    pos += 1
+    if tag == ARG_NONE:
+        return None, pos
+    if tag == ARG_BOOL:
+        return bool(data[pos]), pos + 1
+    if tag == ARG_INT:
+        return struct.unpack_from("<i", data, pos)[0], pos + 4
+    if tag == ARG_LONG:
+        return struct.unpack_from("<q", data, pos)[0], pos + 8
+    if tag == ARG_FLOAT:
+        # float32 on board, printed with its significant digits
+        return float(f"{struct.unpack_from('<f', data, pos)[0]:.7g}"), pos + 4
+    if tag == ARG_LIST:
+        count = data[pos]
+        pos += 1
+        items = []
+        for _ in range(count):
+            item, pos = _unpack_arg(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == ARG_STR or tag == ARG_BYTES:
+        length = data[pos]
+        raw = bytes(data[pos + 1 : pos + 1 + length])
+        return (raw.decode("utf-8", "replace") if tag == ARG_STR else raw), pos + 1 + length
+    raise ValueError(f"Unknown argument tag 0x{tag:02x}")
+
+
+def unpack_records(data: bytes):
+    """
+    Yields (timestamp, level, event ID, args) for each record of a binary event log.
+    A truncated record at the end of the data (interrupted write) is ignored.
+    """
+    pos = 0
+    while pos + EVT_HEADER_SIZE <= len(data):
+        length, timestamp, level, eid, nargs = struct.unpack_from(EVT_HEADER_FORMAT, data, pos)
+        end = pos + 1 + length
+        if end > len(data):
+            break
+        arg_pos = pos + EVT_HEADER_SIZE
+        args = []
+        for _ in range(nargs):
+            arg, arg_pos = _unpack_arg(data, arg_pos)
+            args.append(arg)
+        yield timestamp, level, eid, tuple(args)
+        pos = end
+
+
+def format_record(timestamp: int, level: int, eid: int, args: tuple, events: dict) -> str:
+    """
+    Formats a decoded record as the text handlers would have done on board.
+    """
+    entry = events.get(f"0x{eid:08x}")
+    if entry is None:
+        message = f"<unknown event 0x{eid:08x}> {args}"
+    else:
+        try:
+            message = entry["fmt"] % args if args else entry["fmt"]
+        except (TypeError, ValueError):  # arguments dropped on board
+            message = f"{entry['fmt']} {args}"
+    return f"[{timestamp}][{_level_for(level)}] {message}"
+
+
+def decode_file(path: str, events: dict):
+    """
+    Decodes a binary event log file into text lines.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return [format_record(*record, events) for record in unpack_records(data)]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Binary event log tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dictionary_parser = subparsers.add_parser("dictionary", help="Generate the event dictionary from the sources")
+    dictionary_parser.add_argument("-s", "--source_folder", type=str, default=FLIGHT_PATH, help="Flight sources")
+    dictionary_parser.add_argument("-o", "--output", type=str, default="event_dictionary.json", help="Output file")
+
+    decode_parser = subparsers.add_parser("decode", help="Decode binary event log files")
+    decode_parser.add_argument("files", nargs="+", help="Binary event log files")
+    decode_parser.add_argument("-d", "--dictionary", type=str, default=None, help="Event dictionary (JSON)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "dictionary":
+        count = write_dictionary(args.output, args.source_folder)
+        print(f"Wrote {count} events to {args.output}")
+    else:
+        if args.dictionary:
+            with open(args.dictionary, "r") as f:
+                events = json.load(f)["events"]
+        else:
+            events = generate_dictionary()["events"]
+        for path in args.files:
+            for line in decode_file(path, events):
+                sys.stdout.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Reed-Solomon decoder for FEC file packets
+
+======================
+
+Host-side decoder of the file packets sent with forward error correction (MSG_ID.SAT_FILE_PKT_FEC, see
+flight/apps/comms/fec.py): Berlekamp-Massey for the error locator, Chien search for the error positions and Forney
+for the error magnitudes. Up to nsym / 2 corrupted bytes are corrected per packet, packets received with a CRC
+error are therefore kept and decoded instead of being requested again.
+
+Usage:
+    from ground.fec import decode_packet
+    packet, corrected = decode_packet(received)  # header + data, raises ValueError if uncorrectable
+
+"""
+
+import ground  # noqa: F401  (flight modules on the path)
+
+from apps.comms.fec import FEC_NSYM, GF_EXP, GF_LOG, gf_mul  # isort: skip
+
+
+def _gf_pow(x, power):
+    return GF_EXP[(GF_LOG[x] * power) % 255]
+
+
+def _gf_inverse(x):
+    return GF_EXP[255 - GF_LOG[x]]
+
+
+def _gf_div(x, y):
+    if y == 0:
+        raise ZeroDivisionError()
+    if x == 0:
+        return 0
+    return GF_EXP[(GF_LOG[x] + 255 - GF_LOG[y]) % 255]
+
+
+def _poly_scale(p, x):
+    return [gf_mul(c, x) for c in p]
+
+
+def _poly_add(p, q):
+    out = [0] * max(len(p), len(q))
+    for i, c in enumerate(p):
+        out[i + len(out) - len(p)] = c
+    for i, c in enumerate(q):
+        out[i + len(out) - len(q)] ^= c
+    return out
+
+
+def _poly_mul(p, q):
+    out = [0] * (len(p) + len(q) - 1)
+    for j, cq in enumerate(q):
+        for i, cp in enumerate(p):
+            out[i + j] ^= gf_mul(cp, cq)
+    return out
+
+
+def _poly_eval(p, x):
+    # Horner, coefficients highest degree first
+    y = p[0]
+    for c in p[1:]:
+        y = gf_mul(y, x) ^ c
+    return y
+
+
+def _poly_div(dividend, divisor):
+    out = list(dividend)
+    for i in range(len(dividend) - (len(divisor) - 1)):
+        coef = out[i]
+        if coef != 0:
+            for j in range(1, len(divisor)):
+                if divisor[j] != 0:
+                    out[i + j] ^= gf_mul(divisor[j], coef)
+    separator = -(len(divisor) - 1)
+    return out[:separator], out[separator:]
+
+
+def syndromes(codeword, nsym: int = FEC_NSYM) -> list:
+    """Returns the nsym syndromes of the codeword (all zero if the codeword is valid)."""
+    return [_poly_eval(codeword, GF_EXP[i]) for i in range(nsym)]
+
+
+def _error_locator(synd, nsym):
+    # Berlekamp-Massey (synd padded with a leading 0)
+    err_loc = [1]
+    old_loc = [1]
+    for i in range(1, nsym + 1):
+        delta = synd[i]
+        for j in range(1, len(err_loc)):
+            delta ^= gf_mul(err_loc[-(j + 1)], synd[i - j])
+        old_loc = old_loc + [0]
+        if delta != 0:
+            if len(old_loc) > len(err_loc):
+                new_loc = _poly_scale(old_loc, delta)
+                old_loc = _poly_scale(err_loc, _gf_inverse(delta))
+                err_loc = new_loc
+            err_loc = _poly_add(err_loc, _poly_scale(old_loc, delta))
+
+    while err_loc and err_loc[0] == 0:
+        del err_loc[0]
+    if (len(err_loc) - 1) * 2 > nsym:
+        raise ValueError("Too many errors to correct")
+    return err_loc
+
+
+def _error_positions(err_loc, length):
+    # Chien search (reversed locator, positions from the start of the codeword)
+    positions = [length - 1 - i for i in range(length) if _poly_eval(err_loc, _gf_pow(2, i)) == 0]
+    if len(positions) != len(err_loc) - 1:
+        raise ValueError("Error locator inconsistent with the codeword")
+    return positions
+
+
+def _correct_errata(codeword, synd, positions):
+    # Forney (synd padded with a leading 0)
+    coef_pos = [len(codeword) - 1 - p for p in positions]
+    err_loc = [1]
+    for i in coef_pos:
+        err_loc = _poly_mul(err_loc, _poly_add([1], [_gf_pow(2, i), 0]))
+    _, err_eval = _poly_div(_poly_mul(synd[::-1], err_loc), [1] + [0] * len(err_loc))
+
+    locators = [_gf_pow(2, -(255 - p)) for p in coef_pos]
+    magnitudes = [0] * len(codeword)
+    for i, xi in enumerate(locators):
+        xi_inv = _gf_inverse(xi)
+        err_loc_prime = 1
+        for j, xj in enumerate(locators):
+            if j != i:
+                err_loc_prime = gf_mul(err_loc_prime, 1 ^ gf_mul(xi_inv, xj))
+        if err_loc_prime == 0:
+            raise ValueError("Could not find the error magnitude")
+        y = gf_mul(xi, _poly_eval(err_eval, xi_inv))
+        magnitudes[positions[i]] = _gf_div(y, err_loc_prime)
+    return _poly_add(codeword, magnitudes)
+
+
+def correct(codeword, nsym: int = FEC_NSYM):
+    """
+    Corrects a received codeword (message followed by nsym parity bytes).
+
+    Returns:
+        tuple: (corrected message without the parity bytes as a bytearray, number of corrected bytes)
+
+    Raises:
+        ValueError: If the codeword has more than nsym / 2 corrupted bytes (detected).
+    """
+    codeword = list(codeword)
+    synd = syndromes(codeword, nsym)
+    if not any(synd):
+        return bytearray(codeword[:-nsym]), 0
+
+    synd = [0] + synd
+    err_loc = _error_locator(synd, nsym)
+    positions = _error_positions(err_loc[::-1], len(codeword))
+    corrected = _correct_errata(codeword, synd, positions)
+    if any(syndromes(corrected, nsym)):
+        raise ValueError("Could not correct the codeword")
+    return bytearray(corrected[:-nsym]), len(positions)
+
+
+def decode_packet(message, nsym: int = FEC_NSYM):
+    """
+    Decodes a FEC file packet (4-byte header, data, nsym parity bytes).
+
+    Returns:
+        tuple: (header and data as a bytearray, number of corrected bytes)
+
+    Raises:
+        ValueError: If the packet can't be corrected.
+    """
+    return correct(message, nsym)
@@ -0,0 +1,392 @@
+"""
+Ground station stand-in
+
+======================
+
+Plays the ground side of a pass against the satellite COMMS protocol (flight/apps/comms/comms.py), through a
+channel model (ground/channel.py), so that comms changes can be benchmarked end to end without hardware:
+    1. A heartbeat (telemetry frame) starts the pass: the station requests the metadata of the first file.
+    2. For each file, the station requests the packets it is missing by window (burst mode, with a bitmap), from the
+       first missing packet. Packets lost at the end of a window are requested again after a reply timeout.
+    3. A complete file is acknowledged by requesting the metadata of the next one with its packet count, only in
+       direct reply to a packet or the metadata of that file: the satellite acknowledges its current file, which
+       has changed if the answer to a previous acknowledgement was lost. Repeated requests carry sequence count 0.
+    4. The pass is complete when the satellite has no file left (file ID 0): the station requests a heartbeat.
+With fec, file packets are requested with Reed-Solomon parity and corrupted packets are decoded (ground/fec.py)
+instead of being dropped like the radio CRC does.
+
+GroundStation only handles the protocol and its statistics (goodput, round trips, pass completion time), given the
+time of each event. serve() runs it as a local process against the emulator radio in socket mode (SOCKET_RADIO in
+emulator/configuration.py): one UDP datagram per radio packet, RadioHead header included, both directions
+delayed and corrupted by the channel.
+
+Usage (from the repository root):
+    python -m ground.station [--loss 0.05] [--ber 1e-4] [--burst-enter 0.02 --burst-exit 0.3] [--latency 0.02]
+                             [--sf 7 --bw 125000 --cr 5] [--window 16] [--fec] [--duration 600] [--output report.json]
+
+"""
+
+import argparse
+import heapq
+import json
+import os
+import socket
+import time
+
+import ground  # noqa: F401  (flight modules on the path)
+
+from apps.comms.fec import FEC_NSYM  # isort: skip
+from ground.channel import Channel, RH_HEADER_SIZE  # isort: skip
+from ground.fec import decode_packet  # isort: skip
+
+# Protocol of flight/apps/comms/comms.py (not imported, it pulls the hardware configuration)
+SAT_HEARTBEAT = 0x01
+GS_ACK = 0x08
+SAT_FILE_METADATA = 0x10
+SAT_FILE_PKT = 0x20
+SAT_FILE_PKT_FEC = 0x21
+HEADER_SIZE = 4
+METADATA_SIZE = 9
+FILE_PKTSIZE = 240
+MAX_WINDOW = 32
+
+GS_PORT = 5500  # ground station, satellite radio TX
+SAT_PORT = 5501  # satellite radio RX
+RX_BUFFER_SIZE = 256
+
+
+class GroundStation:
+    """
+    Ground side of a pass.
+
+    Args:
+        channel (Channel): The channel model, for the expected duration of a window (None: reply_timeout only).
+        window (int): The number of file packets requested per GS_ACK (1 to MAX_WINDOW).
+        fec (bool): Whether file packets are requested with Reed-Solomon parity.
+        reply_timeout (float): The time in seconds after which a request without (complete) answer is repeated.
+        output_dir (str): The folder the downlinked files are written to (None: not written).
+    """
+
+    def __init__(
+        self, channel: Channel = None, window: int = 16, fec: bool = False, reply_timeout: float = 1.0, output_dir=None
+    ) -> None:
+        self.channel = channel
+        self.window = max(1, min(window, MAX_WINDOW))
+        self.fec = fec
+        self.reply_timeout = reply_timeout
+        self.output_dir = output_dir
+
+        self.files = {}  # file ID: {"size", "count", "packets": {seq: data}, "start", "end"}
+        self.file = None  # file being downlinked
+
+        self.requested = None  # message ID requested by the last GS_ACK
+        self.window_last = -1  # last packet requested by the last GS_ACK
+        self.last_ack = None
+        self.deadline = None
+
+        self.start_time = None
+        self.complete_time = None
+        self.stats = {
+            "round_trips": 0,
+            "timeouts": 0,
+            "packets": 0,
+            "duplicates": 0,
+            "crc_errors": 0,
+            "fec_corrected_bytes": 0,
+            "fec_failures": 0,
+            "file_bytes": 0,
+        }
+
+    @property
+    def done(self) -> bool:
+        return self.complete_time is not None
+
+    def receive(self, packet, now: float, errors: int = 0):
+        """
+        Handles a packet received from the satellite (RadioHead header removed) with its number of bit errors.
+
+        Returns:
+            bytes: The GS_ACK to send, or None.
+        """
+        if errors:
+            if self.fec and self.requested == SAT_FILE_PKT_FEC:
+                try:
+                    packet, corrected = decode_packet(packet)
+                except ValueError:
+                    self.stats["fec_failures"] += 1
+                    return None
+                self.stats["fec_corrected_bytes"] += corrected
+            else:
+                self.stats["crc_errors"] += 1
+                return None
+
+        msg_id = packet[0]
+        if msg_id == SAT_FILE_METADATA:
+            return self._on_metadata(packet, now)
+        if msg_id == SAT_FILE_PKT or msg_id == SAT_FILE_PKT_FEC:
+            return self._on_file_packet(packet, now)
+
+        # Heartbeat (telemetry frame), the current file of the satellite is unknown
+        if self.start_time is None:
+            self.start_time = now
+        if self.done:
+            return None
+        return self._ack(msg_id, SAT_FILE_METADATA, 0, now)
+
+    def poll(self, now: float):
+        """
+        Repeats the last request if it timed out (lost request, or lost end of the window).
+
+        Returns:
+            bytes: The GS_ACK to send, or None.
+        """
+        if self.deadline is None or now < self.deadline or self.done:
+            return None
+        self.stats["timeouts"] += 1
+        if self.requested in (SAT_FILE_PKT, SAT_FILE_PKT_FEC) and self.file is not None:
+            return self._request_packets(self.requested, now)
+        return self._resend(now)
+
+    def _on_metadata(self, packet, now):
+        payload = packet[HEADER_SIZE : HEADER_SIZE + METADATA_SIZE]
+        file_id = payload[0]
+        size = int.from_bytes(payload[1:5], "big")
+        count = int.from_bytes(payload[5:7], "big")
+
+        if file_id == 0:
+            # No file left on the satellite
+            self.file = None
+            self.complete_time = now
+            return self._ack(SAT_FILE_METADATA, SAT_HEARTBEAT, 0, now)
+
+        file = self.files.get(file_id)
+        if file is None or file["size"] != size:
+            # New file (or file ID reused by the satellite)
+            file = {"size": size, "count": count, "packets": {}, "start": now, "end": None}
+            self.files[file_id] = file
+        file["id"] = file_id
+        self.file = file
+
+        if not self._missing(file):
+            return self._ack(SAT_FILE_METADATA, SAT_FILE_METADATA, count, now)
+        return self._request_packets(SAT_FILE_METADATA, now)
+
+    def _on_file_packet(self, packet, now):
+        file = self.file
+        if file is None:
+            return None
+        seq = int.from_bytes(packet[1:3], "big")
+        length = packet[3]
+        data = bytes(packet[HEADER_SIZE : HEADER_SIZE + length])
+
+        self.stats["packets"] += 1
+        if seq >= file["count"]:
+            return None
+        if seq in file["packets"]:
+            self.stats["duplicates"] += 1
+        else:
+            file["packets"][seq] = data
+            self.stats["file_bytes"] += len(data)
+
+        if not self._missing(file):
+            self._complete(file, now)
+            return self._ack(packet[0], SAT_FILE_METADATA, file["count"], now)
+        if seq >= self.window_last:
+            # End of the window, request what is still missing
+            return self._request_packets(packet[0], now)
+        return None
+
+    def _complete(self, file, now):
+        if file["end"] is not None:
+            return
+        file["end"] = now
+        if self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, "file_%d.bin" % file["id"]), "wb") as f:
+                for seq in range(file["count"]):
+                    f.write(file["packets"][seq])
+
+    def _missing(self, file):
+        packets = file["packets"]
+        return [seq for seq in range(file["count"]) if seq not in packets]
+
+    def _request_packets(self, rx_id, now):
+        missing = self._missing(self.file)
+        first = missing[0]
+        span = min(self.window, self.file["count"] - first)
+        bitmap = 0
+        for seq in missing:
+            if seq >= first + span:
+                break
+            bitmap |= 1 << (seq - first)
+        self.window_last = first + bitmap.bit_length() - 1
+
+        req_id = SAT_FILE_PKT_FEC if self.fec else SAT_FILE_PKT
+        if span == 1:
+            return self._ack(rx_id, req_id, first, now)
+        return self._ack(rx_id, req_id, first, now, span, bitmap)
+
+    def _ack(self, rx_id, req_id, seq, now, window=None, bitmap=None):
+        ack = bytearray([GS_ACK, 0x00, 0x00, 0x04, rx_id, req_id]) + seq.to_bytes(2, "big")
+        if window is not None:
+            ack.append(window)
+            ack += bitmap.to_bytes((window + 7) // 8, "little")
+            ack[3] = len(ack) - HEADER_SIZE
+        if window is None:
+            self.window_last = seq
+
+        self.requested = req_id
+        self.last_ack = ack
+        self.stats["round_trips"] += 1
+        self.deadline = now + self._expected_reply_time(ack, req_id, window, bitmap) + self.reply_timeout
+        return bytes(ack)
+
+    def _resend(self, now):
+        # Satellite answer lost: the satellite last sent the message requested by the previous GS_ACK
+        ack = self.last_ack
+        ack[4] = self.requested
+        if self.requested == SAT_FILE_METADATA:
+            # No acknowledgement, the current file of the satellite may have changed
+            ack[6:8] = bytes(2)
+        self.stats["round_trips"] += 1
+        self.deadline = now + self.reply_timeout
+        return bytes(ack)
+
+    def _expected_reply_time(self, ack, req_id, window, bitmap):
+        if self.channel is None:
+            return 0.0
+        if req_id in (SAT_FILE_PKT, SAT_FILE_PKT_FEC):
+            count = bin(bitmap).count("1") if window is not None else 1
+            length = HEADER_SIZE + FILE_PKTSIZE + (FEC_NSYM if req_id == SAT_FILE_PKT_FEC else 0)
+        else:
+            count = 1
+            length = HEADER_SIZE + max(METADATA_SIZE, FILE_PKTSIZE)  # metadata or heartbeat
+        return self.channel.delay(len(ack)) + count * self.channel.delay(length)
+
+    def report(self, now: float) -> dict:
+        """Returns the statistics of the pass so far."""
+        start = self.start_time if self.start_time is not None else now
+        end = self.complete_time if self.done else now
+        elapsed = max(end - start, 1e-9)
+        file_times = [file["end"] - file["start"] for file in self.files.values() if file["end"] is not None]
+        report = dict(self.stats)
+        report.update(
+            {
+                "complete": self.done,
+                "pass_time_s": round(self.complete_time - start, 3) if self.done else None,
+                "elapsed_s": round(elapsed, 3),
+                "files": len(file_times),
+                "file_times_s": [round(t, 3) for t in file_times],
+                "goodput_bps": round(8 * self.stats["file_bytes"] / elapsed, 1),
+                "round_trips_per_file": round(self.stats["round_trips"] / len(file_times), 2) if file_times else None,
+            }
+        )
+        if self.channel is not None:
+            report["channel"] = dict(self.channel.stats)
+            report["channel"]["airtime"] = round(report["channel"]["airtime"], 3)
+        return report
+
+
+def serve(station: GroundStation, uplink: Channel, downlink: Channel, port=GS_PORT, sat_port=SAT_PORT, duration=None):
+    """
+    Runs the station against the emulator radio over UDP (localhost) until the pass is complete, duration seconds
+    have elapsed or the process is interrupted.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", port))
+    sat_address = ("127.0.0.1", sat_port)
+    start = time.monotonic()
+    pending = []  # (delivery time, order, direction, packet, bit errors)
+    order = 0
+
+    try:
+        while not station.done and (duration is None or time.monotonic() - start < duration):
+            now = time.monotonic()
+            next_event = pending[0][0] if pending else now + 0.1
+            if station.deadline is not None:
+                next_event = min(next_event, station.deadline)
+            sock.settimeout(max(0.0, next_event - now))
+            try:
+                datagram, sat_address = sock.recvfrom(RX_BUFFER_SIZE)
+                # The satellite radio sends at the end of the time on air: latency only
+                packet, errors = downlink.transfer(datagram[RH_HEADER_SIZE:])
+                if packet is not None:
+                    heapq.heappush(pending, (time.monotonic() + downlink.latency, order, "gs", packet, errors))
+                    order += 1
+            except socket.timeout:
+                pass
+
+            now = time.monotonic()
+            acks = [station.poll(now)]
+            while pending and pending[0][0] <= now:
+                _, _, direction, packet, errors = heapq.heappop(pending)
+                if direction == "gs":
+                    acks.append(station.receive(packet, now, errors))
+                else:
+                    sock.sendto(bytes([0xFF, 0x00, 0x00, 0x00]) + packet, sat_address)
+
+            for ack in acks:
+                if ack is None:
+                    continue
+                packet, _ = uplink.transfer(ack)
+                if packet is not None:
+                    # Bit errors on the uplink fail the CRC of the satellite radio
+                    heapq.heappush(pending, (now + uplink.delay(len(ack)), order, "sat", packet, 0))
+                    order += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return station.report(time.monotonic())
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description="Ground station stand-in for the emulator (UDP)")
+    parser.add_argument("--port", type=int, default=GS_PORT, help="UDP port of the station")
+    parser.add_argument("--sat-port", type=int, default=SAT_PORT, help="UDP port of the emulator radio")
+    parser.add_argument("--loss", type=float, default=0.0, help="Packet loss rate")
+    parser.add_argument("--ber", type=float, default=0.0, help="Bit error rate (good state)")
+    parser.add_argument("--burst-enter", type=float, default=0.0, help="Probability of entering a burst per packet")
+    parser.add_argument("--burst-exit", type=float, default=1.0, help="Probability of leaving a burst per packet")
+    parser.add_argument("--burst-ber", type=float, default=1e-2, help="Bit error rate in a burst")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency in seconds (each way)")
+    parser.add_argument("--sf", type=int, default=7, help="Spreading factor")
+    parser.add_argument("--bw", type=int, default=125000, help="Bandwidth (Hz)")
+    parser.add_argument("--cr", type=int, default=5, help="Coding rate denominator")
+    parser.add_argument("--window", type=int, default=16, help="File packets requested per GS_ACK")
+    parser.add_argument("--fec", action="store_true", help="Request file packets with Reed-Solomon parity")
+    parser.add_argument("--reply-timeout", type=float, default=1.0, help="Seconds before a request is repeated")
+    parser.add_argument("--duration", type=float, default=None, help="Maximum duration of the pass in seconds")
+    parser.add_argument("--files", type=str, default=None, help="Folder the downlinked files are written to")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the channel")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    channels = [
+        Channel(
+            loss=args.loss,
+            ber=args.ber,
+            burst_enter=args.burst_enter,
+            burst_exit=args.burst_exit,
+            burst_ber=args.burst_ber,
+            latency=args.latency,
+            sf=args.sf,
+            bw=args.bw,
+            cr=args.cr,
+            seed=args.seed + i,
+        )
+        for i in range(2)
+    ]
+    station = GroundStation(channels[1], args.window, args.fec, args.reply_timeout, args.files)
+    report = serve(station, channels[0], channels[1], args.port, args.sat_port, args.duration)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
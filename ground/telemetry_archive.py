@@ -0,0 +1,203 @@
+"""
+Telemetry frame archive decoder
+
+======================
+
+Decodes a capture file of N telemetry frames of the same type (e.g. the heartbeats received over a season) in one
+np.frombuffer call. The structured dtype is generated from the frame schema of the flight software
+(see flight/apps/telemetry/frames.py), so the decoder follows any change of the frame layouts:
+- the big-endian integer fields are read by the dtype itself
+- the fixed point fields are converted column by column with the batch helpers of apps/telemetry/helpers.py
+The result is exported per subsystem (data process tag) as NumPy structured arrays, CSV or NPZ files.
+The records of history frames are unpacked into a single "records" array (see decode_history_frames).
+
+Usage:
+    python -m ground.telemetry_archive <capture> [--frame-id 1] [-o output_dir] [--format csv|npz]
+
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+import ground  # noqa: F401  (flight modules on the path)
+
+from apps.telemetry.frames import (  # isort: skip
+    TM_FRAME_ID,
+    TM_FRAMES,
+    TM_HISTORY_RECORD_SCHEMA,
+    TM_HISTORY_RECORD_SIZE,
+    TM_HISTORY_RECORDS_OFFSET,
+    TM_HISTORY_RECORDS_PER_FRAME,
+)
+from apps.telemetry.helpers import (  # isort: skip
+    convert_fixed_point_array_to_float_hp,
+    convert_fixed_point_array_to_float_lp,
+)
+from apps.telemetry.schema import FP_HP, FP_LP, S16, S32, U8, U16, U32  # isort: skip
+
+# Wire dtype of each encoding (fixed point fields are kept raw and converted afterwards)
+_WIRE_DTYPES = {U8: "u1", U16: ">u2", S16: ">i2", U32: ">u4", S32: ">i4", FP_HP: ">u4", FP_LP: ">u4"}
+# Decoded dtype of each encoding
+_VALUE_DTYPES = {U8: "u1", U16: "u2", S16: "i2", U32: "u4", S32: "i4", FP_HP: "f8", FP_LP: "f8"}
+_FIXED_POINT = {FP_HP: convert_fixed_point_array_to_float_hp, FP_LP: convert_fixed_point_array_to_float_lp}
+
+HEADER_FIELDS = ("message_id", "seq_count", "packet_length")
+
+
+def frame_dtype(frame_id: int = TM_FRAME_ID.FULL) -> np.dtype:
+    """
+    Returns the structured dtype of a raw frame (header and schema fields at their offsets, itemsize = frame size).
+    """
+    schema, size = TM_FRAMES[frame_id]
+    names = list(HEADER_FIELDS)
+    formats = ["u1", ">u2", "u1"]
+    offsets = [0, 1, 3]
+    for name, tag, _, enc, offset in schema.fields:
+        names.append(f"{tag}.{name}")
+        formats.append(_WIRE_DTYPES[enc])
+        offsets.append(offset)
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": size})
+
+
+def _valid_frames(data, frame_id: int):
+    # Raw frames of type frame_id and their bytes (frames of another type dropped, trailing partial frame ignored)
+    size = TM_FRAMES[frame_id][1]
+    raw = np.frombuffer(data, dtype=frame_dtype(frame_id), count=len(data) // size)
+    valid = raw["message_id"] == frame_id
+    if not valid.all():
+        raw = raw[valid]
+        return raw, raw.tobytes()
+    return raw, data
+
+
+def decode_frames(data, frame_id: int = TM_FRAME_ID.FULL) -> dict:
+    """
+    Decodes a buffer of consecutive frames of type frame_id.
+    Frames of another type (message ID mismatch) are dropped, a trailing partial frame is ignored.
+
+    Returns:
+        dict: {"header": structured array of the header fields, tag: structured array of the subsystem fields}
+    """
+    schema, size = TM_FRAMES[frame_id]
+    raw, frames = _valid_frames(data, frame_id)
+    count = len(raw)
+
+    decoded = {"header": np.empty(count, dtype=[("message_id", "u1"), ("seq_count", "u2"), ("packet_length", "u1")])}
+    for name in HEADER_FIELDS:
+        decoded["header"][name] = raw[name]
+
+    # Fixed point columns are decoded from the bytes of the valid frames, stride = frame size
+    for tag in schema.tags:
+        fields = [field for field in schema.fields if field[1] == tag]
+        decoded[tag] = _decode_columns(frames, raw, fields, count, size, [f"{tag}.{field[0]}" for field in fields])
+
+    return decoded
+
+
+def _decode_columns(data, raw, fields, count: int, stride: int, names) -> np.ndarray:
+    # Structured array of the decoded fields, fixed point columns read from data with the given stride
+    columns = np.empty(count, dtype=[(name, _VALUE_DTYPES[enc]) for name, _, _, enc, _ in fields])
+    for (name, _, _, enc, offset), raw_name in zip(fields, names):
+        if enc in _FIXED_POINT:
+            columns[name] = _FIXED_POINT[enc](data, count, offset=offset, stride=stride)
+        else:
+            columns[name] = raw[raw_name]
+    return columns
+
+
+def decode_history_frames(data) -> dict:
+    """
+    Decodes a buffer of consecutive history frames into the housekeeping records they carry.
+    Records received several times (overlapping pages, repeated catch-ups) are kept once, in sequence order.
+
+    Returns:
+        dict: decode_frames() output plus {"records": structured array with the record sequence number "SEQ"
+              and the record fields}
+    """
+    decoded = decode_frames(data, TM_FRAME_ID.HISTORY)
+    count = len(decoded["header"])
+    size = TM_FRAMES[TM_FRAME_ID.HISTORY][1]
+    first = decoded["history"]["FIRST_SEQ"].astype(np.int64)
+    counts = decoded["history"]["RECORD_COUNT"].astype(np.int64)
+
+    # Record slots of all frames as rows, only the slots filled by each frame are kept
+    frames = np.frombuffer(_valid_frames(data, TM_FRAME_ID.HISTORY)[1], dtype=np.uint8).reshape(count, size)
+    end = TM_HISTORY_RECORDS_OFFSET + TM_HISTORY_RECORDS_PER_FRAME * TM_HISTORY_RECORD_SIZE
+    slots = frames[:, TM_HISTORY_RECORDS_OFFSET:end].reshape(count * TM_HISTORY_RECORDS_PER_FRAME, TM_HISTORY_RECORD_SIZE)
+    slot_idx = np.tile(np.arange(TM_HISTORY_RECORDS_PER_FRAME), count)
+    valid = slot_idx < np.repeat(counts, TM_HISTORY_RECORDS_PER_FRAME)
+    seq = (np.repeat(first, TM_HISTORY_RECORDS_PER_FRAME) + slot_idx)[valid]
+    seq, unique = np.unique(seq, return_index=True)
+    records = np.ascontiguousarray(slots[valid][unique]).tobytes()
+
+    fields = TM_HISTORY_RECORD_SCHEMA.fields
+    raw_dtype = np.dtype(
+        {
+            "names": [name for name, _, _, _, _ in fields],
+            "formats": [_WIRE_DTYPES[enc] for _, _, _, enc, _ in fields],
+            "offsets": [offset for _, _, _, _, offset in fields],
+            "itemsize": TM_HISTORY_RECORD_SIZE,
+        }
+    )
+    raw = np.frombuffer(records, dtype=raw_dtype, count=len(seq))
+    columns = _decode_columns(records, raw, fields, len(seq), TM_HISTORY_RECORD_SIZE, raw_dtype.names)
+
+    decoded["records"] = np.empty(len(seq), dtype=[("SEQ", "u4")] + columns.dtype.descr)
+    decoded["records"]["SEQ"] = seq
+    for name in columns.dtype.names:
+        decoded["records"][name] = columns[name]
+    return decoded
+
+
+def decode_file(path: str, frame_id: int = TM_FRAME_ID.FULL) -> dict:
+    """
+    Decodes a capture file of frames of type frame_id (see decode_frames and decode_history_frames).
+    """
+    with open(path, "rb") as f:
+        if frame_id == TM_FRAME_ID.HISTORY:
+            return decode_history_frames(f.read())
+        return decode_frames(f.read(), frame_id)
+
+
+def export(decoded: dict, output_dir: str, prefix: str, file_format: str = "csv") -> list:
+    """
+    Writes the decoded frames per subsystem: one <prefix>_<tag>.csv file each, or a single <prefix>.npz file.
+
+    Returns:
+        list: The written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if file_format == "npz":
+        path = os.path.join(output_dir, f"{prefix}.npz")
+        np.savez(path, **decoded)
+        return [path]
+
+    paths = []
+    for tag, columns in decoded.items():
+        path = os.path.join(output_dir, f"{prefix}_{tag}.csv")
+        names = columns.dtype.names
+        fmt = ["%.9f" if columns.dtype[name].kind == "f" else "%d" for name in names]
+        np.savetxt(path, columns, fmt=fmt, delimiter=",", header=",".join(names), comments="")
+        paths.append(path)
+    return paths
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Telemetry frame archive decoder")
+    parser.add_argument("capture", help="Capture file of consecutive frames of the same type")
+    parser.add_argument("--frame-id", type=lambda x: int(x, 0), default=TM_FRAME_ID.FULL, help="Frame type (message ID)")
+    parser.add_argument("-o", "--output_dir", type=str, default=".", help="Output folder")
+    parser.add_argument("--format", type=str, choices=("csv", "npz"), default="csv", help="Output format")
+    args = parser.parse_args(argv)
+
+    decoded = decode_file(args.capture, args.frame_id)
+    prefix = os.path.splitext(os.path.basename(args.capture))[0]
+    for path in export(decoded, args.output_dir, prefix, args.format):
+        print(f"Wrote {path}")
+    print(f"Decoded {len(decoded['header'])} frames")
+
+
+if __name__ == "__main__":
+    main()
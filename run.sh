@@ -50,6 +50,18 @@ elif [ "$1" == "emulate-profile" ]; then
     cd build/ && mprof run --python main.py
     mprof plot -o output.png
     cd -
+elif [ "$1" == "benchmark" ]; then
+    # ./run.sh benchmark [name] [options], name defaults to data_handler
+    if [ -z "$2" ] || [[ "$2" == -* ]]; then
+        BENCHMARK=data_handler
+        BENCHMARK_ARGS=("${@:2}")
+    else
+        BENCHMARK=$2
+        BENCHMARK_ARGS=("${@:3}")
+    fi
+    $PYTHON_CMD build_tools/build-emulator.py
+    cd build/ && $PYTHON_CMD -m lib.hal.benchmarks.$BENCHMARK "${BENCHMARK_ARGS[@]}"
+    cd -
 elif [ "$1" == "simulate" ]; then
     export ARGUS_SIMULATION_FLAG=1
     echo "ARGUS_SIMULATION_FLAG set to 1 for simulation mode."
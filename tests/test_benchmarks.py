@@ -0,0 +1,22 @@
+# isort: skip_file
+import json
+
+import tests.cp_mock  # noqa: F401
+from emulator.benchmarks import data_handler
+
+
+def test_data_handler_benchmark_smoke(tmp_path):
+    # Short run of ./run.sh benchmark, flight and stress scenarios
+    output = tmp_path / "data_handler.json"
+    report = data_handler.main(["--duration", "60", "--stress-factor", "10", "--output", str(output)])
+    assert json.loads(output.read_text()) == report
+
+    for scenario in ("flight", "stress"):
+        results = report["results"][scenario]
+        assert results["samples"] > 0 and results["bytes_logged"] > 0
+        assert set(results["processes"]) == {"imu", "adcs", "eps", "cdh"}
+
+    # Rotations within the same second, the closed files compressed
+    imu = report["results"]["stress"]["processes"]["imu"]
+    assert imu["rotation"]["count"] > 0
+    assert imu["bytes_on_disk"] < imu["bytes_logged"]
@@ -1,6 +1,17 @@
+# isort: skip_file
+import struct
+
 import pytest
 
-from flight.apps.command.processor import COMMANDS, CommandProcessingStatus, process_command  # noqa F401
+import tests.cp_mock  # noqa: F401
+import flight.apps.command.processor as processor
+from flight.apps.command.processor import (  # noqa F401
+    COMMANDS,
+    CommandProcessingStatus,
+    compile_commands,
+    process_command,
+    unpack_commands,
+)
 
 
 def mock_command_success(*args):
@@ -13,27 +24,37 @@ def mock_command_fail(*args):
 
 @pytest.fixture
 def setup_commands(monkeypatch):
-    """Fixture to set up the COMMANDS list with mock commands."""
+    """Fixture to set up the dispatch table with mock commands."""
 
     mock_cmds = [
-        (0x01, lambda: True, [], mock_command_success),  # Success command with no arguments
-        (0x02, lambda: False, [], mock_command_success),  # Command with failed precondition
-        (0x03, lambda: True, ["arg1"], mock_command_success),  # Command with one argument
-        (0x04, lambda: True, [], mock_command_fail),  # Command that fails (raises an exception)
+        (0x01, lambda: True, "", mock_command_success),  # Success command with no arguments
+        (0x02, lambda: False, "", mock_command_success),  # Command with failed precondition
+        (0x03, lambda arg1: True, "B", mock_command_success),  # Command with one argument
+        (0x04, lambda: True, "", mock_command_fail),  # Command that fails (raises an exception)
+        (0x06, lambda tag, start, end: True, "8sLL", mock_command_success),  # Command with a string argument
     ]
-    monkeypatch.setattr("flight.apps.command.processor.COMMANDS", mock_cmds)
+    monkeypatch.setattr(processor, "DISPATCH_TABLE", compile_commands(mock_cmds))
     return mock_cmds
 
 
+@pytest.fixture
+def command_queue():
+    queue = processor.CommandQueue
+    queue._queue = []
+    queue.configure(max_size=20)
+    yield queue
+    queue._queue = []
+
+
 def test_process_command_success(setup_commands):
     cmd_id, precond, args, f = setup_commands[0]
-    result = process_command(cmd_id, *args)
+    result = process_command(cmd_id)
     assert result == CommandProcessingStatus.COMMAND_EXECUTION_SUCCESS
 
 
 def test_process_command_precondition_failed(setup_commands):
     cmd_id, precond, args, f = setup_commands[1]
-    result = process_command(cmd_id, *args)
+    result = process_command(cmd_id)
     assert result == CommandProcessingStatus.PRECONDITION_FAILED
 
 
@@ -43,12 +64,48 @@ def test_process_command_argument_count_mismatch(setup_commands):
     assert result == CommandProcessingStatus.ARGUMENT_COUNT_MISMATCH
 
 
+def test_process_command_argument_type_mismatch(setup_commands):
+    assert process_command(0x03, "1") == CommandProcessingStatus.ARGUMENT_TYPE_MISMATCH
+    assert process_command(0x06, "eps", 100, 200) == CommandProcessingStatus.COMMAND_EXECUTION_SUCCESS
+    assert process_command(0x06, b"eps", 100, 200) == CommandProcessingStatus.ARGUMENT_TYPE_MISMATCH
+
+
 def test_process_command_execution_failed(setup_commands):
     cmd_id, precond, args, f = setup_commands[3]
-    result = process_command(cmd_id, *args)
+    result = process_command(cmd_id)
     assert result == CommandProcessingStatus.COMMAND_EXECUTION_FAILED
 
 
 def test_process_command_unknown_command(setup_commands):
-    result = process_command(0xFF)  # Command ID not in COMMANDS
-    assert result == CommandProcessingStatus.UNKNOWN_COMMAND_ID
+    assert process_command(0xFF) == CommandProcessingStatus.UNKNOWN_COMMAND_ID  # Beyond the dispatch table
+    assert process_command(0x05) == CommandProcessingStatus.UNKNOWN_COMMAND_ID  # Gap in the dispatch table
+
+
+def test_command_schemas():
+    # Every flight command has a schema matching its precondition and function
+    table = compile_commands(COMMANDS)
+    for cmd_id, precondition, schema, execute in COMMANDS:
+        arg_types = table[cmd_id][3]
+        assert precondition.__code__.co_argcount == len(arg_types)
+        assert execute.__code__.co_argcount == len(arg_types)
+
+
+def test_unpack_commands(setup_commands, command_queue):
+    frame = bytes([0x01]) + bytes([0x03, 7]) + bytes([0x06]) + struct.pack(">8sLL", b"eps", 100, 200)
+    assert unpack_commands(frame) == 3
+    assert command_queue._queue == [(0x01, ()), (0x03, (7,)), (0x06, ("eps", 100, 200))]
+
+    # Queued commands pass the schema checks
+    for cmd_id, args in command_queue._queue:
+        assert process_command(cmd_id, *args) == CommandProcessingStatus.COMMAND_EXECUTION_SUCCESS
+
+    # Decoding stops at an unknown ID or a truncated record
+    command_queue._queue = []
+    assert unpack_commands(bytes([0x01, 0x05, 0x01])) == 1
+    assert unpack_commands(bytes([0x03, 1, 0x06, 0x00])) == 1
+    assert command_queue._queue == [(0x01, ()), (0x03, (1,))]
+
+    # Records after the end of the frame are ignored, and the queue doesn't overflow
+    assert unpack_commands(bytes([0xAA, 0x01, 0x01, 0x01]), 1, 3) == 2
+    command_queue.configure(max_size=5)
+    assert unpack_commands(bytes([0x01] * 4)) == 1
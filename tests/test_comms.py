@@ -1,8 +1,9 @@
+import asyncio
 from unittest.mock import MagicMock, patch  # noqa F401
 
 import pytest
 
-from flight.apps.comms.comms import COMMS_STATE, MSG_ID  # noqa F401
+from flight.apps.comms.comms import COMMS_STATE, MSG_ID, DownlinkQueue  # noqa F401
 
 
 # Mock SATELLITE for actual hardware interaction
@@ -14,7 +15,8 @@ def satellite_radio():
         mock_satellite.RADIO.read_fifo_buffer = MagicMock(return_value=bytes([0x01, 0x00, 0x02, 0x03, 0x04]))
         mock_satellite.RADIO.crc_error = MagicMock(return_value=0)
         mock_satellite.RADIO.rssi = MagicMock(return_value=100)
-        mock_satellite.RADIO.send = MagicMock()
+        mock_satellite.RADIO.start_send = MagicMock()
+        mock_satellite.RADIO.tx_done = MagicMock(return_value=True)
 
         from flight.apps.comms.comms import SATELLITE_RADIO
 
@@ -78,7 +80,14 @@ def test_1_statechart_T8(satellite_radio):
     assert satellite_radio.get_state() == COMMS_STATE.RX
 
 
-def test_file_get_metadata_no_filepath(satellite_radio):
+@pytest.fixture
+def downlink_queue():
+    DownlinkQueue.clear()
+    yield DownlinkQueue
+    DownlinkQueue.clear()
+
+
+def test_file_get_metadata_no_filepath(satellite_radio, downlink_queue):
     satellite_radio.set_filepath("")
     satellite_radio.file_get_metadata()
     assert satellite_radio.file_ID == 0x00
@@ -86,13 +95,16 @@ def test_file_get_metadata_no_filepath(satellite_radio):
     assert satellite_radio.file_message_count == 0
 
 
-def test_file_get_metadata_with_filepath(satellite_radio):
-    satellite_radio.set_filepath("dummy_path")
-    with patch("os.stat", return_value=(0, 0, 0, 0, 0, 0, 1200, 0, 0, 0)):
-        satellite_radio.file_get_metadata()
-        assert satellite_radio.file_ID == 0x01
-        assert satellite_radio.file_size == 1200
-        assert satellite_radio.file_message_count == 5
+def test_file_get_metadata_with_filepath(satellite_radio, downlink_queue, tmp_path):
+    path = tmp_path / "cdh_0.bin"
+    path.write_bytes(bytes(1200))
+    item = downlink_queue.add("cdh", str(path), 3)
+    satellite_radio.file_get_metadata()
+    assert satellite_radio.filepath == str(path)
+    assert satellite_radio.file_ID == item.item_id
+    assert satellite_radio.file_first_seq == 0
+    assert satellite_radio.file_size == 1200
+    assert satellite_radio.file_message_count == 5
 
 
 def test_receive_message_crc_error(satellite_radio):
@@ -106,16 +118,335 @@ def test_receive_message_crc_error(satellite_radio):
     assert satellite_radio.crc_count == 1
 
 
-def test_transmit_file_metadata(satellite_radio):
-    satellite_radio.file_get_metadata = MagicMock(return_value=None)
-    satellite_radio.file_pack_metadata = MagicMock(return_value=bytes([0x01, 0x00, 0x00, 0x00, 0x04, 0x00, 0x01]))
+def test_transmit_file_metadata(satellite_radio, monkeypatch):
+    monkeypatch.setattr(satellite_radio, "file_get_metadata", MagicMock(return_value=None))
+    metadata = bytes([0x01, 0x00, 0x00, 0x00, 0x04, 0x00, 0x01, 0x00, 0x00])
+    monkeypatch.setattr(satellite_radio, "file_pack_metadata", MagicMock(return_value=metadata))
     satellite_radio.transmit_file_metadata()
-    assert satellite_radio.tx_message[:4] == bytes([MSG_ID.SAT_FILE_METADATA, 0x0, 0x0, 0x7])
+    assert satellite_radio.tx_message[:4] == bytes([MSG_ID.SAT_FILE_METADATA, 0x0, 0x0, 0x9])
 
 
-def test_transmit_message_heartbeat(satellite_radio):
+def test_transmit_message_heartbeat(satellite_radio, monkeypatch):
+    radio = MagicMock()
+    radio.RADIO.tx_done = MagicMock(return_value=True)
+    monkeypatch.setattr(satellite_radio, "sat", radio)
     satellite_radio.state = COMMS_STATE.TX_HEARTBEAT
     satellite_radio.tm_frame = bytearray([0x00, 0x01, 0x02])
-    tx_id = satellite_radio.transmit_message()
+    tx_id = asyncio.run(satellite_radio.transmit_message())
     assert satellite_radio.tx_message == bytearray([0x00, 0x01, 0x02])
     assert tx_id == 0x00
+
+
+def _gs_ack(seq, window=None, bitmap=None, req=MSG_ID.SAT_FILE_PKT):
+    packet = bytes([MSG_ID.GS_ACK, 0x00, 0x00, 0x04, MSG_ID.SAT_FILE_PKT, req]) + seq.to_bytes(2, "big")
+    if window is not None:
+        packet += bytes([window])
+    if bitmap is not None:
+        packet += bitmap
+    return packet
+
+
+@pytest.fixture
+def file_downlink(satellite_radio, tmp_path, monkeypatch):
+    path = str(tmp_path / "tm.bin")
+    with open(path, "wb") as f:
+        f.write(bytes(range(200)) * 6)  # 1200 bytes, 5 packets
+    satellite_radio.set_filepath(path)
+    satellite_radio.tx_message_ID = MSG_ID.SAT_FILE_PKT
+    satellite_radio.crc_count = 0
+
+    radio = MagicMock()
+    radio.RADIO.crc_error = MagicMock(return_value=0)
+    radio.RADIO.tx_done = MagicMock(return_value=True)
+    radio.RADIO.snr = MagicMock(return_value=10.0)
+    # Packets are sent from the TX frame of SATELLITE_RADIO (memoryview), the radio FIFO gets a copy
+    radio.sent = []
+    radio.RADIO.start_send = MagicMock(side_effect=lambda data, **kwargs: radio.sent.append(bytes(data)))
+    monkeypatch.setattr("flight.apps.comms.comms.SATELLITE", radio)
+    monkeypatch.setattr(satellite_radio, "sat", radio)
+    yield satellite_radio, radio
+    satellite_radio.downlink.close()
+    satellite_radio.link.reset()
+
+
+def _sent_seqs(radio):
+    return [int.from_bytes(packet[1:3], "big") for packet in radio.sent]
+
+
+def test_file_packet_single(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=_gs_ack(2))
+    assert satellite_radio.receive_message() == MSG_ID.SAT_FILE_PKT
+    assert satellite_radio.gs_req_window == 1
+
+    satellite_radio.state = COMMS_STATE.TX_FILEPKT
+    asyncio.run(satellite_radio.transmit_message())
+    assert _sent_seqs(radio) == [2]
+    assert radio.sent[0][4:] == (bytes(range(200)) * 6)[480:720]
+
+
+def test_file_packet_window(file_downlink):
+    satellite_radio, radio = file_downlink
+    # Window past the end of the file: stops at the last packet
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=_gs_ack(1, window=8))
+    satellite_radio.receive_message()
+    satellite_radio.state = COMMS_STATE.TX_FILEPKT
+    asyncio.run(satellite_radio.transmit_message())
+    assert _sent_seqs(radio) == [1, 2, 3, 4]
+    assert len(radio.sent[-1]) == 4 + 1200 - 4 * 240
+    # All packets assembled in the pre-allocated TX frame
+    assert satellite_radio.tx_message.obj is satellite_radio.tx_frame
+
+
+def test_file_packet_in_place(file_downlink):
+    from ground.fec import decode_packet
+
+    satellite_radio, radio = file_downlink
+    satellite_radio.gs_req_message_ID = MSG_ID.SAT_FILE_PKT_FEC
+    content = bytes(range(200)) * 6
+
+    # Header, data and parity written in place in the TX frame, the message is a view of it
+    for seq in (1, 4):
+        satellite_radio.transmit_file_packet(seq)
+        assert satellite_radio.tx_message.obj is satellite_radio.tx_frame
+        packet, corrected = decode_packet(bytes(satellite_radio.tx_message))
+        assert corrected == 0
+        assert bytes(packet[:4]) == bytes([MSG_ID.SAT_FILE_PKT_FEC, 0x00, seq, len(content[seq * 240 : seq * 240 + 240])])
+        assert bytes(packet[4:]) == content[seq * 240 : seq * 240 + 240]
+
+
+def test_file_packet_bitmap(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=_gs_ack(0, window=4, bitmap=bytes([0b1010])))
+    satellite_radio.receive_message()
+    satellite_radio.state = COMMS_STATE.TX_FILEPKT
+    asyncio.run(satellite_radio.transmit_message())
+    assert _sent_seqs(radio) == [1, 3]
+
+
+def test_file_packet_fec(file_downlink):
+    from ground.fec import decode_packet
+
+    satellite_radio, radio = file_downlink
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=_gs_ack(3, window=2, req=MSG_ID.SAT_FILE_PKT_FEC))
+    assert satellite_radio.receive_message() == MSG_ID.SAT_FILE_PKT_FEC
+    satellite_radio.state = COMMS_STATE.TX_FILEPKT
+    asyncio.run(satellite_radio.transmit_message())
+    assert _sent_seqs(radio) == [3, 4]
+
+    content = bytes(range(200)) * 6
+    first = bytearray(radio.sent[0])
+    assert len(first) == 4 + 240 + 8
+    assert first[0] == MSG_ID.SAT_FILE_PKT_FEC
+
+    # Up to 4 corrupted bytes (header included) are corrected on the ground
+    for i in (1, 50, 120, 250):
+        first[i] ^= 0x5A
+    packet, corrected = decode_packet(first)
+    assert corrected == 4
+    assert int.from_bytes(packet[1:3], "big") == 3
+    assert bytes(packet[4:]) == content[720:960]
+
+
+def test_file_downlink_resume(file_downlink, downlink_queue, monkeypatch, tmp_path):
+    satellite_radio, radio = file_downlink
+    path = satellite_radio.filepath
+    notify = MagicMock()
+    monkeypatch.setattr("apps.comms.downlink_queue.DH.notify_TM_path", notify)
+    monkeypatch.setattr("apps.comms.downlink_queue.SESSIONS_PATH", str(tmp_path / ".downlink_sessions"))
+    item = downlink_queue.add("cdh", path, 3, created=0)
+
+    satellite_radio.file_get_metadata()
+    assert satellite_radio.file_first_seq == 0
+
+    # Ground received packets 0 to 2 and 4 before the end of the pass
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=_gs_ack(3, window=2, bitmap=bytes([0b01])))
+    satellite_radio.receive_message()
+    satellite_radio.state = COMMS_STATE.TX_FILEPKT
+    asyncio.run(satellite_radio.transmit_message())
+    assert item.acked == 3
+
+    # Reset: the transfer session is restored from the SD card
+    assert downlink_queue.save(force=True)
+    downlink_queue.clear()
+    assert downlink_queue.load() == 1
+
+    # Next pass resumes at packet 3, packet 4 is not sent again
+    satellite_radio.file_get_metadata()
+    radio.sent.clear()
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=_gs_ack(3, window=2))
+    satellite_radio.receive_message()
+    satellite_radio.state = COMMS_STATE.TX_FILEPKT
+    asyncio.run(satellite_radio.transmit_message())
+    assert _sent_seqs(radio) == [3]
+
+    # The file is released once the ground has all 5 packets
+    assert satellite_radio.file_pack_metadata()[-2:] == bytes([0x00, 0x03])
+    satellite_radio.gs_req_seq_count = 5
+    satellite_radio.acknowledge_file()
+    assert downlink_queue.items == []
+    notify.assert_called_once_with("cdh", path)
+
+
+def _run_scheduled(coroutine, max_steps=1000):
+    # Drive the coroutine with the flight scheduler (TX done is awaited on the scheduler clock)
+    from core.scheduler import get_loop
+
+    loop = get_loop()
+    result = []
+
+    async def task():
+        result.append(await coroutine)
+
+    loop.add_task(task(), 0)
+    for _ in range(max_steps):
+        if result:
+            break
+        loop._step()
+    return result[0]
+
+
+def test_send_yields_until_tx_done(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.tx_done = MagicMock(side_effect=[False, False, False, True])
+    radio.RADIO.xmit_timeout = 2.0
+
+    assert _run_scheduled(satellite_radio.send(b"packet"))
+    radio.RADIO.start_send.assert_called_once_with(b"packet")
+    radio.RADIO.end_send.assert_called_once()
+    assert radio.RADIO.tx_done.call_count == 4
+
+
+def test_send_timeout(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.tx_done = MagicMock(return_value=False)
+    radio.RADIO.xmit_timeout = 0.05
+
+    assert not _run_scheduled(satellite_radio.send(b"packet"))
+    # The radio is returned to RX even if TX done never came
+    radio.RADIO.end_send.assert_called_once()
+
+
+def test_data_available_without_edge(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.rx_edge = MagicMock(return_value=False)
+    radio.RADIO.RX_available = MagicMock(return_value=True)
+
+    # No DIO0 edge, the radio is not read over SPI
+    assert not satellite_radio.data_available()
+    radio.RADIO.RX_available.assert_not_called()
+
+    radio.RADIO.rx_edge = MagicMock(return_value=True)
+    assert satellite_radio.data_available()
+    radio.RADIO.RX_available.assert_called_once()
+
+
+def test_wait_for_packet(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.rx_irq_available = MagicMock(return_value=True)
+    radio.RADIO.rx_edge = MagicMock(side_effect=[False, False, True])
+    radio.RADIO.RX_available = MagicMock(return_value=True)
+
+    assert _run_scheduled(satellite_radio.wait_for_packet(1.0))
+    radio.RADIO.RX_available.assert_called_once()
+
+    # Timeout without packet
+    radio.RADIO.rx_edge = MagicMock(return_value=False)
+    assert not _run_scheduled(satellite_radio.wait_for_packet(0.05))
+
+    # Without edge capture: single check of the IRQ flags
+    radio.RADIO.rx_irq_available = MagicMock(return_value=False)
+    radio.RADIO.rx_edge = MagicMock(return_value=True)
+    radio.RADIO.RX_available = MagicMock(return_value=False)
+    assert not _run_scheduled(satellite_radio.wait_for_packet(1.0))
+    radio.RADIO.RX_available.assert_called_once()
+
+
+def test_link_adaptation_handshake(file_downlink):
+    satellite_radio, radio = file_downlink
+    radio.RADIO.snr = MagicMock(return_value=12.0)
+
+    # Ground requests the link configuration
+    ack = bytes([MSG_ID.GS_ACK, 0x00, 0x00, 0x04, MSG_ID.SAT_FILE_PKT, MSG_ID.SAT_LINK_CONFIG, 0x00, 0x00])
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=ack)
+    assert satellite_radio.receive_message() == MSG_ID.SAT_LINK_CONFIG
+    satellite_radio.state = COMMS_STATE.RX
+    satellite_radio.transition_state(False)
+    assert satellite_radio.get_state() == COMMS_STATE.TX_LINK_CONFIG
+
+    # Proposal sent with the current profile: SF7, CR 4/5, 500 kHz
+    asyncio.run(satellite_radio.transmit_message())
+    assert bytes(satellite_radio.tx_message) == bytes([MSG_ID.SAT_LINK_CONFIG, 0x0, 0x0, 0x6, 5, 7, 5, 0x01, 0xF4, 12])
+    radio.RADIO.set_signal_bandwidth.assert_not_called()
+
+    # Confirmed by the next GS_ACK, the radio switches before answering
+    ack = bytes([MSG_ID.GS_ACK, 0x00, 0x00, 0x04, MSG_ID.SAT_LINK_CONFIG, MSG_ID.SAT_HEARTBEAT, 0x00, 0x00])
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=ack)
+    assert satellite_radio.receive_message() == MSG_ID.SAT_HEARTBEAT
+    radio.RADIO.set_signal_bandwidth.assert_called_once_with(500000)
+    assert satellite_radio.link.current == 5
+
+    # Pass timeout: back to the default profile
+    satellite_radio.state = COMMS_STATE.RX
+    satellite_radio.transition_state(True)
+    radio.RADIO.set_signal_bandwidth.assert_called_with(125000)
+    radio.RADIO.set_spreading_factor.assert_called_with(7)
+
+
+def test_command_frame(file_downlink, monkeypatch):
+    satellite_radio, radio = file_downlink
+    unpack_commands = MagicMock(return_value=2)
+    monkeypatch.setattr("flight.apps.comms.comms.unpack_commands", unpack_commands)
+    monkeypatch.setattr(satellite_radio, "gs_cmd_frame", None)
+
+    # Two commands after the request of packet 2, one RX/TX turnaround
+    records = bytes([0x01, 0x07, 0x02])
+    frame = bytes([MSG_ID.GS_CMD, 0x00, 0x05, 0x04 + len(records), MSG_ID.SAT_FILE_PKT, MSG_ID.SAT_FILE_PKT, 0x00, 0x02])
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=frame + records)
+    assert satellite_radio.receive_message() == MSG_ID.SAT_FILE_PKT
+    assert (satellite_radio.gs_req_seq_count, satellite_radio.gs_req_window) == (2, 1)
+    unpack_commands.assert_called_once_with(frame + records, 8, len(frame + records))
+
+    # Same frame repeated by the ground (answer lost): not queued twice
+    assert satellite_radio.receive_message() == MSG_ID.SAT_FILE_PKT
+    unpack_commands.assert_called_once()
+
+    # Frame received with a CRC error: not queued
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=frame[:2] + b"\x06" + frame[3:] + records)
+    radio.RADIO.crc_error = MagicMock(return_value=1)
+    assert satellite_radio.receive_message() == 0x00
+    unpack_commands.assert_called_once()
+
+
+def test_command_frames_two_passes(file_downlink, monkeypatch):
+    satellite_radio, radio = file_downlink
+    unpack_commands = MagicMock(return_value=1)
+    monkeypatch.setattr("flight.apps.comms.comms.unpack_commands", unpack_commands)
+    monkeypatch.setattr(satellite_radio, "gs_cmd_frame", None)
+
+    # Ground numbering its command frames from 0 at each pass (as the GS_ACKs of the ground stand-in)
+    records = bytes([0x01, 0x07, 0x02])
+    frame = bytes([MSG_ID.GS_CMD, 0x00, 0x00, 0x04 + len(records), MSG_ID.SAT_HEARTBEAT, MSG_ID.SAT_HEARTBEAT, 0x00, 0x00])
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=frame + records)
+    satellite_radio.receive_message()
+    assert unpack_commands.call_count == 1
+
+    # Other commands with the same sequence count: a new frame
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=frame + bytes([0x01, 0x08, 0x00]))
+    satellite_radio.receive_message()
+    assert unpack_commands.call_count == 2
+
+    # Pass timeout, the same frame at the next pass is queued again
+    satellite_radio.state = COMMS_STATE.RX
+    satellite_radio.transition_state(True)
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=frame + records)
+    satellite_radio.receive_message()
+    assert unpack_commands.call_count == 3
+
+    # Repeated after a GS_ACK in between: not a retransmission, queued
+    ack = bytes([MSG_ID.GS_ACK, 0x00, 0x00, 0x04, MSG_ID.SAT_HEARTBEAT, MSG_ID.SAT_HEARTBEAT, 0x00, 0x00])
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=ack)
+    satellite_radio.receive_message()
+    radio.RADIO.read_fifo_buffer = MagicMock(return_value=frame + records)
+    satellite_radio.receive_message()
+    assert unpack_commands.call_count == 4
@@ -0,0 +1,121 @@
+# isort: skip_file
+import io
+import math
+import random
+import struct
+
+import pytest
+
+import tests.cp_mock  # noqa: F401
+from flight.core.compression import StreamCompressor, compress, decompress
+
+
+def _roundtrip(data_format, data, float_bits=None):
+    src = io.BytesIO(data)
+    cmp = io.BytesIO()
+    written = compress(src, cmp, data_format, len(data), float_bits)
+    assert written == len(cmp.getvalue())
+
+    out = io.BytesIO()
+    cmp.seek(0)
+    decompress(cmp, out)
+    return cmp.getvalue(), out.getvalue()
+
+
+@pytest.mark.parametrize(
+    "data_format, records",
+    [
+        ("<Lhhb", [(1000 + i, 3700 - i, -(i * 37) % 3000 - 1500, (-1) ** i * i) for i in range(50)]),
+        ("<bBhHiIlLqQ", [(-128, 255, -32768, 65535, -(2**31), 2**32 - 1, 2**31 - 1, 0, -(2**63), 2**64 - 1)] * 3),
+        ("<Lfff", [(i, 0.1 * i, -9.81, float(i) ** 0.5) for i in range(20)]),
+        ("<Qd", [(2**63 + i, -1e300 / (i + 1)) for i in range(10)]),
+    ],
+)
+def test_roundtrip_exact(data_format, records):
+    data = b"".join(struct.pack(data_format, *record) for record in records)
+    _, restored = _roundtrip(data_format, data)
+    assert restored == data
+
+
+def test_roundtrip_tail():
+    # Partial trailing record (e.g. interrupted write) must be preserved as is
+    data = b"".join(struct.pack("<LH", i, i * 2) for i in range(10)) + b"\x01\x02\x03"
+    _, restored = _roundtrip("<LH", data)
+    assert restored == data
+
+
+def test_roundtrip_empty():
+    _, restored = _roundtrip("<Lfff", b"")
+    assert restored == b""
+
+
+def test_compression_ratio():
+    # Slowly varying telemetry, one byte per unchanged field
+    data = b"".join(struct.pack("<Lhhhh", 1700000000 + i, 3700, 120 + i % 3, -40, 0) for i in range(500))
+    compressed, restored = _roundtrip("<Lhhhh", data)
+    assert restored == data
+    assert len(compressed) < len(data) // 2
+
+
+def _imu_records(count, seed=1):
+    # Accelerometer (16-bit samples scaled to m/s^2), rotating magnetic field (uT) and gyroscope (rad/s), with noise
+    rng = random.Random(seed)
+    lsb = 9.81 / 16384
+    records = []
+    for i in range(count):
+        accel = [round((mean + rng.gauss(0, 0.01)) / lsb) * lsb for mean in (0.02, -0.01, 9.81)]
+        mag = [30 * math.cos(i / 500) + rng.gauss(0, 0.3), 30 * math.sin(i / 500) + rng.gauss(0, 0.3), -20 + rng.gauss(0, 0.3)]
+        gyro = [0.01 * math.sin(i / 200) + rng.gauss(0, 0.002) for _ in range(3)]
+        records.append((1700000000 + i, *accel, *mag, *gyro))
+    return records
+
+
+def test_float_ratio():
+    data = b"".join(struct.pack("<Lfffffffff", *record) for record in _imu_records(1000))
+
+    # Lossless: the XOR of noisy floats keeps its low mantissa bits, measured 1.20x
+    compressed, restored = _roundtrip("<Lfffffffff", data)
+    assert restored == data
+    assert 1.1 < len(data) / len(compressed) < 1.3
+
+    # Quantised to 2^-10 (IMU process): measured 3.15x
+    compressed, restored = _roundtrip("<Lfffffffff", data, float_bits=10)
+    assert len(data) / len(compressed) > 3.0
+    for offset in range(0, len(data), 40):
+        original = struct.unpack_from("<Lfffffffff", data, offset)
+        decoded = struct.unpack_from("<Lfffffffff", restored, offset)
+        assert decoded[0] == original[0]
+        assert all(abs(a - b) <= 2**-11 + 1e-5 for a, b in zip(decoded[1:], original[1:]))
+
+
+def test_quantised_non_finite():
+    # Escaped in quantised columns, the next delta is taken against the last finite value
+    records = [(1.5, -2.5), (float("nan"), float("inf")), (1.75, -float("inf")), (2.0, -3.0)]
+    data = b"".join(struct.pack("<fd", *record) for record in records)
+    _, restored = _roundtrip("<fd", data, float_bits=4)
+    assert restored == data
+
+
+def test_stream_steps():
+    # Compressing a few records at a time gives the same container
+    data = b"".join(struct.pack("<Lfffffffff", *record) for record in _imu_records(50)) + b"\x07"
+    for float_bits in (None, 10):
+        expected, _ = _roundtrip("<Lfffffffff", data, float_bits)
+        src = io.BytesIO(data)
+        cmp = io.BytesIO()
+        compressor = StreamCompressor(src, cmp, "<Lfffffffff", len(data), float_bits)
+        steps = 1
+        while not compressor.step(7):
+            steps += 1
+        assert steps == 8
+        assert cmp.getvalue() == expected and compressor.written == len(expected)
+
+
+def test_invalid_container():
+    with pytest.raises(ValueError):
+        decompress(io.BytesIO(b"NOPE" + bytes(16)), io.BytesIO())
+
+
+def test_invalid_format():
+    with pytest.raises(ValueError):
+        compress(io.BytesIO(b""), io.BytesIO(), "<Lz", 0)
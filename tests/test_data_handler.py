@@ -1,11 +1,15 @@
 # isort: skip_file
+import io
 import os
+import struct
 
 import pytest
 
 import tests.cp_mock  # noqa: F401
 import flight.core.data_handler as dh
+from flight.core.compression import decompress
 from flight.core.data_handler import DataProcess as DP
+from flight.core.data_handler import join_path
 
 
 @pytest.mark.parametrize(
@@ -54,6 +58,211 @@ def test_join_path(input_paths, expected_output):
     assert dh.join_path(*input_paths) == expected_output
 
 
+def test_non_persistent_process():
+    process = DP("volatile", "LHf", persistent=False)
+    assert process.get_update_seq() == 0
+    assert not process.data_available()
+
+    process.log([1, 2, 3.0])
+    process.log([4, 5, 6.0])
+    assert process.get_latest_data() == [4, 5, 6.0]
+    assert process.get_update_seq() == 2
+
+    # Nothing on the SD card to manage
+    process.check_circular_buffer()
+    process.clean_up()
+    assert process.get_storage_info() == (0, 0)
+
+
+def test_history_ring(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    history = dh.HistoryProcess("history", record_size=3, capacity=4)
+    buffer = bytearray(12)
+    assert history.read_records(0, buffer, 0, 4) == (0, 0)
+
+    for i in range(6):
+        history.log(bytes([i, i, i]))
+    assert history.get_record_range() == (2, 6)
+    assert history.get_update_seq() == 6
+    assert history.request_TM_path() is None
+
+    # Overwritten records are skipped, the read wraps around the end of the ring
+    assert history.read_records(0, buffer, 0, 4) == (2, 4)
+    assert buffer == bytes([2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5])
+    assert history.read_records(4, buffer, 3, 4) == (4, 2)
+    assert buffer[3:9] == bytes([4, 4, 4, 5, 5, 5])
+
+    # The ring survives a reboot, a layout change resets it
+    history.close()
+    history = dh.HistoryProcess("history", record_size=3, capacity=4)
+    assert history.get_record_range() == (2, 6)
+    history.log(bytes([6, 6, 6]))
+    assert history.read_records(6, buffer, 0, 1) == (6, 1) and buffer[:3] == bytes([6, 6, 6])
+    history.close()
+    history = dh.HistoryProcess("history", record_size=3, capacity=8)
+    assert history.get_record_range() == (0, 0)
+    history.close()
+
+
+def test_history_survives_boot(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh.DataHandler, "data_process_registry", dict())
+    monkeypatch.setattr(dh.DataHandler, "_SD_SCANNED", False)
+    DH = dh.DataHandler
+    history = DH.register_history_process("history", record_size=3, capacity=4)
+    for i in range(3):
+        DH.log_data("history", bytes([i, i, i]))
+    DH.register_data_process("eps", "L", True)
+    DH.log_data("eps", [1])
+    for process in DH.data_process_registry.values():
+        process.close()
+
+    # Boot sequence (see main.py): SD card wiped except the history, then scanned
+    monkeypatch.setattr(dh.DataHandler, "data_process_registry", dict())
+    DH.delete_all_files(exclude=("crash", "history"))
+    DH.scan_SD_card()
+    assert DH.get_all_data_processes_name() == ["history"]
+    history = DH.get_data_process("history")
+    assert history.get_record_range() == (0, 3)
+    buffer = bytearray(3)
+    assert history.read_records(2, buffer, 0, 1) == (2, 1) and buffer == bytes([2, 2, 2])
+    history.close()
+
+
+def test_event_log_size_in_ram(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh, "_EVT_SIZE_LIMIT", 1000)
+    process = dh.EventLogProcess("evt")
+    stats = []
+    monkeypatch.setattr(dh.EventLogProcess, "get_current_file_size", lambda self: stats.append(1) or 0)
+
+    # One stat when the file is opened, records pending until the flush threshold
+    for _ in range(8):
+        process.log(bytes(50))
+    assert len(stats) == 1
+    assert os.path.getsize(process.current_path) == 0 and process.pending_bytes == 400
+    for _ in range(3):
+        process.log(bytes(50))
+    assert os.path.getsize(process.current_path) == 550 and process.pending_bytes == 0
+
+    # Rotation once the size limit is reached
+    process.flush()
+    first_path = process.current_path
+    monkeypatch.setattr(dh.time, "time", lambda: 2000000000)
+    for _ in range(10):
+        process.log(bytes(50))
+    assert process.current_path != first_path and process.file_size == 50
+    assert os.path.getsize(first_path) == 1000 and len(stats) == 2
+    process.close()
+
+
+def _log_records(process, clock, records):
+    for record in records:
+        clock[0] += 1
+        process.log(record)
+
+
+def test_compression_on_rotation(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh, "_CMP_STEP_RECORDS", 2)
+    clock = [1700000000]
+    monkeypatch.setattr(dh.time, "time", lambda: clock[0])
+    process = DP("cmp", "LHf", data_limit=600, compress=True)  # 6 records per file
+    records = [[i, i * 3, float("nan") if i == 2 else i / 4] for i in range(7)]
+
+    # The rotation starts the compression of the closed file, its partial output isn't listed
+    _log_records(process, clock, records)
+    first_path = join_path(str(tmp_path), "cmp", "cmp_1700000001.bin")
+    assert process.compress_path == first_path
+    assert process.get_sorted_file_list() == [dh._PROCESS_CONFIG_FILENAME, "cmp_1700000001.bin", "cmp_1700000007.bin"]
+
+    # Two records per log() call, the lossless compressed file then replaces the original
+    _log_records(process, clock, records[:2])
+    assert process.compressor is None
+    assert process.get_sorted_file_list() == [dh._PROCESS_CONFIG_FILENAME, "cmp_1700000001.cmp", "cmp_1700000007.bin"]
+    restored = io.BytesIO()
+    with open(first_path[:-4] + ".cmp", "rb") as f:
+        decompress(f, restored)
+    assert restored.getvalue() == b"".join(struct.pack("<LHf", *record) for record in records[:6])
+    process.close()
+
+
+def test_lossy_compression_keeps_raw(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    clock = [1700000000]
+    monkeypatch.setattr(dh.time, "time", lambda: clock[0])
+    process = DP("lossy", "LHf", data_limit=600, compress=True, float_precision=4)
+    _log_records(process, clock, [[i, i, i / 3] for i in range(7)])
+
+    # The original is kept onboard next to the compressed file, only the compressed file is transmitted
+    cmp_path = process.request_TM_path()
+    assert cmp_path == join_path(str(tmp_path), "lossy", "lossy_1700000001.cmp")
+    assert os.path.exists(cmp_path[:-4] + ".raw")
+    process.notify_TM_path(cmp_path)
+    process.clean_up()
+    assert sorted(os.listdir(process.dir_path)) == [dh._PROCESS_CONFIG_FILENAME, "lossy_1700000007.bin"]
+    process.close()
+
+
+def test_compression_finished_on_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh, "_CMP_STEP_RECORDS", 2)
+    clock = [1700000000]
+    monkeypatch.setattr(dh.time, "time", lambda: clock[0])
+    process = DP("req", "LHf", data_limit=600, compress=True)
+    _log_records(process, clock, [[i, i, i] for i in range(7)])
+
+    # Requested for transmission before its compression is complete: compressed before it is handed out
+    tm_path = process.request_TM_path()
+    assert tm_path == join_path(str(tmp_path), "req", "req_1700000001.cmp")
+    assert process.compressor is None and process.excluded_paths == [tm_path]
+    assert sorted(os.listdir(process.dir_path)) == [dh._PROCESS_CONFIG_FILENAME, "req_1700000001.cmp", "req_1700000007.bin"]
+    process.close()
+
+
+def test_compression_aborted_on_deletion(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh, "_CMP_STEP_RECORDS", 2)
+    clock = [1700000000]
+    monkeypatch.setattr(dh.time, "time", lambda: clock[0])
+    process = DP("abort", "LHf", data_limit=600, compress=True)
+    _log_records(process, clock, [[i, i, i] for i in range(7)])
+
+    # Flagged for deletion before its compression is complete: the partial output is deleted with it
+    process.delete_paths.append(process.compress_path)
+    process.clean_up()
+    assert process.compressor is None
+    assert sorted(os.listdir(process.dir_path)) == [dh._PROCESS_CONFIG_FILENAME, "abort_1700000007.bin"]
+    process.close()
+
+
+def test_fast_rotation_unique_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh.DataHandler, "data_process_registry", dict())
+    monkeypatch.setattr(dh.time, "time", lambda: 1700000000)
+    DH = dh.DataHandler
+
+    # One record per file, several rotations in the same second
+    DH.register_data_process("adcs", "Lfff", True, data_limit=160, compress=True)
+    for i in range(4):
+        DH.log_data("adcs", [i, 0.0, 1.0, 2.0])
+    process = DH.get_data_process("adcs")
+    assert process.current_path == join_path(str(tmp_path), "adcs", "adcs_1700000000_3.bin")
+    assert process.get_sorted_file_list() == [
+        dh._PROCESS_CONFIG_FILENAME,
+        "adcs_1700000000.cmp",
+        "adcs_1700000000_1.cmp",
+        "adcs_1700000000_2.cmp",
+        "adcs_1700000000_3.bin",
+    ]
+    for name in process.get_sorted_file_list()[1:-1]:
+        restored = io.BytesIO()
+        with open(join_path(process.dir_path, name), "rb") as f:
+            decompress(f, restored)
+        assert struct.unpack("<Lfff", restored.getvalue())[1:] == (0.0, 1.0, 2.0)
+    process.close()
+
+
 # TODO - mock filesystem
 
 """@pytest.fixture
@@ -0,0 +1,69 @@
+# isort: skip_file
+import os
+
+import pytest
+
+import tests.cp_mock  # noqa: F401
+from flight.apps.comms.downlink import DownlinkSession
+
+
+@pytest.fixture
+def tm_file(tmp_path):
+    path = str(tmp_path / "tm.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(1000))
+    return path
+
+
+def test_packets_match_file(tm_file):
+    with open(tm_file, "rb") as f:
+        content = f.read()
+
+    session = DownlinkSession(packet_size=240, block_packets=2)
+    assert session.get_packet(0) is None
+    assert session.open(tm_file)
+    assert session.packet_count == 5
+
+    for seq in range(5):
+        assert bytes(session.get_packet(seq)) == content[seq * 240 : (seq + 1) * 240]
+    # Last packet is shorter, out of range packets are not served
+    assert len(session.get_packet(4)) == 1000 - 4 * 240
+    assert session.get_packet(5) is None
+    assert session.get_packet(-1) is None
+    session.close()
+    assert not session.is_open()
+
+
+def test_read_ahead(tm_file):
+    session = DownlinkSession(packet_size=240, block_packets=4)
+    assert session.open(tm_file)
+
+    for seq in range(4):
+        session.get_packet(seq)
+    assert session.block_reads == 1
+
+    # Re-opening the same file keeps the cache, a retransmission within the block costs no read
+    assert session.open(tm_file)
+    session.get_packet(4)
+    session.get_packet(2)
+    assert session.block_reads == 3
+    session.get_packet(2)
+    assert session.block_reads == 3
+    session.close()
+
+
+def test_missing_file_and_timeout(tm_file, tmp_path, monkeypatch):
+    session = DownlinkSession(packet_size=240, timeout=10)
+    assert not session.open(str(tmp_path / "missing.bin"))
+    assert not session.is_open()
+
+    now = [100.0]
+    monkeypatch.setattr("flight.apps.comms.downlink.time.monotonic", lambda: now[0])
+    assert session.open(tm_file)
+    session.get_packet(0)
+    now[0] += 5
+    assert not session.expired()
+    now[0] += 6
+    assert session.expired()
+    session.close()
+    assert not session.expired()
@@ -0,0 +1,227 @@
+# isort: skip_file
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+import tests.cp_mock  # noqa: F401
+import flight.apps.comms.downlink_queue as dq
+import flight.core.data_handler as dh
+from flight.apps.comms.downlink_queue import DownlinkQueue, file_time
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr(dq, "DH", MagicMock())
+    DownlinkQueue.clear()
+    yield DownlinkQueue
+    DownlinkQueue.clear()
+
+
+def _file(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(bytes(size))
+    return str(path)
+
+
+def test_file_time():
+    assert file_time("/sd/eps/eps_1700000000.bin") == 1700000000
+    assert file_time("eps_1700000000.cmp") == 1700000000
+    assert file_time("/sd/eps/eps_1700000000_2.bin") == 1700000000
+    assert file_time("/sd/cmd_logs/cmd_logs_1700000000.bin") == 1700000000
+    assert file_time("/sd/eps/.data_process_configuration.json") is None
+
+
+def test_priority_age_and_progress(queue, tmp_path):
+    now = 1700000000
+    eps = queue.add("eps", _file(tmp_path, "eps_%d.bin" % (now - 3600), 2400), 3)
+    img = queue.add("img", _file(tmp_path, "img_%d.bin" % (now - 3600), 2400), 1)
+    assert queue.next(now) is eps
+
+    # Same path queued again: keeps the item, raises its priority
+    assert queue.add("img", img.path, 4) is img
+    assert queue.next(now) is img
+
+    # Same priority: the older file goes first
+    old = queue.add("cdh", _file(tmp_path, "cdh_%d.bin" % (now - 24 * 3600), 2400), 3)
+    queue.complete(img)
+    assert queue.next(now) is old
+
+    # Same priority and age: the partially sent file, with fewer bytes left, goes first
+    queue.complete(old)
+    gps = queue.add("gps", _file(tmp_path, "gps_%d.bin" % (now - 3600), 2400), 3)
+    assert not queue.acknowledge(gps, 5)
+    assert queue.next(now) is gps
+
+
+def test_acknowledge_and_complete(queue, tmp_path):
+    item = queue.add("eps", _file(tmp_path, "eps_100.bin", 1200), 3)
+    assert queue.next(0) is item
+
+    assert not queue.acknowledge(item, 1)
+    assert item.acked == 1
+    # Window of 3 packets with packet 2 received: only packets 1 and 3 requested
+    assert not queue.acknowledge(item, 1, 3, 0b101)
+    assert item.acked == 1
+    assert item.is_received(2) and not item.is_received(3)
+    assert queue.missing(item, 1, 4) == 0b1101
+    # Older acknowledgements don't move the progress back
+    assert not queue.acknowledge(item, 0)
+    assert item.acked == 1
+
+    assert not queue.acknowledge(item, 4)
+    assert item.acked == 4
+    assert queue.acknowledge(item, 5)
+    assert queue.items == []
+    assert queue.current is None
+    dq.DH.notify_TM_path.assert_called_once_with("eps", item.path)
+    assert queue.next(0) is None
+
+
+def test_queue_full(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(dq, "MAX_ITEMS", 2)
+    assert queue.add("eps", _file(tmp_path, "eps_1.bin", 10), 3) is not None
+    assert queue.add("eps", _file(tmp_path, "eps_2.bin", 10), 3) is not None
+    assert queue.add("eps", _file(tmp_path, "eps_3.bin", 10), 3) is None
+    assert queue.add("eps", str(tmp_path / "missing_4.bin"), 3) is None
+
+
+def test_save_and_load(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(dq, "SESSIONS_PATH", str(tmp_path / ".downlink_sessions"))
+    eps = queue.add("eps", _file(tmp_path, "eps_100.bin", 2400), 3)
+    img = queue.add("img", _file(tmp_path, "img_200.bin", 600), 4)
+    queue.acknowledge(eps, 3, 4, 0b1010)  # packets 0 to 3 and 5 received
+    assert queue.save(force=True)
+    assert not queue.save(force=True)  # unchanged
+
+    # Reset: the file of img changed, its session is dropped
+    queue.clear()
+    with open(img.path, "ab") as f:
+        f.write(b"\x01")
+    excluded_paths = []
+    dq.DH.get_data_process.return_value.excluded_paths = excluded_paths
+    assert queue.load() == 1
+
+    item = queue.items[0]
+    assert (item.item_id, item.tag, item.path, item.priority) == (eps.item_id, "eps", eps.path, 3)
+    assert (item.created, item.size, item.crc) == (100, 2400, eps.crc)
+    assert item.acked == 4
+    assert item.is_received(5) and not item.is_received(4)
+    assert excluded_paths == [eps.path]
+    assert queue.add("cdh", _file(tmp_path, "cdh_300.bin", 10), 3).item_id == img.item_id + 1
+
+
+def test_crc_steps(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(dq, "CRC_STEP", 1000)
+    path = tmp_path / "eps_100.bin"
+    path.write_bytes(bytes(range(256)) * 10)
+    dq.DH.data_process_exists = MagicMock(return_value=False)
+
+    # Not read when queued, CRC_STEP bytes per refresh
+    item = queue.add("eps", str(path), 3)
+    assert (item.crc, item.crc_offset) == (0, 0)
+    queue.refresh()
+    assert item.crc_offset == 1000
+    queue.refresh()
+    queue.refresh()
+    assert item.crc_offset == 2560 and item.crc == dq.file_crc(str(path))
+
+    # Rest of the file when the session is saved
+    monkeypatch.setattr(dq, "SESSIONS_PATH", str(tmp_path / ".downlink_sessions"))
+    other = queue.add("eps", _file(tmp_path, "eps_200.bin", 600), 3)
+    assert other.crc_offset == 0
+    assert queue.save(force=True)
+    assert other.crc_offset == 600 and other.crc == dq.file_crc(other.path)
+
+
+def test_add_extract(queue, tmp_path):
+    names = ["eps_100.bin", "eps_200.bin", "eps_300.bin", "eps_400.bin"]
+    for name in names:
+        _file(tmp_path, name, 50)
+
+    process = MagicMock()
+    process.dir_path = str(tmp_path)
+    process.current_path = str(tmp_path / "eps_400.bin")
+    process.excluded_paths = []
+    process.get_sorted_file_list = MagicMock(return_value=[".data_process_configuration.json"] + names)
+    process.compression_pending = MagicMock(return_value=False)
+    dq.DH.get_data_process = MagicMock(return_value=process)
+
+    # eps_100 covers [100, 200], eps_200 covers [200, 300], the current file is never queued
+    assert queue.add_extract("eps", 150, 250) == 2
+    assert [item.created for item in queue.items] == [100, 200]
+    assert process.excluded_paths == [str(tmp_path / "eps_100.bin"), str(tmp_path / "eps_200.bin")]
+    assert queue.add_extract("eps", 500, 600) == 0
+
+
+def test_refresh_waits_for_compression(queue, tmp_path):
+    names = [".data_process_configuration.json", "eps_100.bin", "eps_200.bin"]
+    process = MagicMock()
+    process.dir_path = str(tmp_path)
+    process.get_sorted_file_list = MagicMock(return_value=names)
+    process.compression_pending = MagicMock(return_value=True)
+    dq.DH.data_process_exists = MagicMock(side_effect=lambda tag: tag == "eps")
+    dq.DH.get_data_process = MagicMock(return_value=process)
+
+    # Oldest closed file still being compressed: queued at a later heartbeat
+    queue.refresh()
+    dq.DH.request_TM_path.assert_not_called()
+    process.compression_pending.assert_called_with(str(tmp_path / "eps_100.bin"))
+
+    process.compression_pending = MagicMock(return_value=False)
+    dq.DH.request_TM_path = MagicMock(return_value=_file(tmp_path, "eps_100.cmp", 50))
+    queue.refresh()
+    assert [item.path for item in queue.items] == [str(tmp_path / "eps_100.cmp")]
+
+
+def test_refresh_sources(queue, tmp_path):
+    process = MagicMock()
+    process.dir_path = str(tmp_path)
+    process.get_sorted_file_list = MagicMock(return_value=[".data_process_configuration.json", "a_1.bin", "a_2.bin"])
+    process.compression_pending = MagicMock(return_value=False)
+    dq.DH.data_process_exists = MagicMock(side_effect=lambda tag: tag in ("cmd_logs", "imu", "history"))
+    dq.DH.get_data_process = MagicMock(return_value=process)
+    dq.DH.request_TM_path = MagicMock(side_effect=lambda tag: _file(tmp_path, tag + "_1.bin", 50))
+
+    # One closed file per source process, the history ring is not a file source
+    queue.refresh()
+    assert [(item.tag, item.priority) for item in queue.items] == [("cmd_logs", 3), ("imu", 2)]
+
+
+def test_sessions_survive_boot(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    monkeypatch.setattr(dh.DataHandler, "data_process_registry", dict())
+    monkeypatch.setattr(dh.DataHandler, "_SD_SCANNED", False)
+    monkeypatch.setattr(dq, "DH", dh.DataHandler)
+    monkeypatch.setattr(dq, "SESSIONS_PATH", str(tmp_path / ".downlink_sessions"))
+    DH = dh.DataHandler
+    DownlinkQueue.clear()
+    for tag in ("cdh", "eps"):
+        DH.register_data_process(tag, "L", True)
+        DH.log_data(tag, [1])
+        DH.get_data_process(tag).close()
+    DH.register_event_log_process("evt").log(b"event")
+    DH.get_data_process("evt").close()
+    item = DownlinkQueue.add("eps", _file(tmp_path / "eps", "eps_100.bin", 600), 3)
+    DownlinkQueue.acknowledge(item, 1)
+    assert DownlinkQueue.save(force=True)
+    assert DownlinkQueue.kept_files() == [str(tmp_path / ".downlink_sessions"), item.path]
+
+    # Boot sequence (see main.py): SD card wiped except the kept files, scanned, then the sessions loaded
+    DownlinkQueue.clear()
+    monkeypatch.setattr(dh.DataHandler, "data_process_registry", dict())
+    DH.delete_all_files(exclude=["crash", "evt", "history"] + DownlinkQueue.kept_files())
+    assert sorted(os.listdir(tmp_path)) == [".downlink_sessions", "eps", "evt"]
+    assert os.listdir(tmp_path / "eps") == ["eps_100.bin"]
+    DH.scan_SD_card()
+    assert DH.get_all_data_processes_name() == ["evt"]
+    assert DownlinkQueue.load() == 1
+    restored = DownlinkQueue.items[0]
+    assert (restored.path, restored.acked) == (item.path, 1)
+
+    # Excluded from the deletions once its data process is registered again by its task
+    DH.register_data_process("eps", "L", True)
+    DownlinkQueue.refresh()
+    assert DH.get_data_process("eps").excluded_paths == [item.path]
+    DH.get_data_process("eps").close()
+    DownlinkQueue.clear()
@@ -0,0 +1,157 @@
+# isort: skip_file
+import ast
+import io
+
+import tests.cp_mock  # noqa: F401
+import flight.core.logging as logging
+from flight.core.logging import (
+    DEBUG,
+    EVT_MAX_RECORD_SIZE,
+    INFO,
+    WARNING,
+    BinaryLogHandler,
+    Logger,
+    RateLimitFilter,
+    RingBufferHandler,
+    StreamHandler,
+    event_id,
+    pack_event,
+    setup_logger,
+)
+from ground.event_log import _call_template, format_record, generate_dictionary, unpack_records
+
+
+class Recorder:
+    def __init__(self):
+        self.data = bytearray()
+        self.flushes = 0
+
+    def log(self, data):
+        self.data += data
+
+    def flush(self):
+        self.flushes += 1
+
+
+def test_event_id_stable():
+    assert event_id("Switched to state %s") == event_id("Switched to state %s")
+    assert event_id("Switched to state %s") != event_id("Switched to state %d")
+    assert 0 <= event_id("") <= 0xFFFFFFFF
+
+
+def test_pack_unpack_roundtrip():
+    buf = bytearray(EVT_MAX_RECORD_SIZE)
+    args = (42, -7, 2**40, 1.5, "text", b"\x01\x02", [1, 2.5, "a"], None, True)
+    size = pack_event(buf, 1700000000, WARNING, "template", args)
+    records = list(unpack_records(bytes(buf[:size])))
+    assert records == [(1700000000, WARNING, event_id("template"), args)]
+
+
+def test_pack_truncates_to_record_size():
+    buf = bytearray(EVT_MAX_RECORD_SIZE)
+    size = pack_event(buf, 0, INFO, "%s %s", ("x" * 400, 1))
+    assert size == EVT_MAX_RECORD_SIZE
+    ((_, _, _, args),) = unpack_records(bytes(buf[:size]))
+    assert args == ("x" * (EVT_MAX_RECORD_SIZE - 11 - 2),)
+
+
+def test_handler_and_decoding():
+    recorder = Recorder()
+    logger = Logger("binary", INFO)
+    logger.addHandler(BinaryLogHandler(recorder))
+    logger.info("Switched to state %s", 2)
+    logger.debug("filtered %s", 1)
+    logger.warning("Battery at %s mV", 3700)
+
+    events = {f"0x{event_id(fmt):08x}": {"fmt": fmt} for fmt in ("Switched to state %s", "Battery at %s mV")}
+    lines = [format_record(*record, events).split("]", 2)[-1] for record in unpack_records(recorder.data)]
+    assert lines == [" Switched to state 2", " Battery at 3700 mV"]
+
+    # Buffered by the process, flushed from ERROR
+    assert recorder.flushes == 0
+    logger.error("Radio timeout")
+    assert recorder.flushes == 1
+
+
+def test_task_debug_template():
+    # TemplateTask.debug logs at INFO with the task prefix, unlike logger.debug
+    task_call = ast.parse('self.debug("%s", e)').body[0].value
+    assert _call_template(task_call) == ("[%s][%s] %s", INFO, True)
+    logger_call = ast.parse('logger.debug("%s", e)').body[0].value
+    assert _call_template(logger_call) == ("%s", DEBUG, True)
+
+
+def test_dictionary_covers_flight_call_sites():
+    events = generate_dictionary()["events"]
+    templates = {entry["fmt"] for entry in events.values()}
+    assert "Switched to state %s" in templates  # logger call
+    assert "[%s][%s] Comms state is %s" in templates  # task call
+    for key, entry in events.items():
+        assert key == f"0x{event_id(entry['fmt']):08x}"
+
+
+def test_ring_buffer_keeps_latest_records():
+    ring = RingBufferHandler(capacity=EVT_MAX_RECORD_SIZE, level=DEBUG)
+    logger = Logger("ring", DEBUG)
+    logger.addHandler(ring)
+    for i in range(100):  # 16 bytes per record, wraps several times
+        logger.debug("step %s", i)
+
+    records = list(unpack_records(bytes(ring.dump())))
+    assert len(records) == ring.records == EVT_MAX_RECORD_SIZE // 16
+    assert [args[0] for _, _, _, args in records] == list(range(100 - ring.records, 100))
+    assert all(eid == event_id("step %s") for _, _, eid, _ in records)
+
+    ring.clear()
+    assert ring.dump() == bytearray()
+
+
+def test_crash_log_debug_capture(monkeypatch):
+    logger = Logger("boot")
+    monkeypatch.setattr(logging, "logger", logger)
+    ring = RingBufferHandler(capacity=EVT_MAX_RECORD_SIZE, level=INFO)
+    stream = io.StringIO()
+    setup_logger(level="INFO", handler=StreamHandler(stream), crash_log=ring)
+
+    # INFO ring: DEBUG calls stay disabled
+    assert not logger.isEnabledFor(DEBUG)
+    logger.debug("step %s", 1)
+    assert ring.records == 1  # Logger set to level INFO
+
+    # DEBUG capture enabled at runtime: only the ring gets the DEBUG records
+    ring.setLevel(DEBUG)
+    logger.setLevel(DEBUG)
+    logger.debug("step %s", 2)
+    assert ring.records == 2 and "step" not in stream.getvalue()
+
+
+def test_setup_logger_collapses_text_output_only(monkeypatch):
+    logger = Logger("boot")
+    monkeypatch.setattr(logging, "logger", logger)
+    ring = RingBufferHandler(capacity=4 * EVT_MAX_RECORD_SIZE, level=INFO)
+    stream = io.StringIO()
+    setup_logger(level="INFO", handler=StreamHandler(stream), crash_log=ring)
+
+    # Identical lines collapsed in the text output, every record kept in the ring
+    for _ in range(10):
+        logger.warning("No EPS data available")
+    for i in range(10):
+        logger.info("Comms state is %s", i)
+    assert stream.getvalue().count("No EPS data available") == 3
+    assert stream.getvalue().count("Comms state is") == 10
+    assert ring.records == 21  # Logger set to level INFO
+
+
+def test_crash_log_bypasses_logger_filters():
+    logger = Logger("crash")
+    stream = io.StringIO()
+    logger.addHandler(StreamHandler(stream))
+    ring = RingBufferHandler(capacity=4 * EVT_MAX_RECORD_SIZE, level=INFO)
+    logger.addHandler(ring)
+    logger.setLevel(INFO)
+    logger.addFilter(RateLimitFilter(rate=0.0, burst=1))
+
+    for _ in range(5):
+        logger.warning("Sun sensor saturated")
+    assert stream.getvalue().count("Sun sensor saturated") == 1
+    assert ring.records == 5
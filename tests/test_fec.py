@@ -0,0 +1,52 @@
+# isort: skip_file
+import random
+
+import pytest
+
+import tests.cp_mock  # noqa: F401
+from flight.apps.comms.fec import FEC_NSYM, RSEncoder, generator_poly
+from ground.fec import decode_packet, syndromes
+
+
+def _encode(message, nsym=FEC_NSYM):
+    codeword = bytearray(len(message) + nsym)
+    codeword[: len(message)] = message
+    assert RSEncoder(nsym).encode_into(message, codeword, len(message)) == len(codeword)
+    return codeword
+
+
+def test_generator_roots():
+    # 2^i, i < nsym, are the roots of the generator polynomial
+    gen = generator_poly(FEC_NSYM)
+    assert len(gen) == FEC_NSYM + 1
+    assert not any(syndromes(gen, FEC_NSYM))
+
+
+@pytest.mark.parametrize("length", [1, 100, 244])
+def test_encode_valid_codeword(length):
+    rng = random.Random(length)
+    message = bytes(rng.randrange(256) for _ in range(length))
+    codeword = _encode(message)
+    assert codeword[:length] == message
+    assert not any(syndromes(codeword))
+    assert decode_packet(codeword) == (bytearray(message), 0)
+
+
+def test_correct_errors():
+    rng = random.Random(0)
+    for _ in range(100):
+        message = bytes(rng.randrange(256) for _ in range(rng.randint(8, 244)))
+        codeword = _encode(message)
+        errors = rng.randint(1, FEC_NSYM // 2)
+        for pos in rng.sample(range(len(codeword)), errors):
+            codeword[pos] ^= rng.randint(1, 255)
+        assert decode_packet(codeword) == (bytearray(message), errors)
+
+
+def test_uncorrectable():
+    message = bytes(range(200))
+    codeword = _encode(message)
+    for pos in range(0, 2 * FEC_NSYM, 2):
+        codeword[pos] ^= 0xFF
+    with pytest.raises(ValueError):
+        decode_packet(codeword)
@@ -0,0 +1,88 @@
+# isort: skip_file
+import tests.cp_mock  # noqa: F401
+from flight.apps.comms.link import time_on_air
+from ground.channel import RH_HEADER_SIZE, Channel
+from ground.station import GS_ACK, SAT_FILE_METADATA, SAT_FILE_PKT, SAT_HEARTBEAT, GroundStation
+
+
+def _metadata(file_id, size, count):
+    payload = bytes([file_id]) + size.to_bytes(4, "big") + count.to_bytes(2, "big") + bytes(2)
+    return bytes([SAT_FILE_METADATA, 0x00, 0x00, len(payload)]) + payload
+
+
+def _file_packet(seq, data):
+    return bytes([SAT_FILE_PKT]) + seq.to_bytes(2, "big") + bytes([len(data)]) + data
+
+
+def _ack_fields(ack):
+    # (rx_id, req_id, req_seq, window, bitmap)
+    assert ack[0] == GS_ACK and ack[3] == len(ack) - 4
+    window = ack[8] if len(ack) > 8 else 1
+    bitmap = int.from_bytes(ack[9:], "little") if len(ack) > 8 else 1
+    return ack[4], ack[5], int.from_bytes(ack[6:8], "big"), window, bitmap
+
+
+def test_channel():
+    channel = Channel(sf=7, bw=125000, cr=5, latency=0.01)
+    assert channel.time_on_air(12) == time_on_air(12 + RH_HEADER_SIZE, 7, 125000, 5)
+    assert channel.delay(12) == 0.01 + channel.time_on_air(12)
+    packet, errors = channel.transfer(bytes(range(20)))
+    assert packet == bytes(range(20)) and errors == 0
+
+    # Same seed, same losses and bit errors
+    runs = []
+    for _ in range(2):
+        channel = Channel(loss=0.3, ber=1e-3, seed=4)
+        runs.append([channel.transfer(bytes(100)) for _ in range(200)])
+    assert runs[0] == runs[1]
+    assert channel.stats["packets"] == 200 and channel.stats["bytes"] == 20000
+    assert 30 < channel.stats["lost"] < 90
+    assert channel.stats["corrupted"] == sum(1 for packet, errors in runs[1] if errors)
+    assert channel.stats["bit_errors"] == sum(errors for packet, errors in runs[1])
+
+    # Bad state: every packet received is corrupted
+    channel = Channel(burst_enter=1.0, burst_exit=0.0, burst_ber=1.0)
+    packet, errors = channel.transfer(bytes(2))
+    assert packet == b"\xff\xff" and errors == 16
+
+
+def test_station_pass():
+    station = GroundStation(window=4)
+    rx_id, req_id, seq, _, _ = _ack_fields(station.receive(bytes([SAT_HEARTBEAT]) + bytes(20), 0.0))
+    assert (rx_id, req_id, seq) == (SAT_HEARTBEAT, SAT_FILE_METADATA, 0)
+
+    # File of 5 packets: first window of 4
+    data = [bytes([seq]) * 240 for seq in range(4)] + [b"end"]
+    ack = station.receive(_metadata(7, 963, 5), 0.1)
+    assert _ack_fields(ack) == (SAT_FILE_METADATA, SAT_FILE_PKT, 0, 4, 0b1111)
+
+    # Packet 1 lost: requested again with the last packet
+    for seq in (0, 2):
+        assert station.receive(_file_packet(seq, data[seq]), 0.2) is None
+    ack = station.receive(_file_packet(3, data[3]), 0.3)
+    assert _ack_fields(ack) == (SAT_FILE_PKT, SAT_FILE_PKT, 1, 4, 0b1001)
+    assert station.receive(_file_packet(1, data[1]), 0.4) is None
+    assert station.receive(_file_packet(1, data[1]), 0.4) is None
+    assert station.stats["duplicates"] == 1
+
+    # Complete file: acknowledged with its packet count
+    ack = station.receive(_file_packet(4, data[4]), 0.5)
+    assert _ack_fields(ack)[:3] == (SAT_FILE_PKT, SAT_FILE_METADATA, 5)
+    assert station.files[7]["end"] == 0.5
+    assert b"".join(station.files[7]["packets"][seq] for seq in range(5)) == b"".join(data)
+
+    # Answer lost: the request is repeated without acknowledgement
+    assert station.poll(0.6) is None
+    rx_id, req_id, seq, _, _ = _ack_fields(station.poll(station.deadline))
+    assert (rx_id, req_id, seq) == (SAT_FILE_METADATA, SAT_FILE_METADATA, 0)
+
+    # Metadata of a file the station already has: acknowledged without packets
+    ack = station.receive(_metadata(7, 963, 5), 2.0)
+    assert _ack_fields(ack)[1:3] == (SAT_FILE_METADATA, 5)
+
+    # No file left on the satellite
+    assert _ack_fields(station.receive(_metadata(0, 0, 0), 2.5))[1] == SAT_HEARTBEAT
+    assert station.done and station.poll(10.0) is None
+    report = station.report(3.0)
+    assert report["complete"] and report["files"] == 1 and report["file_bytes"] == 963
+    assert report["pass_time_s"] == 2.5
@@ -0,0 +1,75 @@
+# isort: skip_file
+import tests.cp_mock  # noqa: F401
+from flight.apps.comms.link import DEFAULT_PROFILE, PROFILES, LinkAdaptation, time_on_air
+
+
+def test_propose_from_snr():
+    link = LinkAdaptation()
+    # No GS_ACK received yet, the current profile is kept
+    assert link.propose() == DEFAULT_PROFILE
+
+    # Strong link: fastest profile (SF7 500 kHz needs -7.5 + 5 + 6 dB at 125 kHz)
+    for snr in (9.0, 10.0, 12.0):
+        link.record(snr)
+    assert link.propose() == len(PROFILES) - 1
+
+    # The worst SNR of the window decides
+    link.record(-2.0)
+    assert link.propose() == 3
+    link.record(-7.0)
+    assert link.propose() == 1
+    link.record(-20.0)
+    assert link.propose() == 0
+
+
+def test_commit_and_reset():
+    link = LinkAdaptation()
+    for _ in range(4):
+        link.record(10.0)
+    assert link.propose() == 5
+    assert link.commit()
+    assert link.current == 5
+    assert link.settings() == (7, 500000, 5)
+    # SNR samples measured with the previous bandwidth are dropped
+    assert link.worst_snr() is None
+    assert not link.commit()
+
+    # SNR measured at 500 kHz: 6 dB of noise offset back to 125 kHz
+    link.record(-7.0)
+    assert link.propose() == 3
+
+    assert link.reset()
+    assert link.current == DEFAULT_PROFILE
+    assert not link.reset()
+
+
+def test_crc_error_fallback():
+    link = LinkAdaptation()
+    for _ in range(4):
+        link.record(10.0)
+    link.propose()
+    link.commit()
+
+    # A CRC error caps the next proposals below the current profile for the rest of the pass
+    link.record(10.0)
+    link.on_crc_error()
+    assert link.propose() == 4
+    link.commit()
+    link.on_crc_error()
+    link.record(10.0)
+    assert link.propose() == 3
+
+    link.reset()
+    link.record(10.0)
+    assert link.propose() == 5
+
+
+def test_time_on_air():
+    # Semtech LoRa calculator: 10 and 244 + 4 bytes at SF7 125 kHz CR 4/5, 248 bytes at SF10 125 kHz CR 4/8
+    assert abs(time_on_air(10, 7, 125000, 5) - 0.041216) < 1e-6
+    assert abs(time_on_air(248, 7, 125000, 5) - 0.389376) < 1e-6
+    assert abs(time_on_air(248, 10, 125000, 8) - 3.442688) < 1e-6
+    # SF12 125 kHz: low data rate optimization on
+    assert abs(time_on_air(248, 12, 125000, 5) - 8.855552) < 1e-6
+    # Twice the bandwidth, half the airtime
+    assert abs(time_on_air(248, 7, 250000, 5) * 2 - time_on_air(248, 7, 125000, 5)) < 1e-9
@@ -0,0 +1,222 @@
+# isort: skip_file
+import io
+import os
+
+import pytest
+
+import tests.cp_mock  # noqa: F401
+import flight.core.logging as logging
+import flight.core.template_task as template_task
+from flight.core.logging import (
+    CRITICAL,
+    DEBUG,
+    ERROR,
+    INFO,
+    WARNING,
+    Formatter,
+    LogRecord,
+    Logger,
+    RateLimitFilter,
+    RotatingFileHandler,
+    StreamHandler,
+)
+
+
+class ExpensiveArg:
+    formatted = 0
+
+    def __str__(self):
+        ExpensiveArg.formatted += 1
+        return "expensive"
+
+
+def make_logger(level):
+    stream = io.StringIO()
+    handler = StreamHandler(stream)
+    handler.setFormatter(Formatter(fmt="[{levelname}] {message}", style="{"))
+    logger = Logger("test", level)
+    logger.addHandler(handler)
+    return logger, stream
+
+
+def test_message_formatted_by_handler():
+    logger, stream = make_logger(INFO)
+    logger.info("value %s and %d%%", "a", 42)
+    assert stream.getvalue() == "[INFO] value a and 42%\n"
+
+
+def test_message_without_args_is_not_formatted():
+    logger, stream = make_logger(INFO)
+    logger.warning("100% literal")
+    assert stream.getvalue() == "[WARNING] 100% literal\n"
+
+
+def test_filtered_level_is_never_formatted():
+    logger, stream = make_logger(WARNING)
+    ExpensiveArg.formatted = 0
+    logger.info("%s", ExpensiveArg())
+    logger.debug("%s", ExpensiveArg())
+    assert ExpensiveArg.formatted == 0
+    assert stream.getvalue() == ""
+
+    logger.warning("%s", ExpensiveArg())
+    assert ExpensiveArg.formatted == 1
+
+
+def test_is_enabled_for():
+    logger, _ = make_logger(INFO)
+    assert logger.isEnabledFor(INFO)
+    assert logger.isEnabledFor(WARNING)
+    assert not logger.isEnabledFor(DEBUG)
+
+
+def test_rotating_file_handler_tracks_size_without_stat(tmp_path, monkeypatch):
+    path = str(tmp_path / "log.txt")
+    with open(path, "w") as f:
+        f.write("x" * 90)
+
+    handler = RotatingFileHandler(path, maxBytes=100, backupCount=2, flushBytes=0, flushInterval=0)
+    handler.setFormatter(Formatter(fmt="{message}", style="{"))
+    logger = Logger("rotating", INFO)
+    logger.addHandler(handler)
+
+    def no_stat(*args):
+        raise AssertionError("stat called after open")
+
+    monkeypatch.setattr(logging.os, "stat", no_stat)
+    logger.info("a" * 20)  # 110 bytes, rotated on the next record
+    logger.info("b" * 20)
+    handler.flush()
+    monkeypatch.undo()
+
+    assert os.path.getsize(path + ".1") == 110
+    assert os.path.getsize(path) == 20
+    handler.close()
+
+
+def test_rotating_file_handler_flush_thresholds(tmp_path):
+    path = str(tmp_path / "log.txt")
+    handler = RotatingFileHandler(path, flushBytes=50, flushInterval=0, flushLevel=CRITICAL)
+    handler.setFormatter(Formatter(fmt="{message}", style="{"))
+    logger = Logger("buffered", INFO)
+    logger.addHandler(handler)
+
+    logger.error("e" * 30)
+    assert handler._pendingBytes == 30  # buffered
+    logger.info("i" * 30)
+    assert handler._pendingBytes == 0  # byte threshold
+    logger.info("i")
+    logger.critical("c")
+    assert handler._pendingBytes == 0  # CRITICAL always flushed
+    assert os.path.getsize(path) == 62
+    handler.close()
+
+
+def record(msg, created, *args, level=WARNING):
+    return LogRecord("test", level, "WARNING", msg, created, args)
+
+
+def test_rate_limit_filter_collapses_repeats():
+    fltr = RateLimitFilter(rate=1.0, burst=2)
+    assert fltr.filter(record("No EPS data available", 0.0)) is not None
+    assert fltr.filter(record("No EPS data available", 0.1)) is not None
+    assert fltr.filter(record("No EPS data available", 0.2)) is None
+    assert fltr.filter(record("No EPS data available", 0.3)) is None
+    assert fltr.filter(record("Other %s", 0.3, 1)) is not None  # independent bucket
+
+    repeated = fltr.filter(record("No EPS data available", 1.3))
+    assert repeated is not None
+    assert logging.getMessage(repeated) == "[repeated 2 times] No EPS data available"
+    assert fltr.filter(record("No EPS data available", 1.4)) is None
+
+
+def test_rate_limit_filter_keeps_arguments_and_exempt_levels():
+    fltr = RateLimitFilter(rate=1.0, burst=1)
+    assert fltr.filter(record("%s%% battery", 0.0, 50)) is not None
+    assert fltr.filter(record("%s%% battery", 0.5, 50)) is None
+    assert fltr.filter(record("%s%% battery", 0.6, 49)) is not None  # new value, not a repeat
+    assert logging.getMessage(fltr.filter(record("%s%% battery", 2.0, 50))) == "[repeated 1 times] 50% battery"
+
+    for t in range(5):
+        assert fltr.filter(record("Critical", float(t) / 10, level=CRITICAL)) is not None
+        assert fltr.filter(record("%s", float(t) / 10, "exception", level=ERROR)) is not None
+
+
+def test_rate_limit_filter_without_formatting(monkeypatch):
+    fltr = RateLimitFilter(rate=0.0, burst=1)
+    monkeypatch.setattr(logging, "getMessage", lambda record: pytest.fail("record formatted"))
+    assert fltr.filter(record("%s%% battery", 0.0, 50)) is not None
+    assert fltr.filter(record("%s%% battery", 0.1, 50)) is None
+    monkeypatch.undo()
+
+    # Unhashable arguments: keyed on the formatted message
+    assert fltr.filter(record("Gyro %s", 0.0, [0.1, 0.2])) is not None
+    assert fltr.filter(record("Gyro %s", 0.1, [0.1, 0.2])) is None
+    assert fltr.filter(record("Gyro %s", 0.2, [0.1, 0.3])) is not None
+
+
+def test_rate_limit_filter_bucket_per_task():
+    # Same template for every task: a noisy task doesn't use up the burst of the others
+    fltr = RateLimitFilter(rate=0.0, burst=1)
+    assert fltr.filter(record("[%s][%s] %s", 0.0, 1, "IMU", "error")) is not None
+    assert fltr.filter(record("[%s][%s] %s", 0.1, 1, "IMU", "error")) is None
+    assert fltr.filter(record("[%s][%s] %s", 0.2, 2, "EPS", "error")) is not None
+
+
+def test_rate_limit_filter_bounded_keys():
+    fltr = RateLimitFilter(rate=0.0, burst=1, maxKeys=2)
+    fltr.filter(record("a", 0.0))
+    fltr.filter(record("b", 0.0))
+    assert fltr.filter(record("a", 0.0)) is None
+    for t in range(3):  # table full: untracked templates are not limited
+        assert fltr.filter(record("c", float(t))) is not None
+    assert len(fltr._buckets) == 2
+
+
+def test_logger_filter_drops_records():
+    logger, stream = make_logger(INFO)
+    logger.addFilter(RateLimitFilter(rate=0.0, burst=1))
+    logger.info("same")
+    logger.info("same")
+    assert stream.getvalue() == "[INFO] same\n"
+
+
+def test_handler_filter_drops_records():
+    logger, stream = make_logger(INFO)
+    other = io.StringIO()
+    logger.addHandler(StreamHandler(other))
+    logger._handlers[0].addFilter(RateLimitFilter(rate=0.0, burst=1))
+    for _ in range(2):
+        logger.info("same")
+    logger.info("value %s", 1)
+    assert stream.getvalue() == "[INFO] same\n[INFO] value 1\n"
+    assert other.getvalue().count("same") == 2
+
+
+class CaptureFilter(logging.Filter):
+    def __init__(self):
+        self.records = []
+
+    def filter(self, record):
+        self.records.append(record)
+        return record
+
+
+def test_task_messages_built_only_when_enabled(monkeypatch):
+    logger, stream = make_logger(INFO)
+    capture = CaptureFilter()
+    records = capture.records
+    logger.addFilter(capture)
+    monkeypatch.setattr(template_task, "logger", logger)
+    task = template_task.TemplateTask(3)
+
+    ExpensiveArg.formatted = 0
+    task.log_debug("disabled %s", ExpensiveArg())
+    assert ExpensiveArg.formatted == 0 and records == []
+
+    # Prefixed template built once per template, literal messages kept as is
+    task.log_info("value %s", 1)
+    task.log_info("value %s", 2)
+    task.log_warning("100% literal")
+    assert records[0].msg is records[1].msg
+    assert stream.getvalue() == "[INFO] [3][TASK] value 1\n[INFO] [3][TASK] value 2\n[WARNING] [3][TASK] 100% literal\n"
@@ -1,8 +1,17 @@
+# isort: skip_file
+import random
+
+import numpy as np
 import pytest
 
+import tests.cp_mock  # noqa: F401
 from flight.apps.telemetry.helpers import (
+    convert_fixed_point_array_to_float_hp,
+    convert_fixed_point_array_to_float_lp,
     convert_fixed_point_to_float_hp,
     convert_fixed_point_to_float_lp,
+    convert_float_array_to_fixed_point_hp,
+    convert_float_array_to_fixed_point_lp,
     convert_float_to_fixed_point_hp,
     convert_float_to_fixed_point_lp,
 )
@@ -66,3 +75,46 @@ def test_convert_float_to_fixed_point_hp(val, expected):
 def test_convert_fixed_point_to_float_hp(message_list, expected):
     result = convert_fixed_point_to_float_hp(message_list)
     assert result == pytest.approx(expected, rel=1e-6)
+
+
+@pytest.mark.parametrize(
+    "encode_array, decode_array, encode, decode, limit",
+    [
+        (
+            convert_float_array_to_fixed_point_hp,
+            convert_fixed_point_array_to_float_hp,
+            convert_float_to_fixed_point_hp,
+            convert_fixed_point_to_float_hp,
+            300.0,
+        ),
+        (
+            convert_float_array_to_fixed_point_lp,
+            convert_fixed_point_array_to_float_lp,
+            convert_float_to_fixed_point_lp,
+            convert_fixed_point_to_float_lp,
+            80000.0,
+        ),
+    ],
+)
+def test_fixed_point_array_matches_scalar(encode_array, decode_array, encode, decode, limit):
+    rng = random.Random(0)
+    # Out of range values wrap like the scalar helpers
+    values = [rng.uniform(-limit, limit) for _ in range(1000)] + [0.0, -0.0, 0.5, -0.5, 12.3456789, 1e-9, -1e-9]
+
+    buffer = bytearray(2 + 4 * len(values))
+    assert encode_array(np.array(values), buffer, 2) == len(buffer)
+    expected = b"".join(encode(val) for val in values)
+    assert buffer[2:] == expected
+
+    decoded = decode_array(buffer, len(values), offset=2)
+    assert decoded.tolist() == [decode(expected[4 * i : 4 * i + 4]) for i in range(len(values))]
+
+
+def test_fixed_point_array_column():
+    # Same field in consecutive 10-byte frames
+    values = [0.25, -1.5, 100.125]
+    frames = bytearray(10 * len(values))
+    for i, val in enumerate(values):
+        convert_float_array_to_fixed_point_hp([val], frames, 10 * i + 3)
+    assert convert_fixed_point_array_to_float_hp(frames, len(values), offset=3, stride=10).tolist() == values
+    assert len(convert_fixed_point_array_to_float_hp(frames, 0)) == 0
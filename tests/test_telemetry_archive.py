@@ -0,0 +1,115 @@
+# isort: skip_file
+import random
+
+import numpy as np
+import pytest
+
+import tests.cp_mock  # noqa: F401
+from flight.apps.telemetry.frames import (
+    TM_FRAME_ID,
+    TM_FRAMES,
+    TM_HISTORY_RECORD_SCHEMA,
+    TM_HISTORY_RECORD_SIZE,
+    TM_HISTORY_RECORDS_OFFSET,
+)
+from flight.apps.telemetry.schema import FP_HP
+from ground.telemetry_archive import decode_frames, decode_history_frames, export, frame_dtype
+
+
+def _capture(frame_id, count, rng):
+    # Frames packed by the flight schema with random values
+    schema, size = TM_FRAMES[frame_id]
+    frames = []
+    for seq in range(count):
+        for tag in schema.tags:
+            values = [0] * 64
+            for name, field_tag, idx, enc, offset in schema.fields:
+                if field_tag == tag:
+                    values[idx] = rng.uniform(-127.0, 127.0) if enc == FP_HP else rng.randint(-(2**31), 2**31)
+            schema.update(tag, values)
+        frame = bytearray(size)
+        frame[0], frame[1], frame[2], frame[3] = frame_id, seq >> 8, seq & 0xFF, schema.length
+        schema.pack_into(frame)
+        frames.append(bytes(frame))
+    return frames
+
+
+@pytest.mark.parametrize("frame_id", [TM_FRAME_ID.FULL, TM_FRAME_ID.COMPACT, TM_FRAME_ID.ADCS, TM_FRAME_ID.STORAGE])
+def test_decode_matches_schema(frame_id):
+    schema, size = TM_FRAMES[frame_id]
+    frames = _capture(frame_id, 50, random.Random(frame_id))
+    assert frame_dtype(frame_id).itemsize == size
+
+    # Trailing partial frame is ignored
+    decoded = decode_frames(b"".join(frames) + frames[0][:10], frame_id)
+    assert len(decoded["header"]) == len(frames)
+    assert decoded["header"]["seq_count"].tolist() == list(range(len(frames)))
+    assert (decoded["header"]["packet_length"] == schema.length).all()
+
+    for i, frame in enumerate(frames):
+        expected = schema.decode(frame)
+        for tag, fields in expected.items():
+            for name, val in fields.items():
+                assert decoded[tag][name][i] == val
+
+
+def test_decode_drops_other_frame_types():
+    frames = _capture(TM_FRAME_ID.COMPACT, 4, random.Random(0))
+    other = bytearray(frames[1])
+    other[0] = TM_FRAME_ID.ADCS
+    decoded = decode_frames(b"".join([frames[0], bytes(other), frames[2], frames[3]]), TM_FRAME_ID.COMPACT)
+    assert decoded["header"]["seq_count"].tolist() == [0, 2, 3]
+    schema = TM_FRAMES[TM_FRAME_ID.COMPACT][0]
+    assert decoded["adcs"]["GYRO_X"][1] == schema.decode(frames[2])["adcs"]["GYRO_X"]
+
+
+def test_decode_history_frames():
+    rng = random.Random(2)
+    records = []
+    for seq in range(12):
+        for tag in TM_HISTORY_RECORD_SCHEMA.tags:
+            values = [0] * 64
+            for name, field_tag, idx, enc, offset in TM_HISTORY_RECORD_SCHEMA.fields:
+                if field_tag == tag:
+                    values[idx] = rng.uniform(-127.0, 127.0) if enc == FP_HP else rng.randint(0, 2**15)
+            values[0] = seq  # TIME of the cdh section
+            TM_HISTORY_RECORD_SCHEMA.update(tag, values)
+        record = bytearray(TM_HISTORY_RECORD_SIZE)
+        TM_HISTORY_RECORD_SCHEMA.pack_into(record)
+        records.append(bytes(record))
+
+    # Overlapping and partial pages, as received over several passes
+    schema, size = TM_FRAMES[TM_FRAME_ID.HISTORY]
+    frames = b""
+    for first, count in ((0, 8), (4, 8), (8, 3), (11, 1), (12, 0)):
+        frame = bytearray(size)
+        frame[0] = TM_FRAME_ID.HISTORY
+        schema.update("history", (first, count, 12))
+        schema.pack_into(frame)
+        frame[TM_HISTORY_RECORDS_OFFSET : TM_HISTORY_RECORDS_OFFSET + count * TM_HISTORY_RECORD_SIZE] = b"".join(
+            records[first : first + count]
+        )
+        frames += bytes(frame)
+
+    decoded = decode_history_frames(frames)
+    assert decoded["history"]["RECORD_COUNT"].tolist() == [8, 8, 3, 1, 0]
+    assert decoded["records"]["SEQ"].tolist() == list(range(12))
+    for seq, record in enumerate(records):
+        expected = TM_HISTORY_RECORD_SCHEMA.decode(record)
+        for tag, fields in expected.items():
+            for name, val in fields.items():
+                assert decoded["records"][name][seq] == val
+
+
+def test_export(tmp_path):
+    frames = _capture(TM_FRAME_ID.COMPACT, 3, random.Random(1))
+    decoded = decode_frames(b"".join(frames), TM_FRAME_ID.COMPACT)
+
+    paths = export(decoded, str(tmp_path), "capture")
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(f"capture_{tag}.csv" for tag in decoded)
+    with open(paths[1]) as f:
+        assert f.readline().strip().split(",") == list(decoded["cdh"].dtype.names)
+
+    (path,) = export(decoded, str(tmp_path), "capture", "npz")
+    with np.load(path) as archive:
+        assert (archive["eps"] == decoded["eps"]).all()
@@ -0,0 +1,273 @@
+# isort: skip_file
+import random
+
+import pytest
+
+import tests.cp_mock  # noqa: F401
+import flight.apps.telemetry.packing as packing
+import flight.core.data_handler as dh
+from flight.apps.telemetry.frames import (
+    TM_FRAME_FIELDS,
+    TM_FRAME_ID,
+    TM_FRAMES,
+    TM_HEADER_SIZE,
+    TM_HISTORY_RECORD_SCHEMA,
+    TM_HISTORY_RECORD_SIZE,
+    TM_HISTORY_RECORDS_OFFSET,
+    TM_HISTORY_RECORDS_PER_FRAME,
+)
+from flight.apps.telemetry.helpers import (
+    convert_float_to_fixed_point_hp,
+    convert_float_to_fixed_point_lp,
+    pack_signed_long_int,
+    pack_signed_short_int,
+    pack_unsigned_long_int,
+    pack_unsigned_short_int,
+)
+from flight.apps.telemetry.schema import FP_HP, FP_LP, S16, S32, U8, U16, U32, FrameSchema
+from flight.core.states import STATES
+
+_SIZES = {U8: 1, U16: 2, S16: 2, U32: 4, S32: 4, FP_HP: 4, FP_LP: 4}
+
+
+def _reference_pack(fields, data, frame):
+    # Field by field encoding with the helpers, as done before the schema
+    for name, tag, idx, enc, offset in fields:
+        if tag not in data:
+            continue
+        values = data[tag]
+        if enc == U8:
+            encoded = bytearray([values[idx] & 0xFF])
+        elif enc == U16:
+            encoded = pack_unsigned_short_int(values, idx)
+        elif enc == S16:
+            encoded = pack_signed_short_int(values, idx)
+        elif enc == U32:
+            encoded = pack_unsigned_long_int(values, idx)
+        elif enc == S32:
+            encoded = pack_signed_long_int(values, idx)
+        elif enc == FP_HP:
+            encoded = convert_float_to_fixed_point_hp(values[idx])
+        else:
+            encoded = convert_float_to_fixed_point_lp(values[idx])
+        frame[offset : offset + _SIZES[enc]] = encoded
+
+
+def _random_data(fields, rng):
+    data = {}
+    for name, tag, idx, enc, offset in fields:
+        values = data.setdefault(tag, [0] * 64)
+        if enc == FP_HP:
+            values[idx] = rng.uniform(-127.0, 127.0)
+        elif enc == FP_LP:
+            values[idx] = rng.uniform(-32767.0, 32767.0)
+        else:
+            # Out of range values wrap like the helpers
+            values[idx] = rng.randint(-(2**33), 2**33)
+    return data
+
+
+def test_tm_frame_layout():
+    schema = FrameSchema(TM_FRAME_FIELDS, start=TM_HEADER_SIZE, length=245)
+    assert schema.pack_fmt.count("x") == 0
+    assert schema.tags == ["cdh", "eps", "adcs", "gps", "thermal"]
+    assert schema.fields[0][4] == 4
+    assert schema.fields[-1][4] == 247
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_tm_frame_matches_helpers(seed):
+    rng = random.Random(seed)
+    schema = FrameSchema(TM_FRAME_FIELDS, start=TM_HEADER_SIZE, length=245)
+    data = _random_data(TM_FRAME_FIELDS, rng)
+
+    expected = bytearray(250)
+    _reference_pack(TM_FRAME_FIELDS, data, expected)
+
+    frame = bytearray(250)
+    for tag in schema.tags:
+        schema.update(tag, data[tag])
+    schema.pack_into(frame)
+    assert frame == expected
+
+
+def test_decode_roundtrip():
+    rng = random.Random(0)
+    schema = FrameSchema(TM_FRAME_FIELDS, start=TM_HEADER_SIZE, length=245)
+    data = _random_data(TM_FRAME_FIELDS, rng)
+    for tag in schema.tags:
+        schema.update(tag, data[tag])
+    frame = bytearray(250)
+    schema.pack_into(frame)
+
+    decoded = schema.decode(frame)
+    for name, tag, idx, enc, offset in TM_FRAME_FIELDS:
+        val = data[tag][idx]
+        if enc == FP_HP:
+            assert decoded[tag][name] == pytest.approx(val, abs=2**-23)
+        elif enc in (S16, S32):
+            bits = _SIZES[enc] * 8
+            wrapped = val & ((1 << bits) - 1)
+            assert decoded[tag][name] == (wrapped - (1 << bits) if wrapped >> (bits - 1) else wrapped)
+        else:
+            assert decoded[tag][name] == val & ((1 << (_SIZES[enc] * 8)) - 1)
+
+
+def test_missing_section_keeps_last_values():
+    fields = [("A", "a", 0, U16, 4), ("B", "b", 0, FP_LP, 8)]
+    schema = FrameSchema(fields, start=4, length=8)
+    assert schema.pack_fmt == ">H2xI"
+
+    frame = bytearray(12)
+    schema.update("a", [513])
+    schema.update("b", [-1.5])
+    schema.pack_into(frame)
+    assert frame[4:6] == bytearray([0x02, 0x01])
+    assert frame[8:12] == convert_float_to_fixed_point_lp(-1.5)
+
+    schema.update("a", [7])
+    schema.pack_into(frame)
+    assert frame[4:6] == bytearray([0x00, 0x07])
+    assert schema.decode(frame) == {"a": {"A": 7}, "b": {"B": -1.5}}
+
+
+def test_overlapping_fields():
+    with pytest.raises(ValueError):
+        FrameSchema([("A", "a", 0, U32, 4), ("B", "a", 1, U8, 6)], start=4)
+    with pytest.raises(ValueError):
+        FrameSchema([("A", "a", 0, U32, 4)], start=4, length=2)
+
+
+class FakeDataHandler:
+    def __init__(self, data, processes=None):
+        self.data = data
+        self.seq = {tag: 1 for tag in data}
+        self.processes = processes or {}
+
+    def log_data(self, tag, values):
+        self.data[tag] = values
+        self.seq[tag] += 1
+
+    def get_update_seq(self, tag):
+        return self.seq.get(tag, -1)
+
+    def data_available(self, tag):
+        return tag in self.data
+
+    def get_latest_data(self, tag):
+        return self.data[tag]
+
+    def data_process_exists(self, tag):
+        return tag in self.processes
+
+    def get_data_process(self, tag):
+        return self.processes[tag]
+
+
+def test_packer_only_repacks_updated_sections(monkeypatch):
+    data = _random_data(TM_FRAME_FIELDS, random.Random(1))
+    fake_dh = FakeDataHandler(data)
+    monkeypatch.setattr(packing, "DH", fake_dh)
+    monkeypatch.setattr(packing.TelemetryPacker, "_FRAMES", packing._allocate_frames())
+    schema = packing.TelemetryPacker._FRAMES[TM_FRAME_ID.FULL][0]
+
+    updated = []
+    update = schema.update
+    monkeypatch.setattr(schema, "update", lambda tag, values: updated.append(tag) or update(tag, values))
+
+    packing.TelemetryPacker.pack_tm_frame()
+    assert updated == ["cdh", "eps", "adcs", "gps", "thermal"]
+
+    updated.clear()
+    packing.TelemetryPacker.pack_tm_frame()
+    assert updated == []
+
+    fake_dh.log_data("gps", [val + 1 for val in data["gps"]])
+    packing.TelemetryPacker.pack_tm_frame()
+    assert updated == ["gps"]
+
+    expected = bytearray([0x01, 0x00, 0x00, 245]) + bytearray(250 - TM_HEADER_SIZE)
+    _reference_pack(TM_FRAME_FIELDS, fake_dh.data, expected)
+    assert packing.TelemetryPacker.FRAME() == expected
+
+
+def test_frame_registry():
+    for frame_id, (schema, size) in TM_FRAMES.items():
+        assert TM_HEADER_SIZE + schema.length <= size <= 250
+    assert TM_FRAMES[TM_FRAME_ID.COMPACT][1] <= 48
+
+
+def test_frame_selection(monkeypatch):
+    data = _random_data(TM_FRAME_FIELDS, random.Random(2))
+    data["storage"] = list(range(18))
+    monkeypatch.setattr(packing, "DH", FakeDataHandler(data))
+    monkeypatch.setattr(packing.TelemetryPacker, "_FRAMES", packing._allocate_frames())
+    monkeypatch.setattr(packing.TelemetryPacker, "_REQUESTED_ID", None)
+    packer = packing.TelemetryPacker
+
+    assert packer.next_frame_id(STATES.NOMINAL) == TM_FRAME_ID.FULL
+    assert packer.next_frame_id(STATES.LOW_POWER) == TM_FRAME_ID.COMPACT
+    assert packer.next_frame_id(STATES.SAFE) == TM_FRAME_ID.COMPACT
+
+    # Ground request overrides the state default for a single heartbeat
+    assert packer.request_frame(TM_FRAME_ID.STORAGE)
+    assert not packer.request_frame(0x7F)
+    assert packer.next_frame_id(STATES.LOW_POWER) == TM_FRAME_ID.STORAGE
+    assert packer.next_frame_id(STATES.LOW_POWER) == TM_FRAME_ID.COMPACT
+
+    assert packer.pack_tm_frame(TM_FRAME_ID.COMPACT)
+    frame = packer.FRAME()
+    assert packer.FRAME_ID() == TM_FRAME_ID.COMPACT
+    assert frame[0] == TM_FRAME_ID.COMPACT and frame[3] == len(frame) - TM_HEADER_SIZE
+    assert len(frame) == packer.FRAME_SIZE()
+    decoded = TM_FRAMES[TM_FRAME_ID.COMPACT][0].decode(frame)
+    assert decoded["cdh"]["TIME"] == data["cdh"][0] & 0xFFFFFFFF
+
+    assert packer.pack_tm_frame(TM_FRAME_ID.STORAGE)
+    decoded = TM_FRAMES[TM_FRAME_ID.STORAGE][0].decode(packer.FRAME())
+    assert decoded["storage"]["EVT_DIR_SIZE"] == 17
+
+    assert not packer.pack_tm_frame(0x7F)
+
+
+def test_history_catch_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(dh, "_HOME_PATH", str(tmp_path))
+    history = dh.HistoryProcess("history", TM_HISTORY_RECORD_SIZE, capacity=16)
+    data = _random_data(TM_FRAME_FIELDS, random.Random(3))
+    fake_dh = FakeDataHandler(data, {"history": history})
+    monkeypatch.setattr(packing, "DH", fake_dh)
+    monkeypatch.setattr(packing.TelemetryPacker, "_FRAMES", packing._allocate_frames())
+    monkeypatch.setattr(packing.TelemetryPacker, "_HISTORY_PACKED_SEQ", {})
+    monkeypatch.setattr(packing.TelemetryPacker, "_HISTORY_CURSOR", None)
+    packer = packing.TelemetryPacker
+
+    for t in range(20):
+        fake_dh.log_data("cdh", [t] + data["cdh"][1:])
+        history.log(packer.pack_history_record())
+
+    # Catch-up from an overwritten record: starts at the oldest one, ends when caught up
+    packer.request_history(0)
+    pages = []
+    while packer.next_frame_id(STATES.NOMINAL) == TM_FRAME_ID.HISTORY:
+        assert packer.pack_tm_frame(TM_FRAME_ID.HISTORY)
+        pages.append(bytes(packer.FRAME()))
+    assert len(pages) == 2
+
+    times = []
+    for page in pages:
+        header = TM_FRAMES[TM_FRAME_ID.HISTORY][0].decode(page)["history"]
+        assert header["TOTAL_RECORDS"] == 20
+        assert page[3] == 9 + header["RECORD_COUNT"] * TM_HISTORY_RECORD_SIZE
+        for i in range(header["RECORD_COUNT"]):
+            record = TM_HISTORY_RECORD_SCHEMA.decode(page[TM_HISTORY_RECORDS_OFFSET + i * TM_HISTORY_RECORD_SIZE :])
+            times.append((header["FIRST_SEQ"] + i, record["cdh"]["TIME"]))
+    assert times == [(seq, seq) for seq in range(4, 20)]
+    assert TM_HISTORY_RECORDS_PER_FRAME == 8
+
+    # Single page requested with REQUEST_TELEMETRY: latest records
+    assert packer.request_frame(TM_FRAME_ID.HISTORY)
+    assert packer.next_frame_id(STATES.NOMINAL) == TM_FRAME_ID.HISTORY
+    assert packer.pack_tm_frame(TM_FRAME_ID.HISTORY)
+    assert TM_FRAMES[TM_FRAME_ID.HISTORY][0].decode(packer.FRAME())["history"]["FIRST_SEQ"] == 12
+    assert packer.next_frame_id(STATES.NOMINAL) == TM_FRAME_ID.FULL
+    history.close()